@@ -39,6 +39,8 @@ Adapter that uses the traits module to generate interfaces for ... Analyzer.
 import numpy
 from tvb.core.adapters.abcadapter import ABCAsynchronous
 from tvb.core.adapters.exceptions import LaunchException
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
 from tvb.basic.config.settings import TVBSettings
 from tvb.basic.logger.builder import get_logger
 from tvb.basic.filters.chain import FilterChain
@@ -120,16 +122,13 @@ class CrossCorrelateAdapter(ABCAsynchronous):
         cross_corr = CrossCorrelation(source=time_series,
                                       storage_path=self.storage_path)
         
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), slice(self.input_shape[3])]
+        reader = ChunkedArrayReader(time_series, split_axis=1, block_length=1)
         ##---------- Iterate over slices and compose final result ------------##
-        small_ts = TimeSeries(use_storage=False)
-        small_ts.sample_period = time_series.sample_period
+        self._sample_period = time_series.sample_period
         partial_cross_corr = None
-        for var in range(self.input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
-            self.algorithm.time_series = small_ts
-            partial_cross_corr = self.algorithm.evaluate()
+        executor = BlockExecutor()
+        for partial_cross_corr in executor.map(self._compute_block, reader, self.get_required_memory_size(),
+                                               self.input_shape[1]):
             cross_corr.write_data_slice(partial_cross_corr)
         cross_corr.time = partial_cross_corr.time
         cross_corr.labels_ordering[1] = time_series.labels_ordering[2]
@@ -138,6 +137,16 @@ class CrossCorrelateAdapter(ABCAsynchronous):
         return cross_corr
 
 
+    def _compute_block(self, block_data):
+        """
+        Cross-correlate the nodes of one state-variable block. Called from a worker thread.
+        """
+        small_ts = TimeSeries(use_storage=False)
+        small_ts.sample_period = self._sample_period
+        small_ts.data = block_data
+        return CrossCorrelate(time_series=small_ts).evaluate()
+
+
 class PearsonCorrelationCoefficientAdapter(ABCAsynchronous):
     """ TVB adapter for calling the Pearson CrossCorrelation algorithm. """
 
@@ -41,10 +41,12 @@ import math
 from tvb.basic.config.settings import TVBSettings
 import tvb.analyzers.fft as fft
 import tvb.core.adapters.abcadapter as abcadapter
+import tvb.core.entities.file.chunk_reader as chunk_reader
 import tvb.basic.filters.chain as entities_filter
 import tvb.datatypes.time_series as datatypes_time_series
 import tvb.datatypes.spectral as spectral
 from tvb.basic.logger.builder import get_logger
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
 
 LOG = get_logger(__name__)
 
@@ -146,9 +148,13 @@ class FourierAdapter(abcadapter.ABCAsynchronous):
 
         """
         shape = time_series.read_data_shape()
-        block_size = int(math.floor(time_series.read_data_shape()[2]
-                                    / self.memory_factor))
-        blocks = int(math.ceil(time_series.read_data_shape()[2] / block_size))
+        executor = BlockExecutor()
+        ## Split nodes in blocks small enough to fit in memory, and in at least one block per worker.
+        block_size = int(math.floor(shape[2] / self.memory_factor))
+        block_size = min(block_size, int(math.ceil(shape[2] / float(executor.max_workers))))
+        reader = chunk_reader.ChunkedArrayReader(time_series, split_axis=2, block_length=block_size)
+        block_slices = reader.block_slices()
+        block_memory = self.get_required_memory_size() * self.memory_factor * reader.block_length / shape[2]
         
         ##----------- Prepare a FourierSpectrum object for result ------------##
         spectra = spectral.FourierSpectrum(source=time_series,
@@ -157,16 +163,11 @@ class FourierAdapter(abcadapter.ABCAsynchronous):
                                            storage_path=self.storage_path)
         
         ##------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(shape[0]), slice(shape[1]), None, slice(shape[3])]
-        
         ##---------- Iterate over slices and compose final result ------------##
-        small_ts = datatypes_time_series.TimeSeries(use_storage=False)
-        small_ts.sample_period = time_series.sample_period
-        for block in range(blocks):
-            node_slice[2] = slice(block * block_size, min([(block+1) * block_size, shape[2]]), 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
-            self.algorithm.time_series = small_ts
-            partial_result = self.algorithm.evaluate()
+        self._sample_period = time_series.sample_period
+        partial_result = None
+        for partial_result in executor.map(self._compute_block, reader.iter_blocks(block_slices),
+                                           block_memory, len(block_slices)):
             spectra.write_data_slice(partial_result)
         
         LOG.debug("partial segment_length is %s" % (str(partial_result.segment_length)))
@@ -175,3 +176,15 @@ class FourierAdapter(abcadapter.ABCAsynchronous):
         return spectra
 
 
+    def _compute_block(self, block_data):
+        """
+        Evaluate the FFT for one block of nodes. Called from a worker thread.
+        """
+        small_ts = datatypes_time_series.TimeSeries(use_storage=False)
+        small_ts.sample_period = self._sample_period
+        small_ts.data = block_data
+        algorithm = fft.FFT(time_series=small_ts, segment_length=self.algorithm.segment_length,
+                            window_function=self.algorithm.window_function)
+        return algorithm.evaluate()
+
+
@@ -38,6 +38,7 @@ Adapter that uses the traits module to generate interfaces for ICA Analyzer.
 import numpy
 from tvb.analyzers.ica import fastICA
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
 from tvb.datatypes.time_series import TimeSeries
 from tvb.datatypes.mode_decompositions import IndependentComponents
 from tvb.basic.traits.util import log_debug_array
@@ -116,13 +117,12 @@ class ICAAdapter(ABCAsynchronous):
                                            storage_path=self.storage_path)
         
         ##------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), slice(self.input_shape[3])]
+        reader = ChunkedArrayReader(time_series, split_axis=1, block_length=1)
         
         ##---------- Iterate over slices and compose final result ------------##
         small_ts = TimeSeries(use_storage=False)
-        for var in range(self.input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
+        for block_data in reader:
+            small_ts.data = block_data
             self.algorithm.time_series = small_ts 
             partial_ica = self.algorithm.evaluate()
             ica_result.write_data_slice(partial_ica)
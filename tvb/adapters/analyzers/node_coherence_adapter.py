@@ -40,6 +40,8 @@ import numpy
 from tvb.basic.config.settings import TVBSettings
 from tvb.analyzers.node_coherence import NodeCoherence
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
 from tvb.datatypes.time_series import TimeSeries
 from tvb.datatypes.spectral import CoherenceSpectrum
 from tvb.basic.traits.util import log_debug_array
@@ -119,20 +121,27 @@ class NodeCoherenceAdapter(ABCAsynchronous):
                                       storage_path=self.storage_path)
         
         ##------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), slice(self.input_shape[3])]
+        reader = ChunkedArrayReader(time_series, split_axis=1, block_length=1)
         
         ##---------- Iterate over slices and compose final result ------------##
-        small_ts = TimeSeries(use_storage=False)
-        small_ts.sample_rate = time_series.sample_rate
+        self._sample_rate = time_series.sample_rate
         partial_coh = None
-        for var in range(self.input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
-            self.algorithm.time_series = small_ts
-            partial_coh = self.algorithm.evaluate()
+        executor = BlockExecutor()
+        for partial_coh in executor.map(self._compute_block, reader, self.get_required_memory_size(),
+                                        self.input_shape[1]):
             coherence.write_data_slice(partial_coh)
         coherence.frequency = partial_coh.frequency
         coherence.close_file()
         return coherence
 
 
+    def _compute_block(self, block_data):
+        """
+        Evaluate the coherence for one state-variable block. Called from a worker thread.
+        """
+        small_ts = TimeSeries(use_storage=False)
+        small_ts.sample_rate = self._sample_rate
+        small_ts.data = block_data
+        return NodeCoherence(time_series=small_ts, nfft=self.algorithm.nfft).evaluate()
+
+
@@ -40,6 +40,8 @@ import numpy
 from tvb.basic.config.settings import TVBSettings
 from tvb.analyzers.node_covariance import NodeCovariance
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
 from tvb.datatypes.time_series import TimeSeries
 from tvb.datatypes.graph import Covariance
 from tvb.basic.traits.util import log_debug_array
@@ -115,18 +117,28 @@ class NodeCovarianceAdapter(ABCAsynchronous):
         covariance = Covariance(source=time_series, storage_path=self.storage_path)
         
         #NOTE: Assumes 4D, Simulator timeSeries.
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), None]
-        
+        block_slices = []
         for mode in range(self.input_shape[3]):
             for var in range(self.input_shape[1]):
-                small_ts = TimeSeries(use_storage=False)
-                node_slice[1] = slice(var, var + 1)
-                node_slice[3] = slice(mode, mode + 1)
-                small_ts.data = time_series.read_data_slice(tuple(node_slice))
-                self.algorithm.time_series = small_ts 
-                partial_cov = self.algorithm.evaluate()
-                covariance.write_data_slice(partial_cov.array_data)
+                block_slices.append((slice(self.input_shape[0]), slice(var, var + 1),
+                                     slice(self.input_shape[2]), slice(mode, mode + 1)))
+
+        reader = ChunkedArrayReader(time_series, split_axis=1, block_length=1)
+        executor = BlockExecutor()
+        for partial_cov in executor.map(self._compute_block, reader.iter_blocks(block_slices),
+                                        self.get_required_memory_size(), len(block_slices)):
+            covariance.write_data_slice(partial_cov.array_data)
         covariance.close_file()
         return covariance
 
 
+    @staticmethod
+    def _compute_block(block_data):
+        """
+        Evaluate the covariance for one (state-variable, mode) block. Called from a worker thread.
+        """
+        small_ts = TimeSeries(use_storage=False)
+        small_ts.data = block_data
+        return NodeCovariance(time_series=small_ts).evaluate()
+
+
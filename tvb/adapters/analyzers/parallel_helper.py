@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Helper for running the independent blocks of a node-wise analyzer concurrently.
+
+Input blocks are read (in order) from the calling thread, the numeric part of each block is
+evaluated on a bounded pool of worker threads (NumPy and SciPy release the GIL in their heavy
+routines) and results are handed back in exactly the order in which blocks were submitted,
+so adapters can keep appending them to their H5 result files as before.
+"""
+
+import psutil
+import numpy
+import multiprocessing
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+## Fraction of the free (physical + swap) memory that blocks in flight are allowed to use.
+MEMORY_BUDGET_FACTOR = 0.8
+
+
+
+class BlockExecutor(object):
+    """
+    Bounded executor for analyzer blocks.
+
+    The number of blocks in flight at any moment is limited both by the number of workers and
+    by the memory budget: a block is only read once enough budget was released by the blocks
+    already handed back to the caller.
+    """
+
+
+    def __init__(self, max_workers=None, memory_budget=None):
+        """
+        :param max_workers: number of worker threads; defaults to the number of CPUs on this machine
+        :param memory_budget: bytes allowed for the blocks in flight; by default a fraction of the free memory
+        """
+        if max_workers is None:
+            max_workers = multiprocessing.cpu_count()
+        if memory_budget is None:
+            memory_budget = (psutil.virtual_memory().free + psutil.swap_memory().free) * MEMORY_BUDGET_FACTOR
+        self.max_workers = max(1, int(max_workers))
+        self.memory_budget = memory_budget
+
+
+    def max_blocks_in_flight(self, block_memory):
+        """
+        :param block_memory: estimated number of bytes needed to compute one block (input and result)
+        :returns: how many blocks can be read and evaluated at the same time
+        """
+        if block_memory is None or block_memory <= 0:
+            return 2 * self.max_workers
+        return int(max(1, min(2 * self.max_workers, self.memory_budget // block_memory)))
+
+
+    def map_blocks(self, compute_function, read_function, block_slices, block_memory=None):
+        """
+        Generator returning `compute_function(read_function(slice))` for every slice in `block_slices`,
+        in the same order as the slices.
+
+        :param compute_function: callable evaluated on a worker thread; it should not share mutable state
+                                 with other blocks (e.g. build its own algorithm instance)
+        :param read_function: callable invoked from the calling thread, e.g. `time_series.read_data_slice`
+        :param block_slices: iterable with the slice specification for every block
+        :param block_memory: estimated memory in bytes for a single block
+        """
+        block_slices = list(block_slices)
+        blocks = (read_function(block_slice) for block_slice in block_slices)
+        return self.map(compute_function, blocks, block_memory, len(block_slices))
+
+
+    def map(self, compute_function, blocks, block_memory=None, nr_of_blocks=None):
+        """
+        Generator returning `compute_function(block)` for every block of input data, in the same order.
+
+        :param compute_function: callable evaluated on a worker thread
+        :param blocks: iterable with the input data of every block (e.g. a `ChunkedArrayReader`), consumed
+                       lazily from the calling thread
+        :param block_memory: estimated memory in bytes for a single block
+        :param nr_of_blocks: number of blocks, when known; avoids starting a pool for a single block
+        """
+        max_in_flight = self.max_blocks_in_flight(block_memory)
+        nr_of_workers = min(self.max_workers, max_in_flight)
+        if nr_of_blocks is not None:
+            nr_of_workers = min(nr_of_workers, nr_of_blocks)
+        if nr_of_workers <= 1:
+            ## Nothing to gain from a pool, evaluate serially.
+            for block_data in blocks:
+                yield compute_function(block_data)
+            return
+
+        LOG.debug("Evaluating blocks on %d threads, with at most %d blocks in flight." % (nr_of_workers,
+                                                                                          max_in_flight))
+        ## NumPy floating point error handling is thread local; propagate the caller's settings to workers.
+        error_settings = numpy.geterr()
+        pool = ThreadPool(nr_of_workers)
+        pending = deque()
+        try:
+            for block_data in blocks:
+                pending.append(pool.apply_async(_evaluate_block, (compute_function, block_data, error_settings)))
+                if len(pending) >= max_in_flight:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+            pool.close()
+        finally:
+            pending.clear()
+            pool.terminate()
+            pool.join()
+
+
+
+def _evaluate_block(compute_function, block_data, error_settings):
+    """
+    Run on a worker thread, with the NumPy error handling of the thread submitting the block.
+    """
+    old_error_settings = numpy.seterr(**error_settings)
+    try:
+        return compute_function(block_data)
+    finally:
+        numpy.seterr(**old_error_settings)
+
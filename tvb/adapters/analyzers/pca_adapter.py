@@ -40,6 +40,7 @@ import numpy
 from tvb.basic.config.settings import TVBSettings
 from tvb.analyzers.pca import PCA
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
 from tvb.datatypes.time_series import TimeSeries
 from tvb.datatypes.mode_decompositions import PrincipalComponents
 from tvb.basic.traits.util import log_debug_array
@@ -113,13 +114,12 @@ class PCAAdapter(ABCAsynchronous):
         pca_result = PrincipalComponents(source=time_series, storage_path=self.storage_path)
         
         ##------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(self.input_shape[0]), None, slice(self.input_shape[2]), slice(self.input_shape[3])]
+        reader = ChunkedArrayReader(time_series, split_axis=1, block_length=1)
         
         ##---------- Iterate over slices and compose final result ------------##
         small_ts = TimeSeries(use_storage=False)
-        for var in range(self.input_shape[1]):
-            node_slice[1] = slice(var, var + 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
+        for block_data in reader:
+            small_ts.data = block_data
             self.algorithm.time_series = small_ts 
             partial_pca = self.algorithm.evaluate()
             pca_result.write_data_slice(partial_pca)
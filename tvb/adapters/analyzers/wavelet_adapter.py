@@ -37,12 +37,15 @@ ContinuousWaveletTransform Analyzer.
 
 """
 
+import math
 import numpy
 from tvb.basic.config.settings import TVBSettings
 from tvb.analyzers.wavelet import ContinuousWaveletTransform
 from tvb.datatypes.time_series import TimeSeries
 from tvb.datatypes.spectral import WaveletCoefficients
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
 from tvb.basic.traits.types_basic import Range
 from tvb.basic.traits.util import log_debug_array
 from tvb.basic.filters.chain import FilterChain
@@ -143,20 +146,38 @@ class ContinuousWaveletTransformAdapter(ABCAsynchronous):
                                       normalisation=self.algorithm.normalisation, storage_path=self.storage_path)
         
         ##------------- NOTE: Assumes 4D, Simulator timeSeries. --------------##
-        node_slice = [slice(self.input_shape[0]), slice(self.input_shape[1]), None, slice(self.input_shape[3])]
+        executor = BlockExecutor()
+        node_memory = self.get_required_memory_size()
+        ## Blocks of nodes, at least one block per worker, with all workers busy fitting in memory.
+        nodes_per_block = int(math.ceil(self.input_shape[2] / float(executor.max_workers)))
+        nodes_per_block = min(nodes_per_block, int(executor.memory_budget / executor.max_workers / node_memory))
+        reader = ChunkedArrayReader(time_series, split_axis=2, block_length=nodes_per_block)
+        block_slices = reader.block_slices()
         
         ##---------- Iterate over slices and compose final result ------------##
-        small_ts = TimeSeries(use_storage=False)
-        small_ts.sample_rate = time_series.sample_rate
-        small_ts.sample_period = time_series.sample_period
-        for node in range(self.input_shape[2]):
-            node_slice[2] = slice(node, node + 1)
-            small_ts.data = time_series.read_data_slice(tuple(node_slice))
-            self.algorithm.time_series = small_ts
-            partial_wavelet = self.algorithm.evaluate()
+        self._sample_rate = time_series.sample_rate
+        self._sample_period = time_series.sample_period
+        for partial_wavelet in executor.map(self._compute_block, reader.iter_blocks(block_slices),
+                                            node_memory * reader.block_length, len(block_slices)):
             wavelet.write_data_slice(partial_wavelet)
         
         wavelet.close_file()
         return wavelet
 
 
+    def _compute_block(self, block_data):
+        """
+        Evaluate the wavelet transform for one block of nodes. Called from a worker thread.
+        """
+        small_ts = TimeSeries(use_storage=False)
+        small_ts.sample_rate = self._sample_rate
+        small_ts.sample_period = self._sample_period
+        small_ts.data = block_data
+        algorithm = ContinuousWaveletTransform(time_series=small_ts, mother=self.algorithm.mother,
+                                               sample_period=self.algorithm.sample_period,
+                                               frequencies=self.algorithm.frequencies,
+                                               normalisation=self.algorithm.normalisation,
+                                               q_ratio=self.algorithm.q_ratio)
+        return algorithm.evaluate()
+
+
@@ -34,6 +34,8 @@
 
 from tvb.basic.config.settings import TVBSettings
 from tvb.core.adapters.abcadapter import ABCAsynchronous
+from tvb.core.entities.storage import dao
+from tvb.adapters.creators.local_connectivity_engine import LocalConnectivityEngine
 from tvb.datatypes.surfaces import LocalConnectivity
 from tvb.datatypes.equations import Equation
 import tvb.basic.traits.traited_interface as interface
@@ -71,10 +73,37 @@ class LocalConnectivityCreator(ABCAsynchronous):
         local_connectivity.cutoff = float(kwargs['cutoff'])
         local_connectivity.surface = kwargs['surface']
         local_connectivity.equation = self.get_lconn_equation(kwargs)
-        local_connectivity.compute_sparse_matrix()
+
+        # Same steps as LocalConnectivity.compute_sparse_matrix, with the distances computed in parallel.
+        surface = local_connectivity.surface
+        engine = LocalConnectivityEngine(surface.vertices, surface.triangles, local_connectivity.cutoff)
+        self._reported_progress = -1
+        local_connectivity.matrix_gdist = engine.compute_gdist_matrix(self._report_progress)
+        local_connectivity.compute()
+        # Avoid having a large data-set in memory.
+        local_connectivity.matrix_gdist = None
 
         return local_connectivity
 
+
+    def _report_progress(self, done, total):
+        """
+        Show on the operation how many vertices have their distances computed, in steps of 10%.
+        """
+        percent = 100 * done // max(total, 1)
+        if percent // 10 == self._reported_progress // 10:
+            return
+        self._reported_progress = percent
+        operation = dao.get_operation_by_id(self.operation_id)
+        if operation is None:
+            return
+        if done < total:
+            operation.additional_info = "Computed geodesic distances for %d of %d vertices (%d%%)." % (done, total,
+                                                                                                        percent)
+        else:
+            operation.additional_info = ''
+        dao.store_entity(operation)
+
     
     def get_lconn_equation(self, kwargs):
         """
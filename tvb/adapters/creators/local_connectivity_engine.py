@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Computation of the geodesic distance matrix behind a LocalConnectivity, in blocks of spatially
+close vertices evaluated on a pool of processes.
+
+For a block of source vertices only the part of the surface which can hold geodesic paths shorter
+than the cutoff is handed to gdist: such a path stays inside the Euclidean ball of radius `cutoff`
+around its source, so every triangle it crosses has all its vertices closer than `cutoff` plus the
+longest edge of the surface. These vertices are found with a KD-tree, and the distances computed on
+the reduced mesh are exactly the ones on the whole surface.
+"""
+
+import numpy
+import gdist
+import multiprocessing
+from scipy import sparse
+from scipy.spatial import cKDTree
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+## Maximum number of source vertices handled by one task of the pool.
+BLOCK_SIZE = 2000
+
+
+
+def spatial_blocks(vertices, block_size=BLOCK_SIZE):
+    """
+    Split the vertex indices in blocks of at most `block_size` spatially close vertices, by halving
+    recursively along the axis of largest extent.
+
+    :returns: a list of index arrays
+    """
+    blocks = []
+    pending = [numpy.arange(len(vertices))]
+    while pending:
+        indices = pending.pop()
+        if len(indices) <= block_size:
+            blocks.append(indices)
+            continue
+        points = vertices[indices]
+        axis = numpy.argmax(points.max(axis=0) - points.min(axis=0))
+        order = numpy.argsort(points[:, axis], kind='mergesort')
+        half = len(indices) // 2
+        pending.append(indices[order[half:]])
+        pending.append(indices[order[:half]])
+    return blocks
+
+
+
+def _block_distances(task):
+    """
+    Pool worker: geodesic distances up to the cutoff from the sources of one block, computed on their
+    reduced mesh.
+
+    :returns: (number of vertices in the block, rows, columns, distances) with the non-zero entries in
+              vertex indices of the whole surface
+    """
+    nr_of_block_vertices, sources, mesh_vertex_ids, mesh_vertices, mesh_triangles, cutoff = task
+    if not len(sources):
+        return nr_of_block_vertices, sources, sources, numpy.array([], dtype=numpy.float64)
+    local_matrix = gdist.local_gdist_matrix(mesh_vertices, mesh_triangles, max_distance=cutoff)
+    local_sources = numpy.searchsorted(mesh_vertex_ids, sources)
+    block_matrix = local_matrix.tocsr()[local_sources].tocoo()
+    return nr_of_block_vertices, sources[block_matrix.row], mesh_vertex_ids[block_matrix.col], block_matrix.data
+
+
+
+class LocalConnectivityEngine(object):
+    """
+    Builds the sparse matrix of geodesic distances (up to a cutoff) between the vertices of a surface,
+    as `gdist.local_gdist_matrix` does for the whole surface at once.
+    """
+
+
+    def __init__(self, vertices, triangles, cutoff, max_workers=None, block_size=BLOCK_SIZE):
+        """
+        :param max_workers: number of processes computing distances; defaults to the number of CPUs
+        """
+        self.vertices = numpy.ascontiguousarray(vertices, dtype=numpy.float64)
+        self.triangles = numpy.ascontiguousarray(triangles, dtype=numpy.int32)
+        self.cutoff = float(cutoff)
+        if max_workers is None:
+            max_workers = multiprocessing.cpu_count()
+        self.max_workers = max(1, int(max_workers))
+        self.block_size = block_size
+
+
+    def _build_tasks(self, blocks):
+        """
+        Generator with the input of `_block_distances` for each block of source vertices.
+        """
+        nr_of_vertices = len(self.vertices)
+        edges = self.vertices[self.triangles] - self.vertices[numpy.roll(self.triangles, 1, axis=1)]
+        radius = self.cutoff + numpy.sqrt((edges ** 2).sum(axis=-1)).max()
+        tree = cKDTree(self.vertices)
+
+        for block in blocks:
+            selected = numpy.zeros(nr_of_vertices, dtype=bool)
+            for neighbours in tree.query_ball_point(self.vertices[block], radius):
+                selected[neighbours] = True
+            mesh_triangles = self.triangles[selected[self.triangles].all(axis=1)]
+            mesh_vertex_ids = numpy.unique(mesh_triangles)
+            # Vertices which are not part of any triangle have no neighbours at all; they are still
+            # counted with their block, for the progress to reach the number of vertices.
+            sources = block[numpy.in1d(block, mesh_vertex_ids)]
+            if not len(sources):
+                yield len(block), sources, None, None, None, self.cutoff
+                continue
+            mesh_triangles = numpy.searchsorted(mesh_vertex_ids, mesh_triangles).astype(numpy.int32)
+            yield len(block), sources, mesh_vertex_ids, self.vertices[mesh_vertex_ids], mesh_triangles, self.cutoff
+
+
+    def compute_gdist_matrix(self, progress_callback=None):
+        """
+        :param progress_callback: called as `progress_callback(done, total)` with the number of
+                                  source vertices already evaluated
+        :returns: scipy.sparse.csc_matrix with the geodesic distances not larger than the cutoff
+        """
+        nr_of_vertices = len(self.vertices)
+        blocks = spatial_blocks(self.vertices, self.block_size)
+        tasks = self._build_tasks(blocks)
+        nr_of_workers = min(self.max_workers, len(blocks))
+        LOG.debug("Computing geodesic distances for %d vertices, in %d blocks on %d processes."
+                  % (nr_of_vertices, len(blocks), nr_of_workers))
+
+        pool = None
+        if nr_of_workers > 1:
+            pool = multiprocessing.Pool(processes=nr_of_workers)
+            results = pool.imap_unordered(_block_distances, tasks)
+        else:
+            results = (_block_distances(task) for task in tasks)
+
+        rows, columns, distances = [], [], []
+        done = 0
+        try:
+            for nr_of_sources, block_rows, block_columns, block_distances in results:
+                rows.append(block_rows)
+                columns.append(block_columns)
+                distances.append(block_distances)
+                done += nr_of_sources
+                if progress_callback is not None:
+                    progress_callback(done, nr_of_vertices)
+            if pool is not None:
+                pool.close()
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        if not rows:
+            return sparse.csc_matrix((nr_of_vertices, nr_of_vertices))
+        return sparse.csc_matrix((numpy.concatenate(distances),
+                                  (numpy.concatenate(rows), numpy.concatenate(columns))),
+                                 shape=(nr_of_vertices, nr_of_vertices))
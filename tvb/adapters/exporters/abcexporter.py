@@ -36,6 +36,7 @@ Root class for export functionality.
 from datetime import datetime
 from abc import ABCMeta, abstractmethod
 from tvb.core.entities.model import DataTypeGroup
+from tvb.core.entities.storage import dao
 from tvb.core.services.project_service import ProjectService
 from tvb.core.adapters.abcadapter import ABCAdapter
 
@@ -102,11 +103,11 @@ class ABCExporter:
         """
         # first check if current data is a DataTypeGroup
         if self.is_data_a_group(data):
-            data_types = ProjectService.get_datatypes_from_datatype_group(data.id)
+            first_gid = dao.get_first_datatype_gid_from_group(data.id)
             
-            if data_types is not None and len(data_types) > 0:
+            if first_gid is not None:
                 # Since all objects in a group are the same type it's enough 
-                return ABCAdapter.load_entity_by_gid(data_types[0].gid)
+                return ABCAdapter.load_entity_by_gid(first_gid)
             else:
                 return None    
         else:
@@ -139,6 +140,16 @@ class ABCExporter:
         """
         return isinstance(data, DataTypeGroup)        
     
+    def export_stream(self, data, project):
+        """
+        Exporters able to produce their result while it is being sent to the client override this method.
+
+        :returns: None when the data should be exported with `export`, or a tuple with
+                  1. name of the file to be shown to user
+                  2. iterable of byte strings with the export file content
+        """
+        return None
+    
     @abstractmethod
     def export(self, data, export_folder, project):
         """
@@ -36,6 +36,7 @@ Class responsible for all TVB exports (datatype or project).
 
 import os
 import json
+from collections import defaultdict
 from datetime import datetime
 from tvb.adapters.exporters.tvb_export import TVBExporter 
 from tvb.adapters.exporters.cifti_export import CIFTIExporter 
@@ -43,6 +44,7 @@ from tvb.adapters.exporters.exceptions import ExportException, InvalidExportData
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.core.entities.model.model_burst import BURST_INFO_FILE, BURSTS_DICT_KEY, DT_BURST_MAP
 from tvb.core.entities.file.files_helper import FilesHelper
+from tvb.core.entities.file.zip_stream import ZipStream
 from tvb.core.entities.transient.burst_export_entities import BurstInformation, WorkflowInformation
 from tvb.core.entities.transient.burst_export_entities import WorkflowStepInformation, WorkflowViewStepInformation
 from tvb.core.entities.storage import dao
@@ -50,7 +52,6 @@ from tvb.basic.logger.builder import get_logger
 
 LOG = get_logger(__name__)
 BURST_PAGE_SIZE = 100
-DATAYPES_PAGE_SIZE = 100
 
 
 class ExportManager:
@@ -113,23 +114,7 @@ class ExportManager:
             2. full path of the export file (available for download)
             3. boolean which specify if file can be deleted after download
         """
-        if data is None:
-            raise InvalidExportDataException("Could not export null data. Please select data to be exported")
-        
-        if exporter_id is None:
-            raise ExportException("Please select the exporter to be used for this operation")
-        
-        if exporter_id not in self.all_exporters:
-            raise ExportException("Provided exporter identifier is not a valid one")
-        
-        exporter = self.all_exporters[exporter_id]
-        
-        if project is None:  
-            raise ExportException("Please provide the project where data files are stored")
-        
-        # Now we start the real export        
-        if not exporter.accepts(data):
-            raise InvalidExportDataException("Current data can not be exported by specified exporter")
+        exporter = self._get_exporter(data, exporter_id, project)
         
         # Now compute and create folder where to store exported data
         # This will imply to generate a folder which is unique for each export
@@ -148,110 +133,124 @@ class ExportManager:
         return export_data
 
 
+    def export_data_stream(self, data, exporter_id, project):
+        """
+        Export provided data, when the given exporter can produce it while it is being sent.
+        Parameters are the same as for `export_data`.
+
+        :returns: None when `export_data` should be used instead, or a tuple with
+            1. name of the file to be shown to user
+            2. iterable of byte strings with the export file content
+        """
+        exporter = self._get_exporter(data, exporter_id, project)
+        LOG.debug("Start streamed export of data: %s" % data.type)
+        return exporter.export_stream(data, project)
+
+
+    def _get_exporter(self, data, exporter_id, project):
+        """
+        Validate the export parameters.
+        :returns: the exporter with the given identifier
+        """
+        if data is None:
+            raise InvalidExportDataException("Could not export null data. Please select data to be exported")
+        
+        if exporter_id is None:
+            raise ExportException("Please select the exporter to be used for this operation")
+        
+        if exporter_id not in self.all_exporters:
+            raise ExportException("Provided exporter identifier is not a valid one")
+        
+        exporter = self.all_exporters[exporter_id]
+        
+        if project is None:  
+            raise ExportException("Please provide the project where data files are stored")
+        
+        if not exporter.accepts(data):
+            raise InvalidExportDataException("Current data can not be exported by specified exporter")
+        return exporter
+
+
     def export_project(self, project):
         """
         Given a project root and the TVB storage_path, create a ZIP
         ready for export.
         :param project: project object which identifies project to be exported
+        :returns: full path of the ZIP file
+        """
+        zip_file_name, archive = self.build_project_archive(project)
+        export_folder = self._build_data_export_folder(project)
+        return archive.write_to(os.path.join(export_folder, zip_file_name))
+
+
+    def build_project_archive(self, project):
+        """
+        Prepare the export of a project as an archive produced while it is being sent: the project folder
+        is not copied, and the bursts information is added to the archive, without being written on disk.
+        :param project: project object which identifies project to be exported
+        :returns: a tuple (name of the ZIP file, ZipStream with the project content)
         """
         if project is None:
             raise ExportException("Please provide project to be exported")
 
-        files_helper = FilesHelper()
-        project_folder = files_helper.get_project_folder(project)
-        
-        bursts_dict = {}
-        datatype_burst_mapping = {}
-        bursts_count = dao.get_bursts_for_project(project.id, count=True)
-        for start_idx in range(0, bursts_count, BURST_PAGE_SIZE):
-            bursts = dao.get_bursts_for_project(project.id, page_start=start_idx, page_end=start_idx + BURST_PAGE_SIZE)
-            for burst in bursts:
-                self._build_burst_export_dict(burst, bursts_dict)
-                
-        datatypes_count = dao.get_datatypes_for_project(project.id, count=True)
-        for start_idx in range(0, datatypes_count, DATAYPES_PAGE_SIZE):
-            datatypes = dao.get_datatypes_for_project(project.id, page_start=start_idx,
-                                                      page_end=start_idx + DATAYPES_PAGE_SIZE)
-            for datatype in datatypes:
-                datatype_burst_mapping[datatype.gid] = datatype.fk_parent_burst
+        project_folder = FilesHelper().get_project_folder(project)
+        burst_info = {BURSTS_DICT_KEY: self._build_bursts_dict(project),
+                      DT_BURST_MAP: dao.get_datatype_burst_mapping(project.id)}
 
-        # Compute path and name of the zip file
         now = datetime.now()
         date_str = now.strftime("%Y-%m-%d_%H-%M")
         zip_file_name = "%s_%s.%s" % (date_str, project.name, self.ZIP_FILE_EXTENSION)
-        
-        export_folder = self._build_data_export_folder(project)    
-        result_path = os.path.join(export_folder, zip_file_name) 
-        
-        bursts_file_name = os.path.join(project_folder, BURST_INFO_FILE)
-        burst_info = {BURSTS_DICT_KEY: bursts_dict,
-                      DT_BURST_MAP: datatype_burst_mapping}
-        with open(bursts_file_name, 'w') as bursts_file:
-            bursts_file.write(json.dumps(burst_info))
-            
-        # pack project content into a ZIP file
-        result_zip = files_helper.zip_folder(result_path, project_folder)
-        
-        # remove these files, since we only want them in export archive
-        os.remove(bursts_file_name)
-        return result_zip
-    
-    
-    def _build_workflow_step_info(self, workflow):
-        """
-        For the input workflow, get all workflop steps and return a list with information
-        that can be then exported.
-        """
-        wf_steps = []
-        view_steps = []
-        for wf_step in dao.get_workflow_steps(workflow.id):
-            
-            if wf_step.fk_operation is None:
-                ## Avoid exporting old form of View Steps.
-                continue
-            # Get all basic information for this workflow step
-            wf_step_info = WorkflowStepInformation(wf_step.to_dict()[1])
-            # We need to store the gid for the operation since the id might be 
-            # different in case of a project export / import
-            linked_operation = dao.get_operation_by_id(wf_step.fk_operation)
-            wf_step_info.set_operation(linked_operation)
-            # We also need to keep info about algorithm in the form of module
-            # and classname because that id might also be different in case 
-            # of project export / import.
-            linked_algorithm = dao.get_algorithm_by_id(wf_step.fk_algorithm)
-            wf_step_info.set_algorithm(linked_algorithm)
-            wf_steps.append(wf_step_info)
-        for view_step in dao.get_visualization_steps(workflow.id):
-            # Get all basic information for this view step
-            view_step_info = WorkflowViewStepInformation(view_step.to_dict()[1])
-            # We need to store portlet identifier, since portlet id might be different
-            # in project we are importing into.
-            portlet = dao.get_portlet_by_id(view_step.fk_portlet)
-            view_step_info.set_portlet(portlet)
-            # We also need to keep info about algorithm in the form of module
-            # and classname because that id might also be different in case 
-            # of project export / import.
-            linked_algorithm = dao.get_algorithm_by_id(view_step.fk_algorithm)
-            view_step_info.set_algorithm(linked_algorithm)
-            view_steps.append(view_step_info)
-        return wf_steps, view_steps
-            
-    
-    def _build_burst_export_dict(self, burst, bursts_dict):
+
+        archive = ZipStream()
+        archive.add_folder(project_folder)
+        archive.add_string(json.dumps(burst_info), BURST_INFO_FILE)
+        return zip_file_name, archive
+
+
+    def _build_bursts_dict(self, project):
         """
-        Compute needed info and add them to burst_dict for export.
+        :returns: dictionary {burst id: burst information dictionary} for all bursts in the project.
+                  Workflows and their steps are read with a few queries for each page of bursts.
         """
-        burst_info = BurstInformation(burst.to_dict()[1])
-        workflows = dao.get_workflows_for_burst(burst.id)
-        for workflow in workflows:
-            # Get information for each workflow for this burst
-            workflow_info = WorkflowInformation(workflow.to_dict()[1])
-            wf_steps, view_steps = self._build_workflow_step_info(workflow)
-            workflow_info.set_workflow_steps(wf_steps)
-            workflow_info.set_view_steps(view_steps)
-            burst_info.add_workflow(workflow_info)
-        # Save data in dictionary form so we can just save it as a json later on
-        bursts_dict[burst.id] = burst_info.to_dict()
+        bursts_dict = {}
+        bursts_count = dao.get_bursts_for_project(project.id, count=True)
+        for start_idx in range(0, bursts_count, BURST_PAGE_SIZE):
+            bursts = dao.get_bursts_for_project(project.id, page_start=start_idx, page_end=BURST_PAGE_SIZE)
+            burst_ids = [burst.id for burst in bursts]
+
+            wf_steps = defaultdict(list)
+            for wf_step, operation_gid, algorithm, algo_group in dao.get_workflow_steps_for_bursts(burst_ids):
+                # Get all basic information for this workflow step
+                wf_step_info = WorkflowStepInformation(wf_step.to_dict()[1])
+                # We need to store the gid for the operation since the id might be
+                # different in case of a project export / import
+                wf_step_info.set_operation_gid(operation_gid)
+                # We also need to keep info about algorithm in the form of module
+                # and classname because that id might also be different in case
+                # of project export / import.
+                wf_step_info.set_algorithm(algorithm, algo_group)
+                wf_steps[wf_step.fk_workflow].append(wf_step_info)
+
+            view_steps = defaultdict(list)
+            for view_step, portlet_identifier, algorithm, algo_group in \
+                    dao.get_visualization_steps_for_bursts(burst_ids):
+                view_step_info = WorkflowViewStepInformation(view_step.to_dict()[1])
+                # We need to store portlet identifier, since portlet id might be different
+                # in project we are importing into.
+                view_step_info.set_portlet_identifier(portlet_identifier)
+                view_step_info.set_algorithm(algorithm, algo_group)
+                view_steps[view_step.fk_workflow].append(view_step_info)
+
+            burst_infos = dict((burst.id, BurstInformation(burst.to_dict()[1])) for burst in bursts)
+            for workflow in dao.get_workflows_for_bursts(burst_ids):
+                workflow_info = WorkflowInformation(workflow.to_dict()[1])
+                workflow_info.set_workflow_steps(wf_steps[workflow.id])
+                workflow_info.set_view_steps(view_steps[workflow.id])
+                burst_infos[workflow.fk_burst].add_workflow(workflow_info)
+            # Save data in dictionary form so we can just save it as a json later on
+            for burst_id, burst_info in burst_infos.iteritems():
+                bursts_dict[burst_id] = burst_info.to_dict()
+        return bursts_dict
     
     
     def _build_data_export_folder(self, data):
@@ -36,6 +36,8 @@ import os
 from tvb.core.entities import model 
 from tvb.adapters.exporters.abcexporter import ABCExporter
 from tvb.core.entities.file.files_helper import FilesHelper
+from tvb.core.entities.file.zip_stream import ZipStream
+from tvb.core.entities.storage import dao
 from tvb.adapters.exporters.exceptions import ExportException 
 
 
@@ -58,34 +60,45 @@ class TVBExporter(ABCExporter):
         2. If data is a DataTypeGroup creates a zip with all files for all data types
         """
         download_file_name = self.get_export_file_name(data)
-        files_helper = FilesHelper()
          
         if self.is_data_a_group(data):
-            all_datatypes = self._get_all_data_types_arr(data)
-            
-            if all_datatypes is None or len(all_datatypes) == 0:
-                raise ExportException("Could not export a data type group with no data")    
-            
             zip_file = os.path.join(export_folder, download_file_name)
-            
-            # Now process each data type from group and add it to ZIP file
-            operation_folders = []
-            for data_type in all_datatypes:
-                operation_folder = files_helper.get_operation_folder(project.name, data_type.fk_from_operation)
-                operation_folders.append(operation_folder)
-                
-            # Create ZIP archive    
-            files_helper.zip_folders(zip_file, operation_folders, self.OPERATION_FOLDER_PREFIX)
-                        
+            self._build_group_archive(data, project).write_to(zip_file)
             return download_file_name, zip_file, True
 
         else:
-            project_folder = files_helper.get_project_folder(project)
+            project_folder = FilesHelper().get_project_folder(project)
             data_file = os.path.join(project_folder, data.get_storage_file_path())
 
             return download_file_name, data_file, False
 
 
+    def export_stream(self, data, project):
+        """
+        A DataTypeGroup is exported as a ZIP archive produced while it is being sent.
+        """
+        if self.is_data_a_group(data):
+            return self.get_export_file_name(data), self._build_group_archive(data, project)
+        return None
+
+
+    def _build_group_archive(self, data, project):
+        """
+        Archive with the folders of all operations in the group, found with a single query,
+        without loading the datatypes in the group.
+        """
+        operation_ids = dao.get_operation_ids_for_datatype_group(data.id)
+        if not operation_ids:
+            raise ExportException("Could not export a data type group with no data")
+
+        files_helper = FilesHelper()
+        archive = ZipStream()
+        for operation_id in operation_ids:
+            operation_folder = files_helper.get_operation_folder(project.name, operation_id)
+            archive.add_folder(operation_folder, "%s%s/" % (self.OPERATION_FOLDER_PREFIX, operation_id))
+        return archive
+
+
     def get_export_file_extension(self, data):
         if self.is_data_a_group(data):
             return "zip"
@@ -35,9 +35,9 @@ A displayer for covariance.
 
 """
 
-import json
 from tvb.datatypes.graph import Covariance
 from tvb.core.adapters.abcdisplayer import ABCDisplayer
+from tvb.adapters.visualizers.matrix_viewer import matrix_parameters, get_cached_parameters
 
 
 
@@ -63,25 +63,11 @@ class CovarianceVisualizer(ABCDisplayer):
     def launch(self, covariance):
         """Construct data for visualization and launch it."""
 
-        # get data from corr datatype, convert to json
-        matrix = covariance.get_data('array_data')
-
-        matrix_data = self.dump_prec(matrix.flat)
-        matrix_shape = json.dumps(matrix.shape)
-        matrix_strides = json.dumps(map(lambda x: x / matrix.itemsize, matrix.strides))
-
-        view_pars = dict(matrix_data=matrix_data, matrix_shape=matrix_shape, matrix_strides=matrix_strides)
+        view_pars = get_cached_parameters(covariance.gid, "covariance",
+                                          lambda: matrix_parameters(covariance.get_data('array_data')))
         return self.build_display_result("covariance/view", view_pars)
 
 
     def generate_preview(self, covariance, figure_size):
         return self.launch(covariance)
 
-
-    def dump_prec(self, xs, prec=3):
-        """
-        Dump a list of numbers into a string, each at the specified precision. 
-        """
-
-        return "[" + ",".join(map(lambda x: ("%0." + str(prec) + "g") % (x,), xs)) + "]"
-
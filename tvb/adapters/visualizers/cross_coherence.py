@@ -35,9 +35,10 @@ A displayer for the cross coherence of a time series.
 
 """
 
-import json
 from tvb.datatypes.spectral import CoherenceSpectrum
 from tvb.core.adapters.abcdisplayer import ABCDisplayer
+from tvb.core.utils import float32_data_url
+from tvb.adapters.visualizers.matrix_viewer import matrix_parameters, get_cached_parameters
 
 
 
@@ -64,27 +65,23 @@ class CrossCoherenceVisualizer(ABCDisplayer):
     def launch(self, coherence_spectrum):
         """Construct data for visualization and launch it."""
 
-        # get data from coher datatype, convert to json
-        frequency = self.dump_prec(coherence_spectrum.get_data('frequency').flat)
-
-        # js needs to know shape and stride, not just elements
-        array_data = coherence_spectrum.get_data('array_data')
-        coherence = self.dump_prec(coherence_spectrum.get_data('array_data').flat)  # may be a long string
-        shape = json.dumps(array_data.shape)
-        strides = json.dumps(map(lambda x: x / array_data.itemsize, array_data.strides))
-
-        return self.build_display_result("cross_coherence/view",
-                                         dict(frequency=frequency, coherence=coherence, shape=shape, strides=strides))
+        view_pars = get_cached_parameters(coherence_spectrum.gid, "coherence",
+                                          lambda: self._prepare_parameters(coherence_spectrum))
+        return self.build_display_result("cross_coherence/view", view_pars)
 
 
     def generate_preview(self, coherence_spectrum, figure_size):
         return self.launch(coherence_spectrum)
 
 
-    def dump_prec(self, xs, prec=3):
+    @staticmethod
+    def _prepare_parameters(coherence_spectrum):
         """
-        Dump a list of numbers into a string, each at the specified precision. 
+        Frequencies are sent entirely, while the node x node dimensions of the coherence are reduced.
+        tv.plot.coh reads the coherence as [frequency, node, node].
         """
-
-        return "[" + ",".join(map(lambda x: ("%0." + str(prec) + "g") % (x,), xs)) + "]"
+        params = matrix_parameters(coherence_spectrum.get_data('array_data'), axes=(1, 2), prefix="")
+        return dict(frequency=float32_data_url(coherence_spectrum.get_data('frequency')),
+                    coherence=params["data"], shape=params["shape"], strides=params["strides"],
+                    full_shape=params["full_shape"])
 
@@ -36,11 +36,11 @@ A displayer for cross correlation.
 
 """
 
-import json
 import numpy
 from tvb.datatypes.graph import CorrelationCoefficients
 from tvb.datatypes.temporal_correlations import CrossCorrelation
 from tvb.core.adapters.abcdisplayer import ABCDisplayer
+from tvb.adapters.visualizers.matrix_viewer import matrix_parameters, get_cached_parameters
 
 
 
@@ -65,34 +65,24 @@ class CrossCorrelationVisualizer(ABCDisplayer):
     def launch(self, cross_correlation):
         """Construct data for visualization and launch it."""
 
-        matrix = cross_correlation.get_data('array_data').mean(axis=0)[:, :, 0, 0]
-        return self._mainDisplay(matrix)
+        return self._mainDisplay(cross_correlation.gid,
+                                 lambda: cross_correlation.get_data('array_data').mean(axis=0)[:, :, 0, 0])
 
 
     def generate_preview(self, cross_correlation, figure_size):
         return self.launch(cross_correlation)
 
 
-    def _mainDisplay(self, matrix):
+    def _mainDisplay(self, datatype_gid, read_matrix):
         """
-        Prepare JSON matrix for display
-        :param matrix: input 2D matrix
+        Prepare the matrix payload for display (cached per DataType)
+        :param read_matrix: callable returning the input 2D matrix; not called when the payload is cached
         :return: Genshi template
         """
-        matrix_data = self._dump_prec(matrix.flat)
-        matrix_shape = json.dumps(matrix.shape)
-        matrix_strides = json.dumps(map(lambda x: x / matrix.itemsize, matrix.strides))
-
-        view_pars = dict(matrix_data=matrix_data, matrix_shape=matrix_shape, matrix_strides=matrix_strides)
+        view_pars = get_cached_parameters(datatype_gid, "correlation", lambda: matrix_parameters(read_matrix()))
         return self.build_display_result("cross_correlation/view", view_pars)
 
 
-    def _dump_prec(self, xs, prec=3):
-        """ Dump a list of numbers into a string, each at the specified precision. """
-
-        return "[" + ",".join(map(lambda x: ("%0." + str(prec) + "g") % (x,), xs)) + "]"
-
-
 
 class PearsonCorrelationCoefficientVisualizer(CrossCorrelationVisualizer):
     """
@@ -122,6 +112,6 @@ class PearsonCorrelationCoefficientVisualizer(CrossCorrelationVisualizer):
 
         # Currently only the first mode & state-var are displayed.
         # TODO: display other mode / state-var
-        matrix = cross_correlation.get_data('array_data')[:, :, 0, 0]
-        return self._mainDisplay(matrix)
+        return self._mainDisplay(cross_correlation.gid,
+                                 lambda: cross_correlation.get_data('array_data')[:, :, 0, 0])
 
@@ -39,6 +39,8 @@ import numpy
 from tvb.core.adapters.abcdisplayer import ABCDisplayer
 from tvb.basic.filters.chain import FilterChain
 from tvb.datatypes.graph import ConnectivityMeasure
+from tvb.core.utils import float32_data_url
+from tvb.adapters.visualizers.matrix_viewer import get_cached_parameters
 
 
 
@@ -88,15 +90,22 @@ class HistogramViewer(ABCDisplayer):
         """
         Prepare all required parameters for a launch.
         """
+        return get_cached_parameters(input_data.gid, "histogram", lambda: self._compute_parameters(input_data))
+
+
+    @staticmethod
+    def _compute_parameters(input_data):
+        """
+        The values are sent once, as a float32 data URL: they give both the bars and
+        the gradient of colors used for each node.
+        """
         labels_list = input_data.connectivity.region_labels.tolist()
-        values_list = input_data.array_data.tolist()
-        # A gradient of colors will be used for each node
-        colors_list = values_list
+        values = numpy.asarray(input_data.array_data).ravel()
+        min_value, max_value = float(values.min()), float(values.max())
 
         params = dict(title="Connectivity Measure - " + input_data.title, labels=json.dumps(labels_list),
-                      data=json.dumps(values_list), colors=json.dumps(colors_list),
-                      xposition='center' if min(values_list) < 0 else 'bottom',
-                      minColor=min(colors_list), maxColor=max(colors_list))
+                      data=float32_data_url(values), xposition='center' if min_value < 0 else 'bottom',
+                      minColor=min_value, maxColor=max_value)
         return params
     
     
\ No newline at end of file
@@ -8,9 +8,9 @@ It displays the mixing matrix of siae n_features x n_components
 
 """
 
-import json
 from tvb.datatypes.mode_decompositions import IndependentComponents
 from tvb.core.adapters.abcdisplayer import ABCDisplayer
+from tvb.adapters.visualizers.matrix_viewer import matrix_parameters, get_cached_parameters
 from tvb.basic.logger.builder import get_logger
 
 LOG = get_logger(__name__)
@@ -39,26 +39,12 @@ class ICA(ABCDisplayer):
     def launch(self, ica):
         """Construct data for visualization and launch it."""
 
-        # get data from IndependentComponents datatype, convert to json
-        # HACK: dump only a 2D array
-        matrix = abs(ica.get_data('mixing_matrix')[:, :, 0, 0])
-        matrix_data = self.dump_prec(matrix.flat)
-        matrix_shape = json.dumps(matrix.shape)
-        matrix_strides = json.dumps(map(lambda x: x / matrix.itemsize, matrix.strides))
-
-        view_pars = dict(matrix_data=matrix_data, matrix_shape=matrix_shape, matrix_strides=matrix_strides)
-
+        # HACK: display only a 2D array
+        view_pars = get_cached_parameters(ica.gid, "mixing_matrix",
+                                          lambda: matrix_parameters(abs(ica.get_data('mixing_matrix')[:, :, 0, 0])))
         return self.build_display_result("ica/view", view_pars)
 
 
     def generate_preview(self, ica, figure_size):
         return self.launch(ica)
 
-
-    def dump_prec(self, xs, prec=3):
-        """
-        Dump a list of numbers into a string, each at the specified precision. 
-        """
-
-        return "[" + ",".join(map(lambda x: ("%0." + str(prec) + "g") % (x,), xs)) + "]"
-
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Shared preparation of matrix payloads for the d3 matrix visualizers (covariance, cross correlation,
+cross coherence, ICA, ...): block-mean reduction of matrices larger than what the browser can draw,
+and a compact base64 float32 encoding instead of one JSON string per element.
+"""
+
+import json
+import numpy
+from tvb.core.utils import LRUCache, float32_data_url
+
+## Largest number of rows/columns drawn by tv.plot.mat (one SVG element per cell).
+MAX_DISPLAY_SIZE = 256
+
+## How many prepared payloads are kept in memory. DataTypes are immutable, so their GID is a safe key.
+PAYLOADS_CACHE_SIZE = 32
+_PAYLOADS = LRUCache(PAYLOADS_CACHE_SIZE)
+
+
+
+def downsample_matrix(matrix, max_size=MAX_DISPLAY_SIZE, axes=(0, 1)):
+    """
+    Reduce each of the given axes to at most max_size entries, by averaging contiguous blocks.
+    Blocks have equal sizes (+/- 1) when the axis length is not a multiple of max_size: entry k of a reduced
+    axis is the mean of the entries [k * size // max_size, (k + 1) * size // max_size) (as inverted in JS by
+    tv.util.block_label, for hover labels).
+    Other axes (e.g. frequency for a coherence spectrum) are left untouched.
+    """
+    result = numpy.asarray(matrix)
+    for axis in axes:
+        size = result.shape[axis]
+        if size <= max_size:
+            continue
+        edges = numpy.arange(max_size + 1) * size // max_size
+        counts_shape = [1] * result.ndim
+        counts_shape[axis] = max_size
+        sums = numpy.add.reduceat(result, edges[:-1], axis=axis)
+        result = sums / numpy.diff(edges).reshape(counts_shape).astype(sums.dtype)
+    return result
+
+
+def matrix_parameters(matrix, max_size=MAX_DISPLAY_SIZE, axes=(0, 1), prefix="matrix_"):
+    """
+    :returns: dictionary with <prefix>data (data URL), <prefix>shape and <prefix>strides (JSON, in elements),
+              describing the reduced matrix as expected by tv.ndar.ndfrom, and <prefix>full_shape (JSON) with
+              the shape before reduction, for mapping reduced entries back to node indices.
+    """
+    matrix = numpy.asarray(matrix)
+    reduced = numpy.ascontiguousarray(downsample_matrix(matrix, max_size, axes), dtype='<f4')
+    strides = [stride / reduced.itemsize for stride in reduced.strides]
+    return {prefix + "data": float32_data_url(reduced),
+            prefix + "shape": json.dumps(list(reduced.shape)),
+            prefix + "strides": json.dumps(strides),
+            prefix + "full_shape": json.dumps(list(matrix.shape))}
+
+
+def get_cached_parameters(datatype_gid, key, prepare):
+    """
+    :param prepare: callable building the view parameters; called only when they are not in cache.
+    :returns: a copy of the cached view parameters for (datatype_gid, key).
+    """
+    cache_key = (datatype_gid, key)
+    parameters = _PAYLOADS.get(cache_key)
+    if parameters is None:
+        parameters = prepare()
+        _PAYLOADS.put(cache_key, parameters)
+    return dict(parameters)
@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Phase-plane computations for a TVB model, independent of any drawing back-end:
+vector field, nullclines and sample trajectories.
+
+.. moduleauthor:: Ionel Ortelecan <ionel.ortelecan@codemart.ro>
+"""
+
+import numpy
+import threading
+import tvb.simulator.integrators as integrators_module
+from tvb.basic.logger.builder import get_logger
+from tvb.core.utils import LRUCache
+
+
+#Set the resolution of the phase-plane and sample trajectories.
+NUMBEROFGRIDPOINTS = 42
+TRAJ_STEPS = 1024
+#Number of computed vector fields kept, for going back to a previous view without recomputing.
+VECTOR_FIELDS_CACHE_SIZE = 16
+
+#For each marching-squares case (bit 0: bottom-left corner above level, 1: bottom-right, 2: top-right,
+#3: top-left), the pairs of cell edges (0: bottom, 1: right, 2: top, 3: left) joined by a segment.
+#Saddle cases 5 and 10 are listed for a center below level, and resolved separately.
+_MARCHING_SQUARES_EDGES = {1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)], 5: [(3, 0), (1, 2)],
+                           6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)], 9: [(0, 2)], 10: [(0, 1), (2, 3)],
+                           11: [(1, 2)], 12: [(3, 1)], 13: [(0, 1)], 14: [(3, 0)]}
+
+
+
+def marching_squares(x, y, field, level=0.0):
+    """
+    Find the line segments where a field sampled on a grid crosses the given level.
+
+    :param x: 1D array with the grid positions on the horizontal axis
+    :param y: 1D array with the grid positions on the vertical axis
+    :param field: 2D array of shape (len(y), len(x))
+    :returns: array of shape (number of segments, 4), each row being x1, y1, x2, y2
+    """
+    values = numpy.asarray(field, dtype=numpy.float64) - level
+    above = values > 0
+    b_l, b_r, t_r, t_l = values[:-1, :-1], values[:-1, 1:], values[1:, 1:], values[1:, :-1]
+    cases = (above[:-1, :-1] * 1 + above[:-1, 1:] * 2 + above[1:, 1:] * 4 + above[1:, :-1] * 8)
+    valid = numpy.isfinite(b_l) & numpy.isfinite(b_r) & numpy.isfinite(t_r) & numpy.isfinite(t_l)
+
+    x_lo, y_lo = numpy.meshgrid(x[:-1], y[:-1])
+    x_hi, y_hi = numpy.meshgrid(x[1:], y[1:])
+
+
+    def crossing(value_a, value_b):
+        """Fraction of the way from a to b where the field crosses level."""
+        delta = value_a - value_b
+        delta[delta == 0] = 1.0
+        return value_a / delta
+
+    with numpy.errstate(invalid='ignore'):
+        bottom, right = crossing(b_l, b_r), crossing(b_r, t_r)
+        top, left = crossing(t_l, t_r), crossing(b_l, t_l)
+    edge_x = [x_lo + bottom * (x_hi - x_lo), x_hi, x_lo + top * (x_hi - x_lo), x_lo]
+    edge_y = [y_lo, y_lo + right * (y_hi - y_lo), y_hi, y_lo + left * (y_hi - y_lo)]
+
+    center_above = (b_l + b_r + t_r + t_l) > 0
+    segments = []
+    for case, edge_pairs in _MARCHING_SQUARES_EDGES.iteritems():
+        mask = (cases == case) & valid
+        if case in (5, 10):
+            ## A center above level joins the two corners above; use the pairs of the complementary case.
+            saddle_mask = mask & center_above
+            mask = mask & ~center_above
+            for edge_a, edge_b in _MARCHING_SQUARES_EDGES[15 - case]:
+                segments.append(numpy.column_stack([edge_x[edge_a][saddle_mask], edge_y[edge_a][saddle_mask],
+                                                    edge_x[edge_b][saddle_mask], edge_y[edge_b][saddle_mask]]))
+        for edge_a, edge_b in edge_pairs:
+            segments.append(numpy.column_stack([edge_x[edge_a][mask], edge_y[edge_a][mask],
+                                                edge_x[edge_b][mask], edge_y[edge_b][mask]]))
+    return numpy.concatenate(segments)
+
+
+
+class PhasePlane(object):
+    """
+    Phase-plane of a TVB model, for two of its state variables, with the other state variables fixed.
+
+    A TVB integrator object will be use for generating sample trajectories
+    -- not the phase-plane. This is mainly interesting for visualising
+    the effect of noise on a trajectory.
+    """
+
+
+    def __init__(self, model, integrator):
+        self.log = get_logger(self.__class__.__module__)
+        self.model = model
+        self.integrator = integrator
+        self._vector_fields = LRUCache(VECTOR_FIELDS_CACHE_SIZE)
+        self._lock = threading.RLock()
+        #Make sure the model is fully configured...
+        self.model.configure()
+        self.model.update_derived_parameters()
+        self._default_ranges = dict((sv, numpy.array(self.model.state_variable_range[sv]))
+                                    for sv in self.model.state_variables)
+
+        self.svx = self.model.state_variables[0]  # x-axis: 1st state variable
+        self.svy = self.model.state_variables[1]  # y-axis: 2nd state variable
+        self.mode = 0
+        self._set_state_vector()
+        self._set_mesh_grid()
+        self._configure_noise()
+
+
+    def _configure_noise(self):
+        """
+        Prepare the noise of a stochastic integrator, for trajectories of a single node.
+        """
+        if isinstance(self.integrator, integrators_module.IntegratorStochastic):
+            if self.integrator.noise.ntau > 0.0:
+                self.integrator.noise.configure_coloured(self.integrator.dt,
+                                                         (1, self.model.nvar, 1, self.model.number_of_modes))
+            else:
+                self.integrator.noise.configure_white(self.integrator.dt,
+                                                      (1, self.model.nvar, 1, self.model.number_of_modes))
+
+
+    ##------------------------------------------------------------------------##
+    ##------------------- Public, thread-safe interface ----------------------##
+    ##------------------------------------------------------------------------##
+
+    def get_settings(self):
+        """
+        :returns: a JSON serializable dictionary describing the current phase-plane view, and the
+                  limits allowed for changing it.
+        """
+        with self._lock:
+            msv_range = self.model.state_variable_range
+            axes_limits = {}
+            state_values = {}
+            for idx, sv in enumerate(self.model.state_variables):
+                default_lo, default_hi = self._default_ranges[sv]
+                extent = default_hi - default_lo
+                axes_limits[sv] = [float(default_lo - 4.0 * extent), float(default_hi + 4.0 * extent)]
+                state_values[sv] = float(self.default_sv[idx, 0, 0])
+            settings = dict(model=self.model.__class__.__name__,
+                            state_variables=list(self.model.state_variables),
+                            number_of_modes=int(self.model.number_of_modes),
+                            svx=self.svx, svy=self.svy,
+                            x_range=[float(value) for value in msv_range[self.svx]],
+                            y_range=[float(value) for value in msv_range[self.svy]],
+                            axes_limits=axes_limits,
+                            default_ranges=dict((sv, [float(value) for value in self._default_ranges[sv]])
+                                                for sv in self.model.state_variables),
+                            state_values=state_values,
+                            grid_points=NUMBEROFGRIDPOINTS,
+                            dt=float(self.integrator.dt),
+                            trajectory_steps=TRAJ_STEPS)
+            if isinstance(self.integrator, integrators_module.IntegratorStochastic):
+                settings['noise'] = float(numpy.asarray(self.integrator.noise.nsig).ravel()[0])
+            return settings
+
+
+    def update_settings(self, svx=None, svy=None, x_range=None, y_range=None, state_values=None, noise=None):
+        """
+        Change the phase-plane view. Arguments left None are not changed.
+
+        :param x_range: [min, max] for the state variable on the x axis
+        :param state_values: dictionary {state variable name: value} for the state variables not on the axes
+        :returns: the resulting settings, as for get_settings
+        """
+        with self._lock:
+            for name in (svx, svy):
+                if name is not None and name not in self.model.state_variables:
+                    raise ValueError("Unknown state variable %s" % name)
+            for value_range in (x_range, y_range):
+                if value_range is not None and float(value_range[0]) >= float(value_range[1]):
+                    raise ValueError("Axis min must be less than max...")
+            if svx is not None:
+                self.svx = svx
+            if svy is not None:
+                self.svy = svy
+            msv_range = self.model.state_variable_range
+            if x_range is not None:
+                msv_range[self.svx][0], msv_range[self.svx][1] = float(x_range[0]), float(x_range[1])
+            if y_range is not None:
+                msv_range[self.svy][0], msv_range[self.svy][1] = float(y_range[0]), float(y_range[1])
+            if state_values:
+                for name, value in state_values.iteritems():
+                    self.default_sv[self.model.state_variables.index(name)] = float(value)
+            if noise is not None and isinstance(self.integrator, integrators_module.IntegratorStochastic):
+                self.integrator.noise.nsig = numpy.array([float(noise)])
+            self._set_mesh_grid()
+            return self.get_settings()
+
+
+    def reset_axes(self):
+        """
+        Bring the ranges of all state variables back to the model defaults.
+        """
+        with self._lock:
+            for sv, default_range in self._default_ranges.iteritems():
+                self.model.state_variable_range[sv][:] = default_range
+            self._set_mesh_grid()
+            return self.get_settings()
+
+
+    def get_vector_field(self, mode=0):
+        """
+        :returns: tuple (X, Y, U, V), with X and Y the grid positions on the two axes, and U, V the
+                  derivatives along the x and y axes, of shape (len(Y), len(X)), for the given mode.
+        """
+        with self._lock:
+            self._calc_phase_plane()
+            return self.X, self.Y, self.U[:, :, mode], self.V[:, :, mode]
+
+
+    def get_nullclines(self, mode=0):
+        """
+        :returns: dictionary with the line segments [x1, y1, x2, y2] of the x and y nullclines, for the given mode.
+        """
+        x_values, y_values, u_field, v_field = self.get_vector_field(mode)
+        return {'x': marching_squares(x_values, y_values, u_field).tolist(),
+                'y': marching_squares(x_values, y_values, v_field).tolist()}
+
+
+    def get_trajectories(self, starting_points, mode=0):
+        """
+        :param starting_points: list of (x, y) positions in the phase-plane
+        :returns: list with an array of shape (TRAJ_STEPS + 1, nvar) for each trajectory, for the given mode.
+        """
+        with self._lock:
+            traj = self._calc_trajectories(starting_points)
+            return [traj[:, :, idx, mode] for idx in xrange(len(starting_points))]
+
+
+    def update_model_parameter(self, param_name, param_new_value):
+        """
+        Update one model parameter. The vector field is recomputed when next requested.
+        """
+        with self._lock:
+            setattr(self.model, param_name, numpy.array([param_new_value]))
+            self.model.update_derived_parameters()
+
+
+    def update_all_model_parameters(self, model_instance):
+        """
+        Copy into the phase-plane model all the single-valued parameters of model_instance.
+        """
+        with self._lock:
+            for key in model_instance.ui_configurable_parameters:
+                attr = getattr(model_instance, key)
+                if isinstance(attr, numpy.ndarray) and attr.size == 1:
+                    setattr(self.model, key, numpy.array([attr[0]]))
+
+            self.model.update_derived_parameters()
+
+
+    ##------------------------------------------------------------------------##
+    ##------------------- Computations ---------------------------------------##
+    ##------------------------------------------------------------------------##
+
+    def _set_mesh_grid(self):
+        """
+        Generate the phase-plane gridding based on currently selected statevariables
+        and their range values.
+        """
+        xlo = self.model.state_variable_range[self.svx][0]
+        xhi = self.model.state_variable_range[self.svx][1]
+        ylo = self.model.state_variable_range[self.svy][0]
+        yhi = self.model.state_variable_range[self.svy][1]
+
+        self.X = numpy.mgrid[xlo:xhi:(NUMBEROFGRIDPOINTS * 1j)]
+        self.Y = numpy.mgrid[ylo:yhi:(NUMBEROFGRIDPOINTS * 1j)]
+
+
+    def _set_state_vector(self):
+        """
+        """
+        svr = self.model.state_variable_range
+        sv_mean = numpy.array([svr[key].mean() for key in self.model.state_variables])
+        sv_mean = sv_mean.reshape((self.model.nvar, 1, 1))
+        self.default_sv = sv_mean.repeat(self.model.number_of_modes, axis=2)
+        self.no_coupling = numpy.zeros((self.model.nvar, 1, self.model.number_of_modes))
+
+
+    def _vector_field_key(self):
+        """
+        Everything the vector field depends on: the model parameters, the state variables on the axes with
+        their ranges, and the values of all the state variables.
+        """
+        msv_range = self.model.state_variable_range
+        parameters = tuple((name, numpy.asarray(getattr(self.model, name)).tostring())
+                           for name in self.model.ui_configurable_parameters)
+        return (self.svx, self.svy, tuple(msv_range[self.svx]), tuple(msv_range[self.svy]),
+                self.default_sv.tostring(), parameters)
+
+
+    def _calc_phase_plane(self):
+        """ Calculate the vector field, unless it was already computed for the current settings. """
+        key = self._vector_field_key()
+        cached = self._vector_fields.get(key)
+        if cached is not None:
+            self.U, self.V = cached
+        else:
+            try:
+                self.U, self.V = self._calc_vector_field()
+            except (ValueError, IndexError), excep:
+                self.log.warning("Could not evaluate %s on the whole grid at once (%s), going point by point."
+                                 % (self.model.__class__.__name__, str(excep)))
+                self.U, self.V = self._calc_vector_field_pointwise()
+
+            if numpy.isnan(self.U).any() or numpy.isnan(self.V).any():
+                self.log.error("NaN")
+            self._vector_fields.put(key, (self.U, self.V))
+
+
+    def _calc_vector_field(self):
+        """
+        Evaluate the model on all the grid points in a single call, with each grid point as a separate node.
+        :returns: U, V arrays of shape (NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, number_of_modes)
+        """
+        svx_ind = self.model.state_variables.index(self.svx)
+        svy_ind = self.model.state_variables.index(self.svy)
+        nr_points = NUMBEROFGRIDPOINTS * NUMBEROFGRIDPOINTS
+
+        #Grid point [ii, jj] is node ii * NUMBEROFGRIDPOINTS + jj, with y on rows and x on columns.
+        grid = self.default_sv.repeat(nr_points, axis=1)
+        grid[svx_ind] = numpy.tile(self.X, NUMBEROFGRIDPOINTS)[:, numpy.newaxis]
+        grid[svy_ind] = numpy.repeat(self.Y, NUMBEROFGRIDPOINTS)[:, numpy.newaxis]
+        coupling = numpy.zeros((self.no_coupling.shape[0], nr_points, self.model.number_of_modes))
+        d = self.model.dfun(grid, coupling)
+
+        field_shape = (NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, self.model.number_of_modes)
+        return d[svx_ind].reshape(field_shape), d[svy_ind].reshape(field_shape)
+
+
+    def _calc_vector_field_pointwise(self):
+        """
+        Evaluate the model once per grid point, for models which do not accept a node dimension other than 1.
+        """
+        svx_ind = self.model.state_variables.index(self.svx)
+        svy_ind = self.model.state_variables.index(self.svy)
+
+        grid_point = self.default_sv.copy()
+        U = numpy.zeros((NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, self.model.number_of_modes))
+        V = numpy.zeros((NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, self.model.number_of_modes))
+        for ii in xrange(NUMBEROFGRIDPOINTS):
+            grid_point[svy_ind] = self.Y[ii]
+            for jj in xrange(NUMBEROFGRIDPOINTS):
+                grid_point[svx_ind] = self.X[jj]
+                d = self.model.dfun(grid_point, self.no_coupling)
+                U[ii, jj, :] = d[svx_ind, 0, :]
+                V[ii, jj, :] = d[svy_ind, 0, :]
+        return U, V
+
+
+    def _calc_trajectories(self, starting_points):
+        """
+        Integrate sample trajectories, starting at the given (x, y) positions in the phase-plane.
+        Trajectories are integrated together, each one as a separate node.
+
+        :returns: array of shape (TRAJ_STEPS + 1, nvar, len(starting_points), number_of_modes)
+        """
+        if isinstance(self.integrator, integrators_module.IntegratorStochastic) and len(starting_points) > 1:
+            #Noise is configured for a single node: go one by one, for each trajectory to get its own noise.
+            return numpy.concatenate([self._calc_trajectories([point]) for point in starting_points], axis=2)
+
+        svx_ind = self.model.state_variables.index(self.svx)
+        svy_ind = self.model.state_variables.index(self.svy)
+        nr_trajectories = len(starting_points)
+
+        state = self.default_sv.repeat(nr_trajectories, axis=1)
+        state[svx_ind] = numpy.array([point[0] for point in starting_points])[:, numpy.newaxis]
+        state[svy_ind] = numpy.array([point[1] for point in starting_points])[:, numpy.newaxis]
+        coupling = numpy.zeros((self.no_coupling.shape[0], nr_trajectories, self.model.number_of_modes))
+        scheme = self.integrator.scheme
+        traj = numpy.zeros((TRAJ_STEPS + 1, self.model.nvar, nr_trajectories, self.model.number_of_modes))
+        traj[0, :] = state
+        for step in xrange(TRAJ_STEPS):
+            state = scheme(state, self.model.dfun, coupling, 0.0, 0.0)
+            traj[step + 1, :] = state
+        return traj
+
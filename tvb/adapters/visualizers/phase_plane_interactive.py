@@ -37,7 +37,7 @@ import colorsys
 import tvb.simulator.integrators as integrators_module
 from matplotlib.widgets import Slider, Button, RadioButtons
 from tvb.basic.config.settings import TVBSettings as config
-from tvb.basic.logger.builder import get_logger
+from tvb.adapters.visualizers.phase_plane import PhasePlane, TRAJ_STEPS
 
 
 # Define a colour theme... see: matplotlib.colors.cnames.keys()
@@ -47,10 +47,6 @@ AXCOLOUR = "steelblue"  # 'burlywood'
 BUTTONCOLOUR = "steelblue"  # 'fuchsia'
 HOVERCOLOUR = "darkred"  # 'chartreuse'
 
-#Set the resolution of the phase-plane and sample trajectories.
-NUMBEROFGRIDPOINTS = 42
-TRAJ_STEPS = 1024
-
 
 def get_color(num_colours):
     for hue in range(num_colours):
@@ -60,25 +56,12 @@ def get_color(num_colours):
 
 
 
-class PhasePlaneInteractive(object):
+class PhasePlaneInteractive(PhasePlane):
     """
-    An interactive phase-plane plot generated from a TVB model object.
-
-    A TVB integrator object will be use for generating sample trajectories
-    -- not the phase-plane. This is mainly interesting for visualising
-    the effect of noise on a trajectory.
+    An interactive phase-plane plot generated from a TVB model object, drawn with matplotlib widgets.
     """
 
 
-    def __init__(self, model, integrator):
-        self.log = get_logger(self.__class__.__module__)
-        self.model = model
-        self.integrator = integrator
-        #Make sure the model is fully configured...
-        self.model.configure()
-        self.model.update_derived_parameters()
-
-
     def get_required_memory_size(self, **kwargs):
         """
         Return the required memory to run this algorithm.
@@ -123,13 +106,6 @@ class PhasePlaneInteractive(object):
         self._add_axes_range_sliders()
         self._add_state_variable_sliders()
         if isinstance(self.integrator, integrators_module.IntegratorStochastic):
-            if self.integrator.noise.ntau > 0.0:
-                self.integrator.noise.configure_coloured(self.integrator.dt,
-                                                         (1, self.model.nvar, 1, self.model.number_of_modes))
-            else:
-                self.integrator.noise.configure_white(self.integrator.dt,
-                                                      (1, self.model.nvar, 1, self.model.number_of_modes))
-
             self._add_noise_slider()
             self._add_reset_noise_button()
             self._add_reset_seed_button()
@@ -481,57 +457,6 @@ class PhasePlaneInteractive(object):
         self._update_phase_plane()
 
 
-    def _set_mesh_grid(self):
-        """
-        Generate the phase-plane gridding based on currently selected statevariables
-        and their range values.
-        """
-        xlo = self.model.state_variable_range[self.svx][0]
-        xhi = self.model.state_variable_range[self.svx][1]
-        ylo = self.model.state_variable_range[self.svy][0]
-        yhi = self.model.state_variable_range[self.svy][1]
-
-        self.X = numpy.mgrid[xlo:xhi:(NUMBEROFGRIDPOINTS * 1j)]
-        self.Y = numpy.mgrid[ylo:yhi:(NUMBEROFGRIDPOINTS * 1j)]
-
-
-    def _set_state_vector(self):
-        """
-        """
-        #import pdb; pdb.set_trace()
-        svr = self.model.state_variable_range
-        sv_mean = numpy.array([svr[key].mean() for key in self.model.state_variables])
-        sv_mean = sv_mean.reshape((self.model.nvar, 1, 1))
-        self.default_sv = sv_mean.repeat(self.model.number_of_modes, axis=2)
-        self.no_coupling = numpy.zeros((self.model.nvar, 1, self.model.number_of_modes))
-
-
-    def _calc_phase_plane(self):
-        """ Calculate the vector field. """
-        svx_ind = self.model.state_variables.index(self.svx)
-        svy_ind = self.model.state_variables.index(self.svy)
-
-        #Calculate the vector field discretely sampled at a grid of points
-        grid_point = self.default_sv.copy()
-        self.U = numpy.zeros((NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, self.model.number_of_modes))
-        self.V = numpy.zeros((NUMBEROFGRIDPOINTS, NUMBEROFGRIDPOINTS, self.model.number_of_modes))
-        for ii in xrange(NUMBEROFGRIDPOINTS):
-            grid_point[svy_ind] = self.Y[ii]
-            for jj in xrange(NUMBEROFGRIDPOINTS):
-                #import pdb; pdb.set_trace()
-                grid_point[svx_ind] = self.X[jj]
-                d = self.model.dfun(grid_point, self.no_coupling)
-
-                for kk in range(self.model.number_of_modes):
-                    self.U[ii, jj, kk] = d[svx_ind, 0, kk]
-                    self.V[ii, jj, kk] = d[svy_ind, 0, kk]
-
-        #self.UVmag = numpy.sqrt(self.U**2 + self.V**2)
-        #import pdb; pdb.set_trace()
-        if numpy.isnan(self.U).any() or numpy.isnan(self.V).any():
-            self.log.error("NaN")
-
-
     def _plot_phase_plane(self):
         """ Plot the vector field and its nullclines. """
         # Set title and axis labels
@@ -558,35 +483,31 @@ class PhasePlaneInteractive(object):
         self.ipp_fig.canvas.draw()
 
 
-    def _plot_trajectory(self, x, y):
+    def _plot_trajectories(self, starting_points):
         """
-        Plot a sample trajectory, starting at the position x,y in the phase-plane.
+        Plot sample trajectories, starting at the given (x, y) positions in the phase-plane.
         """
         svx_ind = self.model.state_variables.index(self.svx)
         svy_ind = self.model.state_variables.index(self.svy)
+        traj = self._calc_trajectories(starting_points)
 
-        #Calculate an example trajectory
-        state = self.default_sv.copy()
-        state[svx_ind] = x
-        state[svy_ind] = y
-        scheme = self.integrator.scheme
-        traj = numpy.zeros((TRAJ_STEPS + 1, self.model.nvar, 1,
-                            self.model.number_of_modes))
-        traj[0, :] = state
-        for step in range(TRAJ_STEPS):
-            #import pdb; pdb.set_trace()
-            state = scheme(state, self.model.dfun, self.no_coupling, 0.0, 0.0)
-            traj[step + 1, :] = state
-
-        self.pp_ax.scatter(x, y, s=42, c='g', marker='o', edgecolor=None)
-        self.pp_ax.plot(traj[:, svx_ind, 0, self.mode], traj[:, svy_ind, 0, self.mode])
-
-        #Plot the selected state variable trajectories as a function of time
-        self.pp_splt.plot(numpy.arange(TRAJ_STEPS + 1) * self.integrator.dt, traj[:, :, 0, self.mode])
+        times = numpy.arange(TRAJ_STEPS + 1) * self.integrator.dt
+        for idx, (x, y) in enumerate(starting_points):
+            self.pp_ax.scatter(x, y, s=42, c='g', marker='o', edgecolor=None)
+            self.pp_ax.plot(traj[:, svx_ind, idx, self.mode], traj[:, svy_ind, idx, self.mode])
+            #Plot the selected state variable trajectories as a function of time
+            self.pp_splt.plot(times, traj[:, :, idx, self.mode])
 
         pylab.draw()
 
 
+    def _plot_trajectory(self, x, y):
+        """
+        Plot a sample trajectory, starting at the position x,y in the phase-plane.
+        """
+        self._plot_trajectories([(x, y)])
+
+
     def _click_trajectory(self, event):
         """
         """
@@ -598,41 +519,8 @@ class PhasePlaneInteractive(object):
 
     def update_model_parameter(self, param_name, param_new_value):
         """
-        Update model parameters based on the current parameter slider values.
-
-        NOTE: Haven't figured out how to update independantly, so just update
-            everything.
-        """
-        #TODO: Grab caller and use val directly, ie independent parameter update.
-        setattr(self.model, param_name, numpy.array([param_new_value]))
-
-        self.model.update_derived_parameters()
-        self._calc_phase_plane()
-        self._update_phase_plane()
-
-
-    def update_all_model_parameters(self, model_instance):
-        for key in model_instance.ui_configurable_parameters:
-            attr = getattr(model_instance, key)
-            if isinstance(attr, numpy.ndarray) and attr.size == 1:
-                setattr(self.model, key, numpy.array([attr[0]]))
-
-        self.model.update_derived_parameters()
-        self._calc_phase_plane()
-        self._update_phase_plane()
-
-
-    def update_model_parameters_from_dict(self, parameters_dict):
-        """
-        NOTE: I expect that the given parameters exists on the current
-        model and also that they are numpy arrays.
-
-        Sets the parameters from the given dict on the current
-        model instance and also updates the phase-plane.
+        Update model parameters based on the current parameter slider values, and redraw.
         """
-        for param_name in parameters_dict:
-            setattr(self.model, param_name, numpy.array([parameters_dict[param_name]]))
-
-        self.model.update_derived_parameters()
+        PhasePlane.update_model_parameter(self, param_name, param_new_value)
         self._calc_phase_plane()
         self._update_phase_plane()
@@ -47,13 +47,20 @@ class TimeSeriesVolumeVisualiser(ABCDisplayer):
 
 
     def launch(self, time_series_volume):
-        dataUrls = [self.paths2url(time_series_volume, "get_volume_slice", parameter="from_idx=0;to_idx=1")]
+        """
+        Only the shape and the global min/max (from H5 metadata) are sent with the page. The browser then
+        reads the orthogonal planes through the selected voxel, one time point at a time, in binary form.
+        """
+        planesUrl = "/flow/read_volume_planes/" + time_series_volume.gid
         minValue, maxValue = time_series_volume.get_min_max_values()
+        data_shape = time_series_volume.read_data_shape()
         volume = time_series_volume.volume
 
         return self.build_display_result("time_series_volume/view",
                                          dict(title="Volumetric Time Series", minValue=minValue, maxValue=maxValue,
-                                              dataUrls=json.dumps(dataUrls), voxelUnit=volume.voxel_unit,
+                                              planesUrl=planesUrl, timePoints=data_shape[0],
+                                              volumeShape=json.dumps(list(data_shape[1:4])),
+                                              voxelUnit=volume.voxel_unit,
                                               volumeOrigin=json.dumps(volume.origin.tolist()),
                                               voxelSize=json.dumps(volume.voxel_size.tolist())))
 
@@ -54,6 +54,9 @@ EVENTS_FOLDER = "tvb.config"
 
 PORTLETS_PATH = ["tvb.adapters.portlets"]
 
+CLUSTER_SCHEDULER_MODULE = "tvb.core.services.cluster_schedulers"
+CLUSTER_SCHEDULER_CLASS = "OARScheduler"
+
 SIMULATOR_MODULE = "tvb.adapters.simulator.simulator_adapter"
 SIMULATOR_CLASS = "SimulatorAdapter"
 
@@ -195,6 +195,8 @@ class BaseProfile():
     OPERATION_EXECUTION_PROCESS = False
 
     CLUSTER_SCHEDULE_COMMAND = 'oarsub -l walltime=%s -q tvb -S "/home/tvbadmin/clusterLauncher %s %s"'
+    ## Array job: each task receives as arguments one line (operation id, user label) from the parameters file.
+    CLUSTER_ARRAY_SCHEDULE_COMMAND = 'oarsub -l walltime=%s -q tvb --array-param-file %s /home/tvbadmin/clusterLauncher'
     CLUSTER_STOP_COMMAND = 'oardel %s'
 
     _CACHED_RUNNING_ON_CLUSTER_NODE = None
@@ -424,6 +426,17 @@ class BaseProfile():
         return FrameworkSettings.get_attribute(FrameworkSettings.KEY_PORT_MPLH5, 9000, int)
 
 
+    @ClassProperty
+    @staticmethod
+    @settings_loaded()
+    def WEB_SENDFILE_HEADER():
+        """
+        Header (e.g. X-Sendfile) with which CherryPy lets a front web server send whole stored files, with sendfile.
+        Empty when CherryPy sends the files itself.
+        """
+        return FrameworkSettings.get_attribute(FrameworkSettings.KEY_SENDFILE_HEADER, '')
+
+
     @ClassProperty
     @staticmethod
     @settings_loaded()
@@ -629,6 +642,7 @@ class BaseProfile():
     KEY_IP = 'SERVER_IP'
     KEY_PORT = 'WEB_SERVER_PORT'
     KEY_PORT_MPLH5 = 'MPLH5_SERVER_PORT'
+    KEY_SENDFILE_HEADER = 'WEB_SENDFILE_HEADER'
     KEY_SELECTED_DB = 'SELECTED_DB'
     KEY_DB_URL = 'URL_VALUE'
     KEY_URL_VERSION = 'URL_TVB_VERSION'
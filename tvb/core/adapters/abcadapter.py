@@ -38,6 +38,7 @@ Root classes for adding custom functionality to the code.
 import os
 import json
 import psutil
+import threading
 import numpy
 from datetime import datetime
 from copy import copy
@@ -65,6 +66,11 @@ KEY_EQUATION = "equation"
 KEY_FOCAL_POINTS = "focal_points"
 KEY_SURFACE_GID = "surface_gid"
 
+## AlgorithmGroup id -> (module, classname, adapter class), filled at introspection time (or at the first
+## build_adapter for a group), so that adapters are not resolved through the import machinery on every request.
+_ADAPTER_CLASSES = {}
+_ADAPTER_CLASSES_LOCK = threading.Lock()
+
 
 
 def nan_not_allowed():
@@ -409,6 +415,9 @@ class ABCAdapter(object):
             datatype_path = datatype.get_storage_file_path()
             files_update_manager = FilesUpdateManager()
             if not files_update_manager.is_file_up_to_date(datatype_path):
+                if FilesUpdateManager.is_storage_upgrade_running():
+                    raise FileVersioningException("The storage of this DataType is being upgraded to the current "
+                                                  "version. Please try again after the upgrade finishes.")
                 datatype.invalid = True
                 dao.store_entity(datatype)
                 raise FileVersioningException("Encountered DataType with an incompatible storage or data version. "
@@ -422,8 +431,7 @@ class ABCAdapter(object):
         Having a module and a class name, create an instance of ABCAdapter.
         """
         try:
-            adapter = __import__(algo_group.module, globals(), locals(), [algo_group.classname])
-            adapter = eval("adapter." + algo_group.classname)
+            adapter = ABCAdapter.determine_adapter_class(algo_group)
             if algo_group.init_parameter is not None and len(algo_group.init_parameter) > 0:
                 adapter_instance = adapter(str(algo_group.init_parameter))
             else:
@@ -437,6 +445,32 @@ class ABCAdapter(object):
             raise IntrospectionException(excep.message)
 
 
+    @staticmethod
+    def determine_adapter_class(algo_group):
+        """
+        :returns: the adapter class for an AlgorithmGroup, from the classes registry when already resolved.
+        """
+        with _ADAPTER_CLASSES_LOCK:
+            entry = _ADAPTER_CLASSES.get(algo_group.id)
+        ## Ids are only reused after the DB is reset, thus check the entry still describes the same group.
+        if entry is not None and entry[0] == algo_group.module and entry[1] == algo_group.classname:
+            return entry[2]
+        adapter_module = __import__(algo_group.module, globals(), locals(), [algo_group.classname])
+        adapter_class = getattr(adapter_module, algo_group.classname)
+        ABCAdapter.register_adapter_class(algo_group, adapter_class)
+        return adapter_class
+
+
+    @staticmethod
+    def register_adapter_class(algo_group, adapter_class):
+        """
+        Remember the class resolved for an AlgorithmGroup (groups not yet stored in DB are ignored).
+        """
+        if algo_group.id is not None:
+            with _ADAPTER_CLASSES_LOCK:
+                _ADAPTER_CLASSES[algo_group.id] = (algo_group.module, algo_group.classname, adapter_class)
+
+
     ####### METHODS for PROCESSING PARAMETERS start here #############################
 
     def review_operation_inputs(self, parameters):
@@ -960,11 +994,12 @@ class ABCAdapter(object):
 
     @staticmethod
     def fill_defaults(adapter_interface, data, fill_unselected_branches=False):
-        """ Change the default values in the Input Interface Tree."""
+        """
+        Change the default values in the Input Interface Tree.
+        The given tree is left unchanged (it can be shared): the changed nodes are copies.
+        """
         result = []
         for param in adapter_interface:
-            if param[ABCAdapter.KEY_NAME] == 'integrator':
-                pass
             new_p = copy(param)
             if param[ABCAdapter.KEY_NAME] in data:
                 new_p[ABCAdapter.KEY_DEFAULT] = data[param[ABCAdapter.KEY_NAME]]
@@ -974,6 +1009,7 @@ class ABCAdapter(object):
             if (ABCAdapter.KEY_OPTIONS in param) and (param[ABCAdapter.KEY_OPTIONS] is not None):
                 new_options = param[ABCAdapter.KEY_OPTIONS]
                 if param[ABCAdapter.KEY_NAME] in data or fill_unselected_branches:
+                    new_options = list(new_options)
                     selected_values = []
                     if param[ABCAdapter.KEY_NAME] in data:
                         if param[ABCAdapter.KEY_TYPE] == ABCAdapter.TYPE_MULTIPLE:
@@ -334,6 +334,7 @@ class Introspector:
             group.displayname = ui_name
             group.last_introspection_check = datetime.datetime.now()
             group_inst_from_db = dao.store_entity(group)
+            ABCAdapter.register_adapter_class(group_inst_from_db, adapter.__class__)
             self.__store_algorithms_for_group(group_inst_from_db, adapter, has_sub_algorithms)
 
 
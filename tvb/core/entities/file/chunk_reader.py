@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Out-of-core, block-wise reading of arrays stored in the H5 file of a MappedType.
+
+Blocks are split along one axis, sized from a memory budget and aligned to the on-disk chunk
+layout of the data set, so that every chunk is read from disk only once. While the consumer
+works on one block, the next one is read on a background thread.
+"""
+
+import Queue
+import psutil
+import numpy
+import threading
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+## Fraction of the free (physical + swap) memory that the blocks held by one reader are allowed to use.
+MEMORY_BUDGET_FACTOR = 0.4
+## Number of blocks read ahead of the one being consumed.
+PREFETCH_DEPTH = 1
+## All arrays are accounted for as 8 bytes per element, as in the adapters memory estimates.
+ELEMENT_SIZE = 8.0
+
+
+
+class ChunkedArrayReader(object):
+    """
+    Iterate over blocks of one data set of a MappedType, without loading the full array in memory.
+
+    While blocks are prefetched, the H5 file of the source DataType should not be accessed from
+    other threads (its storage manager keeps a single file handle).
+    """
+
+
+    def __init__(self, datatype, data_name='data', split_axis=2, block_length=None,
+                 memory_budget=None, prefetch=True):
+        """
+        :param datatype: MappedType instance with the array stored in its H5 file
+        :param data_name: name of the data set to read (e.g. 'data' for a TimeSeries)
+        :param split_axis: the axis along which blocks are taken (by default nodes, for a 4D TimeSeries)
+        :param block_length: maximum number of elements along `split_axis` in one block; it is further
+                             limited by `memory_budget` and aligned to the chunk layout
+        :param memory_budget: bytes allowed for the blocks held at one time; by default a fraction of the free memory
+        :param prefetch: when True, the next block is read on a background thread
+        """
+        self.datatype = datatype
+        self.data_name = data_name
+        self.shape = tuple(datatype.get_data_shape(data_name))
+        self.chunk_shape = datatype.get_data_chunk_shape(data_name)
+        self.split_axis = split_axis
+        self.prefetch = prefetch
+        if memory_budget is None:
+            memory_budget = (psutil.virtual_memory().free + psutil.swap_memory().free) * MEMORY_BUDGET_FACTOR
+        self.block_length = self._compute_block_length(block_length, memory_budget)
+
+
+    def _compute_block_length(self, block_length, memory_budget):
+        """
+        Fit the requested block length to the memory budget, the array size and the chunk layout.
+        """
+        axis_length = self.shape[self.split_axis]
+        blocks_held = PREFETCH_DEPTH + 2 if self.prefetch else 1
+        bytes_per_unit = numpy.prod(self.shape) / float(axis_length) * ELEMENT_SIZE
+        budget_length = int(memory_budget / blocks_held / bytes_per_unit)
+        if block_length is not None:
+            budget_length = min(budget_length, int(block_length))
+        block_length = max(1, min(budget_length, axis_length))
+        if self.chunk_shape is not None:
+            chunk_length = self.chunk_shape[self.split_axis]
+            if block_length > chunk_length:
+                ## Do not split chunks between consecutive blocks.
+                block_length -= block_length % chunk_length
+        return block_length
+
+
+    @property
+    def block_memory(self):
+        """
+        Estimated memory, in bytes, for one block of the default split.
+        """
+        return numpy.prod(self.shape) / float(self.shape[self.split_axis]) * self.block_length * ELEMENT_SIZE
+
+
+    def block_slices(self):
+        """
+        :returns: list with the slice specification of every block, in order
+        """
+        slices = []
+        axis_length = self.shape[self.split_axis]
+        for start in range(0, axis_length, self.block_length):
+            block_slice = [slice(dim) for dim in self.shape]
+            block_slice[self.split_axis] = slice(start, min(start + self.block_length, axis_length))
+            slices.append(tuple(block_slice))
+        return slices
+
+
+    def iter_blocks(self, block_slices=None):
+        """
+        Generator returning the data for every block, in order.
+
+        :param block_slices: custom list of slices to read; by default `block_slices()`
+        """
+        if block_slices is None:
+            block_slices = self.block_slices()
+        if not self.prefetch or len(block_slices) <= 1:
+            for block_slice in block_slices:
+                yield self.datatype.get_data(self.data_name, block_slice)
+            return
+
+        blocks_queue = Queue.Queue(maxsize=PREFETCH_DEPTH)
+        stop_event = threading.Event()
+        reader_thread = threading.Thread(target=self._prefetch_blocks, args=(block_slices, blocks_queue, stop_event))
+        reader_thread.daemon = True
+        reader_thread.start()
+        try:
+            for _ in block_slices:
+                is_error, block_data = blocks_queue.get()
+                if is_error:
+                    raise block_data
+                yield block_data
+        finally:
+            stop_event.set()
+            reader_thread.join()
+
+
+    __iter__ = iter_blocks
+
+
+    def _prefetch_blocks(self, block_slices, blocks_queue, stop_event):
+        """
+        Body of the background reader: read blocks in order and pass them to the consumer.
+        """
+        try:
+            for block_slice in block_slices:
+                block_data = self.datatype.get_data(self.data_name, block_slice)
+                if not self._put(blocks_queue, (False, block_data), stop_event):
+                    return
+        except Exception, excep:
+            LOG.exception(excep)
+            self._put(blocks_queue, (True, excep), stop_event)
+
+
+    @staticmethod
+    def _put(blocks_queue, entry, stop_event):
+        """
+        Block until there is room in the queue, or the consumer has stopped iterating.
+        :returns: False when the consumer is no longer interested in blocks
+        """
+        while not stop_event.is_set():
+            try:
+                blocks_queue.put(entry, timeout=0.1)
+                return True
+            except Queue.Full:
+                pass
+        return False
+
@@ -35,6 +35,7 @@
 import os
 import shutil
 import json
+import zlib
 import zipfile
 from contextlib import closing
 from zipfile import ZipFile, ZIP_DEFLATED, BadZipfile
@@ -406,6 +407,37 @@ class FilesHelper():
             raise FileStructureException("Could not unpack the given ZIP file...")
             
 
+    def extract_zip_folder(self, zip_arch, folder_in_zip, folder_path):
+        """
+        Write into folder_path the entries of an opened ZIP archive which are under folder_in_zip,
+        reading them in chunks. Files already present with the expected size (e.g. written by a previous
+        attempt which failed later) are not written again.
+
+        :param zip_arch: a zipfile.ZipFile instance
+        :param folder_in_zip: path of the folder inside the archive, '' for the whole archive
+        :returns: the number of files written
+        """
+        prefix = folder_in_zip.rstrip('/') + '/' if folder_in_zip else ''
+        written = 0
+        try:
+            for info in zip_arch.infolist():
+                if not info.filename.startswith(prefix) or info.filename.endswith('/'):
+                    continue
+                path_parts = info.filename[len(prefix):].split('/')
+                if '..' in path_parts or os.path.isabs(info.filename):
+                    raise FileStructureException("Invalid entry %s in ZIP file." % info.filename)
+                new_file_name = os.path.join(folder_path, *path_parts)
+                if os.path.isfile(new_file_name) and os.path.getsize(new_file_name) == info.file_size:
+                    continue
+                with closing(zip_arch.open(info)) as src:
+                    FilesHelper.copy_file(src, new_file_name)
+                written += 1
+        except (BadZipfile, zipfile.LargeZipFile, zlib.error), excep:
+            self.logger.error(excep)
+            raise FileStructureException("Invalid ZIP file...")
+        return written
+
+
     @staticmethod
     def copy_file(source, dest, dest_postfix=None, buffer_size=1024 * 1024):
         """
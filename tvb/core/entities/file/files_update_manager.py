@@ -37,6 +37,8 @@ Manager for the file storage versioning updates.
 """
 
 import os
+import threading
+import multiprocessing
 import tvb.core.entities.file.file_update_scripts as file_update_scripts
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.basic.traits.types_mapped import MappedType
@@ -50,6 +52,33 @@ from tvb.core.entities.storage import dao
 FILE_STORAGE_VALID = 'valid'
 FILE_STORAGE_INVALID = 'invalid'
 
+## File in TVB_STORAGE listing the DataTypes already handled by a storage upgrade (one "gid status" per line),
+## so that an upgrade interrupted by a restart does not process them again.
+UPGRADE_PROGRESS_FILE = "files_upgrade_progress_%s.txt"
+UPGRADE_STATUS_FINE = 'fine'
+UPGRADE_STATUS_FAULT = 'fault'
+
+## Paths of the H5 files known to be at the current DATA_VERSION in this process. It only grows,
+## as files are never downgraded; checking it avoids opening the file at every DataType load.
+UP_TO_DATE_FILES = set()
+
+
+
+def _upgrade_file_version(file_path):
+    """
+    Bring one H5 file to the current data version. Executed in the processes of the upgrade pool,
+    so it only works on the file; the caller updates the DB.
+
+    :returns: (file_path, error_message, mark_invalid); error_message is None when the upgrade worked
+    """
+    try:
+        FilesUpdateManager().upgrade_file_version(file_path)
+        return file_path, None, False
+    except (MissingDataFileException, FileVersioningException), excep:
+        return file_path, str(excep), True
+    except Exception, excep:
+        return file_path, "%s: %s" % (excep.__class__.__name__, excep), False
+
 
 class FilesUpdateManager(UpdateManager):
     """
@@ -58,7 +87,13 @@ class FilesUpdateManager(UpdateManager):
 
     UPDATE_SCRIPTS_SUFFIX = "_update_files"
     PROJECTS_PAGE_SIZE = 20
-    DATA_TYPES_PAGE_SIZE = 20
+    DATA_TYPES_PAGE_SIZE = 500
+
+    ## Background thread started by `start_storage_upgrade`, and the (status, message) it finished with.
+    _upgrade_thread = None
+    _upgrade_result = None
+    ## Processes upgrading files, created by `prepare_upgrade_pool` before the web server starts any thread.
+    _upgrade_pool = None
     
     
     def __init__(self):
@@ -81,6 +116,8 @@ class FilesUpdateManager(UpdateManager):
         Returns True only if the data version of the file is equal with the
         data version specified into the TVB configuration file.
         """
+        if file_path in UP_TO_DATE_FILES:
+            return True
         try:
             file_version = self.get_file_data_version(file_path)
         except MissingDataFileException, ex:
@@ -91,6 +128,7 @@ class FilesUpdateManager(UpdateManager):
             return False
 
         if file_version == cfg.DATA_VERSION:
+            UP_TO_DATE_FILES.add(file_path)
             return True
         return False
 
@@ -102,74 +140,145 @@ class FilesUpdateManager(UpdateManager):
         
         :param input_file_name: the path to the file which needs to be upgraded
         """
+        self.upgrade_file_version(input_file_name)
+        self._update_datatype_disk_size(input_file_name)
+
+
+    def upgrade_file_version(self, input_file_name):
+        """
+        Run the update scripts needed to bring the given file to the latest data version.
+        Unlike `upgrade_file` it does not touch the DB, so it can be executed in a separate process.
+        """
         file_version = self.get_file_data_version(input_file_name)
         for script_name in self.get_update_scripts(file_version):
             self.run_update_script(script_name, input_file=input_file_name)
-        self._update_datatype_disk_size(input_file_name)
+        UP_TO_DATE_FILES.add(input_file_name)
 
 
-    def __upgrade_datatype_list(self, datatypes):
+    def __upgrade_datatype_list(self, datatypes, pool, progress_file):
         """
-        Upgrade a list of DataTypes to the current version.
+        Upgrade a list of DataTypes to the current version. Files are upgraded on the process pool (when
+        given), while the DB is updated from here. Each DataType is stored and appended to the progress file
+        as soon as its file is handled, so an interrupted upgrade continues from the next file.
         
         :param datatypes: The list of DataTypes that should be upgraded.
 
-        :returns: (nr_of_dts_upgraded_fine, nr_of_dts_upgraded_fault) a two-tuple of integers representing
-            the number of DataTypes for which the upgrade worked fine, and the number of DataTypes for which
-            some kind of fault occurred
+        :returns: (nr_of_dts_upgraded_fine, nr_of_dts_upgraded_fault, nr_of_errors) a three-tuple of integers
+            representing the number of DataTypes for which the upgrade worked fine, the number of DataTypes
+            marked invalid because of missing or incompatible files, and the number of DataTypes for which an
+            unexpected error occurred (those are not recorded as done, so a next upgrade retries them)
         """
+        datatypes_by_file = {}
         nr_of_dts_upgraded_fine = 0
-        nr_of_dts_upgraded_fault = 0
         for datatype in datatypes:
             specific_datatype = dao.get_datatype_by_gid(datatype.gid)
             if isinstance(specific_datatype, MappedType):
-                try:
-                    self.upgrade_file(specific_datatype.get_storage_file_path())
-                    nr_of_dts_upgraded_fine += 1
-                except (MissingDataFileException, FileVersioningException) as ex:
-                    # The file is missing for some reason. Just mark the DataType as invalid.
-                    datatype.invalid = True
-                    dao.store_entity(datatype)
-                    nr_of_dts_upgraded_fault += 1
-                    self.log.exception(ex)
-        return nr_of_dts_upgraded_fine, nr_of_dts_upgraded_fault
+                datatypes_by_file[specific_datatype.get_storage_file_path()] = specific_datatype
+            else:
+                self._write_upgrade_progress(progress_file, datatype.gid, UPGRADE_STATUS_FINE)
+                nr_of_dts_upgraded_fine += 1
+
+        if pool is None:
+            results = (_upgrade_file_version(file_path) for file_path in datatypes_by_file)
+        else:
+            results = pool.imap_unordered(_upgrade_file_version, datatypes_by_file.keys())
+
+        files_helper = FilesHelper()
+        nr_of_dts_upgraded_fault = 0
+        nr_of_errors = 0
+        for file_path, error_message, mark_invalid in results:
+            datatype = datatypes_by_file[file_path]
+            if error_message is None:
+                UP_TO_DATE_FILES.add(file_path)
+                datatype.disk_size = files_helper.compute_size_on_disk(file_path)
+                status = UPGRADE_STATUS_FINE
+                nr_of_dts_upgraded_fine += 1
+            elif mark_invalid:
+                # The file is missing for some reason. Just mark the DataType as invalid.
+                self.log.error("Could not upgrade %s: %s" % (file_path, error_message))
+                datatype.invalid = True
+                status = UPGRADE_STATUS_FAULT
+                nr_of_dts_upgraded_fault += 1
+            else:
+                self.log.error("Unexpected error while upgrading %s: %s" % (file_path, error_message))
+                nr_of_errors += 1
+                continue
+            dao.store_entity(datatype)
+            self._write_upgrade_progress(progress_file, datatype.gid, status)
+        return nr_of_dts_upgraded_fine, nr_of_dts_upgraded_fault, nr_of_errors
+
+
+    @staticmethod
+    def _write_upgrade_progress(progress_file, gid, status):
+        """
+        Record a handled DataType, and make sure the line is on disk before continuing with the next one.
+        """
+        progress_file.write("%s %s\n" % (gid, status))
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+
+
+    @staticmethod
+    def _read_upgrade_progress(progress_path):
+        """
+        :returns: dictionary {gid: status} with the DataTypes handled by a previous, interrupted, upgrade
+        """
+        progress = {}
+        if os.path.exists(progress_path):
+            with open(progress_path, 'r') as progress_file:
+                for line in progress_file:
+                    parts = line.split()
+                    # A last line without status was being written when the upgrade was interrupted.
+                    if len(parts) == 2:
+                        progress[parts[0]] = parts[1]
+        return progress
                         
                         
-    def upgrade_all_files_from_storage(self):
+    def upgrade_all_files_from_storage(self, pool=None):
         """
         Upgrades all the data types from TVB storage to the latest data version.
+        Progress is recorded in TVB_STORAGE after each file, so an interrupted upgrade
+        continues with the DataTypes not yet handled.
         
+        :param pool: multiprocessing pool upgrading the files (see `prepare_upgrade_pool`);
+                     when None, files are upgraded in the current thread
         :returns: a two entry tuple (status, message) where status is a boolean that is True in case
             the upgrade was successfully for all DataTypes and False otherwise, and message is a status
             update message.
         """
         if cfg.DATA_CHECKED_TO_VERSION < cfg.DATA_VERSION:
             datatype_total_count = dao.count_all_datatypes()
+            progress_path = os.path.join(cfg.TVB_STORAGE, UPGRADE_PROGRESS_FILE % cfg.DATA_VERSION)
+            already_handled = self._read_upgrade_progress(progress_path)
+            if already_handled:
+                self.log.info("Continuing file storage upgrade; %d DataTypes were already handled."
+                              % len(already_handled))
             # Keep track of how many DataTypes were properly updated and how many 
             # were marked as invalid due to missing files or invalid manager.
-            nr_of_dts_upgraded_fine = 0
-            nr_of_dts_upgraded_fault = 0
+            statuses = already_handled.values()
+            nr_of_dts_upgraded_fine = statuses.count(UPGRADE_STATUS_FINE)
+            nr_of_dts_upgraded_fault = statuses.count(UPGRADE_STATUS_FAULT)
+            nr_of_errors = 0
             
             # Read DataTypes in pages just to spare memory consumption
-            datatypes_nr_of_pages = datatype_total_count // self.DATA_TYPES_PAGE_SIZE
-            if datatype_total_count % self.DATA_TYPES_PAGE_SIZE:
-                datatypes_nr_of_pages += 1
-            current_datatype_page = 1
-            
-            while current_datatype_page <= datatypes_nr_of_pages:
-                
-                datatype_start_idx = self.DATA_TYPES_PAGE_SIZE * (current_datatype_page - 1)
-                if datatype_total_count >= datatype_start_idx + self.DATA_TYPES_PAGE_SIZE:
-                    datatype_end_idx = self.DATA_TYPES_PAGE_SIZE * current_datatype_page  
-                else: 
-                    datatype_end_idx = datatype_total_count - datatype_start_idx
-    
-                datatypes_for_page = dao.get_all_datatypes(datatype_start_idx, datatype_end_idx)
-                upgraded_fine_count, upgraded_fault_count = self.__upgrade_datatype_list(datatypes_for_page)
-                nr_of_dts_upgraded_fine += upgraded_fine_count
-                nr_of_dts_upgraded_fault += upgraded_fault_count
-                current_datatype_page += 1
-                
+            with open(progress_path, 'a') as progress_file:
+                for datatype_start_idx in xrange(0, datatype_total_count, self.DATA_TYPES_PAGE_SIZE):
+                    datatypes_for_page = [datatype for datatype in
+                                          dao.get_all_datatypes(datatype_start_idx, self.DATA_TYPES_PAGE_SIZE)
+                                          if datatype.gid not in already_handled]
+                    if datatypes_for_page:
+                        upgrade_counts = self.__upgrade_datatype_list(datatypes_for_page, pool, progress_file)
+                        nr_of_dts_upgraded_fine += upgrade_counts[0]
+                        nr_of_dts_upgraded_fault += upgrade_counts[1]
+                        nr_of_errors += upgrade_counts[2]
+
+            if nr_of_errors > 0:
+                # Do not mark storage as checked, so the DataTypes which failed are retried next time.
+                return_message = ("File upgrade could not be completed for %s DataTypes, because of unexpected "
+                                  "errors. It will be retried at the next login." % nr_of_errors)
+                self.log.error(return_message)
+                return False, return_message
+
             # Now update the configuration file since update was done
             config_file_update_dict = {cfg.KEY_LAST_CHECKED_FILE_VERSION: cfg.DATA_VERSION}
             if nr_of_dts_upgraded_fault == 0:
@@ -188,7 +297,86 @@ class FilesUpdateManager(UpdateManager):
                                   nr_of_dts_upgraded_fine, nr_of_dts_upgraded_fault))
                 self.log.warning(return_message)
             cfg.add_entries_to_config_file(config_file_update_dict)
+            os.remove(progress_path)
             return return_status, return_message
+
+
+    @classmethod
+    def prepare_upgrade_pool(cls, max_workers=None):
+        """
+        When the file storage needs an upgrade, create the processes which will upgrade the files.
+        To be called at start-up, before the web server starts: forking later, from one of its threads,
+        would copy in the children its DB connections and the locks held by the other threads.
+
+        :param max_workers: number of processes upgrading files; defaults to the number of CPUs
+        """
+        if cls._upgrade_pool is not None or cfg.DATA_CHECKED_TO_VERSION >= cfg.DATA_VERSION:
+            return
+        if max_workers is None:
+            max_workers = multiprocessing.cpu_count()
+        if max_workers > 1:
+            cls._upgrade_pool = multiprocessing.Pool(processes=max_workers)
+
+
+    @classmethod
+    def _close_upgrade_pool(cls):
+        """
+        Stop the upgrade processes, once they are no longer needed.
+        """
+        if cls._upgrade_pool is not None:
+            cls._upgrade_pool.close()
+            cls._upgrade_pool.join()
+            cls._upgrade_pool = None
+
+
+    @classmethod
+    def start_storage_upgrade(cls):
+        """
+        Start `upgrade_all_files_from_storage` on a background thread, unless it is already running.
+        Callers should serialize calls to this method.
+        """
+        if cls.is_storage_upgrade_running():
+            return
+        cls._upgrade_result = None
+        cls._upgrade_thread = threading.Thread(target=cls._run_storage_upgrade, name="FilesStorageUpgrade")
+        cls._upgrade_thread.daemon = True
+        cls._upgrade_thread.start()
+
+
+    @classmethod
+    def is_storage_upgrade_running(cls):
+        """
+        :returns: True while a storage upgrade started with `start_storage_upgrade` is in progress
+        """
+        return cls._upgrade_thread is not None and cls._upgrade_thread.is_alive()
+
+
+    @classmethod
+    def pop_storage_upgrade_result(cls):
+        """
+        :returns: the (status, message) of the last finished background upgrade, only once; None otherwise
+        """
+        if cls.is_storage_upgrade_running():
+            return None
+        result = cls._upgrade_result
+        cls._upgrade_result = None
+        return result
+
+
+    @classmethod
+    def _run_storage_upgrade(cls):
+        """
+        Target of the background upgrade thread.
+        """
+        try:
+            cls._upgrade_result = cls().upgrade_all_files_from_storage(cls._upgrade_pool)
+        except Exception, excep:
+            cls().log.exception(excep)
+            cls._upgrade_result = (False, "An unexpected error occurred during the file storage upgrade. "
+                                          "It will be retried at the next login.")
+        finally:
+            # The pool is used only once; a retry at the next login upgrades the remaining files serially.
+            cls._close_upgrade_pool()
      
 
     @staticmethod
@@ -260,6 +260,34 @@ class HDF5StorageManager(object):
             self.close_file()
 
 
+    def get_data_chunks(self, dataset_name, where=ROOT_NODE_PATH, ignore_errors=False):
+        """
+        This method reads the on-disk chunk layout of the given data set
+
+        :param dataset_name: Name of the data set for which to read the chunk shape
+        :param where: represents the path where dataset is stored (e.g. /data/info)
+        :returns: a tuple with the chunk shape, or None when the data set is stored contiguously
+
+        """
+        if dataset_name is None:
+            dataset_name = ''
+        if where is None:
+            where = self.ROOT_NODE_PATH
+
+        try:
+            # Open file to read data
+            hdf5File = self._open_h5_file('r')
+            return hdf5File[where + dataset_name].chunks
+        except KeyError:
+            if not ignore_errors:
+                LOG.debug("Trying to read chunks from a missing data set: %s" % dataset_name)
+                raise MissingDataSetException("Could not locate dataset: %s" % dataset_name)
+            else:
+                return None
+        finally:
+            self.close_file()
+
+
     def set_metadata(self, meta_dictionary, dataset_name='', tvb_specific_metadata=True, where=ROOT_NODE_PATH):
         """
         Set meta-data information for root node or for a given data set.
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+ZIP archives produced as a stream of bytes, without a temporary copy of the archive on disk.
+
+Entries are written one after the other, so the archive can be sent to a client (or written to any
+file-like object) while it is being built. Files which are already compressed (e.g. H5) are stored,
+the others are deflated. Small files are deflated on a pool of worker threads (zlib releases the GIL),
+larger ones are deflated while streamed, so memory use stays bounded by the size of the files in flight.
+ZIP64 records are written when the archive, or one of its entries, exceeds the classic 4GB limits.
+"""
+
+import os
+import time
+import zlib
+import struct
+import zipfile
+import multiprocessing
+from collections import deque
+from multiprocessing.pool import ThreadPool
+from tvb.basic.logger.builder import get_logger
+
+LOG = get_logger(__name__)
+
+## Bytes read from a file at once.
+CHUNK_SIZE = 1 << 20
+## Files up to this size are deflated in memory, on the worker threads.
+IN_MEMORY_LIMIT = 8 << 20
+## Extensions of files which are already compressed, and thus not deflated again.
+STORED_EXTENSIONS = ('.h5', '.zip', '.gz', '.bz2', '.png', '.jpg', '.jpeg', '.gif')
+COMPRESSION_LEVEL = 6
+
+## Flag bits: sizes and CRC given after the data; file name encoded as UTF-8.
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_DATA_DESCRIPTOR_SIGNATURE = 'PK\x07\x08'
+_CREATE_SYSTEM_UNIX = 3
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+
+
+
+class _EntryInfo(object):
+    """
+    What needs to be remembered about an entry, for the central directory at the end of the archive.
+    """
+
+    def __init__(self, arc_name, date_time, external_attr, compress_type):
+        if isinstance(arc_name, unicode):
+            try:
+                self.name = arc_name.encode('ascii')
+                self.flag_bits = 0
+            except UnicodeEncodeError:
+                self.name = arc_name.encode('utf-8')
+                self.flag_bits = _FLAG_UTF8
+        else:
+            self.name = arc_name
+            self.flag_bits = 0
+        self.name = self.name.replace(os.sep, '/').lstrip('/')
+        self.date_time = date_time
+        self.external_attr = external_attr
+        self.compress_type = compress_type
+        self.crc = 0
+        self.compress_size = 0
+        self.file_size = 0
+        self.header_offset = 0
+        self.zip64 = False
+
+
+    @property
+    def dos_date_time(self):
+        """(dos date, dos time) as used in ZIP headers"""
+        year, month, day, hour, minute, second = self.date_time[:6]
+        year = max(1980, year)
+        return ((year - 1980) << 9 | month << 5 | day), (hour << 11 | minute << 5 | second // 2)
+
+
+    def local_header(self):
+        """Local file header; sizes and CRC are in the header only when already known."""
+        dos_date, dos_time = self.dos_date_time
+        extra = ''
+        crc, compress_size, file_size = self.crc, self.compress_size, self.file_size
+        if self.zip64:
+            extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+            compress_size = file_size = 0xFFFFFFFF
+        return struct.pack(zipfile.structFileHeader, zipfile.stringFileHeader,
+                           _VERSION_ZIP64 if self.zip64 else _VERSION_DEFAULT, 0,
+                           self.flag_bits, self.compress_type, dos_time, dos_date,
+                           crc, compress_size, file_size, len(self.name), len(extra)) + self.name + extra
+
+
+    def data_descriptor(self):
+        """Sizes and CRC, written after the data of an entry streamed from disk."""
+        if self.zip64:
+            return struct.pack('<4sLQQ', _DATA_DESCRIPTOR_SIGNATURE, self.crc, self.compress_size, self.file_size)
+        return struct.pack('<4sLLL', _DATA_DESCRIPTOR_SIGNATURE, self.crc, self.compress_size, self.file_size)
+
+
+    def central_directory_record(self):
+        """Record of this entry in the central directory."""
+        dos_date, dos_time = self.dos_date_time
+        zip64_values = []
+        file_size, compress_size, header_offset = self.file_size, self.compress_size, self.header_offset
+        if file_size > zipfile.ZIP64_LIMIT or compress_size > zipfile.ZIP64_LIMIT:
+            zip64_values.extend([file_size, compress_size])
+            file_size = compress_size = 0xFFFFFFFF
+        if header_offset > zipfile.ZIP64_LIMIT:
+            zip64_values.append(header_offset)
+            header_offset = 0xFFFFFFFF
+        extra = ''
+        if zip64_values:
+            extra = struct.pack('<HH' + 'Q' * len(zip64_values), 1, 8 * len(zip64_values), *zip64_values)
+        version = _VERSION_ZIP64 if (zip64_values or self.zip64) else _VERSION_DEFAULT
+        return struct.pack(zipfile.structCentralDir, zipfile.stringCentralDir,
+                           version, _CREATE_SYSTEM_UNIX, version, 0,
+                           self.flag_bits, self.compress_type, dos_time, dos_date,
+                           self.crc, compress_size, file_size, len(self.name), len(extra), 0, 0, 0,
+                           self.external_attr, header_offset) + self.name + extra
+
+
+
+def _deflate_in_memory(file_path, content, level):
+    """
+    Run on a worker thread: deflate a whole (small) file or string.
+    :returns: tuple (compressed data, CRC, uncompressed size)
+    """
+    if file_path is not None:
+        with open(file_path, 'rb') as source:
+            content = source.read()
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(content) + compressor.flush(), zlib.crc32(content) & 0xFFFFFFFF, len(content)
+
+
+
+class ZipStream(object):
+    """
+    ZIP archive built from files, folders and strings, produced when iterated as a sequence of byte strings.
+
+    Usage::
+
+        archive = ZipStream()
+        archive.add_folder(project_folder)
+        archive.add_string(json.dumps(info), "info.json")
+        for data in archive:
+            response.write(data)
+    """
+
+
+    def __init__(self, max_workers=None, compression_level=COMPRESSION_LEVEL):
+        """
+        :param max_workers: threads used for deflating small files; defaults to the number of CPUs
+        """
+        if max_workers is None:
+            max_workers = multiprocessing.cpu_count()
+        self.max_workers = max(1, int(max_workers))
+        self.compression_level = compression_level
+        self._sources = []
+
+
+    def add_file(self, file_path, arc_name=None):
+        """Add one file, under the name arc_name in the archive (by default its base name)."""
+        self._sources.append(('file', file_path, arc_name or os.path.basename(file_path)))
+
+
+    def add_folder(self, folder_root, arc_prefix=''):
+        """
+        Add all the files under folder_root (empty folders are ignored), with paths relative to
+        folder_root, prefixed by arc_prefix. The folder is walked only when the archive is produced.
+        """
+        self._sources.append(('folder', folder_root, arc_prefix))
+
+
+    def add_string(self, content, arc_name):
+        """Add an entry with the given content."""
+        if isinstance(content, unicode):
+            content = content.encode('utf-8')
+        self._sources.append(('string', content, arc_name))
+
+
+    def write_to(self, file_path):
+        """
+        Write the whole archive into a file.
+        :returns: file_path
+        """
+        with open(file_path, 'wb') as output:
+            for data in self:
+                output.write(data)
+        return file_path
+
+
+    def _entries(self):
+        """
+        Generator of tuples (arc name, file path or None, content or None, os.stat result or None).
+        """
+        for kind, source, name in self._sources:
+            if kind == 'string':
+                yield name, None, source, None
+            elif kind == 'file':
+                yield name, source, None, os.stat(source)
+            else:
+                for root, _, files in os.walk(source):
+                    for file_name in sorted(files):
+                        file_path = os.path.join(root, file_name)
+                        yield name + file_path[len(source) + len(os.sep):], file_path, None, os.stat(file_path)
+
+
+    def __iter__(self):
+        self._offset = 0
+        written = []
+        pending = deque()
+        max_in_flight = 2 * self.max_workers
+        pool = ThreadPool(self.max_workers) if self.max_workers > 1 else None
+        try:
+            for arc_name, file_path, content, stat in self._entries():
+                is_stored = file_path is not None and os.path.splitext(file_path)[1].lower() in STORED_EXTENSIONS
+                date_time = time.localtime(stat.st_mtime if stat is not None else time.time())
+                external_attr = ((stat.st_mode if stat is not None else 0100644) & 0xFFFF) << 16
+                info = _EntryInfo(arc_name, date_time, external_attr,
+                                  zipfile.ZIP_STORED if is_stored else zipfile.ZIP_DEFLATED)
+                size = stat.st_size if stat is not None else len(content)
+
+                if is_stored or size > IN_MEMORY_LIMIT:
+                    ## Entries deflated on workers are kept in memory, so big files are streamed right away.
+                    for data in self._stream_file(info, file_path, size):
+                        yield data
+                    written.append(info)
+                    continue
+
+                args = (file_path, content, self.compression_level)
+                if pool is None:
+                    pending.append((info, _deflate_in_memory(*args)))
+                else:
+                    pending.append((info, pool.apply_async(_deflate_in_memory, args)))
+                while len(pending) >= max_in_flight or (pending and _is_ready(pending[0][1])):
+                    info, result = pending.popleft()
+                    yield self._deflated_entry(info, result)
+                    written.append(info)
+
+            while pending:
+                info, result = pending.popleft()
+                yield self._deflated_entry(info, result)
+                written.append(info)
+            if pool is not None:
+                pool.close()
+        finally:
+            pending.clear()
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        yield self._central_directory(written)
+
+
+    def _emit(self, data):
+        self._offset += len(data)
+        return data
+
+
+    def _deflated_entry(self, info, result):
+        """Header and data of an entry deflated in memory: sizes and CRC are known in advance."""
+        if not isinstance(result, tuple):
+            result = result.get()
+        compressed, info.crc, info.file_size = result
+        info.compress_size = len(compressed)
+        info.zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+        info.header_offset = self._offset
+        return self._emit(info.local_header() + compressed)
+
+
+    def _stream_file(self, info, file_path, size):
+        """Generator for the header, data and data descriptor of an entry read from disk in chunks."""
+        info.flag_bits |= _FLAG_DATA_DESCRIPTOR
+        ## Deflate can slightly grow data that does not compress.
+        info.zip64 = size + size // 100 + 1024 > zipfile.ZIP64_LIMIT
+        info.header_offset = self._offset
+        yield self._emit(info.local_header())
+
+        compressor = None
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        crc = 0
+        with open(file_path, 'rb') as source:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                info.file_size += len(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                info.compress_size += len(chunk)
+                yield self._emit(chunk)
+        if compressor is not None:
+            chunk = compressor.flush()
+            info.compress_size += len(chunk)
+            yield self._emit(chunk)
+        info.crc = crc & 0xFFFFFFFF
+        yield self._emit(info.data_descriptor())
+
+
+    def _central_directory(self, entries):
+        """Central directory and end of archive records, ZIP64 ones included when needed."""
+        start = self._offset
+        records = ''.join(info.central_directory_record() for info in entries)
+        size = len(records)
+        end = ''
+        if len(entries) >= 0xFFFF or start > zipfile.ZIP64_LIMIT or size > zipfile.ZIP64_LIMIT:
+            end_64 = start + size
+            end += struct.pack(zipfile.structEndArchive64, zipfile.stringEndArchive64, 44,
+                               _VERSION_ZIP64, _VERSION_ZIP64, 0, 0, len(entries), len(entries), size, start)
+            end += struct.pack(zipfile.structEndArchive64Locator, zipfile.stringEndArchive64Locator, 0, end_64, 1)
+            count, size_32, start_32 = (min(len(entries), 0xFFFF), min(size, 0xFFFFFFFF),
+                                        min(start, 0xFFFFFFFF))
+        else:
+            count, size_32, start_32 = len(entries), size, start
+        end += struct.pack(zipfile.structEndArchive, zipfile.stringEndArchive, 0, 0, count, count,
+                           size_32, start_32, 0)
+        return self._emit(records + end)
+
+
+
+def _is_ready(result):
+    """True for results computed in place, or for finished asynchronous results."""
+    return isinstance(result, tuple) or result.ready()
@@ -151,10 +151,17 @@ class BurstConfiguration(Base, Exportable):
         ## After launch and storage, if we have multiple workflows in current burst, it means there is a group.
         if self.workflows_number > 1:
             return True
+        return self.has_range_parameters(self.simulator_configuration)
 
+
+    @staticmethod
+    def has_range_parameters(simulator_configuration):
+        """
+        :returns: True, when a range parameter is selected in the given simulator configuration dictionary.
+        """
         for param in [RANGE_PARAMETER_1, RANGE_PARAMETER_2]:
-            if param in self.simulator_configuration and KEY_SAVED_VALUE in self.simulator_configuration[param] \
-                    and self.simulator_configuration[param][KEY_SAVED_VALUE] != '0':
+            if param in simulator_configuration and KEY_SAVED_VALUE in simulator_configuration[param] \
+                    and simulator_configuration[param][KEY_SAVED_VALUE] != '0':
                 return True
         return False
 
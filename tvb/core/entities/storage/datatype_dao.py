@@ -144,6 +144,35 @@ class DatatypeDAO(RootDAO):
             return None
 
 
+    def get_first_datatype_gid_from_group(self, datatype_group_id):
+        """
+        :returns: the GID of the first datatype in the given group, or None for an empty group.
+        """
+        try:
+            result = self.session.query(model.DataType.gid).filter_by(fk_datatype_group=datatype_group_id
+                                                                      ).order_by(model.DataType.id).first()
+            return result[0] if result is not None else None
+        except Exception, excep:
+            self.logger.exception(excep)
+            return None
+
+
+    def get_operation_ids_for_datatype_group(self, datatype_group_id):
+        """
+        :returns: the ids of the operations which produced the datatypes in the given group,
+                  without loading the datatype entities.
+        """
+        result = []
+        try:
+            query = self.session.query(model.DataType.fk_from_operation
+                                       ).filter_by(fk_datatype_group=datatype_group_id
+                                       ).distinct().order_by(model.DataType.fk_from_operation)
+            result = [row[0] for row in query.all()]
+        except Exception, excep:
+            self.logger.exception(excep)
+        return result
+
+
     def set_datatype_visibility(self, datatype_gid, is_visible):
         """
         Sets the dataType visibility. If the given dataType is a dataTypeGroup or it is part of a
@@ -182,7 +211,8 @@ class DatatypeDAO(RootDAO):
         """
         resulted_data = []
         try:
-            resulted_data = self.session.query(model.DataType).offset(max(page_start, 0)).limit(max(page_end, 0)).all()
+            resulted_data = self.session.query(model.DataType).order_by(model.DataType.id
+                                                                ).offset(max(page_start, 0)).limit(max(page_end, 0)).all()
         except Exception, excep:
             self.logger.exception(excep)
         return resulted_data
@@ -222,6 +252,21 @@ class DatatypeDAO(RootDAO):
         return resulted_data
 
 
+    def get_datatype_burst_mapping(self, project_id):
+        """
+        :returns: dictionary {datatype GID: id of the burst which produced it} for all the datatypes
+                  in the given project, without loading the datatype entities.
+        """
+        result = {}
+        try:
+            query = self.session.query(model.DataType.gid, model.DataType.fk_parent_burst
+                                       ).join(model.Operation).filter(model.Operation.fk_launched_in == project_id)
+            result = dict(query.all())
+        except Exception, excep:
+            self.logger.exception(excep)
+        return result
+
+
     def get_datatypes_info_for_project(self, project_id, visibility_filter=None, filter_value=None):
         """
         Get all the dataTypes for a given project, including linked data.
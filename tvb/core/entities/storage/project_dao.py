@@ -35,7 +35,7 @@ DAO operation related to Users and Projects are defined here.
 .. moduleauthor:: Bogdan Neacsa <bogdan.neacsa@codemart.ro>
 """
 
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func
 from sqlalchemy.sql.expression import desc
 from sqlalchemy.orm.exc import NoResultFound
 from tvb.basic.config.settings import TVBSettings as cfg
@@ -292,13 +292,10 @@ class CaseDAO(RootDAO):
     def get_operation_numbers(self, proj_id):
         """
         Count total number of operations started for current project.
+        :returns: tuple (finished, started, error, canceled), from a single GROUP BY status query
         """
-        fns = self.session.query(model.Operation).filter_by(fk_launched_in=proj_id
-                                 ).filter_by(status=model.STATUS_FINISHED).count()
-        sta = self.session.query(model.Operation).filter_by(fk_launched_in=proj_id
-                                 ).filter_by(status=model.STATUS_STARTED).count()
-        err = self.session.query(model.Operation).filter_by(fk_launched_in=proj_id
-                                 ).filter_by(status=model.STATUS_ERROR).count()
-        canceled = self.session.query(model.Operation).filter_by(fk_launched_in=proj_id
-                                      ).filter_by(status=model.STATUS_CANCELED).count()
-        return fns, sta, err, canceled
+        counts = dict(self.session.query(model.Operation.status, func.count(model.Operation.id)
+                                         ).filter(model.Operation.fk_launched_in == proj_id
+                                         ).group_by(model.Operation.status).all())
+        return (counts.get(model.STATUS_FINISHED, 0), counts.get(model.STATUS_STARTED, 0),
+                counts.get(model.STATUS_ERROR, 0), counts.get(model.STATUS_CANCELED, 0))
@@ -125,6 +125,29 @@ class WorkflowDAO(RootDAO):
         return burst
 
 
+    def get_bursts_status(self, burst_ids, changed_since=None):
+        """
+        Projection query, which does not build BurstConfiguration entities (nor decode their configuration).
+        :param changed_since: when not None, only bursts finished after this moment are returned
+        :returns: list of tuples (id, status, workflows_number, error_message, simulator_configuration JSON)
+                  for the given burst ids
+        """
+        if not burst_ids:
+            return []
+        try:
+            query = self.session.query(model.BurstConfiguration.id, model.BurstConfiguration.status,
+                                       model.BurstConfiguration.workflows_number,
+                                       model.BurstConfiguration.error_message,
+                                       model.BurstConfiguration._simulator_configuration
+                                       ).filter(model.BurstConfiguration.id.in_(burst_ids))
+            if changed_since is not None:
+                query = query.filter(model.BurstConfiguration.finish_time > changed_since)
+            return query.all()
+        except Exception, excep:
+            self.logger.exception(excep)
+            return []
+
+
     def get_visualization_steps(self, workflow_id):
         """Retrieve all the visualization steps for a workflow."""
         try:
@@ -164,6 +187,76 @@ class WorkflowDAO(RootDAO):
         return workflows
 
 
+    def get_workflows_for_bursts(self, burst_ids):
+        """Returns all the workflows launched for any of the given burst ids, ordered by id."""
+        workflows = []
+        try:
+            if burst_ids:
+                workflows = self.session.query(model.Workflow).filter(model.Workflow.fk_burst.in_(burst_ids)
+                                                                      ).order_by(model.Workflow.id).all()
+        except Exception, excep:
+            self.logger.exception(excep)
+
+        return workflows
+
+
+    def get_workflow_steps_for_bursts(self, burst_ids):
+        """
+        Retrieve, with a single query, the simulation/analyzers steps which produced an operation,
+        for all the workflows of the given bursts.
+
+        :returns: list of tuples (WorkflowStep, operation GID, Algorithm, AlgorithmGroup),
+                  ordered by workflow and step index
+        """
+        result = []
+        try:
+            if burst_ids:
+                result = self.session.query(model.WorkflowStep, model.Operation.gid,
+                                            model.Algorithm, model.AlgorithmGroup
+                                            ).join(model.Workflow
+                                            ).join((model.Operation,
+                                                    model.Operation.id == model.WorkflowStep.fk_operation)
+                                            ).join((model.Algorithm,
+                                                    model.Algorithm.id == model.WorkflowStep.fk_algorithm)
+                                            ).join((model.AlgorithmGroup,
+                                                    model.AlgorithmGroup.id == model.Algorithm.fk_algo_group)
+                                            ).filter(model.Workflow.fk_burst.in_(burst_ids)
+                                            ).filter(model.WorkflowStep.step_index > -1
+                                            ).order_by(model.WorkflowStep.fk_workflow,
+                                                       model.WorkflowStep.step_index).all()
+        except Exception, excep:
+            self.logger.exception(excep)
+        return result
+
+
+    def get_visualization_steps_for_bursts(self, burst_ids):
+        """
+        Retrieve, with a single query, the visualization steps for all the workflows of the given bursts.
+
+        :returns: list of tuples (WorkflowStepView, portlet identifier, Algorithm, AlgorithmGroup),
+                  ordered by workflow and position in the portlets grid
+        """
+        result = []
+        try:
+            if burst_ids:
+                result = self.session.query(model.WorkflowStepView, model.Portlet.algorithm_identifier,
+                                            model.Algorithm, model.AlgorithmGroup
+                                            ).join(model.Workflow
+                                            ).join((model.Portlet,
+                                                    model.Portlet.id == model.WorkflowStepView.fk_portlet)
+                                            ).join((model.Algorithm,
+                                                    model.Algorithm.id == model.WorkflowStepView.fk_algorithm)
+                                            ).join((model.AlgorithmGroup,
+                                                    model.AlgorithmGroup.id == model.Algorithm.fk_algo_group)
+                                            ).filter(model.Workflow.fk_burst.in_(burst_ids)
+                                            ).order_by(model.WorkflowStepView.fk_workflow,
+                                                       model.WorkflowStepView.tab_index,
+                                                       model.WorkflowStepView.index_in_tab).all()
+        except Exception, excep:
+            self.logger.exception(excep)
+        return result
+
+
     def get_workflow_by_id(self, workflow_id):
         """"Returns the workflow instance with the given id"""
         workflow = None
@@ -194,15 +194,17 @@ class StepInfo(BaseExportHelp):
     def __init__(self, data_dict):
         super(StepInfo, self).__init__(data_dict)
     
-    def set_algorithm(self, algorithm):
+    def set_algorithm(self, algorithm, algo_group=None):
         """
         Save required info about algorithm to quickly rebuild it.
         Recieves a model.Algorithm entity and makes sure to store just what is needed to
         later be able to re-create that entity (even if with different id).
+        The algo_group can be given when it was loaded together with a detached algorithm.
         """
-        self._data_dict[self.ALGO_INFO] = {'module' : algorithm.algo_group.module,
-                                            'class' : algorithm.algo_group.classname,
-                                            'init_param' : algorithm.algo_group.init_parameter,
+        algo_group = algo_group or algorithm.algo_group
+        self._data_dict[self.ALGO_INFO] = {'module' : algo_group.module,
+                                            'class' : algo_group.classname,
+                                            'init_param' : algo_group.init_parameter,
                                             'identifier' : algorithm.identifier}
         
     def get_algorithm(self):
@@ -251,7 +253,13 @@ class WorkflowViewStepInformation(StepInfo):
         Having as input a model.Portlet entity, store what is required in order to
         later recreate that entity even in 'id' from database differs.
         """
-        self._data_dict[self.PORTLET_IDENT] = portlet.algorithm_identifier
+        self.set_portlet_identifier(portlet.algorithm_identifier)
+
+    def set_portlet_identifier(self, portlet_identifier):
+        """
+        Store the identifier of the portlet displayed by this view step.
+        """
+        self._data_dict[self.PORTLET_IDENT] = portlet_identifier
     
     def get_portlet(self):
         """
@@ -284,7 +292,13 @@ class WorkflowStepInformation(StepInfo):
         Having a model.Operation entity as input, store it's gid so we can later
         return it even if 'id' in db has changed.
         """
-        self._data_dict[self.OP_GID] = operation.gid
+        self.set_operation_gid(operation.gid)
+
+    def set_operation_gid(self, operation_gid):
+        """
+        Store the gid of the operation which resulted from this step.
+        """
+        self._data_dict[self.OP_GID] = operation_gid
         
     def get_operagion(self):
         """
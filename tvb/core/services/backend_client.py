@@ -48,6 +48,9 @@ from tvb.core.utils import parse_json_parameters
 from tvb.core.entities import model
 from tvb.core.entities.storage import dao
 from tvb.core.services.workflow_service import WorkflowService
+from tvb.core.services.status_bus import STATUS_BUS
+from tvb.core.services.exceptions import BackendLaunchException
+from tvb.config import CLUSTER_SCHEDULER_MODULE, CLUSTER_SCHEDULER_CLASS
 
 
 LOGGER = get_logger(__name__)
@@ -102,19 +105,27 @@ class OperationExecutor(threading.Thread):
             LOGGER.info("Finished with launch of operation %s" % operation_id)
             returned = launched_process.wait()
 
-            if returned != 0 and not self.stopped():
-                # Process did not end as expected. (e.g. Segmentation fault)
+            if not self.stopped():
+                ## Status was changed in the launched process, so let the clients watching this
+                ## web process know about it. When stopped, stop_operation already published the change.
                 operation = dao.get_operation_by_id(self.operation_id)
-                LOGGER.error("Operation suffered fatal failure with exit code: %s" % returned)
+                burst_entity = dao.get_burst_for_operation_id(self.operation_id)
 
-                operation.mark_complete(model.STATUS_ERROR,
-                                        "Operation failed unexpectedly! Probably segmentation fault.")
-                dao.store_entity(operation)
+                if returned != 0:
+                    # Process did not end as expected. (e.g. Segmentation fault)
+                    LOGGER.error("Operation suffered fatal failure with exit code: %s" % returned)
 
-                burst_entity = dao.get_burst_for_operation_id(self.operation_id)
-                if burst_entity:
+                    operation.mark_complete(model.STATUS_ERROR,
+                                            "Operation failed unexpectedly! Probably segmentation fault.")
+                    dao.store_entity(operation)
+
+                STATUS_BUS.publish_operation(operation, burst_entity.id if burst_entity else None)
+
+                if burst_entity and returned != 0:
                     message = "Error on burst operation! Probably segmentation fault."
                     WorkflowService().mark_burst_finished(burst_entity, error=True, error_message=message)
+                elif burst_entity and burst_entity.status != burst_entity.BURST_RUNNING:
+                    STATUS_BUS.publish_burst(burst_entity)
 
             del launched_process
 
@@ -173,6 +184,31 @@ class StandAloneClient(object):
         thread.start()
 
 
+    @staticmethod
+    def execute_operations(operations, user_name_label, adapter_instance):
+        """
+        Start each of the given operations asynchronously, locally.
+        :raises BackendLaunchException: telling how many operations were started, before the failing one
+        """
+        for idx, operation in enumerate(operations):
+            try:
+                StandAloneClient.execute(str(operation.id), user_name_label, adapter_instance)
+            except Exception, excep:
+                raise BackendLaunchException(str(excep), idx, excep)
+
+
+    @staticmethod
+    def stop_operations(operation_ids):
+        """
+        Stop all the given operations.
+        :returns: True when at least one of them was stopped.
+        """
+        result = False
+        for operation_id in operation_ids:
+            result = StandAloneClient.stop_operation(operation_id) or result
+        return result
+
+
     @staticmethod
     def stop_operation(operation_id):
         """
@@ -205,6 +241,7 @@ class StandAloneClient(object):
         ## Mark operation as canceled in DB.
         operation.mark_cancelled()
         dao.store_entity(operation)
+        STATUS_BUS.publish_operation(operation)
         return stopped
 
 
@@ -213,20 +250,29 @@ class ClusterSchedulerClient(object):
     """
     Simple class, to mimic the same behavior we are expecting from StandAloneClient, but firing behind
     the cluster job scheduling process..
+    Operations launched together (e.g. from a range) are submitted as array jobs, when the scheduler allows it.
     """
 
 
+    def __init__(self, scheduler=None):
+        """
+        :param scheduler: ClusterScheduler instance; when missing, the one configured in tvb.config is used.
+        """
+        if scheduler is None:
+            module = __import__(CLUSTER_SCHEDULER_MODULE, globals(), locals(), [CLUSTER_SCHEDULER_CLASS])
+            scheduler = getattr(module, CLUSTER_SCHEDULER_CLASS)()
+        self.scheduler = scheduler
+
+
     @staticmethod
-    def _run_cluster_job(operation_identifier, user_name_label, adapter_instance):
+    def _compute_walltime(operations, adapter_instance):
         """
-        Threaded Popen
-        It is the function called by the ClusterSchedulerClient in a Thread.
-        This function starts a new process.
+        Estimate the walltime needed by the longest of the given operations.
         """
-        # Load operation so we can estimate the execution time
-        operation = dao.get_operation_by_id(operation_identifier)
-        kwargs = parse_json_parameters(operation.parameters)
-        time_estimate = int(adapter_instance.get_execution_time_approximation(**kwargs))
+        time_estimate = 0
+        for operation in operations:
+            kwargs = parse_json_parameters(operation.parameters)
+            time_estimate = max(time_estimate, int(adapter_instance.get_execution_time_approximation(**kwargs)))
         hours = int(time_estimate / 3600)
         minutes = (int(time_estimate) % 3600) / 60
         seconds = int(time_estimate) % 60
@@ -238,51 +284,84 @@ class ClusterSchedulerClient(object):
         else:
             walltime = datetime.time(hours, minutes, seconds)
             walltime = walltime.strftime("%H:%M:%S")
+        return walltime
 
-        call_arg = config.CLUSTER_SCHEDULE_COMMAND % (walltime, operation_identifier, user_name_label)
-        LOGGER.info(call_arg)
-        process_ = Popen([call_arg], stdout=PIPE, shell=True)
-        job_id = process_.stdout.read().replace('\n', '').split('OAR_JOB_ID=')[-1]
-        LOGGER.debug("Got jobIdentifier = %s for CLUSTER operationID = %s" % (operation_identifier, job_id))
-        operation_identifier = model.OperationProcessIdentifier(operation_identifier, job_id=job_id)
-        dao.store_entity(operation_identifier)
 
-
-    @staticmethod
-    def execute(operation_id, user_name_label, adapter_instance):
+    def _run_cluster_job(self, operations, user_name_label, adapter_instance):
+        """
+        It is the function called by the ClusterSchedulerClient in a Thread.
+        Submit the operations in chunks of at most MAX_ARRAY_SIZE tasks, and store the received job ids.
+        """
+        walltime = self._compute_walltime(operations, adapter_instance)
+        chunk_size = max(1, self.scheduler.MAX_ARRAY_SIZE)
+        for start in xrange(0, len(operations), chunk_size):
+            chunk = operations[start:start + chunk_size]
+            try:
+                job_ids = self.scheduler.submit([(operation.id, user_name_label) for operation in chunk], walltime)
+            except Exception, excep:
+                LOGGER.exception(excep)
+                for operation in chunk:
+                    operation = dao.get_operation_by_id(operation.id)
+                    operation.mark_complete(model.STATUS_ERROR, "Could not submit operation to the cluster!")
+                    dao.store_entity(operation)
+                    STATUS_BUS.publish_operation(operation)
+                continue
+            LOGGER.debug("Got jobIdentifiers = %s for CLUSTER operationIDs = %s"
+                         % (job_ids, [operation.id for operation in chunk]))
+            dao.store_entities([model.OperationProcessIdentifier(operation.id, job_id=job_id)
+                                for operation, job_id in zip(chunk, job_ids)])
+
+
+    def execute(self, operation_id, user_name_label, adapter_instance):
         """Call the correct system command to submit a job to the cluster."""
-        thread = threading.Thread(target=ClusterSchedulerClient._run_cluster_job,
-                                  kwargs={'operation_identifier': operation_id,
+        self.execute_operations([dao.get_operation_by_id(operation_id)], user_name_label, adapter_instance)
+
+
+    def execute_operations(self, operations, user_name_label, adapter_instance):
+        """Submit all the given operations to the cluster, with as few scheduler calls as possible."""
+        thread = threading.Thread(target=self._run_cluster_job,
+                                  kwargs={'operations': operations,
                                           'user_name_label': user_name_label,
                                           'adapter_instance': adapter_instance})
         thread.start()
 
 
-    @staticmethod
-    def stop_operation(operation_id):
+    def stop_operation(self, operation_id):
         """
         Stop a thread for a given operation id
         """
-        operation = dao.get_operation_by_id(operation_id)
-        if not operation or operation.status != model.STATUS_STARTED:
-            LOGGER.warning("Operation already stopped or not found is given to stop job: %s" % operation_id)
-            return True
+        return self.stop_operations([operation_id])
 
-        operation_process = dao.get_operation_process_for_operation(operation_id)
-        result = 0
-        ## Try to kill only if operation job process is not None
-        if operation_process is not None:
-            stop_command = config.CLUSTER_STOP_COMMAND % operation_process.job_id
-            LOGGER.info("Stopping cluster operation: %s" % stop_command)
-            result = os.system(stop_command)
-            if result != 0:
-                LOGGER.error("Stopping cluster operation was unsuccessful. "
-                             "Try following with 'oarstat' for job ID: %s" % operation_process.job_id)
 
-        operation.mark_cancelled()
-        dao.store_entity(operation)
+    def stop_operations(self, operation_ids):
+        """
+        Stop the given operations, with a single scheduler call for all their jobs.
+        """
+        operations = []
+        for operation_id in operation_ids:
+            operation = dao.get_operation_by_id(operation_id)
+            if not operation or operation.status != model.STATUS_STARTED:
+                LOGGER.warning("Operation already stopped or not found is given to stop job: %s" % operation_id)
+            else:
+                operations.append(operation)
+        if not operations:
+            return True
 
-        return result == 0
+        job_ids = []
+        for operation in operations:
+            operation_process = dao.get_operation_process_for_operation(operation.id)
+            ## Try to kill only if operation job process is not None
+            if operation_process is not None:
+                job_ids.append(operation_process.job_id)
+        result = True
+        if job_ids:
+            result = self.scheduler.stop(job_ids)
+
+        for operation in operations:
+            operation.mark_cancelled()
+            dao.store_entity(operation)
+            STATUS_BUS.publish_operation(operation)
+        return result
 
 
 
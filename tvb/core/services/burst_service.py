@@ -37,6 +37,8 @@ Created on Apr 27, 2012
 
 import json
 import threading
+from time import time
+from copy import copy, deepcopy
 from types import IntType
 from tvb.config import MEASURE_METRICS_MODULE, MEASURE_METRICS_CLASS, DEFAULT_PORTLETS
 from tvb.config import SIMULATION_DATATYPE_MODULE, SIMULATION_DATATYPE_CLASS
@@ -46,11 +48,14 @@ from tvb.core.entities.model import KEY_PARAMETER_CHECKED, KEY_SAVED_VALUE
 from tvb.core.entities.transient.structure_entities import DataTypeMetaData
 from tvb.core.entities.transient.burst_configuration_entities import PortletConfiguration, WorkflowStepConfiguration
 from tvb.core.entities.storage import dao, transactional
+from tvb.core.utils import LRUCache, parse_json_parameters
 from tvb.core.adapters.abcadapter import ABCAdapter
 from tvb.core.adapters.abcdisplayer import ABCDisplayer, ABCMPLH5Displayer
 from tvb.core.services.operation_service import OperationService
 from tvb.core.services.flow_service import FlowService
 from tvb.core.services.workflow_service import WorkflowService
+from tvb.core.services.status_bus import STATUS_BUS, EVENT_BURST
+from tvb.core.services.event_handlers import EventDispatcher
 from tvb.core.services.project_service import ProjectService
 from tvb.core.services.exceptions import RemoveDataTypeException, InvalidPortletConfiguration, BurstServiceException
 from tvb.core.portlets.portlet_configurer import PortletConfigurer
@@ -58,6 +63,117 @@ from tvb.core.portlets.portlet_configurer import PortletConfigurer
 
 MAX_BURSTS_DISPLAYED = 50
 
+## Portlet previews are rendered by PREVIEW_DISPATCHER threads (never inside the web request) and kept
+## per (visualization step, visualizer, figure size), together with the visualization parameters they were
+## rendered with: a re-configured portlet no longer matches its cached preview.
+## Failed renders are only kept for FAILED_PREVIEW_EXPIRY seconds, then rendered again.
+PREVIEWS_CACHE_SIZE = 100
+PREVIEW_RENDER_THREADS = 2
+PREVIEW_METHOD = "generate_preview"
+FAILED_PREVIEW_EXPIRY = 30
+_PREVIEWS = LRUCache(PREVIEWS_CACHE_SIZE)
+## Keys of the previews being rendered (or waiting for it), not to be scheduled again meanwhile.
+_PENDING_PREVIEWS = set()
+_PREVIEWS_LOCK = threading.Lock()
+## (tab_index, index_in_tab) -> the last figure size asked for that portlet position,
+## used for rendering the previews of a burst as soon as it finishes.
+_PREVIEW_SIZES = {}
+_PREVIEW_SIZES_LOCK = threading.Lock()
+PREVIEW_DISPATCHER = EventDispatcher(PREVIEW_RENDER_THREADS)
+
+
+
+def _preview_signature(visualization):
+    """The visualization inputs a cached preview is valid for."""
+    return json.dumps([visualization.static_param, visualization.dynamic_param], sort_keys=True)
+
+
+
+def _preview_key(visualization, frame_width, frame_height):
+    """Key of the cached preview of a visualization step, for one figure size."""
+    return visualization.id, visualization.fk_algorithm, frame_width, frame_height
+
+
+
+def _schedule_preview(visualization, frame_width, frame_height):
+    """Submit the render of a preview to PREVIEW_DISPATCHER, unless it is already pending."""
+    key = _preview_key(visualization, frame_width, frame_height)
+    with _PREVIEWS_LOCK:
+        if key in _PENDING_PREVIEWS:
+            return
+        _PENDING_PREVIEWS.add(key)
+    PREVIEW_DISPATCHER.submit(PortletPreviewRenderer(visualization, frame_width, frame_height))
+
+
+
+class PortletPreviewRenderer(object):
+    """
+    Executor (for PREVIEW_DISPATCHER) rendering the preview of a visualization step, for one figure size.
+    """
+
+
+    def __init__(self, visualization, frame_width, frame_height):
+        self.visualization = visualization
+        self.frame_width = frame_width
+        self.frame_height = frame_height
+
+
+    def get_coalesce_key(self):
+        return ('preview', self.visualization.id, self.frame_width, self.frame_height)
+
+
+    def run(self):
+        key = _preview_key(self.visualization, self.frame_width, self.frame_height)
+        try:
+            signature = _preview_signature(self.visualization)
+            expiry = None
+            try:
+                result = BurstService.launch_visualization(self.visualization, self.frame_width, self.frame_height,
+                                                           PREVIEW_METHOD)[0]
+                result['launch_success'] = True
+            except Exception, excep:
+                get_logger(__name__).exception(excep)
+                result = {'launch_success': False, 'error_msg': str(excep)}
+                expiry = time() + FAILED_PREVIEW_EXPIRY
+            _PREVIEWS.put(key, (signature, result, expiry))
+        finally:
+            with _PREVIEWS_LOCK:
+                _PENDING_PREVIEWS.discard(key)
+
+
+
+class BurstPreviewsRenderer(object):
+    """
+    Executor (for PREVIEW_DISPATCHER) scheduling the previews of all the portlets in a burst,
+    for the figure sizes last asked at their positions.
+    """
+
+
+    def __init__(self, burst_id):
+        self.burst_id = burst_id
+
+
+    def get_coalesce_key(self):
+        return ('burst_previews', self.burst_id)
+
+
+    def run(self):
+        for visualization, _, _, _ in dao.get_visualization_steps_for_bursts([self.burst_id]):
+            with _PREVIEW_SIZES_LOCK:
+                figure_size = _PREVIEW_SIZES.get((visualization.tab_index, visualization.index_in_tab))
+            if figure_size is not None:
+                _schedule_preview(visualization, *figure_size)
+
+
+
+def _render_finished_burst_previews(event):
+    """STATUS_BUS listener: when a burst finishes, start rendering its portlet previews."""
+    if event['type'] == EVENT_BURST and event['status'] == model.BurstConfiguration.BURST_FINISHED:
+        PREVIEW_DISPATCHER.submit(BurstPreviewsRenderer(event['id']))
+
+
+STATUS_BUS.add_listener(_render_finished_burst_previews)
+
 
 class BurstService():
     """
@@ -327,6 +443,7 @@ class BurstService():
         if launch_mode in ['new', 'branch']:
             ## New Burst entry in the history
             burst_id = self._store_burst_config(burst_config)
+            STATUS_BUS.publish_burst(burst_config)
             thread = threading.Thread(target=self._async_launch_and_prepare,
                                       kwargs={'burst_config': burst_config,
                                               'simulator_index': simulator_index,
@@ -440,8 +557,8 @@ class BurstService():
         :param visualization: a visualization workflow step
         """
         dynamic_params = visualization.dynamic_param
-        static_params = visualization.static_param
-        parameters_dict = static_params
+        ## Filled below: never change the parameters of the (possibly shared) visualization step.
+        parameters_dict = deepcopy(visualization.static_param)
         operation_id = 0
         ## Current operation id needed for export mechanism. So far just use ##
         ## the operation of the workflow_step from which the inputs are taken    ####
@@ -467,20 +584,65 @@ class BurstService():
             prepared_inputs[ABCMPLH5Displayer.SHOW_FULL_TOOLBAR] = False
         result = eval("adapter_instance." + method_name + "(**prepared_inputs)")
         return result, parameters_dict, operation_id
+
+
+    @staticmethod
+    def get_portlet_preview(visualization, frame_width, frame_height):
+        """
+        Read the preview of a visualization step, as rendered in background.
+        When no preview is available for the current visualization parameters and figure size (or only an
+        expired failure), its rendering is scheduled (once), and None is returned: the client is expected
+        to ask again later.
+
+        :param visualization: a visualization workflow step, stored in DB
+        :returns: the result of the visualizer `generate_preview` (a copy of it), with an additional
+                  'launch_success' flag (and 'error_msg' when False), or None.
+        """
+        signature = _preview_signature(visualization)
+        with _PREVIEW_SIZES_LOCK:
+            _PREVIEW_SIZES[(visualization.tab_index, visualization.index_in_tab)] = (frame_width, frame_height)
+        cached = _PREVIEWS.get(_preview_key(visualization, frame_width, frame_height))
+        if cached is not None:
+            cached_signature, result, expiry = cached
+            if cached_signature == signature and (expiry is None or time() < expiry):
+                return dict(result)
+        _schedule_preview(visualization, frame_width, frame_height)
+        return None
+
+
+    @staticmethod
+    def invalidate_portlet_previews(visualization_ids=None):
+        """
+        Drop the cached previews of the given visualization steps (all, when None).
+        """
+        for key in _PREVIEWS.keys():
+            if visualization_ids is None or key[0] in visualization_ids:
+                _PREVIEWS.pop(key)
+
     
-    
-    def update_history_status(self, id_list):
+    def update_history_status(self, id_list, changed_since=None):
         """
-        For each burst_id received in the id_list read new status from DB and return a list [id, new_status] pair.
+        For each burst_id received in the id_list read new status from DB and return a list
+        [id, new_status, is_group, error_message] entries.
+        All bursts are read with a single query. As for BurstConfiguration.is_group, a burst with several
+        workflows is a group; only for the others the simulator configuration is decoded, to check the
+        range parameters (a range may hold a single value).
+
+        :param changed_since: when not None, only the bursts finished after this moment are returned
         """
+        id_list = [int(b_id) for b_id in id_list]
+        statuses = dict((row[0], row) for row in dao.get_bursts_status(id_list, changed_since))
         result = []
         for b_id in id_list:
-            burst = dao.get_burst_by_id(b_id)
-            burst.prepare_after_load()
-            if burst is not None:
-                result.append([burst.id, burst.status, burst.is_group,
-                               "Check Operations page for error Message" if burst.status == burst.BURST_ERROR else ''])
-            else:
+            if b_id in statuses:
+                _, status, workflows_number, _, simulator_configuration = statuses[b_id]
+                is_group = (workflows_number or 0) > 1
+                if not is_group and simulator_configuration:
+                    is_group = model.BurstConfiguration.has_range_parameters(
+                        parse_json_parameters(simulator_configuration))
+                is_error = status == model.BurstConfiguration.BURST_ERROR
+                result.append([b_id, status, is_group, "Check Operations page for error Message" if is_error else ''])
+            elif changed_since is None:
                 self.logger.debug("Could not find burst with id=" + str(b_id) + ". Might have been deleted by user!!")
         return result
         
@@ -490,13 +652,14 @@ class BurstService():
         Stop all the entities for the current burst and set the burst status to canceled.
         """ 
         burst_wfs = dao.get_workflows_for_burst(burst_entity.id)
-        any_stopped = False
+        operation_ids = []
         for workflow in burst_wfs:
             wf_steps = dao.get_workflow_steps(workflow.id)
             for step in wf_steps:
                 if step.fk_operation is not None:
                     self.logger.debug("We will stop operation: %d" % step.fk_operation)
-                    any_stopped = self.operation_service.stop_operation(step.fk_operation) or any_stopped
+                    operation_ids.append(step.fk_operation)
+        any_stopped = len(operation_ids) > 0 and self.operation_service.stop_operations(operation_ids)
 
         if any_stopped and burst_entity.status != burst_entity.BURST_CANCELED:
             self.workflow_service.mark_burst_finished(burst_entity, cancel=True)
@@ -522,6 +685,7 @@ class BurstService():
         ## Get operations linked to current burst before removing the burst or else 
         ##    the burst won't be there to identify operations any more.
         remaining_ops = dao.get_operations_in_burst(burst_id)
+        self.invalidate_portlet_previews([step[0].id for step in dao.get_visualization_steps_for_bursts([burst_id])])
         
         #Remove burst first to delete work-flow steps which still hold foreign keys to operations.
         correct = dao.remove_entity(burst_entity.__class__, burst_id)
@@ -609,11 +773,13 @@ class BurstService():
         :param selection_dictionary: a dictionary that keeps for each entry a default value and if it is check or not.
         :param prefix: a prefix to be added to the ui_name in case a select with subtrees is not selected
         
+        The given tree is left unchanged (it can be shared): the changed nodes are copies.
         """
         if full_tree is None:
             return None
         result = []
         for param in full_tree:
+            param = copy(param)
             param_name = param[ABCAdapter.KEY_NAME]
             if ABCAdapter.KEY_LABEL in param and len(prefix):
                 param[ABCAdapter.KEY_LABEL] = prefix + '_' + param[ABCAdapter.KEY_LABEL]
@@ -625,11 +791,15 @@ class BurstService():
 
             if ABCAdapter.KEY_OPTIONS in param and param[ABCAdapter.KEY_OPTIONS] is not None:
                 if is_checked:
+                    new_options = []
                     for option in param[ABCAdapter.KEY_OPTIONS]:
                         if ABCAdapter.KEY_ATTRIBUTES in option:
+                            option = copy(option)
                             option[ABCAdapter.KEY_ATTRIBUTES] = self.select_simulator_inputs(
                                                     option[ABCAdapter.KEY_ATTRIBUTES], selection_dictionary, prefix)
                             option[ABCAdapter.KEY_DEFAULT] = selection_dictionary[param_name][model.KEY_SAVED_VALUE]
+                        new_options.append(option)
+                    param[ABCAdapter.KEY_OPTIONS] = new_options
                 else:
                     ## Since entry is not selected, just recurse on the default option and ###
                     ## all it's subtree will come up one level in the input tree         #####
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Job schedulers behind ClusterSchedulerClient.
+
+A scheduler submits a list of tasks in one go (an array job, when the scheduler supports it), where each
+task receives the parameters of exactly one operation: (operation id, user name label).
+The implementation in use is configured in tvb.config (CLUSTER_SCHEDULER_MODULE / CLUSTER_SCHEDULER_CLASS).
+"""
+
+import os
+import tempfile
+import threading
+from subprocess import Popen, PIPE
+from tvb.basic.profile import TvbProfile as tvb_profile
+from tvb.basic.config.settings import TVBSettings as config
+from tvb.basic.logger.builder import get_logger
+from tvb.core.services.exceptions import OperationException
+
+
+LOGGER = get_logger(__name__)
+
+
+
+class ClusterScheduler(object):
+    """
+    Interface for submitting and removing TVB operations on a cluster job scheduler.
+    """
+    ## Maximum number of tasks in a single submission.
+    MAX_ARRAY_SIZE = 1
+
+
+    def submit(self, task_parameters, walltime):
+        """
+        Submit one job for each entry in task_parameters.
+
+        :param task_parameters: list of tuples (operation_id, user_name_label), one per task
+        :param walltime: string 'HH:MM:SS', enough for the longest task
+        :returns: list of job identifiers, one per task, in the same order as task_parameters
+        :raises OperationException: when the submission was not accepted
+        """
+        raise NotImplementedError()
+
+
+    def stop(self, job_ids):
+        """
+        Remove the given jobs from the scheduler (either queued or running).
+        :returns: True when the scheduler reported success.
+        """
+        raise NotImplementedError()
+
+
+
+class OARScheduler(ClusterScheduler):
+    """
+    Submit jobs through the OAR commands configured in settings.
+    Several operations are sent as one array job, with a parameters file holding a line per task.
+    """
+    MAX_ARRAY_SIZE = 1000
+    JOB_ID_KEY = 'OAR_JOB_ID='
+
+
+    def submit(self, task_parameters, walltime):
+        if len(task_parameters) == 1:
+            operation_id, user_name_label = task_parameters[0]
+            job_ids = self._run_submit_command(config.CLUSTER_SCHEDULE_COMMAND % (walltime, operation_id,
+                                                                                 user_name_label))
+        else:
+            file_descriptor, params_file = tempfile.mkstemp(prefix='cluster_array_', suffix='.txt',
+                                                            dir=config.TVB_TEMP_FOLDER)
+            try:
+                with os.fdopen(file_descriptor, 'w') as file_obj:
+                    for operation_id, user_name_label in task_parameters:
+                        file_obj.write("%s %s\n" % (operation_id, user_name_label))
+                ## oarsub reads the parameters file at submission time, so it can be removed afterwards.
+                job_ids = self._run_submit_command(config.CLUSTER_ARRAY_SCHEDULE_COMMAND % (walltime, params_file))
+            finally:
+                os.remove(params_file)
+
+        if len(job_ids) != len(task_parameters):
+            raise OperationException("Cluster scheduler returned %d job identifiers for %d submitted tasks!"
+                                     % (len(job_ids), len(task_parameters)))
+        return job_ids
+
+
+    def _run_submit_command(self, command):
+        """
+        :returns: the list of job identifiers, as printed by oarsub (one line per task).
+        """
+        LOGGER.info(command)
+        process_ = Popen([command], stdout=PIPE, shell=True)
+        output = process_.communicate()[0]
+        return [line.split(self.JOB_ID_KEY)[-1].strip() for line in output.splitlines() if self.JOB_ID_KEY in line]
+
+
+    def stop(self, job_ids):
+        stop_command = config.CLUSTER_STOP_COMMAND % ' '.join(str(job_id) for job_id in job_ids)
+        LOGGER.info("Stopping cluster operations: %s" % stop_command)
+        result = os.system(stop_command)
+        if result != 0:
+            LOGGER.error("Stopping cluster operations was unsuccessful. "
+                         "Try following with 'oarstat' for job IDs: %s" % job_ids)
+        return result == 0
+
+
+
+def launch_operation_process(operation_id, user_name_label):
+    """
+    Default task for LocalScheduler: execute the operation in a new process, the same way a cluster node would.
+    """
+    run_params = [config().get_python_path(), '-m', 'tvb.core.operation_async_launcher', str(operation_id)]
+    if tvb_profile.CURRENT_SELECTED_PROFILE is not None:
+        run_params.extend([tvb_profile.SUBPARAM_PROFILE, tvb_profile.CURRENT_SELECTED_PROFILE])
+    launched_process = Popen(run_params, stdout=PIPE, stderr=PIPE)
+    launched_process.communicate()
+    return launched_process.wait()
+
+
+
+class LocalScheduler(ClusterScheduler):
+    """
+    Fake scheduler, running the tasks of every submission in local threads.
+    It mimics array jobs: a task only knows its array and index, and resolves from them its own operation.
+    Meant for testing the cluster code path on machines without OAR.
+    """
+    MAX_ARRAY_SIZE = 50
+
+
+    def __init__(self, task_function=launch_operation_process):
+        """
+        :param task_function: callable receiving (operation_id, user_name_label) for each task
+        """
+        self.task_function = task_function
+        ## array_id -> list of task parameters, as submitted
+        self.submissions = {}
+        self.stopped_jobs = set()
+        self._threads = []
+        self._lock = threading.Lock()
+
+
+    def submit(self, task_parameters, walltime):
+        with self._lock:
+            array_id = len(self.submissions) + 1
+            self.submissions[array_id] = list(task_parameters)
+        job_ids = []
+        for array_index in xrange(len(task_parameters)):
+            job_id = "%d[%d]" % (array_id, array_index)
+            thread = threading.Thread(target=self._run_task, args=(array_id, array_index, job_id))
+            thread.daemon = True
+            job_ids.append(job_id)
+            self._threads.append(thread)
+            thread.start()
+        return job_ids
+
+
+    def _run_task(self, array_id, array_index, job_id):
+        """
+        Body of one task in a local array job.
+        """
+        if job_id in self.stopped_jobs:
+            return
+        operation_id, user_name_label = self.submissions[array_id][array_index]
+        try:
+            self.task_function(operation_id, user_name_label)
+        except Exception, excep:
+            LOGGER.exception(excep)
+
+
+    def stop(self, job_ids):
+        """
+        Tasks not yet started are skipped; tasks already running are left to finish.
+        """
+        self.stopped_jobs.update(job_ids)
+        return True
+
+
+    def wait(self, timeout=None):
+        """
+        Wait for all the submitted tasks to finish.
+        """
+        for thread in list(self._threads):
+            thread.join(timeout)
+
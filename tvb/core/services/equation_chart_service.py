@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Service layer for the equation charts of the spatio-temporal editors (stimulus, local connectivity and model
+parameters pages). These charts are plotted again on every input change, thus equations are evaluated at once
+over a numpy grid, the series are reduced to what the chart can display, and results are kept in a small cache.
+"""
+
+import json
+import numpy
+from tvb.basic.logger.builder import get_logger
+from tvb.core.utils import LRUCache
+
+## Number of points a chart can display: longer series are reduced to this size.
+CHART_POINTS = 500
+## Number of evaluations in the [min_x, max_x] range, when no explicit step is given.
+DEFAULT_RESOLUTION = 1000
+SERIES_CACHE_SIZE = 64
+_SERIES = LRUCache(SERIES_CACHE_SIZE)
+
+
+
+def reduce_series(x_values, y_values, max_points=CHART_POINTS):
+    """
+    Keep, in each of max_points / 2 consecutive buckets, the points with the minimum and the maximum value,
+    so that peaks stay visible in the reduced series.
+    :returns: tuple (x_values, y_values), unchanged when not longer than max_points
+    """
+    length = len(y_values)
+    buckets = max(max_points // 2, 1)
+    if length <= max_points:
+        return x_values, y_values
+    bucket_size = int(numpy.ceil(float(length) / buckets))
+    padded = numpy.empty(buckets * bucket_size, dtype=y_values.dtype)
+    padded[:length] = y_values
+    padded[length:] = y_values[-1]
+    padded = padded.reshape((buckets, bucket_size))
+    offsets = numpy.arange(buckets) * bucket_size
+    idx_min = offsets + padded.argmin(axis=1)
+    idx_max = offsets + padded.argmax(axis=1)
+    indices = numpy.column_stack((numpy.minimum(idx_min, idx_max), numpy.maximum(idx_min, idx_max))).ravel()
+    indices = numpy.unique(numpy.minimum(indices, length - 1))
+    return x_values[indices], y_values[indices]
+
+
+
+class EquationChartService(object):
+    """
+    Evaluate Equation entities for charts.
+    """
+
+
+    def __init__(self):
+        self.logger = get_logger(self.__class__.__module__)
+
+
+    @staticmethod
+    def equation_key(equation):
+        """
+        :returns: string identifying an equation with its current parameters.
+        """
+        return json.dumps([equation.__class__.__module__, equation.__class__.__name__,
+                           getattr(equation, 'equation', None), equation.parameters], sort_keys=True, default=str)
+
+
+    def get_series(self, equation, min_x, max_x, step=None, max_points=CHART_POINTS):
+        """
+        Evaluate an equation in [min_x, max_x] (both included), with the given step
+        (or DEFAULT_RESOLUTION points when no step is given).
+        When min_x equals max_x, the series has that single point.
+
+        :returns: tuple (x_values, y_values, values_changed), with float32 arrays of at most max_points elements.
+                  values_changed is True when the equation could not be evaluated in all the points, and some
+                  values (NaN or infinite) were replaced by 0.
+        :raises ValueError: when max_x is smaller than min_x, or the given step is not positive
+        """
+        if max_x < min_x:
+            raise ValueError("The max value for the x-axis (%s) should not be smaller than the min value (%s)."
+                             % (max_x, min_x))
+        if max_x == min_x:
+            step = 0
+        elif step is None:
+            step = float(max_x - min_x) / DEFAULT_RESOLUTION
+        elif step <= 0:
+            raise ValueError("The step for the x-axis (%s) should be positive." % step)
+        cache_key = (self.equation_key(equation), float(min_x), float(max_x), float(step), max_points)
+        result = _SERIES.get(cache_key)
+        if result is not None:
+            return result
+
+        if step == 0:
+            x_values = numpy.array([min_x], dtype=numpy.float64)
+        else:
+            x_values = numpy.arange(min_x, max_x + step, step)
+        y_values = numpy.ravel(equation.evaluate(x_values[numpy.newaxis, :])).astype(numpy.float32)
+        if y_values.size == 1 and x_values.size > 1:
+            ## Constant equations evaluate to a single value.
+            y_values = numpy.repeat(y_values, x_values.size)
+        invalid = ~numpy.isfinite(y_values)
+        values_changed = bool(invalid.any())
+        if values_changed:
+            y_values[invalid] = 0
+        x_values, y_values = reduce_series(x_values.astype(numpy.float32), y_values, max_points)
+        result = (x_values, y_values, values_changed)
+
+        _SERIES.put(cache_key, result)
+        return result
@@ -34,10 +34,10 @@
 
 import os
 import copy
+import heapq
 import threading
-import Queue
 import xml.dom.minidom
-from time import sleep
+from time import time
 from xml.dom.minidom import Node
 from tvb.basic.config.settings import TVBSettings as config
 from tvb.basic.logger.builder import get_logger
@@ -49,9 +49,6 @@ from tvb.core.services.flow_service import FlowService
 from tvb.core.services.operation_service import OperationService
 
 
-LOCKS_QUEUE = Queue.Queue(0)
-for i in range(config.MAX_THREADS_NUMBER):
-    LOCKS_QUEUE.put(1)
 #Global variable to store events as read from XML files.
 EXECUTORS_DICT = {}
 
@@ -83,8 +80,10 @@ TYPE_FILE = "file"
 
 class GenericEventExecutor(object):
     """
-    Thread for executing a generic event. 
+    Executor for a generic event. 
     The event in this case is any method from any service.
+    The XML node is parsed only once, when events are read; every fired event
+    works on a light copy, with its own runtime parameters.
     """
     runtime_mapping = {RUNTIME_USERNAME: 'self.current_user',
                        RUNTIME_PROJECT: 'self.current_project'}
@@ -93,8 +92,10 @@ class GenericEventExecutor(object):
 
     def __init__(self, event_node, **kwargs):
         self.event_node = event_node
-        self.event = None
+        self.is_parsed = False
         self.callable_object = None
+        self.callable_class = None
+        self.create_instance = False
         self.call_method = "__init__"   # Dummy default __init__
         self.arguments = kwargs
         self.current_user = None
@@ -104,7 +105,7 @@ class GenericEventExecutor(object):
     def _prepare_parameters(self):
         """Main method to prepare call parameters.
            Will handle 'runtime' evaluated params."""
-        if self.event is None:
+        if not self.is_parsed:
             self.parse_event_node()
 
         prepared_parameters = {}
@@ -128,17 +129,25 @@ class GenericEventExecutor(object):
         return self.arguments[arg]
 
 
+    def _build_callable(self):
+        """
+        Prepare the object on which the event method is called, fresh for every fired event.
+        """
+        if self.create_instance:
+            self.callable_object = self.callable_class()
+        else:
+            self.callable_object = self.callable_class
+
+
     def run(self):
         """
-        This method will be executed in a different thread.
+        This method will be executed by one of the event dispatcher threads.
         Executed on the event mentioned in description.
         """
-        #Try to get a spot to launch own operation.
-        LOCKS_QUEUE.get(True)
+        self._build_callable()
         parameters = self._prepare_parameters()
         method = getattr(self.callable_object, self.call_method)
         method(**parameters)
-        LOCKS_QUEUE.put(1)
 
 
     def set_runtime_parameters(self, user=None, project=None):
@@ -147,6 +156,28 @@ class GenericEventExecutor(object):
         self.current_project = project
 
 
+    def prepare_for_launch(self, user=None, project=None):
+        """
+        :returns: a copy of this (already parsed) executor, with the runtime variables filled,
+                  to be handed to the dispatcher. Parsed arguments are copied, the XML node is shared.
+        """
+        if not self.is_parsed:
+            self.parse_event_node()
+        launch_copy = copy.copy(self)
+        launch_copy.arguments = copy.deepcopy(self.arguments)
+        launch_copy.set_runtime_parameters(user, project)
+        return launch_copy
+
+
+    def get_coalesce_key(self):
+        """
+        Events with the same key, waiting to be executed at the same time, are executed only once.
+        """
+        user_id = getattr(self.current_user, 'id', None)
+        project_id = getattr(self.current_project, 'id', None)
+        return id(self.event_node), user_id, project_id
+
+
     def parse_event_node(self):
         """Parse the stored event node to get required data and arguments."""
         kw_parameters = {}
@@ -157,10 +188,8 @@ class GenericEventExecutor(object):
                 module = one_arg.getAttribute(ATT_MODULE)
                 class_name = one_arg.getAttribute(ATT_CLASS)
                 call_obj = __import__(module, globals(), locals(), [class_name])
-                call_obj = eval('call_obj.' + class_name)
-                if eval(one_arg.getAttribute(ATT_INSTANCE)):
-                    call_obj = call_obj()
-                self.callable_object = call_obj
+                self.callable_class = eval('call_obj.' + class_name)
+                self.create_instance = eval(one_arg.getAttribute(ATT_INSTANCE))
                 continue
             if one_arg.nodeName == ELEM_METHOD:
                 self.call_method = one_arg.getAttribute(ATT_NAME)
@@ -171,12 +200,13 @@ class GenericEventExecutor(object):
             LOGGER.info("Ignored undefined node %s", str(one_arg.nodeName))
 
         self.arguments.update(kw_parameters)
+        self.is_parsed = True
 
 
 
 class AdapterEventExecutor(GenericEventExecutor):
     """
-    Thread for firing a custom event. 
+    Executor for firing a custom event. 
     The event in this case is a custom method, on an Adapter instance. 
     """
 
@@ -184,6 +214,8 @@ class AdapterEventExecutor(GenericEventExecutor):
     def __init__(self, events_node, **kwargs):
         GenericEventExecutor.__init__(self, events_node, **kwargs)
         self.operation_visible = True
+        self.adapter_module = None
+        self.adapter_class = None
 
 
     def _prepare_custom_parameter(self, arg):
@@ -204,17 +236,26 @@ class AdapterEventExecutor(GenericEventExecutor):
         return current_value
 
 
+    def _build_callable(self):
+        """
+        Build a new adapter instance for every fired event.
+        """
+        #TODO: so far there is no need for it, but we should maybe
+        #handle cases where same module/class but different init parameter
+        group = dao.find_group(self.adapter_module, self.adapter_class)
+        self.callable_object = ABCAdapter.build_adapter(group)
+        LOGGER.debug("Adapter used is %s", str(self.callable_object.__class__))
+
+
     def run(self):
         """
         Fire TVB operation which makes sure the Adapter method is called.
+        The delay was already waited for in the dispatcher queue.
         """
-        LOCKS_QUEUE.get(True)
-        if self.delay > 0:
-            sleep(self.delay)
+        self._build_callable()
         parameters = self._prepare_parameters()
         FlowService().fire_operation(self.callable_object, self.current_user, self.current_project.id,
                                      method_name=self.call_method, visible=self.operation_visible, **parameters)
-        LOCKS_QUEUE.put(1)
 
 
     def parse_event_node(self):
@@ -226,15 +267,11 @@ class AdapterEventExecutor(GenericEventExecutor):
             if one_arg.nodeType != Node.ELEMENT_NODE:
                 continue
             if one_arg.nodeName == ELEM_ADAPTER:
-                #TODO: so far there is no need for it, but we should maybe
-                #handle cases where same module/class but different init parameter
-                group = dao.find_group(one_arg.getAttribute(ATT_MODULE), one_arg.getAttribute(ATT_CLASS))
-                adapter = ABCAdapter.build_adapter(group)
+                self.adapter_module = one_arg.getAttribute(ATT_MODULE)
+                self.adapter_class = one_arg.getAttribute(ATT_CLASS)
                 result_uid = one_arg.getAttribute(ATT_UID)
                 if result_uid:
                     kw_parameters[ATT_UID] = result_uid
-                LOGGER.debug("Adapter used is %s", str(adapter.__class__))
-                self.callable_object = adapter
                 continue
             if one_arg.nodeName == ELEM_METHOD:
                 self.call_method = one_arg.getAttribute(ATT_NAME)
@@ -247,6 +284,98 @@ class AdapterEventExecutor(GenericEventExecutor):
             LOGGER.info("Ignored undefined node %s", str(one_arg.nodeName))
 
         self.arguments.update(kw_parameters)
+        self.is_parsed = True
+
+
+
+class EventDispatcher(object):
+    """
+    Fixed-size pool of threads executing fired events.
+    Delayed events wait in a queue ordered by their due time, instead of in sleeping threads.
+    An event identical to one still waiting in the queue (same registration and same
+    runtime user and project) is coalesced with the waiting one.
+    """
+
+
+    def __init__(self, nr_of_threads):
+        self.nr_of_threads = nr_of_threads
+        self._condition = threading.Condition()
+        self._delay_queue = []
+        self._waiting_keys = set()
+        self._sequence = 0
+        self._threads = []
+
+
+    def submit(self, executor, delay=0):
+        """
+        Queue an executor, to be run after `delay` seconds.
+        :returns: False when the event was coalesced with an identical one, already waiting
+        """
+        coalesce_key = executor.get_coalesce_key()
+        with self._condition:
+            if coalesce_key in self._waiting_keys:
+                LOGGER.debug("Event %s is already waiting to be executed." % str(coalesce_key))
+                return False
+            self._waiting_keys.add(coalesce_key)
+            self._sequence += 1
+            heapq.heappush(self._delay_queue, (time() + delay, self._sequence, coalesce_key, executor))
+            self._start_threads()
+            self._condition.notify_all()
+        return True
+
+
+    def get_waiting_count(self):
+        """
+        :returns: number of events not yet started.
+        """
+        with self._condition:
+            return len(self._delay_queue)
+
+
+    def _start_threads(self):
+        """
+        Lazily start the pool of dispatcher threads (called with the condition acquired).
+        """
+        while len(self._threads) < self.nr_of_threads:
+            thread = threading.Thread(target=self._dispatch_events, name="EventDispatcher-%d" % len(self._threads))
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+
+    def _next_executor(self):
+        """
+        Block until the first event in the queue is due, and take it out of the queue.
+        """
+        with self._condition:
+            while True:
+                if not self._delay_queue:
+                    self._condition.wait()
+                    continue
+                wait_time = self._delay_queue[0][0] - time()
+                if wait_time > 0:
+                    self._condition.wait(wait_time)
+                    continue
+                _, _, coalesce_key, executor = heapq.heappop(self._delay_queue)
+                self._waiting_keys.discard(coalesce_key)
+                return executor
+
+
+    def _dispatch_events(self):
+        """
+        Body of a dispatcher thread.
+        """
+        while True:
+            executor = self._next_executor()
+            try:
+                executor.run()
+            except Exception, excep:
+                LOGGER.error("Could not execute event %s" % str(executor.get_coalesce_key()))
+                LOGGER.exception(excep)
+
+
+
+EVENT_DISPATCHER = EventDispatcher(config.MAX_THREADS_NUMBER)
 
 
 
@@ -257,9 +386,8 @@ def handle_event(hookpoint, current_user=None, current_project=None):
     """
     if hookpoint in EXECUTORS_DICT:
         for executor in EXECUTORS_DICT[hookpoint]:
-            executor = copy.deepcopy(executor)
-            executor.set_runtime_parameters(current_user, current_project)
-            threading.Thread(target=executor.run).start()
+            executor = executor.prepare_for_launch(current_user, current_project)
+            EVENT_DISPATCHER.submit(executor, executor.delay)
     else:
         LOGGER.debug("No events are declared for method %s", hookpoint)
 
@@ -296,6 +424,7 @@ def read_from_file(file_name, executor_dict):
                 delay = one_event.getAttribute('delay')
                 if delay is not None and delay != '':
                     event_executor.delay = int(delay)
+            event_executor.parse_event_node()
             if event_trigger in executor_dict:
                 executor_dict[event_trigger].append(event_executor)
             else:
@@ -71,6 +71,19 @@ class OperationException(ServicesBaseException):
 
 
 
+class BackendLaunchException(OperationException):
+    """
+    Exception to be thrown when only some operations, from a batch sent to the back-end, were started.
+    The first `launched_count` operations of the batch are running, the others were not started.
+    """
+
+
+    def __init__(self, message, launched_count, parent_exception=None):
+        OperationException.__init__(self, message, parent_exception)
+        self.launched_count = launched_count
+
+
+
 class UsernameException(ServicesBaseException):
     """
     Exception to be thrown in case of a problem related to creating
@@ -131,6 +144,17 @@ class ProjectImportException(ServicesBaseException):
 
 
 
+class FigureException(ServicesBaseException):
+    """
+    Exception to be thrown when a figure exported from the browser can not be stored.
+    """
+
+
+    def __init__(self, message):
+        ServicesBaseException.__init__(self, message)
+
+
+
 class BurstServiceException(ServicesBaseException):
     """
     Exception to be thrown in case of a problem at project import.
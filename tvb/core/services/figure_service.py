@@ -41,6 +41,7 @@ import Image
 if not hasattr(Image, 'open'):
     from Image import Image
 import base64
+import threading
 import xml.dom.minidom
 from StringIO import StringIO
 from tvb.basic.logger.builder import get_logger
@@ -48,6 +49,112 @@ from tvb.core import utils
 from tvb.core.entities import model
 from tvb.core.entities.storage import dao
 from tvb.core.entities.file.files_helper import FilesHelper
+from tvb.core.services.event_handlers import EventDispatcher
+from tvb.core.services.exceptions import FigureException
+
+
+## Figures are decoded in the web request, then composed and written to disk by a single FIGURE_DISPATCHER
+## thread. Listing pages show THUMBNAIL_SIZE copies of PNG figures (SVG figures are scaled by the browser).
+FIGURE_WRITER_THREADS = 1
+THUMBNAIL_SIZE = (300, 300)
+THUMBNAIL_SUFFIX = "-thumbnail"
+FIGURE_DISPATCHER = EventDispatcher(FIGURE_WRITER_THREADS)
+## user_id -> messages for the figures which could not be written, until shown to that user.
+_FAILED_FIGURES = {}
+_FAILED_FIGURES_LOCK = threading.Lock()
+
+
+
+def get_thumbnail_file(figure_file):
+    """
+    :returns: name of the thumbnail for a figure file name (or path).
+    """
+    return os.path.splitext(figure_file)[0] + THUMBNAIL_SUFFIX + "." + FigureService._TYPE_PNG
+
+
+
+def write_thumbnail(image, figure_path):
+    """
+    Store next to figure_path, a thumbnail of the PIL image.
+    """
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.ANTIALIAS)
+    thumbnail.save(get_thumbnail_file(figure_path))
+
+
+
+def get_figure_thumbnail_url(figures_folder, figure):
+    """
+    :returns: URL part of the image to display for a figure, in lists: its thumbnail when one exists,
+              or else the figure itself (and a thumbnail is scheduled for the next display).
+    """
+    figure_path = os.path.join(figures_folder, figure.file_path)
+    if figure.file_format.lower() != FigureService._TYPE_PNG:
+        return utils.path2url_part(figure_path)
+    thumbnail_path = get_thumbnail_file(figure_path)
+    if os.path.exists(thumbnail_path):
+        return utils.path2url_part(thumbnail_path)
+    if os.path.exists(figure_path):
+        FIGURE_DISPATCHER.submit(ThumbnailWriter(figure_path))
+    return utils.path2url_part(figure_path)
+
+
+
+class FigureWriter(object):
+    """
+    Executor (for FIGURE_DISPATCHER) storing one figure exported from the browser.
+    Only plain values are kept, as entities loaded in the request are not to be used in other threads.
+    """
+
+
+    def __init__(self, project, user, img_type, operation_id, figure):
+        self.project_id = project.id
+        self.project_name = project.name
+        self.user_id = user.id
+        self.img_type = img_type
+        self.operation_id = operation_id
+        self.figure = figure
+
+
+    def get_coalesce_key(self):
+        ## Every figure stored by a user is kept, thus never coalesced.
+        return ('figure', id(self))
+
+
+    def run(self):
+        try:
+            FigureService().write_result_figure(self.project_id, self.project_name, self.user_id,
+                                                self.img_type, self.operation_id, self.figure)
+        except Exception, excep:
+            get_logger(__name__).exception(excep)
+            with _FAILED_FIGURES_LOCK:
+                _FAILED_FIGURES.setdefault(self.user_id, []).append(
+                    "A figure of operation %s could not be stored: %s" % (self.operation_id, str(excep)))
+        self.figure = None
+
+
+
+class ThumbnailWriter(object):
+    """
+    Executor (for FIGURE_DISPATCHER) writing the missing thumbnail of a PNG figure (e.g. an imported one).
+    """
+
+
+    def __init__(self, figure_path):
+        self.figure_path = figure_path
+
+
+    def get_coalesce_key(self):
+        return ('thumbnail', self.figure_path)
+
+
+    def run(self):
+        if os.path.exists(get_thumbnail_file(self.figure_path)):
+            return
+        try:
+            write_thumbnail(Image.open(self.figure_path), self.figure_path)
+        except Exception, excep:
+            get_logger(__name__).exception(excep)
 
 
 
@@ -70,19 +177,59 @@ class FigureService:
         self.file_helper = FilesHelper()
 
 
-    def store_result_figure(self, project, user, img_type, operation_id, export_data):
+    @staticmethod
+    def decode_figure(img_type, export_data):
+        """
+        Decode a figure exported from the browser.
+
+        :returns: a PIL image for PNG figures, or the `svg` DOM element for SVG figures
+        :raises FigureException: when the data is not a valid figure of the given type
+        """
+        try:
+            if img_type == FigureService._TYPE_PNG:
+                image = Image.open(StringIO(base64.b64decode(export_data)))  # PIL.Image only opens from file
+                image.load()
+                return image
+            if img_type == FigureService._TYPE_SVG:
+                return xml.dom.minidom.parseString(export_data).getElementsByTagName('svg')[0]
+        except Exception, excep:
+            raise FigureException("Invalid %s figure: %s" % (img_type, str(excep)))
+        raise FigureException("Unsupported figure type: %s" % img_type)
+
+
+    @staticmethod
+    def store_result_figure(project, user, img_type, operation_id, export_data):
+        """
+        Decode a Result Image (invalid data is reported to the caller, by a FigureException), and queue it
+        to be stored into a file and referenced in DB by a FIGURE_DISPATCHER thread.
+        Failures from that thread are kept for `pop_failed_figures`.
+        """
+        figure = FigureService.decode_figure(img_type, export_data)
+        FIGURE_DISPATCHER.submit(FigureWriter(project, user, img_type, operation_id, figure))
+
+
+    @staticmethod
+    def pop_failed_figures(user_id):
         """
-        Store into a file, Result Image and reference in DB.
+        :returns: list of messages for the figures of a user that could not be written since the last call
+        """
+        with _FAILED_FIGURES_LOCK:
+            return _FAILED_FIGURES.pop(user_id, [])
+
+
+    def write_result_figure(self, project_id, project_name, user_id, img_type, operation_id, figure):
+        """
+        Store into a file (with its thumbnail, for PNG), Result Image and reference in DB.
+
+        :param figure: the figure, as returned by `decode_figure`
         """
         # Generate path where to store image
-        store_path = self.file_helper.get_images_folder(project.name, operation_id)
+        store_path = self.file_helper.get_images_folder(project_name, operation_id)
         store_path = utils.get_unique_file_name(store_path, FigureService._DEFAULT_IMAGE_FILE_NAME + img_type)[0]
         file_path = os.path.split(store_path)[1]
 
         if img_type == FigureService._TYPE_PNG:                         # PNG file from canvas
-            imgData = base64.b64decode(export_data)                     # decode the image
-            fakeImgFile = StringIO(imgData)                             # PIL.Image only opens from file, so fake one
-            origImg = Image.open(fakeImgFile)
+            origImg = figure                                            # the decoded image
             brandingBar = Image.open(FigureService._BRANDING_BAR_PNG)
 
             finalSize = (origImg.size[0],                               # original width
@@ -94,10 +241,10 @@ class FigureService:
                                                                         # the extra width will be discarded
 
             finalImg.save(store_path)                                   # store to disk
+            write_thumbnail(finalImg, store_path)                       # and a smaller copy, for listings
 
         elif img_type == FigureService._TYPE_SVG:                                   # SVG file from svg viewer
-            dom = xml.dom.minidom.parseString(export_data)
-            figureSvg = dom.getElementsByTagName('svg')[0]                          # get the original image
+            figureSvg = figure                                                      # the original image
 
             dom = xml.dom.minidom.parse(FigureService._BRANDING_BAR_SVG)
             brandingSvg = dom.getElementsByTagName('svg')[0]                        # get the branding bar
@@ -122,7 +269,7 @@ class FigureService:
         file_name = 'TVB-%s-%s' % (operation.algorithm.name.replace(' ', '-'), operation_id)    # e.g. TVB-Algo-Name-352
 
         # Store entity into DB
-        entity = model.ResultFigure(operation_id, user.id, project.id, FigureService._DEFAULT_SESSION_NAME,
+        entity = model.ResultFigure(operation_id, user_id, project_id, FigureService._DEFAULT_SESSION_NAME,
                                     file_name, file_path, img_type)
         entity = dao.store_entity(entity)
 
@@ -145,9 +292,8 @@ class FigureService:
         for name in result:
             for figure in result[name]:
                 figures_folder = self.file_helper.get_images_folder(project.name, figure.operation.id)
-                figure_full_path = os.path.join(figures_folder, figure.file_path)
-                # Compute the path 
-                figure.file_path = utils.path2url_part(figure_full_path)
+                # Compute the path of the image to display in lists
+                figure.file_path = get_figure_thumbnail_url(figures_folder, figure)
         return result, previews_info
 
 
@@ -186,6 +332,9 @@ class FigureService:
         if os.path.exists(path2figure):
             os.remove(path2figure)
             self.file_helper.remove_image_metadata(figure)
+        path2thumbnail = get_thumbnail_file(path2figure)
+        if os.path.exists(path2thumbnail):
+            os.remove(path2thumbnail)
 
         # Remove figure reference from DB.
         result = dao.remove_entity(model.ResultFigure, figure_id)
@@ -36,6 +36,8 @@ Code related to launching/duplicating operations is placed here.
 .. moduleauthor:: Bogdan Neacsa <bogdan.neacsa@codemart.ro>
 """
 
+import threading
+from time import time
 from copy import copy
 from tvb.basic.traits.exceptions import TVBException
 from tvb.basic.filters.chain import FilterChain
@@ -48,8 +50,23 @@ from tvb.core.adapters.abcadapter import ABCAdapter
 from tvb.core.adapters.exceptions import IntrospectionException
 from tvb.core.services.exceptions import OperationException
 from tvb.core.services.operation_service import OperationService
+from tvb.core.services.status_bus import STATUS_BUS
 from tvb.core.portlets.xml_reader import KEY_DYNAMIC
 
+## Operation numbers per project, as displayed on every page. An entry is valid until an operation status of
+## that project is published on the STATUS_BUS, or for at most OPERATION_NUMBERS_MAX_AGE seconds, because
+## changes made by other processes (e.g. cluster nodes) are not published on the bus.
+OPERATION_NUMBERS_MAX_AGE = 10
+_OPERATION_NUMBERS = {}
+_OPERATION_NUMBERS_LOCK = threading.Lock()
+
+## Adapter input trees prepared for a project (with the project DataTypes as options), shared by all its users.
+## Shared trees are never changed: callers apply their own values with ABCAdapter.fill_defaults, which copies
+## only the nodes it changes. Entries are dropped with the same rules as the operation numbers above.
+INPUT_TREES_CACHE_SIZE = 20
+INPUT_TREES_MAX_AGE = 60
+_INPUT_TREES = utils.LRUCache(INPUT_TREES_CACHE_SIZE)
+
 
 
 class FlowService:
@@ -152,10 +169,53 @@ class FlowService:
 
     @staticmethod
     def get_operation_numbers(proj_id):
-        """ Count total number of operations started for current project. """
-        return dao.get_operation_numbers(proj_id)
+        """
+        Count total number of operations started for current project.
+        :returns: tuple (finished, started, error, canceled), from cache when still valid
+        """
+        sequence = STATUS_BUS.project_sequence(proj_id)
+        now = time()
+        with _OPERATION_NUMBERS_LOCK:
+            cached = _OPERATION_NUMBERS.get(proj_id)
+        if cached is not None and cached[0] == sequence and now - cached[1] < OPERATION_NUMBERS_MAX_AGE:
+            return cached[2]
+        numbers = dao.get_operation_numbers(proj_id)
+        with _OPERATION_NUMBERS_LOCK:
+            _OPERATION_NUMBERS[proj_id] = (sequence, now, numbers)
+        return numbers
+
+
+    @staticmethod
+    def invalidate_operation_numbers(proj_id):
+        """ Operations were added or removed in a project, without a status event: drop its cached numbers. """
+        with _OPERATION_NUMBERS_LOCK:
+            _OPERATION_NUMBERS.pop(proj_id, None)
     
     
+    def get_project_input_tree(self, project_id, algo_group):
+        """
+        :returns: the input tree of an adapter, prepared for a project, as shared by all the users of that project.
+                  The result should not be changed; use ABCAdapter.fill_defaults to get a tree with other values.
+        """
+        key = (project_id, algo_group.id)
+        sequence = STATUS_BUS.project_sequence(project_id)
+        now = time()
+        cached = _INPUT_TREES.get(key)
+        if cached is not None and cached[0] == sequence and now - cached[1] < INPUT_TREES_MAX_AGE:
+            return cached[2]
+        input_tree = self.prepare_adapter(project_id, algo_group)[1]
+        _INPUT_TREES.put(key, (sequence, now, input_tree))
+        return input_tree
+
+
+    @staticmethod
+    def invalidate_input_trees(proj_id):
+        """ DataTypes were removed from a project, without a status event: drop its shared input trees. """
+        for key in _INPUT_TREES.keys():
+            if key[0] == proj_id:
+                _INPUT_TREES.pop(key)
+
+
     def build_adapter_instance(self, group):
         """
         Having a module and a class name, create an instance of ABCAdapter.
@@ -37,12 +37,16 @@
 import os
 import json
 import shutil
+import zipfile
+import posixpath
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 from tvb.config import ADAPTERS
 from cgi import FieldStorage
-from datetime import datetime
 from cherrypy._cpreqbody import Part
 from sqlalchemy.orm.attributes import manager_of_class
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.exc import IntegrityError, OperationalError
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.basic.logger.builder import get_logger
 from tvb.core.entities import model
@@ -56,7 +60,92 @@ from tvb.core.entities.file.hdf5_storage_manager import HDF5StorageManager
 from tvb.core.entities.file.files_update_manager import FilesUpdateManager
 from tvb.core.entities.file.exceptions import FileStructureException, MissingDataSetException
 from tvb.core.entities.transient.burst_export_entities import BurstInformation
-from tvb.core.entities.transient.structure_entities import DataTypeMetaData
+from tvb.core.entities.transient.structure_entities import DataTypeMetaData, GenericMetaData
+
+## File kept in the folder of a project while it is imported, recording which stages are done.
+IMPORT_JOURNAL_FILE = "import_journal.json"
+## Errors after which uploading the same archive again can succeed (e.g. disk full, lost DB connection).
+## After any other error, the import would stop again at the same place, thus the project is removed.
+RETRYABLE_IMPORT_ERRORS = (IOError, OSError, MemoryError, OperationalError)
+
+
+
+def _read_storage_metadata(file_path):
+    """
+    Read the root meta-data of a TVB H5 file. Executed on the threads of the meta-data pool,
+    so it must not touch the database.
+
+    :returns: the meta-data dictionary, or None when the file needs an upgrade first (or is invalid),
+              in which case it is handled serially by the caller.
+    """
+    folder, file_name = os.path.split(file_path)
+    try:
+        meta_dictionary = HDF5StorageManager(folder, file_name).get_metadata()
+    except FileStructureException:
+        return None
+    if meta_dictionary.get(cfg.DATA_VERSION_ATTRIBUTE) != cfg.DATA_VERSION:
+        return None
+    return meta_dictionary
+
+
+
+class ImportJournal(object):
+    """
+    Progress of importing one project from an archive. It is stored in the project folder while
+    the import runs, and kept only after a retryable failure (RETRYABLE_IMPORT_ERRORS), so uploading
+    the same archive again continues the import from the last completed stage.
+    """
+    STAGE_EXTRACTED = "extracted"
+    STAGE_WORKFLOWS = "workflows"
+    KEY_BURSTS_MAPPING = "bursts_mapping"
+
+
+    def __init__(self, project_folder):
+        self.file_path = os.path.join(project_folder, IMPORT_JOURNAL_FILE)
+        self._data = {}
+        if os.path.isfile(self.file_path):
+            with open(self.file_path, 'r') as journal_file:
+                self._data = json.load(journal_file)
+
+
+    @staticmethod
+    def exists(project_folder):
+        """
+        :returns: True when an unfinished import of the project in the given folder is recorded
+        """
+        return os.path.isfile(os.path.join(project_folder, IMPORT_JOURNAL_FILE))
+
+
+    def get(self, key, default=None):
+        """ Value recorded for key, or default when that stage was not reached yet. """
+        return self._data.get(key, default)
+
+
+    def set(self, key, value=True):
+        """ Record a value (by default mark a stage as done) and persist the journal. """
+        self._data[key] = value
+        self.save()
+
+
+    def save(self):
+        """
+        Write the journal in a temporary file first, so an interrupted write never leaves it corrupted.
+        """
+        folder = os.path.dirname(self.file_path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'w') as journal_file:
+            json.dump(self._data, journal_file)
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+        os.rename(temp_path, self.file_path)
+
+
+    def remove(self):
+        """ Called when the import is complete. """
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
 
 
 
@@ -75,121 +164,137 @@ class ImportService():
         self.created_projects = []
 
 
-    @transactional
     def import_project_structure(self, uploaded, user_id):
         """
         Execute import operations:
          
-        1. check if ZIP or folder 
+        1. open the uploaded ZIP (entries are read directly from it, without a temporary copy)
         2. find all project nodes
         3. for each project node:
-            - create project
-            - create all operations
-            - import all images
-            - create all dataTypes
+            - create project (or continue an interrupted import of the same project)
+            - extract the project files into storage
+            - create all bursts, operations, dataTypes, images and workflows
+
+        Each operation is stored in its own transaction and progress is recorded in an
+        ImportJournal. When the import fails with a retryable error, the data imported so far is kept and
+        uploading the same archive again continues from where it stopped. After any other error,
+        the projects created by this import are removed.
         """
 
         self.user_id = user_id
         self.created_projects = []
 
-        # Now we compute the name of the file where to store uploaded project
-        now = datetime.now()
-        date_str = "%d-%d-%d_%d-%d-%d_%d" % (now.year, now.month, now.day, now.hour,
-                                             now.minute, now.second, now.microsecond)
-        uq_name = "%s-ImportProject" % date_str
-        uq_file_name = os.path.join(cfg.TVB_TEMP_FOLDER, uq_name + ".zip")
-
-        temp_folder = None
+        if isinstance(uploaded, FieldStorage) or isinstance(uploaded, Part):
+            if not uploaded.file:
+                raise ProjectImportException("Please select the archive which contains the project structure.")
+            uploaded = uploaded.file
         try:
-            if isinstance(uploaded, FieldStorage) or isinstance(uploaded, Part):
-                if uploaded.file:
-                    file_obj = open(uq_file_name, 'wb')
-                    file_obj.write(uploaded.file.read())
-                    file_obj.close()
-                else:
-                    raise ProjectImportException("Please select the archive which contains the project structure.")
-            else:
-                shutil.copyfile(uploaded, uq_file_name)
-
-            # Now compute the name of the folder where to explode uploaded ZIP file
-            temp_folder = os.path.join(cfg.TVB_TEMP_FOLDER, uq_name)
-            try:
-                self.files_helper.unpack_zip(uq_file_name, temp_folder)
-            except FileStructureException, excep:
-                self.logger.exception(excep)
-                raise ProjectImportException("Bad ZIP archive provided. A TVB exported project is expected!")
+            zip_arch = zipfile.ZipFile(uploaded)
+        except (zipfile.BadZipfile, IOError), excep:
+            self.logger.exception(excep)
+            raise ProjectImportException("Bad ZIP archive provided. A TVB exported project is expected!")
 
-            try:
-                self._import_project_from_folder(temp_folder)
-            except Exception, excep:
-                self.logger.exception(excep)
-                self.logger.debug("Error encountered during import. Deleting projects created during this operation.")
+        try:
+            self._import_projects_from_zip(zip_arch)
+        finally:
+            zip_arch.close()
 
-                # Roll back projects created so far
-                project_service = ProjectService()
-                for project in self.created_projects:
-                    project_service.remove_project(project.id)
 
-                raise ProjectImportException(str(excep))
+    def _import_projects_from_zip(self, zip_arch):
+        """
+        Process each project from the uploaded pack.
+        """
+        project_roots = []
+        for entry_name in zip_arch.namelist():
+            if posixpath.basename(entry_name) == FilesHelper.TVB_PROJECT_FILE:
+                project_roots.append(posixpath.dirname(entry_name))
 
-        finally:
-            # Now delete uploaded file
-            if os.path.exists(uq_file_name):
-                os.remove(uq_file_name)
-            # Now delete temporary folder where uploaded ZIP was exploded.
-            if temp_folder is not None and os.path.exists(temp_folder):
-                shutil.rmtree(temp_folder)
+        try:
+            for project_root in project_roots:
+                project_entity = self.__populate_project(zip_arch, project_root)
+                self.created_projects.append(project_entity)
+                self._import_project_content(zip_arch, project_root, project_entity)
+        except Exception, excep:
+            self.logger.exception(excep)
+            if self.created_projects and isinstance(excep, RETRYABLE_IMPORT_ERRORS):
+                raise ProjectImportException("Import of project %s stopped: %s. Data imported so far was kept; "
+                                             "upload the same archive again to continue the import, or remove "
+                                             "the project." % (self.created_projects[-1].name, excep))
+            self.logger.debug("Error encountered during import. Deleting projects created during this operation.")
+            # Roll back projects created so far (their folder, with the import journal, is removed too)
+            project_service = ProjectService()
+            for project in self.created_projects:
+                project_service.remove_project(project.id)
+            raise ProjectImportException(str(excep))
+
+
+    def _import_project_content(self, zip_arch, project_root, project_entity):
+        """
+        Import one project, skipping the stages already completed by a previous attempt.
+        """
+        project_path = os.path.join(cfg.TVB_STORAGE, FilesHelper.PROJECTS_FOLDER, project_entity.name)
+        journal = ImportJournal(project_path)
+        resumed = journal.get(ImportJournal.STAGE_EXTRACTED, False)
+
+        if not resumed:
+            written = self.files_helper.extract_zip_folder(zip_arch, project_root, project_path)
+            self.logger.debug("Extracted %d files for project %s" % (written, project_entity.name))
+            journal.set(ImportJournal.STAGE_EXTRACTED)
+
+        bursts_dict = {}
+        dt_mappings_dict = {}
+        bursts_file = os.path.join(project_path, BURST_INFO_FILE)
+        if os.path.isfile(bursts_file):
+            bursts_info_dict = json.loads(open(bursts_file, 'r').read())
+            bursts_dict = bursts_info_dict[BURSTS_DICT_KEY]
+            dt_mappings_dict = bursts_info_dict[DT_BURST_MAP]
+        for old_burst_id in bursts_dict:
+            bursts_dict[old_burst_id] = BurstInformation.load_from_dict(bursts_dict[old_burst_id])
+
+        # Re-create old bursts, but keep a mapping between the id it has here and the old-id it had
+        # in the project where they were exported, so we can re-add the datatypes to them.
+        # Bursts are stored before operations, since we need their new ids for operations parent_burst.
+        burst_ids_mapping = journal.get(ImportJournal.KEY_BURSTS_MAPPING)
+        if burst_ids_mapping is None:
+            burst_ids_mapping = self._store_bursts(project_entity, bursts_dict)
+            journal.set(ImportJournal.KEY_BURSTS_MAPPING, burst_ids_mapping)
+        # JSON keeps dictionary keys as strings
+        burst_ids_mapping = dict((int(old_id), new_id) for old_id, new_id in burst_ids_mapping.iteritems())
+
+        # Now import project operations
+        operations = self.import_project_operations(project_entity, project_path, dt_mappings_dict,
+                                                    burst_ids_mapping, skip_existing=resumed)
+        # Now we can finally import workflow related entities
+        if not journal.get(ImportJournal.STAGE_WORKFLOWS, False):
+            operation_ids = dict((operation.gid, operation.id) for operation in operations)
+            self.import_workflows(project_entity, bursts_dict, burst_ids_mapping, operation_ids)
+            journal.set(ImportJournal.STAGE_WORKFLOWS)
+        journal.remove()
 
 
-    def _import_project_from_folder(self, temp_folder):
+    @staticmethod
+    @transactional
+    def _store_bursts(project, bursts_dict):
         """
-        Process each project from the uploaded pack, to extract names.
+        Store in one transaction the bursts described in bursts_dict.
+
+        :returns: dictionary {old_burst_id: new_burst_id}
         """
-        project_roots = []
-        for root, _, files in os.walk(temp_folder):
-            if FilesHelper.TVB_PROJECT_FILE in files:
-                project_roots.append(root)
-
-        for project_path in project_roots:
-            project_entity = self.__populate_project(project_path)
-
-            bursts_dict = {}
-            dt_mappings_dict = {}
-            bursts_file = os.path.join(project_path, BURST_INFO_FILE)
-            if os.path.isfile(bursts_file):
-                bursts_info_dict = json.loads(open(bursts_file, 'r').read())
-                bursts_dict = bursts_info_dict[BURSTS_DICT_KEY]
-                dt_mappings_dict = bursts_info_dict[DT_BURST_MAP]
-
-            # Compute the path where to store files of the imported project
-            new_project_path = os.path.join(cfg.TVB_STORAGE, FilesHelper.PROJECTS_FOLDER, project_entity.name)
-            if project_path != new_project_path:
-                shutil.copytree(project_path, new_project_path)
-                shutil.rmtree(project_path)
-
-            self.created_projects.append(project_entity)
-            # Re-create old bursts, but keep a mapping between the id it has here and the old-id it had
-            # in the project where they were exported, so we can re-add the datatypes to them.
-            burst_ids_mapping = {}
-            # Keep a list with all burst that were imported since we will want to also add the workflow
-            # steps after we are finished with importing the operations and datatypes. We need to first
-            # stored bursts since we need to know which new id's they have for operations parent_burst.
-            if bursts_dict:
-                for old_burst_id in bursts_dict:
-                    burst_information = BurstInformation.load_from_dict(bursts_dict[old_burst_id])
-                    burst_entity = model.BurstConfiguration(project_entity.id)
-                    burst_entity.from_dict(burst_information.data)
-                    burst_entity = dao.store_entity(burst_entity)
-                    burst_ids_mapping[int(old_burst_id)] = burst_entity.id
-                    # We don't need the data in dictionary form anymore, so update it with new BurstInformation object
-                    bursts_dict[old_burst_id] = burst_information
-            # Now import project operations
-            self.import_project_operations(project_entity, new_project_path, dt_mappings_dict, burst_ids_mapping)
-            # Now we can finally import workflow related entities
-            self.import_workflows(project_entity, bursts_dict, burst_ids_mapping)
-
-
-    def import_workflows(self, project, bursts_dict, burst_ids_mapping):
+        old_ids = []
+        burst_entities = []
+        for old_burst_id, burst_information in bursts_dict.iteritems():
+            burst_entity = model.BurstConfiguration(project.id)
+            burst_entity.from_dict(burst_information.data)
+            burst_entities.append(burst_entity)
+            old_ids.append(old_burst_id)
+        if not burst_entities:
+            return {}
+        burst_entities = dao.store_entities(burst_entities)
+        return dict((str(old_id), burst.id) for old_id, burst in zip(old_ids, burst_entities))
+
+
+    @transactional
+    def import_workflows(self, project, bursts_dict, burst_ids_mapping, operation_ids=None):
         """
         Import the workflow entities for all bursts imported in the project.
 
@@ -200,17 +305,30 @@ class ImportService():
 
         :param burst_ids_mapping: a dictionary of the form {old_burst_id : new_burst_id} so we
                                   know what burst to link each workflow to
+
+        :param operation_ids: optional dictionary {operation_gid: operation_id} for the operations just imported,
+                              to avoid loading them again from DB
         """
+        workflow_entities = []
+        workflows_info = []
         for burst_id in bursts_dict:
-            workflows_info = bursts_dict[burst_id].get_workflows()
-            for one_wf_info in workflows_info:
+            for one_wf_info in bursts_dict[burst_id].get_workflows():
                 # Use the new burst id when creating the workflow
                 workflow_entity = model.Workflow(project.id, burst_ids_mapping[int(burst_id)])
                 workflow_entity.from_dict(one_wf_info.data)
-                workflow_entity = dao.store_entity(workflow_entity)
-                wf_steps_info = one_wf_info.get_workflow_steps()
-                view_steps_info = one_wf_info.get_view_steps()
-                self.import_workflow_steps(workflow_entity, wf_steps_info, view_steps_info)
+                workflow_entities.append(workflow_entity)
+                workflows_info.append(one_wf_info)
+        if not workflow_entities:
+            return
+        workflow_entities = dao.store_entities(workflow_entities)
+
+        step_entities = []
+        lookup_cache = {}
+        for workflow_entity, one_wf_info in zip(workflow_entities, workflows_info):
+            step_entities.extend(self._build_workflow_steps(workflow_entity, one_wf_info.get_workflow_steps(),
+                                                            one_wf_info.get_view_steps(), operation_ids, lookup_cache))
+        if step_entities:
+            dao.store_entities(step_entities)
 
 
     def import_workflow_steps(self, workflow, wf_steps, view_steps):
@@ -227,8 +345,38 @@ class ImportService():
                            rebuild the workflow view steps
 
         """
+        step_entities = self._build_workflow_steps(workflow, wf_steps, view_steps)
+        if step_entities:
+            dao.store_entities(step_entities)
+
+
+    @staticmethod
+    def _build_workflow_steps(workflow, wf_steps, view_steps, operation_ids=None, lookup_cache=None):
+        """
+        Build (without storing) the WorkflowStep and WorkflowStepView entities for a workflow.
+        Algorithms and portlets are cached in lookup_cache, as the same few are used by all bursts.
+        """
+        if operation_ids is None:
+            operation_ids = {}
+        if lookup_cache is None:
+            lookup_cache = {}
+
+        def _cached(key, load_function):
+            if key not in lookup_cache:
+                lookup_cache[key] = load_function()
+            return lookup_cache[key]
+
+        def _algorithm(step):
+            algo_info = step.data.get(step.ALGO_INFO)
+            if algo_info is None:
+                return None
+            key = ('algorithm', algo_info['module'], algo_info['class'],
+                   algo_info['init_param'], algo_info['identifier'])
+            return _cached(key, step.get_algorithm)
+
+        step_entities = []
         for wf_step in wf_steps:
-            algorithm = wf_step.get_algorithm()
+            algorithm = _algorithm(wf_step)
             if algorithm is None:
                 # The algorithm is invalid for some reason. Just remove also the view step.
                 position = wf_step.index()
@@ -239,22 +387,35 @@ class ImportService():
             wf_step_entity = model.WorkflowStep(algorithm.id)
             wf_step_entity.from_dict(wf_step.data)
             wf_step_entity.fk_workflow = workflow.id
-            wf_step_entity.fk_operation = wf_step.get_operagion().id
-            dao.store_entity(wf_step_entity)
+            operation_gid = wf_step.data.get(wf_step.OP_GID)
+            if operation_gid in operation_ids:
+                wf_step_entity.fk_operation = operation_ids[operation_gid]
+            else:
+                wf_step_entity.fk_operation = wf_step.get_operagion().id
+            step_entities.append(wf_step_entity)
         for view_step in view_steps:
-            algorithm = view_step.get_algorithm()
+            algorithm = _algorithm(view_step)
             if algorithm is None:
                 continue
             view_step_entity = model.WorkflowStepView(algorithm.id)
             view_step_entity.from_dict(view_step.data)
             view_step_entity.fk_workflow = workflow.id
-            view_step_entity.fk_portlet = view_step.get_portlet().id
-            dao.store_entity(view_step_entity)
+            portlet_key = ('portlet', view_step.data.get(view_step.PORTLET_IDENT))
+            view_step_entity.fk_portlet = _cached(portlet_key, view_step.get_portlet).id
+            step_entities.append(view_step_entity)
+        return step_entities
 
 
-    def import_project_operations(self, project, import_path, dt_burst_mappings=None, burst_ids_mapping=None):
+    def import_project_operations(self, project, import_path, dt_burst_mappings=None, burst_ids_mapping=None,
+                                  skip_existing=False):
         """
-        This method scans provided folder and identify all operations that needs to be imported
+        This method scans provided folder and identify all operations that needs to be imported.
+
+        The meta-data of all H5 files found is read up-front on a pool of threads; each operation
+        is then stored together with its dataTypes and images in a separate transaction.
+
+        :param skip_existing: when True, operations already present in DB (with the same gid) are not
+                              imported again; used when continuing an interrupted project import
         """
         if burst_ids_mapping is None:
             burst_ids_mapping = {}
@@ -264,40 +425,94 @@ class ImportService():
         operations = []
         for root, _, files in os.walk(import_path):
             if FilesHelper.TVB_OPERARATION_FILE in files:
-                # Found an operation folder - append TMP to its name
-                tmp_op_folder = os.path.join(os.path.split(root)[0], os.path.split(root)[1] + 'tmp')
-                os.rename(root, tmp_op_folder)
-
-                operation_file_path = os.path.join(tmp_op_folder, FilesHelper.TVB_OPERARATION_FILE)
-                operation = self.__build_operation_from_file(project, operation_file_path)
-                operation.import_file = operation_file_path
+                operation = self.__build_operation_from_file(project, os.path.join(root,
+                                                                                   FilesHelper.TVB_OPERARATION_FILE))
+                if skip_existing and self.__is_operation_stored(operation.gid):
+                    continue
+                # Found an operation folder - append TMP to its name (unless a previous attempt already did)
+                tmp_op_folder = root
+                if not root.endswith('tmp'):
+                    tmp_op_folder = os.path.join(os.path.split(root)[0], os.path.split(root)[1] + 'tmp')
+                    os.rename(root, tmp_op_folder)
+                operation.import_file = os.path.join(tmp_op_folder, FilesHelper.TVB_OPERARATION_FILE)
                 operations.append(operation)
 
-        imported_operations = []
-
         # Now we sort operations by start date, to be sure data dependency is resolved correct
         operations = sorted(operations, key=lambda operation: operation.start_date)
+        all_meta = self._read_operations_metadata(operations)
 
+        imported_operations = []
         # Here we process each operation found
+        for idx, operation in enumerate(operations):
+            operation_entity = self._import_operation_with_data(project, operation, all_meta[idx],
+                                                                dt_burst_mappings, burst_ids_mapping)
+            imported_operations.append(operation_entity)
+
+        return imported_operations
+
+
+    @staticmethod
+    def _read_operations_metadata(operations):
+        """
+        Read on a thread pool the root meta-data for the H5 files of all operations.
+
+        :returns: a list with one dictionary {file_name: meta_dictionary or None} per operation
+        """
+        file_paths = []
         for operation in operations:
-            old_operation_folder, _ = os.path.split(operation.import_file)
-            operation_entity, datatype_group = self.__import_operation(operation)
+            operation_folder = os.path.split(operation.import_file)[0]
+            for file_name in os.listdir(operation_folder):
+                if file_name.endswith(FilesHelper.TVB_STORAGE_FILE_EXTENSION):
+                    file_paths.append(os.path.join(operation_folder, file_name))
+
+        nr_of_workers = min(multiprocessing.cpu_count(), len(file_paths))
+        if nr_of_workers > 1:
+            pool = ThreadPool(nr_of_workers)
+            try:
+                meta_dictionaries = pool.map(_read_storage_metadata, file_paths)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            meta_dictionaries = [_read_storage_metadata(file_path) for file_path in file_paths]
+
+        metadata_per_folder = {}
+        for file_path, meta_dictionary in zip(file_paths, meta_dictionaries):
+            folder, file_name = os.path.split(file_path)
+            metadata_per_folder.setdefault(folder, {})[file_name] = meta_dictionary
+        return [metadata_per_folder.get(os.path.split(operation.import_file)[0], {}) for operation in operations]
 
-            # Rename operation folder with the ID of the stored operation 
-            new_operation_path = FilesHelper().get_operation_folder(project.name, operation_entity.id)
-            if old_operation_folder != new_operation_path:
-                # Delete folder of the new operation, otherwise move will fail
-                shutil.rmtree(new_operation_path)
-                shutil.move(old_operation_folder, new_operation_path)
 
+    @transactional
+    def _import_operation_with_data(self, project, operation, operation_meta, dt_burst_mappings, burst_ids_mapping):
+        """
+        Store one operation with its dataTypes and images, moving its folder under the new operation id.
+        When anything fails the folder is moved back, so the import of this operation can be retried.
+
+        :param operation_meta: dictionary {file_name: meta_dictionary} read in advance for the H5 files
+                               of this operation; None values mark files which need an upgrade
+        """
+        old_operation_folder, _ = os.path.split(operation.import_file)
+        operation_entity, datatype_group = self.__import_operation(operation)
+
+        # Rename operation folder with the ID of the stored operation 
+        new_operation_path = self.files_helper.get_operation_folder(project.name, operation_entity.id)
+        if old_operation_folder != new_operation_path:
+            # Delete folder of the new operation, otherwise move will fail
+            shutil.rmtree(new_operation_path)
+            shutil.move(old_operation_folder, new_operation_path)
+
+        try:
             # Now process data types for each operation
             all_datatypes = []
             for file_name in os.listdir(new_operation_path):
                 if file_name.endswith(FilesHelper.TVB_STORAGE_FILE_EXTENSION):
-                    file_update_manager = FilesUpdateManager()
-                    file_update_manager.upgrade_file(os.path.join(new_operation_path, file_name))
-                    datatype = self.load_datatype_from_file(new_operation_path, file_name,
-                                                            operation_entity.id, datatype_group)
+                    meta_dictionary = operation_meta.get(file_name)
+                    if meta_dictionary is None:
+                        file_update_manager = FilesUpdateManager()
+                        file_update_manager.upgrade_file(os.path.join(new_operation_path, file_name))
+                    datatype = self.load_datatype_from_file(new_operation_path, file_name, operation_entity.id,
+                                                            datatype_group, meta_dictionary)
                     all_datatypes.append(datatype)
 
             # Before inserting into DB sort data types by creation date (to solve any dependencies)
@@ -318,9 +533,11 @@ class ImportService():
                     for file_name in files:
                         if file_name.endswith(FilesHelper.TVB_FILE_EXTENSION):
                             self.__populate_image(os.path.join(root, file_name), project.id, operation_entity.id)
-            imported_operations.append(operation_entity)
-
-        return imported_operations
+        except Exception:
+            if old_operation_folder != new_operation_path and os.path.exists(new_operation_path):
+                shutil.move(new_operation_path, old_operation_folder)
+            raise
+        return operation_entity
 
 
     def __populate_image(self, file_name, project_id, op_id):
@@ -344,14 +561,16 @@ class ImportService():
             self.files_helper.write_image_metadata(figure)
 
 
-    def load_datatype_from_file(self, storage_folder, file_name, op_id, datatype_group=None):
+    def load_datatype_from_file(self, storage_folder, file_name, op_id, datatype_group=None, meta_dictionary=None):
         """
         Creates an instance of datatype from storage / H5 file 
+        :param meta_dictionary: root meta-data of the file, when it was already read
         :returns: datatype
         """
         self.logger.debug("Loading datatType from file: %s" % file_name)
-        storage_manager = HDF5StorageManager(storage_folder, file_name)
-        meta_dictionary = storage_manager.get_metadata()
+        if meta_dictionary is None:
+            storage_manager = HDF5StorageManager(storage_folder, file_name)
+            meta_dictionary = storage_manager.get_metadata()
         meta_structure = DataTypeMetaData(meta_dictionary)
 
         # Now try to determine class and instantiate it
@@ -399,27 +618,59 @@ class ImportService():
             raise ProjectImportException(error_msg)
 
 
-    def __populate_project(self, project_path):
+    def __populate_project(self, zip_arch, project_root):
         """
-        Create and store a Project entity.
+        Create and store a Project entity, from the project meta-data file found in the archive.
+        When a project with the same gid exists and has an unfinished import, that project is returned
+        so the import continues.
         """
-        self.logger.debug("Creating project from path: %s" % project_path)
-        project_cfg_file = os.path.join(project_path, FilesHelper.TVB_PROJECT_FILE)
+        self.logger.debug("Creating project from archive folder: %s" % project_root)
+        project_cfg_file = posixpath.join(project_root, FilesHelper.TVB_PROJECT_FILE)
 
-        reader = XMLReader(project_cfg_file)
-        project_dict = reader.read_metadata()
+        project_dict = GenericMetaData(XMLReader(None).parse_xml_content_to_dict(zip_arch.read(project_cfg_file)))
         project_entity = manager_of_class(model.Project).new_instance()
         project_entity = project_entity.from_dict(project_dict, self.user_id)
 
+        existing_project = self.__get_interrupted_project(project_entity.gid)
+        if existing_project is not None:
+            self.logger.info("Continuing the interrupted import of project %s" % existing_project.name)
+            return existing_project
+
         try:
             self.logger.debug("Storing imported project")
-            return dao.store_entity(project_entity)
+            project_entity = dao.store_entity(project_entity)
         except IntegrityError, excep:
             self.logger.exception(excep)
             error_msg = ("Could not import project: %s with gid: %s. There is already a "
                          "project with the same name or gid.") % (project_entity.name, project_entity.gid)
             raise ProjectImportException(error_msg)
 
+        # Mark the import as started; a project with a journal is resumed by the next upload.
+        ImportJournal(self.files_helper.get_project_folder(project_entity)).save()
+        return project_entity
+
+
+    def __get_interrupted_project(self, project_gid):
+        """
+        :returns: the project with the given gid, owned by the current user, if its import did not finish
+        """
+        try:
+            project = dao.get_project_by_gid(project_gid)
+        except NoResultFound:
+            return None
+        project_path = os.path.join(cfg.TVB_STORAGE, FilesHelper.PROJECTS_FOLDER, project.name)
+        if project.fk_admin == self.user_id and ImportJournal.exists(project_path):
+            return project
+        return None
+
+
+    @staticmethod
+    def __is_operation_stored(operation_gid):
+        """
+        :returns: True when an operation with the given gid is already in DB
+        """
+        return dao.get_operation_by_gid(operation_gid) is not None
+
 
     def __build_operation_from_file(self, project, operation_file):
         """
@@ -53,6 +53,8 @@ from tvb.core.entities.transient.structure_entities import DataTypeMetaData
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.core.adapters.abcadapter import ABCAdapter, ABCSynchronous
 from tvb.core.services.backend_client import BACKEND_CLIENT
+from tvb.core.services.status_bus import STATUS_BUS
+from tvb.core.services.exceptions import BackendLaunchException
 import tvb.core.adapters.xml_reader as xml_reader
 from tvb.core.adapters.exceptions import LaunchException
 from tvb.basic.config.settings import TVBSettings as cfg
@@ -341,6 +343,7 @@ class OperationService:
                 #### Write operation meta-XML only if some result are returned
                 self.file_helper.write_operation_metadata(operation)
             dao.store_entity(operation)
+            STATUS_BUS.publish_operation(operation)
             self._remove_files(temp_files)
 
         except zipfile.BadZipfile, excep:
@@ -363,12 +366,25 @@ class OperationService:
 
 
     def _send_to_cluster(self, operations, adapter_instance):
-        """ Initiate operation on cluster"""
-        for operation in operations:
-            try:
-                BACKEND_CLIENT.execute(str(operation.id), operation.user.username, adapter_instance)
-            except Exception, excep:
-                self._handle_exception(excep, {}, "Could not connect to the back-end cluster!", operation)
+        """ Initiate operations on cluster, all in one request to the back-end"""
+        if not operations:
+            return operations
+        try:
+            BACKEND_CLIENT.execute_operations(operations, operations[0].user.username, adapter_instance)
+            for operation in operations:
+                STATUS_BUS.publish_operation(operation)
+        except Exception, excep:
+            ## Operations started before the failure keep running; the failing one and the ones
+            ## after it were never started, thus they are marked as failed instead of staying pending.
+            launched_count = excep.launched_count if isinstance(excep, BackendLaunchException) else 0
+            for operation in operations[:launched_count]:
+                STATUS_BUS.publish_operation(operation)
+            for operation in operations[launched_count + 1:]:
+                operation.mark_complete(model.STATUS_ERROR, "Not launched, as a previous operation could not start.")
+                dao.store_entity(operation)
+                STATUS_BUS.publish_operation(operation)
+                self.workflow_service.update_executed_workflow_state(operation.id)
+            self._handle_exception(excep, {}, "Could not connect to the back-end cluster!", operations[launched_count])
 
         return operations
 
@@ -404,6 +420,7 @@ class OperationService:
         if operation is not None:
             operation.mark_complete(model.STATUS_ERROR, str(exception))
             dao.store_entity(operation)
+            STATUS_BUS.publish_operation(operation)
             self.workflow_service.update_executed_workflow_state(operation.id)
         self._remove_files(temp_files)
         exception.message = message
@@ -537,5 +554,13 @@ class OperationService:
         """
         return BACKEND_CLIENT.stop_operation(int(operation_id))
 
+
+    def stop_operations(self, operation_ids):
+        """
+        Stop all the operations given by id, in one request to the back-end.
+        :returns: True when at least one operation was stopped.
+        """
+        return BACKEND_CLIENT.stop_operations([int(operation_id) for operation_id in operation_ids])
+
     
     
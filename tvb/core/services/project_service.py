@@ -39,7 +39,6 @@ import os
 import copy
 import json
 import formencode
-from tvb.core import utils
 from inspect import stack
 from tvb.basic.traits.types_mapped import MappedType
 from tvb.basic.logger.builder import get_logger
@@ -54,9 +53,11 @@ from tvb.core.entities.transient.structure_entities import StructureNode, DataTy
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.core.entities.file.exceptions import FileStructureException
 from tvb.core.services.event_handlers import handle_event
+from tvb.core.services.figure_service import get_figure_thumbnail_url
 from tvb.core.services.exceptions import StructureException, ProjectServiceException
 from tvb.core.services.exceptions import RemoveDataTypeException, RemoveDataTypeError
 from tvb.core.services.user_service import UserService
+from tvb.core.services.flow_service import FlowService
 from tvb.core.adapters.abcadapter import ABCAdapter
 
 
@@ -272,13 +273,11 @@ class ProjectService:
                                                                 dt.gid, 'gid')[0] for dt in datatype_results]
                     operation_figures = dao.get_figures_for_operation(result['id'])
 
-                    # Compute the full path to the figure / image on disk
+                    # Compute the path (available from browser) to the figure / image thumbnail on disk
                     for figure in operation_figures:
                         figures_folder = self.structure_helper.get_images_folder(figure.project.name,
                                                                                  figure.operation.id)
-                        figure_full_path = os.path.join(figures_folder, figure.file_path)
-                        # Compute the path available from browser 
-                        figure.figure_path = utils.path2url_part(figure_full_path)
+                        figure.figure_path = get_figure_thumbnail_url(figures_folder, figure)
 
                     result['figures'] = operation_figures
                 else:
@@ -301,7 +300,7 @@ class ProjectService:
         available_projects = dao.get_projects_for_user(user_id, start_idx, end_idx)
         pages_no = total // PROJECTS_PAGE_SIZE + (1 if total % PROJECTS_PAGE_SIZE else 0)
         for prj in available_projects:
-            fns, sta, err, canceled = dao.get_operation_numbers(prj.id)
+            fns, sta, err, canceled = FlowService.get_operation_numbers(prj.id)
             prj.operations_finished = fns
             prj.operations_started = sta
             prj.operations_error = err
@@ -633,6 +632,7 @@ class ProjectService:
             for dt in datatypes_for_op:
                 self.remove_datatype(operation.project.id, dt.gid, True)
             dao.remove_entity(model.Operation, operation.id)
+            FlowService.invalidate_operation_numbers(operation.fk_launched_in)
         else:
             self.logger.warning("Attempt to delete operation with id=%s which no longer exists." % operation_id)
         
@@ -686,6 +686,8 @@ class ProjectService:
             ## Make sure Operation folder is removed
             self.structure_helper.remove_operation_data(project.name, datatype.fk_from_operation)
 
+        FlowService.invalidate_operation_numbers(project_id)
+        FlowService.invalidate_input_trees(project_id)
         if not correct:
             raise RemoveDataTypeException("Could not remove DataType " + str(datatype_gid))
         else:
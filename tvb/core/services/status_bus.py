@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+In-process bus for operation and burst status changes.
+
+Web clients used to poll the DB for the status of every running burst; instead,
+the code paths that change a status inside the web process publish a small
+event here, and clients fetch (or long-poll for) the events of their current
+project, with no DB access involved.
+
+Status changes made in another process (e.g. a cluster node) are not seen by
+this bus, so clients should still reconcile with a plain DB status read, though
+at a much lower frequency than the old polling.
+"""
+
+import threading
+from collections import deque
+from time import time
+from tvb.basic.logger.builder import get_logger
+from tvb.core.entities import model
+
+
+LOGGER = get_logger(__name__)
+
+EVENT_OPERATION = "operation"
+EVENT_BURST = "burst"
+
+OPERATION_FINAL_STATUSES = [model.STATUS_FINISHED, model.STATUS_ERROR, model.STATUS_CANCELED]
+
+
+
+class StatusBus(object):
+    """
+    Keep a bounded history of status events, each with an increasing sequence number.
+    Readers remember the last sequence they have seen, and ask for everything newer.
+    """
+
+
+    def __init__(self, history_size=1000, max_waiting_clients=8):
+        """
+        :param history_size: how many events are kept in memory; clients falling further behind are asked
+                             to reload everything from the DB.
+        :param max_waiting_clients: how many requests can block in `get_events` at the same time. Each waiting
+                                    request holds a web-server thread, so over this limit requests return at once.
+        """
+        self._condition = threading.Condition()
+        self._events = deque(maxlen=history_size)
+        self._last_sequence = 0
+        self._waiting_clients = 0
+        self.max_waiting_clients = max_waiting_clients
+        ## burst_id -> {status: number of operations seen in that status}
+        self._burst_progress = {}
+        ## project_id -> sequence of the last event published for that project
+        self._project_sequences = {}
+        self._listeners = []
+
+
+    @property
+    def last_sequence(self):
+        """Sequence number of the most recent event published."""
+        return self._last_sequence
+
+
+    def project_sequence(self, project_id):
+        """Sequence number of the most recent event published for a project (0 when none)."""
+        return self._project_sequences.get(project_id, 0)
+
+
+    def add_listener(self, listener):
+        """
+        Register a callable, to be given every published event (as a dictionary).
+        Listeners are called from the publishing thread, after the bus lock is released, so they should only
+        schedule their work and return fast.
+        """
+        with self._condition:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+
+
+    def remove_listener(self, listener):
+        """Stop passing events to a listener previously registered."""
+        with self._condition:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+    def publish(self, project_id, event_type, entity_id, status, **details):
+        """
+        Store a new event and wake up all the clients waiting for it.
+        :returns: the sequence number given to the event.
+        """
+        with self._condition:
+            self._last_sequence += 1
+            self._project_sequences[project_id] = self._last_sequence
+            event = dict(details)
+            event.update({'sequence': self._last_sequence, 'project_id': project_id,
+                          'type': event_type, 'id': entity_id, 'status': status})
+            self._events.append(event)
+            self._condition.notifyAll()
+            sequence = self._last_sequence
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(dict(event))
+            except Exception, excep:
+                LOGGER.error("Status listener failed for event %s" % str(event))
+                LOGGER.exception(excep)
+        return sequence
+
+
+    def publish_operation(self, operation, burst_id=None):
+        """
+        Publish the current status of an Operation entity.
+        When the operation is part of a burst, the event also carries the burst progress, as counted from
+        the operation events this bus has seen.
+        """
+        details = {}
+        if burst_id is not None:
+            with self._condition:
+                progress = self._burst_progress.setdefault(burst_id, {})
+                if operation.status in OPERATION_FINAL_STATUSES:
+                    progress[operation.status] = progress.get(operation.status, 0) + 1
+                details['burst_id'] = burst_id
+                details['burst_progress'] = dict(progress)
+        return self.publish(operation.fk_launched_in, EVENT_OPERATION, operation.id, operation.status, **details)
+
+
+    def publish_burst(self, burst):
+        """
+        Publish the current status of a BurstConfiguration entity.
+        """
+        with self._condition:
+            if burst.status != burst.BURST_RUNNING:
+                progress = self._burst_progress.pop(burst.id, {})
+            else:
+                progress = dict(self._burst_progress.get(burst.id, {}))
+        return self.publish(burst.fk_project, EVENT_BURST, burst.id, burst.status,
+                            error=burst.error_message, burst_progress=progress)
+
+
+    def get_events(self, project_id, since_sequence, timeout=0):
+        """
+        Return events for the given project, newer than since_sequence.
+        When no such event exists, block for at most timeout seconds (and only when the number of already
+        waiting clients allows it) for new events to get published.
+
+        :returns: tuple (last_sequence, events, is_complete). When is_complete is False, some events
+                  newer than since_sequence are no longer kept (or the server was restarted), and the
+                  client should reload its whole status from the DB.
+        """
+        deadline = time() + timeout
+        with self._condition:
+            events, is_complete = self._find_events(project_id, since_sequence)
+            if events or not is_complete or timeout <= 0 or self._waiting_clients >= self.max_waiting_clients:
+                return self._last_sequence, events, is_complete
+
+            self._waiting_clients += 1
+            try:
+                remaining = timeout
+                while remaining > 0:
+                    self._condition.wait(remaining)
+                    events, is_complete = self._find_events(project_id, since_sequence)
+                    if events or not is_complete:
+                        break
+                    remaining = deadline - time()
+            finally:
+                self._waiting_clients -= 1
+            return self._last_sequence, events, is_complete
+
+
+    def _find_events(self, project_id, since_sequence):
+        """
+        Should be called with the lock acquired.
+        :returns: tuple (matching events list, is_complete flag)
+        """
+        if since_sequence > self._last_sequence:
+            ## The client knows of a sequence we never generated: server restarted.
+            return [], False
+        if since_sequence == self._last_sequence:
+            return [], True
+        oldest_kept = self._events[0]['sequence'] if self._events else self._last_sequence + 1
+        is_complete = since_sequence >= oldest_kept - 1
+        result = []
+        for event in reversed(self._events):
+            if event['sequence'] <= since_sequence:
+                break
+            if event['project_id'] == project_id:
+                result.append(event)
+        result.reverse()
+        return result, is_complete
+
+
+
+STATUS_BUS = StatusBus()
+
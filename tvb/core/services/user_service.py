@@ -307,16 +307,32 @@ class UserService:
     @synchronized(FILE_UPGRADE_LOCK)
     def upgrade_file_storage(self):
         """
-        For the given user upgrade all DataType files storage.
+        Start upgrading all DataType files storage in background, when needed, and report its outcome.
+        TVB stays usable during the upgrade; DataTypes not yet upgraded can not be loaded until it finishes.
         
         :returns: a two entry tuple (status, message) where status is a boolean that is True in case the upgrade
              was successful for all DataTypes and False otherwise, and message is a status update message.
+             While the upgrade is running (see `is_file_storage_upgrading`) status is None.
         """
         status = None
         message = ''
-        if cfg.DATA_CHECKED_TO_VERSION < cfg.DATA_VERSION:
+        result = FilesUpdateManager.pop_storage_upgrade_result()
+        if result is not None:
+            status, message = result
+        elif FilesUpdateManager.is_storage_upgrade_running():
+            message = "Your stored data is being upgraded in background."
+        elif cfg.DATA_CHECKED_TO_VERSION < cfg.DATA_VERSION:
             self.logger.info("Starting to upgrade all DataType file storage.")
-            status, message = FilesUpdateManager().upgrade_all_files_from_storage()
+            FilesUpdateManager.start_storage_upgrade()
+            message = "Your stored data is being upgraded in background."
         return status, message
+
+
+    @staticmethod
+    def is_file_storage_upgrading():
+        """
+        :returns: True while the upgrade started by `upgrade_file_storage` runs
+        """
+        return FilesUpdateManager.is_storage_upgrade_running()
          
             
\ No newline at end of file
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Service layer for browsing TimeSeriesVolume data: a time point is read once from H5 (kept in a small
+LRU cache) and only the orthogonal planes through the selected voxel are sent to the browser.
+"""
+
+import numpy
+from tvb.basic.logger.builder import get_logger
+from tvb.core.utils import LRUCache
+from tvb.core.adapters.abcadapter import ABCAdapter
+
+## How many (TimeSeriesVolume, time point) volumes are kept in memory, while scrubbing through time.
+TIME_POINTS_CACHE_SIZE = 16
+_TIME_POINTS = LRUCache(TIME_POINTS_CACHE_SIZE)
+## Number of time points of the TimeSeriesVolumes recently browsed, for clamping requested indices.
+_TIME_LENGTHS = LRUCache(TIME_POINTS_CACHE_SIZE)
+
+
+
+def orthogonal_planes(volume, voxel, axis=None):
+    """
+    :param volume: 3D array, for one time point
+    :param voxel: (x, y, z) indices of the selected voxel; clipped to the volume shape
+    :param axis: when given, only the plane orthogonal to this axis is returned
+    :returns: list of 2D arrays; the plane orthogonal to axis 0 is volume[x, :, :], to axis 1 volume[:, y, :]
+              and to axis 2 volume[:, :, z]
+    """
+    voxel = numpy.clip(numpy.asarray(voxel, dtype=int), 0, numpy.array(volume.shape) - 1)
+    axes = range(3) if axis is None else [axis]
+    return [numpy.take(volume, voxel[current_axis], axis=current_axis) for current_axis in axes]
+
+
+
+class VolumeService(object):
+    """
+    Read TimeSeriesVolume data one time point at a time, and cut planes from it.
+    """
+
+
+    def __init__(self):
+        self.logger = get_logger(self.__class__.__module__)
+
+
+    def get_time_point(self, time_series_gid, time_idx):
+        """
+        :returns: the 3D volume (float32) of a TimeSeriesVolume at time_idx, from cache when recently read.
+                  time_idx is clipped to the time points available.
+        """
+        time_length = _TIME_LENGTHS.get(time_series_gid)
+        if time_length is None:
+            time_length = self._read_time_length(time_series_gid)
+            _TIME_LENGTHS.put(time_series_gid, time_length)
+        time_idx = min(max(time_idx, 0), time_length - 1)
+        cache_key = (time_series_gid, time_idx)
+        volume = _TIME_POINTS.get(cache_key)
+        if volume is None:
+            volume = self._read_time_point(time_series_gid, time_idx)
+            _TIME_POINTS.put(cache_key, volume)
+        return volume
+
+
+    def get_planes(self, time_series_gid, time_idx, voxel, axis=None):
+        """
+        :returns: the planes through voxel, at time_idx (see orthogonal_planes)
+        """
+        return orthogonal_planes(self.get_time_point(time_series_gid, time_idx), voxel, axis)
+
+
+    @staticmethod
+    def _read_time_length(time_series_gid):
+        """
+        :returns: the number of time points of a TimeSeriesVolume
+        """
+        return ABCAdapter.load_entity_by_gid(time_series_gid).read_data_shape()[0]
+
+
+    def _read_time_point(self, time_series_gid, time_idx):
+        """
+        Read from H5 only the hyperslab of one time point (time_idx is a valid index).
+        """
+        time_series = ABCAdapter.load_entity_by_gid(time_series_gid)
+        self.logger.debug("Reading time point %d from TimeSeriesVolume %s" % (time_idx, time_series_gid))
+        volume = time_series.get_data('data', (slice(time_idx, time_idx + 1),))[0]
+        return numpy.ascontiguousarray(volume, dtype=numpy.float32)
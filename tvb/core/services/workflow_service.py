@@ -36,6 +36,7 @@ from tvb.basic.logger.builder import get_logger
 from tvb.core.entities.storage import dao
 from tvb.core.entities import model
 from tvb.core.services.exceptions import WorkflowInterStepsException
+from tvb.core.services.status_bus import STATUS_BUS
 from tvb.core.entities.transient.burst_configuration_entities import WorkflowStepConfiguration as wf_cfg
 from types import IntType
 
@@ -242,6 +243,7 @@ class WorkflowService:
             burst_entity.mark_status(error=True)
             burst_entity.error_message = "Error when updating Burst Status"
             dao.store_entity(burst_entity)
+        STATUS_BUS.publish_burst(burst_entity)
                 
                 
         
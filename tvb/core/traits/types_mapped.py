@@ -263,6 +263,23 @@ class MappedType(model.DataType, mapped.MappedTypeLight):
             return super(MappedType, self).get_data_shape(data_name)
 
 
+    def get_data_chunk_shape(self, data_name, where=ROOT_NODE_PATH):
+        """
+        This method reads the on-disk chunk layout of the given data set
+            :param data_name: Name of the data set for which to read the chunk shape
+            :param where: represents the path where dataset is stored (e.g. /data/info)
+            :returns: a shape tuple, or None when data is not stored in chunks
+        """
+        if TVBSettings.TRAITS_CONFIGURATION.use_storage and self.trait.use_storage:
+            try:
+                store_manager = self._get_file_storage_mng()
+                return store_manager.get_data_chunks(data_name, where, ignore_errors=True)
+            except IOError, excep:
+                self.logger.warning(str(excep))
+                self.logger.warning("Could not read chunks from file. Most probably because data was not written....")
+        return None
+
+
     def get_info_about_array(self, array_name, included_info=None):
         """
         :returns: dictionary {label: value} about an attribute of type mapped.Array
@@ -38,7 +38,10 @@ import sys
 import json
 import datetime
 import uuid
+import base64
+import threading
 import numpy
+from collections import OrderedDict
 from scipy import io as scipy_io
 from tvb.basic.config.settings import TVBSettings as configFile
 from tvb.basic.logger.builder import get_logger
@@ -58,6 +61,7 @@ COMPLEX_TIME_FORMAT = '%Y-%m-%d,%H-%M-%S.%f'
 # This is only used as a fallback in the string to date conversion.
 LESS_COMPLEX_TIME_FORMAT = '%Y-%m-%d,%H-%M-%S'
 SIMPLE_TIME_FORMAT = "%m-%d-%Y"
+DATA_URL_PREFIX = "data:application/octet-stream;base64,"
 
 
 ################## PATH related methods start here ###############
@@ -426,3 +430,81 @@ def generate_guid():
     return str(uuid.uuid1())
 
 
+
+def float32_data_url(array):
+    """
+    :returns: array values as little-endian float32, in C order, encoded as a base64 data URL
+              (decoded in JS by decodeFloat32DataURL from genericTVB.js).
+    """
+    raw = numpy.ascontiguousarray(array, dtype='<f4').tostring()
+    return DATA_URL_PREFIX + base64.b64encode(raw)
+
+
+
+class LRUCache(object):
+    """
+    Thread-safe dictionary holding at most `max_size` entries: when full, the least recently used one is dropped.
+    """
+
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+
+    def get(self, key, default=None):
+        """
+        :returns: the value cached for key (marking it as the most recently used), or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries.pop(key)
+            self._entries[key] = value
+            return value
+
+
+    def put(self, key, value):
+        """
+        Cache value for key, dropping the least recently used entries above `max_size`.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+    def pop(self, key, default=None):
+        """
+        Remove key from the cache. :returns: its value, or default when it was not cached
+        """
+        with self._lock:
+            return self._entries.pop(key, default)
+
+
+    def keys(self):
+        """
+        :returns: a list with the cached keys, from the least to the most recently used
+        """
+        with self._lock:
+            return list(self._entries)
+
+
+    def clear(self):
+        """
+        Drop all the cached entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
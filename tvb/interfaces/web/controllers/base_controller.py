@@ -39,6 +39,8 @@ This is the main UI entry point.
 
 import os
 import json
+import time
+import threading
 import cherrypy
 from copy import copy
 from genshi.template.loader import TemplateLoader
@@ -90,7 +92,6 @@ KEY_WRAP_CONTENT_IN_MAIN_DIV = "wrapContentInMainDiv"
 KEY_CURRENT_TAB = "currentTab"
 
 KEY_BURST_CONFIG = 'burst_configuration'
-KEY_CACHED_SIMULATOR_TREE = 'simulator_input_tree'
 KEY_BACK_PAGE = "back_page_link"
 KEY_SECTION_TITLES = "section_titles"
 KEY_SUBSECTION_TITLES = "sub_section_titles"
@@ -106,6 +107,72 @@ KEY_OVERLAY_PAGINATION = "show_overlay_pagination"
 KEY_OVERLAY_PREVIOUS = "action_overlay_previous"
 KEY_OVERLAY_NEXT = "action_overlay_next"
 
+## One Genshi loader per process: it keeps each compiled template (and its static xi:include fragments),
+## keyed by path. Only in development mode it checks files for changes on every load.
+TEMPLATES_CACHE_SIZE = 300
+TEMPLATE_LOADER = TemplateLoader(auto_reload=cfg.is_development(), max_cache_size=TEMPLATES_CACHE_SIZE)
+
+## Renders slower than this (in seconds) are logged as warnings.
+SLOW_RENDER_THRESHOLD = 1.0
+_RENDER_METRICS = {}
+_RENDER_METRICS_LOCK = threading.Lock()
+
+
+
+def render_template(template_path, template_dict):
+    """
+    Generate HTML given the path to the template and the data dictionary, and record the time spent.
+    """
+    start_time = time.time()
+    template = TEMPLATE_LOADER.load(template_path)
+    load_time = time.time() - start_time
+    result = template.generate(**template_dict).render('xhtml')
+    render_time = time.time() - start_time - load_time
+
+    with _RENDER_METRICS_LOCK:
+        metrics = _RENDER_METRICS.setdefault(template_path, {'count': 0, 'load_time': 0.0,
+                                                             'render_time': 0.0, 'max_time': 0.0})
+        metrics['count'] += 1
+        metrics['load_time'] += load_time
+        metrics['render_time'] += render_time
+        metrics['max_time'] = max(metrics['max_time'], load_time + render_time)
+    if load_time + render_time > SLOW_RENDER_THRESHOLD:
+        get_logger(__name__).warning("Slow render for %s: %.3fs load, %.3fs render"
+                                     % (template_path, load_time, render_time))
+    return result
+
+
+
+def get_render_metrics():
+    """
+    :returns: dictionary {template path: {count, load_time, render_time, max_time}}, times in seconds
+    """
+    with _RENDER_METRICS_LOCK:
+        return dict((path, dict(metrics)) for path, metrics in _RENDER_METRICS.iteritems())
+
+
+
+def precompile_templates(templates_root=None):
+    """
+    Load (parse and compile) in the shared loader all templates under templates_root.
+    Fragments which can not be compiled on their own are skipped.
+    :returns: the number of compiled templates
+    """
+    logger = get_logger(__name__)
+    templates_root = templates_root or cfg.TEMPLATE_ROOT
+    compiled = 0
+    for root, _, files in os.walk(templates_root):
+        for file_name in files:
+            if not file_name.endswith('.html'):
+                continue
+            try:
+                TEMPLATE_LOADER.load(os.path.join(root, file_name))
+                compiled += 1
+            except Exception, excep:
+                logger.debug("Could not precompile template %s: %s" % (file_name, str(excep)))
+    logger.info("Precompiled %d templates from %s" % (compiled, templates_root))
+    return compiled
+
 
 
 def settings():
@@ -140,11 +207,7 @@ def profile(template_path, func, *a, **b):
     but for the runtime process we do not want a separate call, to increase time.
     """
     template_dict = func(*a, **b)
-    ### Generate HTML given the path to the template and the data dictionary.
-    loader = TemplateLoader()
-    template = loader.load(template_path)
-    stream = template.generate(**template_dict)
-    return stream.render('xhtml')
+    return render_template(template_path, template_dict)
 
 
 
@@ -168,11 +231,7 @@ def using_template(template_name):
                 template_dict = func(*a, **b)
                 if not cfg.RENDER_HTML:
                     return template_dict
-                    ### Generate HTML given the path to the template and the data dictionary.
-                loader = TemplateLoader()
-                template = loader.load(template_path)
-                stream = template.generate(**template_dict)
-                return stream.render('xhtml')
+                return render_template(template_path, template_dict)
             except Exception, excep:
                 if isinstance(excep, cherrypy.HTTPRedirect):
                     raise excep
@@ -352,7 +411,6 @@ class BaseController(object):
         ### Update project stored in selection, with latest Project entity from DB.
         members = self.user_service.get_users_for_project("", project.id)[1]
         project.members = members
-        remove_from_session(KEY_CACHED_SIMULATOR_TREE)
         add2session(KEY_PROJECT, project)
 
         if previous_project is None or previous_project.id != project.id:
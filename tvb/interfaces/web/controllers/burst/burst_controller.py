@@ -41,10 +41,11 @@ import formencode
 from formencode import validators
 from tvb.config import SIMULATOR_MODULE, SIMULATOR_CLASS, MEASURE_METRICS_MODULE, MEASURE_METRICS_CLASS
 from tvb.basic.config.settings import TVBSettings as cfg
-from tvb.core.utils import generate_guid
+from tvb.core.utils import generate_guid, string2date
 from tvb.core.adapters.abcadapter import ABCAdapter
-from tvb.core.services.burst_service import BurstService, KEY_PARAMETER_CHECKED
+from tvb.core.services.burst_service import BurstService, KEY_PARAMETER_CHECKED, PREVIEW_METHOD
 from tvb.core.services.workflow_service import WorkflowService
+from tvb.core.services.status_bus import STATUS_BUS
 from tvb.core.services.operation_service import RANGE_PARAMETER_1, RANGE_PARAMETER_2
 import tvb.interfaces.web.controllers.base_controller as base
 from tvb.interfaces.web.controllers.users_controller import logged
@@ -53,6 +54,10 @@ from tvb.interfaces.web.controllers.flow_controller import context_selected, KEY
 
 PORTLET_STEP_SEPARATOR = "____"
 BURST_NAME = 'burstName'
+## Maximum number of seconds a status request waits for a change, before answering empty.
+STATUS_WAIT_TIMEOUT = 25
+## Seconds after which a portlet iframe asks again for a preview still being rendered
+PREVIEW_RELOAD_INTERVAL = 2
 
 
 
@@ -78,16 +83,11 @@ class BurstController(base.BaseController):
     @context_selected()
     def cached_simulator_input_tree(self):
         """
-        Cache Simulator's input tree, for performance issues.
-        Anyway, without restart, the introspected tree will not be different on multiple executions.
-        :returns: Simulator's Input Tree (copy from cache or just loaded)
+        Simulator's input tree for the current project, shared by all its users (not kept in session).
+        :returns: Simulator's Input Tree. It should not be changed: apply user values with ABCAdapter.fill_defaults.
         """
-        cached_simulator_tree = base.get_from_session(base.KEY_CACHED_SIMULATOR_TREE)
-        if cached_simulator_tree is None:
-            cached_simulator_tree = self.flow_service.prepare_adapter(base.get_current_project().id,
-                                                                      self.cached_simulator_algo_group)[1]
-            base.add2session(base.KEY_CACHED_SIMULATOR_TREE, cached_simulator_tree)
-        return copy.deepcopy(cached_simulator_tree)
+        return self.flow_service.get_project_input_tree(base.get_current_project().id,
+                                                        self.cached_simulator_algo_group)
 
 
     @cherrypy.expose
@@ -110,8 +110,9 @@ class BurstController(base.BaseController):
             if session_stored_burst is not None:
                 current_data = session_stored_burst.get_all_simulator_values()[0]
                 adapter_interface = ABCAdapter.fill_defaults(adapter_interface, current_data, True)
-                ### Add simulator tree to session to be available in filters
-                self.context.add_adapter_to_session(self.cached_simulator_algo_group, adapter_interface, current_data)
+                ### Make simulator tree available in filters (the shared tree is not copied into session)
+                self.context.add_project_adapter_to_session(self.cached_simulator_algo_group,
+                                                            base.get_current_project().id, current_data)
             template_specification['inputList'] = adapter_interface
 
         selected_portlets = session_stored_burst.update_selected_portlets()
@@ -374,8 +375,29 @@ class BurstController(base.BaseController):
     def get_history_status(self, **data):
         """
         For each burst id received, get the status and return it.
+        When 'changed_since' is also received, only bursts finished after that moment are returned.
         """
-        return self.burst_service.update_history_status(json.loads(data['burst_ids']))
+        changed_since = string2date(data['changed_since']) if data.get('changed_since') else None
+        return self.burst_service.update_history_status(json.loads(data['burst_ids']), changed_since)
+
+
+    @cherrypy.expose
+    @ajax_call()
+    def get_status_updates(self, last_sequence=0):
+        """
+        Wait for Operation and Burst status changes in the current project, newer than last_sequence.
+        No DB access is done here; when 'complete' is False in the result, some changes are no longer
+        known and the client should reload the status through get_history_status.
+        """
+        project = base.get_current_project()
+        last_sequence = int(last_sequence)
+        if project is None:
+            return {'sequence': STATUS_BUS.last_sequence, 'events': [], 'complete': False}
+        if last_sequence < 0:
+            ## First request from this client: only tell it where to start listening from.
+            return {'sequence': STATUS_BUS.last_sequence, 'events': [], 'complete': True}
+        sequence, events, is_complete = STATUS_BUS.get_events(project.id, last_sequence, STATUS_WAIT_TIMEOUT)
+        return {'sequence': sequence, 'events': events, 'complete': is_complete}
 
 
     @cherrypy.expose
@@ -468,7 +490,6 @@ class BurstController(base.BaseController):
         Called when click on "New Burst" entry happens from UI.
         This will generate an empty new Burst Configuration.
         """
-        base.remove_from_session(base.KEY_CACHED_SIMULATOR_TREE)
         new_burst = self.burst_service.new_burst_configuration(base.get_current_project().id)
         base.add2session(base.KEY_BURST_CONFIG, new_burst)
 
@@ -479,7 +500,6 @@ class BurstController(base.BaseController):
         """
         When currently selected entry is a valid Burst, create a clone of that Burst.
         """
-        base.remove_from_session(base.KEY_CACHED_SIMULATOR_TREE)
         base_burst = self.burst_service.load_burst(burst_id)[0]
         if (base_burst is None) or (base_burst.id is None):
             return self.reset_burst()
@@ -493,11 +513,19 @@ class BurstController(base.BaseController):
         """
         Launch the visualization for this tab and index in tab. The width and height represent the maximum of the inner 
         visualization canvas so that it can fit in the iFrame.
+        Previews are only read from the cache filled by the background renderers: while one is not yet available,
+        a page asking to be reloaded later is returned.
         """
         result = {}
         try:
             burst = base.get_from_session(base.KEY_BURST_CONFIG)
             visualizer = burst.tabs[burst.selected_tab].portlets[int(index_in_tab)].visualizer
+            if method_name == PREVIEW_METHOD and visualizer.id is not None:
+                result = self.burst_service.get_portlet_preview(visualizer, float(frame_width), float(frame_height))
+                if result is None:
+                    result = {'launch_success': True, 'preview_pending': True,
+                              'reload_after': PREVIEW_RELOAD_INTERVAL}
+                return result
             result = self.burst_service.launch_visualization(visualizer, float(frame_width),
                                                              float(frame_height), method_name)[0]
             result['launch_success'] = True
@@ -520,8 +548,9 @@ class BurstController(base.BaseController):
         default_values, any_checked = burst_config.get_all_simulator_values()
         simulator_input_tree = self.cached_simulator_input_tree
         simulator_input_tree = ABCAdapter.fill_defaults(simulator_input_tree, default_values)
-        ### Add simulator tree to session to be available in filters
-        self.context.add_adapter_to_session(self.cached_simulator_algo_group, simulator_input_tree, default_values)
+        ### Make simulator tree available in filters (the shared tree is not copied into session)
+        self.context.add_project_adapter_to_session(self.cached_simulator_algo_group,
+                                                    base.get_current_project().id, default_values)
 
         template_specification = {"inputList": simulator_input_tree,
                                   base.KEY_PARAMETERS_CONFIG: True,
@@ -548,8 +577,9 @@ class BurstController(base.BaseController):
         if any_checked:
             simulator_input_tree = self.burst_service.select_simulator_inputs(simulator_input_tree, simulator_config)
 
-        ### Add simulator tree to session to be available in filters
-        self.context.add_adapter_to_session(self.cached_simulator_algo_group, simulator_input_tree, default_values)
+        ### Make simulator tree available in filters (the shared tree is not copied into session)
+        self.context.add_project_adapter_to_session(self.cached_simulator_algo_group,
+                                                    base.get_current_project().id, default_values)
 
         template_specification = {"inputList": simulator_input_tree,
                                   base.KEY_PARAMETERS_CONFIG: False,
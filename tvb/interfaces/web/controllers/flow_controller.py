@@ -35,10 +35,12 @@ given action are described here.
 .. moduleauthor:: Lia Domide <lia.domide@codemart.ro>
 """
 
+import os
 import cherrypy
 import formencode
 import copy
 import json
+import numpy
 from tvb.basic.filters.chain import FilterChain
 from tvb.datatypes.arrays import MappedArray
 from tvb.core.utils import url2path, parse_json_parameters, string2date, string2bool
@@ -49,7 +51,9 @@ from tvb.core.services.exceptions import OperationException
 from tvb.core.services.operation_service import OperationService, RANGE_PARAMETER_1
 from tvb.core.services.project_service import ProjectService
 from tvb.core.services.burst_service import BurstService
+from tvb.core.services.volume_service import VolumeService
 from tvb.interfaces.web.entities.context_selected_adapter import SelectedAdapterContext
+from tvb.interfaces.web.data_serving import build_etag, validate_etag, discard_etag, serve_data_file
 from tvb.interfaces.web.controllers.users_controller import logged
 from tvb.interfaces.web.controllers.base_controller import using_template, ajax_call
 import tvb.interfaces.web.controllers.base_controller as base
@@ -97,6 +101,7 @@ class FlowController(base.BaseController):
         base.BaseController.__init__(self)
         self.context = SelectedAdapterContext()
         self.files_helper = FilesHelper()
+        self.volume_service = VolumeService()
 
 
     @cherrypy.expose
@@ -548,14 +553,11 @@ class FlowController(base.BaseController):
         """
         Retrieve file from Local storage, having a File System Path.
         """
-        try:
-            my_file = open(url2path(coded_path), "rb")
-            result = my_file.read()
-            my_file.close()
-            return result
-        except Exception, excep:
+        file_path = url2path(coded_path)
+        if not os.path.isfile(file_path):
             self.logger.error("Could not retrieve file from path:" + str(coded_path))
-            self.logger.exception(excep)
+            raise cherrypy.NotFound()
+        return serve_data_file(file_path)
 
 
     @cherrypy.expose
@@ -572,6 +574,8 @@ class FlowController(base.BaseController):
         pair, a load_entity will be performed and kwargs will be updated to contain the result
         :param kwargs: extra parameters to be passed when dataset_name is method. 
         """
+        ## The content under a GID never changes: browsers already holding this result get a 304.
+        validate_etag(build_etag(entity_gid, dataset_name, str(flatten), datatype_kwargs, kwargs))
         try:
             self.logger.debug("Starting to read HDF5: " + entity_gid + "/" + dataset_name + "/" + str(kwargs))
             entity = ABCAdapter.load_entity_by_gid(entity_gid)
@@ -591,6 +595,26 @@ class FlowController(base.BaseController):
         except Exception, excep:
             self.logger.error("Could not retrieve complex entity field:" + str(entity_gid) + "/" + str(dataset_name))
             self.logger.exception(excep)
+            discard_etag()
+
+
+    @cherrypy.expose
+    @ajax_call(False)
+    @logged()
+    def read_volume_planes(self, entity_gid, time_idx, x_idx, y_idx, z_idx, axis=None):
+        """
+        Binary content, as float32 values: for one time point of a TimeSeriesVolume, the planes through voxel
+        (x_idx, y_idx, z_idx) orthogonal to the first, second and third axis (or only to `axis`), each in C order.
+        """
+        validate_etag(build_etag(entity_gid, time_idx, x_idx, y_idx, z_idx, axis))
+        try:
+            planes = self.volume_service.get_planes(entity_gid, int(time_idx), (int(x_idx), int(y_idx), int(z_idx)),
+                                                    None if axis is None else int(axis))
+        except Exception:
+            discard_etag()
+            raise
+        cherrypy.response.headers['Content-Type'] = 'application/octet-stream'
+        return numpy.concatenate([plane.ravel() for plane in planes]).astype('<f4').tostring()
 
 
     @cherrypy.expose
@@ -732,11 +756,11 @@ class FlowController(base.BaseController):
         else:
             op_group = ProjectService.get_operation_group_by_id(operation_id)
             operations_in_group = ProjectService.get_operations_in_group(op_group)
-            for operation in operations_in_group:
-                tmp_res = operation_service.stop_operation(operation.id)
-                if remove_after_stop:
+            if operations_in_group:
+                result = operation_service.stop_operations([operation.id for operation in operations_in_group])
+            if remove_after_stop:
+                for operation in operations_in_group:
                     ProjectService().remove_operation(operation.id)
-                result = result or tmp_res
         return result
     
     
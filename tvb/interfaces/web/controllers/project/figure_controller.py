@@ -39,9 +39,9 @@ import cherrypy
 import formencode
 from formencode import validators
 from tvb.core import utils
-from cherrypy.lib.static import serve_file
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.core.services.figure_service import FigureService
+from tvb.interfaces.web.data_serving import serve_data_file
 from tvb.interfaces.web.controllers.users_controller import logged
 from tvb.interfaces.web.controllers.project.project_controller import ProjectController
 from tvb.interfaces.web.controllers.flow_controller import context_selected
@@ -80,6 +80,9 @@ class FigureController(ProjectController):
         """ Collect and display saved previews, grouped by session."""
         project = base.get_current_project()
         user = base.get_logged_user()
+        failed_figures = self.figure_service.pop_failed_figures(user.id)
+        if failed_figures:
+            base.set_error_message("<br/>".join(failed_figures))
         data, all_sessions_info = self.figure_service.retrieve_result_figures(project, user, selected_session)
         manage_figure_title = "Figures for " + str(selected_session) + " category"
         if selected_session == 'all_sessions':
@@ -177,8 +180,8 @@ class FigureController(ProjectController):
         figure = self.figure_service.load_figure(figure_id)
         image_folder = self.files_helper.get_images_folder(figure.project.name, figure.fk_from_operation)
         figure_path = os.path.join(image_folder, figure.file_path)
-        return serve_file(figure_path, "image/" + figure.file_format, "attachment",
-                          "%s.%s" % (figure.name, figure.file_format))
+        return serve_data_file(figure_path, "image/" + figure.file_format, "attachment",
+                               "%s.%s" % (figure.name, figure.file_format))
 
 
     @cherrypy.expose
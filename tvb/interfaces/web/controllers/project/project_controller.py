@@ -36,6 +36,7 @@ This represents the Controller part (from MVC).
 .. moduleauthor:: Bogdan Neacsa <bogdan.neacsa@codemart.ro>
 """
 
+import os
 import json
 import cherrypy
 import formencode
@@ -45,6 +46,7 @@ from simplejson import JSONEncoder
 from cherrypy.lib.static import serve_file
 from tvb.config import SIMULATOR_CLASS, SIMULATOR_MODULE
 from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.basic.traits.types_mapped import MappedType
 from tvb.core.entities.transient.structure_entities import DataTypeMetaData
 from tvb.core.entities.transient.filtering import StaticFiltersFactory
 from tvb.core.adapters.abcadapter import ABCAdapter
@@ -54,6 +56,8 @@ from tvb.core.services.exceptions import ServicesBaseException, ProjectServiceEx
 from tvb.core.services.exceptions import RemoveDataTypeException, RemoveDataTypeError
 from tvb.adapters.exporters.export_manager import ExportManager
 from tvb.interfaces.web.entities.context_overlay import OverlayTabDefinition
+from tvb.interfaces.web.data_serving import build_etag, file_etag, validate_etag, discard_etag, serve_data_file
+from tvb.interfaces.web.data_serving import REVALIDATE
 from tvb.interfaces.web.controllers.base_controller import using_template, ajax_call
 from tvb.interfaces.web.controllers.users_controller import logged
 from tvb.interfaces.web.controllers.flow_controller import FlowController, KEY_CONTENT
@@ -197,7 +201,6 @@ class ProjectController(bc.BaseController):
         try:
             if cherrypy.request.method == 'POST' and save:
                 bc.remove_from_session(bc.KEY_PROJECT)
-                bc.remove_from_session(bc.KEY_CACHED_SIMULATOR_TREE)
                 self._persist_project(data, project_id, is_create, current_user)
                 raise cherrypy.HTTPRedirect('/project/viewall')
         except formencode.Invalid, excep:
@@ -770,15 +773,34 @@ class ProjectController(bc.BaseController):
         current_prj = bc.get_current_project()
         # Load data by GID
         entity = ABCAdapter.load_entity_by_gid(data_gid)
+        export_etag = None
+        if isinstance(entity, MappedType) and os.path.exists(entity.get_storage_file_path()):
+            ## Metadata edits rewrite the H5 file, thus the export is identified by the file too.
+            ## Other entities (e.g. DataTypeGroups, whose members can be removed) are not cached.
+            export_etag = build_etag(data_gid, export_module, file_etag(entity.get_storage_file_path()))
+            validate_etag(export_etag, REVALIDATE)
         # Do real export
         export_mng = ExportManager()
-        file_name, file_path, delete_file = export_mng.export_data(entity, export_module, current_prj)
+        try:
+            streamed_export = export_mng.export_data_stream(entity, export_module, current_prj)
+            if streamed_export is None:
+                file_name, file_path, delete_file = export_mng.export_data(entity, export_module, current_prj)
+        except Exception:
+            discard_etag()
+            raise
+        if streamed_export is not None:
+            file_name, content = streamed_export
+            return self._stream_download(file_name, content)
+
         if delete_file:
             # We force parent folder deletion because export process generated it.
             self.mark_file_for_delete(file_path, True)
 
         self.logger.debug("Data exported in file: " + str(file_path))
-        return serve_file(file_path, "application/x-download", "attachment", file_name)
+        if export_etag is None:
+            return serve_file(file_path, "application/x-download", "attachment", file_name)
+        return serve_data_file(file_path, "application/x-download", "attachment", file_name,
+                               etag=export_etag, use_sendfile=not delete_file)
 
 
     @cherrypy.expose
@@ -789,13 +811,21 @@ class ProjectController(bc.BaseController):
         """
         current_project = self.project_service.find_project(project_id)
         export_mng = ExportManager()
-        export_file = export_mng.export_project(current_project)
+        file_name, archive = export_mng.build_project_archive(current_project)
+        return self._stream_download(file_name, archive)
 
-        # Register export file for delete when download complete
-        # We force parent folder deletion because export process generated it.
-        self.mark_file_for_delete(export_file, True)
 
-        return serve_file(export_file, "application/x-download", "attachment")
+    @staticmethod
+    def _stream_download(file_name, content):
+        """
+        Send to the client, as a file to be saved, content produced while it is being sent
+        (e.g. an archive which is not stored on disk first).
+        :param content: iterable of byte strings
+        """
+        cherrypy.response.headers['Content-Type'] = "application/x-download"
+        cherrypy.response.headers['Content-Disposition'] = 'attachment; filename="%s"' % file_name
+        cherrypy.response.stream = True
+        return iter(content)
 
 
     #methods related to data structure - graph
@@ -35,6 +35,7 @@
 
 import cherrypy
 import json
+import numpy
 from copy import deepcopy
 
 import tvb.interfaces.web.controllers.base_controller as base
@@ -44,8 +45,10 @@ from tvb.interfaces.web.controllers.users_controller import logged
 from tvb.interfaces.web.controllers.flow_controller import SelectedAdapterContext
 from tvb.basic.traits.parameters_factory import get_traited_instance_for_name
 from tvb.basic.logger.builder import get_logger
+from tvb.core.utils import float32_data_url
 from tvb.core.adapters.abcadapter import ABCAdapter
 from tvb.core.services.flow_service import FlowService
+from tvb.core.services.equation_chart_service import EquationChartService
 from tvb.core.services.operation_service import RANGE_PARAMETER_1, RANGE_PARAMETER_2
 from tvb.adapters.visualizers.connectivity import ConnectivityViewer
 from tvb.simulator.models import Model
@@ -73,6 +76,7 @@ class SpatioTemporalController(base.BaseController):
     def __init__(self):
         base.BaseController.__init__(self)
         self.flow_service = FlowService()
+        self.chart_service = EquationChartService()
         self.logger = get_logger(__name__)
         editable_entities = [dict(link='/spatial/stimulus/region/step_1_submit/1/1', title='Region Stimulus',
                                   subsection='regionstim', description='Create a new Stimulus on Region level'),
@@ -217,24 +221,21 @@ class SpatioTemporalController(base.BaseController):
 
 
     @staticmethod
-    def get_series_json(data, label):
-        """ For each data point entry, build the FLOT specific JSON. """
-        series = "{\"data\": " + json.dumps(data) + ","
-        series += "\"label\": \"" + label + "\""
-        series += "}"
+    def get_series_json(x_values, y_values, label, **options):
+        """
+        Build one FLOT series, with its [x, y] points packed as float32 data URL
+        (expanded in the browser by decodeFloat32PointsDataURL, in equation_displayer).
+        :param options: other FLOT series options (e.g. color, lines)
+        """
+        series = dict(options)
+        series.update({'data': float32_data_url(numpy.column_stack((x_values, y_values))), 'label': label})
         return series
 
 
     @staticmethod
     def build_final_json(list_of_series):
-        """ Given a list with all the data points, build the final FLOT json. """
-        final_json = "["
-        for i, value in enumerate(list_of_series):
-            if i:
-                final_json += ","
-            final_json += value
-        final_json += "]"
-        return final_json
+        """ Given a list with all the series, build the final FLOT json. """
+        return json.dumps(list_of_series)
 
 
     @staticmethod
@@ -35,8 +35,10 @@
 
 import cherrypy
 import json
+import numpy
 
 from tvb.datatypes.surfaces import LocalConnectivity
+from tvb.core.utils import LRUCache
 from tvb.core.adapters.abcadapter import ABCAdapter
 import tvb.interfaces.web.controllers.base_controller as base
 from tvb.interfaces.web.controllers.base_controller import using_template, ajax_call
@@ -55,6 +57,46 @@ RELOAD_DEFAULT_PAGE_URL = '/spatial/localconnectivity/reset_local_connectivity'
 
 KEY_LCONN_CONTEXT = "local-conn-ctx"
 
+## How many LocalConnectivity matrices are kept in memory for the gradient view.
+GRADIENT_SOURCES_CACHE_SIZE = 4
+_GRADIENT_SOURCES = LRUCache(GRADIENT_SOURCES_CACHE_SIZE)
+
+
+
+class _GradientSource(object):
+    """
+    What the gradient view needs from a LocalConnectivity: its matrix in CSR format (so that a row is
+    just a slice), the first vertex of every surface triangle, and the split of the surface vertices
+    in display buffers.
+    """
+
+
+    def __init__(self, local_connectivity):
+        surface = local_connectivity.surface
+        self.matrix = local_connectivity.matrix.tocsr()
+        self.triangle_vertices = numpy.array(surface.triangles[:, 0])
+        self.vertex_count = int(self.matrix.shape[1])
+        chunk_size = surface.SPLIT_MAX_SIZE
+        buffer_size = surface.SPLIT_BUFFER_SIZE
+        if chunk_size >= self.vertex_count:
+            self.chunks = [[0, self.vertex_count]]
+        else:
+            starts = numpy.arange(0, self.vertex_count - buffer_size, chunk_size)
+            ends = numpy.minimum(starts + chunk_size + buffer_size, self.vertex_count)
+            self.chunks = numpy.column_stack((starts, ends)).tolist()
+
+
+
+def _get_gradient_source(local_connectivity_gid):
+    """
+    :returns: the cached _GradientSource for a LocalConnectivity, loading it on first use.
+    """
+    gradient_source = _GRADIENT_SOURCES.get(local_connectivity_gid)
+    if gradient_source is None:
+        gradient_source = _GradientSource(ABCAdapter.load_entity_by_gid(local_connectivity_gid))
+        _GRADIENT_SOURCES.put(local_connectivity_gid, gradient_source)
+    return gradient_source
+
 
 class LocalConnectivityController(SpatioTemporalController):
     """
@@ -265,56 +307,46 @@ class LocalConnectivityController(SpatioTemporalController):
         When the user loads an existent local connectivity and he picks a vertex from the used surface, this
         method computes the data needed for drawing a gradient view corresponding to that vertex.
 
-        Returns a json which contains the data needed for drawing a gradient view for the selected vertex.
+        Returns a json with the non-zero entries of the matrix row for the selected vertex (as `indices` and
+        `values`), the number of vertices, the [start, end) vertex ranges of the surface split (one per
+        display buffer) and the min / max of the whole row.
         """
-        selected_local_conn = ABCAdapter.load_entity_by_gid(local_connectivity_gid)
-        surface = selected_local_conn.surface
-        triangle_index = int(selected_triangle)
-        vertex_index = int(surface.triangles[triangle_index][0])
-        picked_data = list(selected_local_conn.matrix[vertex_index].toarray().squeeze())
-        chunk_size = surface.SPLIT_MAX_SIZE
-        buffer_size = surface.SPLIT_BUFFER_SIZE
-        result = []
-        if chunk_size >= len(picked_data):
-            result.append(picked_data)
-        else:
-            for start_idx in range(0, len(picked_data) - buffer_size, chunk_size):
-                result.append(picked_data[start_idx:start_idx + chunk_size + buffer_size])
-        result = {'min_value': min(picked_data), 'max_value': max(picked_data), 'data': json.dumps(result)}
-
-        return result
-
-
-    @staticmethod
-    def get_series_json(ideal_case, average_case, worst_case, best_case, vertical_line):
-        """ Gather all the separate data arrays into a single flot series. """
-        series = []
-        normal = '{"data": ' + json.dumps(ideal_case) + ', "lines" : {"lineWidth" : 1},'
-        normal += '"label": "Theoretical case", color : "rgb(52, 255, 25)"'
-        normal += '}'
-
-        data_2_by_2 = '{"data": ' + json.dumps(average_case) + ', "lines" : {"lineWidth" : 1},'
-        data_2_by_2 += '"label": "Most probable", color : "rgb(148, 0, 179)"'
-        data_2_by_2 += '}'
-
-        data_3_by_3 = '{"data": ' + json.dumps(worst_case) + ', "lines" : {"lineWidth" : 1},'
-        data_3_by_3 += '"label": "Worst case", color : "rgb(0, 0, 255)"'
-        data_3_by_3 += '}'
-
-        data_double_length = '{"data": ' + json.dumps(best_case) + ', "lines" : {"lineWidth" : 1},'
-        data_double_length += '"label": "Best case", color : "rgb(122, 122, 0)"'
-        data_double_length += '}'
-
-        data_vertical_line = '{"data": ' + json.dumps(vertical_line) + ', "points": { "show" : true, "radius" : 1 },'
-        data_vertical_line += '"label": "Cut-off distance", color : "rgb(255, 0, 0)"'
-        data_vertical_line += '}'
-
-        series.append(normal)
-        series.append(data_2_by_2)
-        series.append(data_3_by_3)
-        series.append(data_double_length)
-        series.append(data_vertical_line)
-        return series
+        gradient_source = _get_gradient_source(local_connectivity_gid)
+        vertex_index = int(gradient_source.triangle_vertices[int(selected_triangle)])
+        matrix = gradient_source.matrix
+        row_start, row_end = matrix.indptr[vertex_index], matrix.indptr[vertex_index + 1]
+        indices = matrix.indices[row_start:row_end]
+        values = matrix.data[row_start:row_end]
+
+        min_value = max_value = 0.0
+        if len(values):
+            min_value = float(values.min())
+            max_value = float(values.max())
+            if len(values) < gradient_source.vertex_count:
+                # The implicit zeros of the sparse row are part of the gradient as well.
+                min_value = min(min_value, 0.0)
+                max_value = max(max_value, 0.0)
+        return {'min_value': min_value, 'max_value': max_value,
+                'vertex_count': gradient_source.vertex_count, 'chunks': gradient_source.chunks,
+                'indices': indices.tolist(), 'values': values.tolist()}
+
+
+    @classmethod
+    def get_cases_series_json(cls, ideal_case, average_case, worst_case, best_case, vertical_line):
+        """
+        Gather all the separate data arrays into a single flot series.
+        Each case is a tuple (x_values, y_values, ...), as returned by EquationChartService.get_series.
+        """
+        return [cls.get_series_json(ideal_case[0], ideal_case[1], "Theoretical case",
+                                    lines={"lineWidth": 1}, color="rgb(52, 255, 25)"),
+                cls.get_series_json(average_case[0], average_case[1], "Most probable",
+                                    lines={"lineWidth": 1}, color="rgb(148, 0, 179)"),
+                cls.get_series_json(worst_case[0], worst_case[1], "Worst case",
+                                    lines={"lineWidth": 1}, color="rgb(0, 0, 255)"),
+                cls.get_series_json(best_case[0], best_case[1], "Best case",
+                                    lines={"lineWidth": 1}, color="rgb(122, 122, 0)"),
+                cls.get_series_json(vertical_line[0], vertical_line[1], "Cut-off distance",
+                                    points={"show": True, "radius": 1}, color="rgb(255, 0, 0)")]
 
 
     @cherrypy.expose
@@ -342,40 +374,28 @@ class LocalConnectivityController(SpatioTemporalController):
                 form_data = local_connectivity_creator.prepare_ui_inputs(form_data, validation_required=False)
                 equation = local_connectivity_creator.get_lconn_equation(form_data)
                 #What we want
-                ideal_case_series, _ = equation.get_series_data(0, 2 * max_x)
+                ideal_case = self.chart_service.get_series(equation, 0, 2 * max_x)
 
                 #What we'll mostly get
                 avg_res = 2 * int(max_x / surface.edge_length_mean)
                 step = max_x * 2 / (avg_res - 1)
-                average_case_series, _ = equation.get_series_data(0, 2 * max_x, step)
+                average_case = self.chart_service.get_series(equation, 0, 2 * max_x, step)
 
                 #It can be this bad
                 worst_res = 2 * int(max_x / surface.edge_length_max)
                 step = 2 * max_x / (worst_res - 1)
-                worst_case_series, _ = equation.get_series_data(0, 2 * max_x, step)
+                worst_case = self.chart_service.get_series(equation, 0, 2 * max_x, step)
 
                 #This is as good as it gets...
                 best_res = 2 * int(max_x / surface.edge_length_min)
                 step = 2 * max_x / (best_res - 1)
-                best_case_series, _ = equation.get_series_data(0, 2 * max_x, step)
-
-                max_y = -1000000000
-                min_y = 10000000000
-                for case in ideal_case_series:
-                    if min_y > case[1]:
-                        min_y = case[1]
-                    if min_y > case[1]:
-                        min_y = case[1]
-                    if max_y < case[1]:
-                        max_y = case[1]
-                    if max_y < case[1]:
-                        max_y = case[1]
-                vertical_line = []
+                best_case = self.chart_service.get_series(equation, 0, 2 * max_x, step)
+
+                min_y, max_y = float(ideal_case[1].min()), float(ideal_case[1].max())
                 vertical_step = (max_y - min_y) / NO_OF_CUTOFF_POINTS
-                for i in xrange(NO_OF_CUTOFF_POINTS):
-                    vertical_line.append([max_x, min_y + i * vertical_step])
-                json_data = self.get_series_json(ideal_case_series, average_case_series, worst_case_series,
-                                                 best_case_series, vertical_line)
+                vertical_line = (numpy.repeat(max_x, NO_OF_CUTOFF_POINTS),
+                                 min_y + numpy.arange(NO_OF_CUTOFF_POINTS) * vertical_step)
+                json_data = self.get_cases_series_json(ideal_case, average_case, worst_case, best_case, vertical_line)
                 all_series = self.build_final_json(json_data)
 
                 return {'allSeries': all_series, 'prefix': self.plotted_equations_prefixes[0], "message": None}
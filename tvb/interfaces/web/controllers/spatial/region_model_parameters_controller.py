@@ -34,6 +34,7 @@
 """
 
 import json
+import numpy
 import cherrypy
 import tvb.interfaces.web.controllers.base_controller as base
 from tvb.interfaces.web.controllers.users_controller import logged
@@ -165,6 +166,71 @@ class RegionsModelParametersController(SpatioTemporalController):
         return template_specification
 
 
+    @cherrypy.expose
+    @ajax_call()
+    @logged()
+    def update_phase_plane(self, svx=None, svy=None, x_range=None, y_range=None,
+                           state_values=None, noise=None, reset_axes=False):
+        """
+        Change what the phase-plane shows. Ranges and state_values are expected as JSON strings.
+        :returns: the resulting phase-plane settings.
+        """
+        phase_plane = base.get_from_session(KEY_CONTEXT_MPR).phase_plane
+        if reset_axes and json.loads(reset_axes):
+            phase_plane.reset_axes()
+        return phase_plane.update_settings(svx, svy,
+                                           json.loads(x_range) if x_range else None,
+                                           json.loads(y_range) if y_range else None,
+                                           json.loads(state_values) if state_values else None,
+                                           noise)
+
+
+    @cherrypy.expose
+    @ajax_call(False)
+    @logged()
+    def get_phase_plane_field(self, mode=0):
+        """
+        Binary content, as float32 values: the grid positions on x, then on y, and after those
+        the derivatives along x, then along y, with y on rows and x on columns.
+        """
+        x_values, y_values, u_field, v_field = base.get_from_session(KEY_CONTEXT_MPR).phase_plane.get_vector_field(
+            int(mode))
+        cherrypy.response.headers['Content-Type'] = 'application/octet-stream'
+        return numpy.concatenate([x_values, y_values, u_field.ravel(), v_field.ravel()]).astype('<f4').tostring()
+
+
+    @cherrypy.expose
+    @ajax_call()
+    @logged()
+    def get_phase_plane_nullclines(self, mode=0):
+        """
+        :returns: the segments [x1, y1, x2, y2] of both nullclines, computed with marching squares.
+        """
+        return base.get_from_session(KEY_CONTEXT_MPR).phase_plane.get_nullclines(int(mode))
+
+
+    @cherrypy.expose
+    @ajax_call()
+    @logged()
+    def get_phase_plane_trajectories(self, starting_points, mode=0):
+        """
+        :param starting_points: JSON list of [x, y] positions in the phase-plane
+        :returns: for each trajectory, the values of all state variables at each integration step.
+        """
+        starting_points = json.loads(starting_points)
+        if not starting_points:
+            return []
+        trajectories = base.get_from_session(KEY_CONTEXT_MPR).phase_plane.get_trajectories(starting_points,
+                                                                                            int(mode))
+        result = []
+        for trajectory in trajectories:
+            ## Diverging trajectories would otherwise give NaN, which is not valid JSON.
+            trajectory = trajectory.astype(object)
+            trajectory[~numpy.isfinite(trajectory.astype(float))] = None
+            result.append(trajectory.tolist())
+        return result
+
+
     @cherrypy.expose
     @ajax_call()
     @logged()
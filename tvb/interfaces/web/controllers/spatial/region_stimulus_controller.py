@@ -244,8 +244,8 @@ class RegionStimulusController(SpatioTemporalController):
             form_data = ABCAdapter.collapse_arrays(form_data, ['temporal'])
             min_x, max_x, ui_message = self.get_x_axis_range(form_data['min_x'], form_data['max_x'])
             equation = Equation.build_equation_from_dict('temporal', form_data)
-            series_data, display_ui_message = equation.get_series_data(min_range=min_x, max_range=max_x)
-            json_data = self.get_series_json(series_data, 'Temporal')
+            x_values, y_values, display_ui_message = self.chart_service.get_series(equation, min_x, max_x)
+            json_data = self.get_series_json(x_values, y_values, 'Temporal')
             all_series = self.build_final_json([json_data])
             if display_ui_message:
                 ui_message = self.get_ui_message(["temporal"])
@@ -296,8 +296,8 @@ class SurfaceModelParametersController(SpatioTemporalController):
             min_x, max_x, ui_message = self.get_x_axis_range(form_data['min_x'], form_data['max_x'])
             form_data = ABCAdapter.collapse_arrays(form_data, self.plotted_equations_prefixes)
             _, equation = self._compute_equation(form_data)
-            series_data, display_ui_message = equation.get_series_data(min_range=min_x, max_range=max_x)
-            json_data = self.get_series_json(series_data, "Spatial")
+            x_values, y_values, display_ui_message = self.chart_service.get_series(equation, min_x, max_x)
+            json_data = self.get_series_json(x_values, y_values, "Spatial")
             all_series = self.build_final_json([json_data])
             ui_message = ''
             if display_ui_message:
@@ -40,6 +40,7 @@ import copy
 
 import tvb.interfaces.web.controllers.base_controller as base
 from tvb.datatypes.patterns import StimuliSurface
+from tvb.core.utils import LRUCache, float32_data_url
 from tvb.core.adapters.abcadapter import ABCAdapter
 from tvb.core.entities.transient.context_stimulus import SurfaceStimulusContext, SURFACE_PARAMETER
 from tvb.core.entities.transient.structure_entities import DataTypeMetaData
@@ -51,13 +52,27 @@ from tvb.interfaces.web.controllers.spatial.base_spatio_temporal_controller impo
 
 SURFACE_STIMULUS_CREATOR_MODULE = "tvb.adapters.creators.stimulus_creator"
 SURFACE_STIMULUS_CREATOR_CLASS = "SurfaceStimulusCreator"
-KEY_STIMULUS = "session_stimulus"
 LOAD_EXISTING_URL = '/spatial/stimulus/surface/load_surface_stimulus'
 RELOAD_DEFAULT_PAGE_URL = '/spatial/stimulus/surface/reload_default'
 CHUNK_SIZE = 20
 
 KEY_SURFACE_CONTEXT = "stim-surface-ctx"
 
+## Stimulus patterns (time x vertices, float32) computed for view_stimulus, per session and stimulus
+## configuration; get_stimulus_chunk only slices them.
+STIMULUS_PATTERNS_CACHE_SIZE = 4
+_STIMULUS_PATTERNS = LRUCache(STIMULUS_PATTERNS_CACHE_SIZE)
+
+
+
+def stimulus_pattern(spatial_pattern, temporal_pattern):
+    """
+    :returns: the spatio-temporal pattern of a stimulus, as float32 array (time x space), computed at once
+              as the outer product of its spatial and temporal components.
+    """
+    return numpy.outer(numpy.ravel(temporal_pattern).astype(numpy.float32),
+                       numpy.ravel(spatial_pattern).astype(numpy.float32))
+
 
 class SurfaceStimulusController(SpatioTemporalController):
     """
@@ -256,37 +271,16 @@ class SurfaceStimulusController(SpatioTemporalController):
     def view_stimulus(self, focal_points):
         """
         Just create the stimulus to view the actual data, don't store to db.
-        Hold the entity in session without the surface, so the next time you need
-        data just get from that one.
+        The first CHUNK_SIZE time steps are returned (float32 data URL, time x vertices), and the following
+        ones are read with get_stimulus_chunk.
         """
         try:
             context = base.get_from_session(KEY_SURFACE_CONTEXT)
             context.set_focal_points(focal_points)
-            kwargs = copy.deepcopy(context.equation_kwargs)
-            surface_stimulus_creator = self.get_creator_and_interface(SURFACE_STIMULUS_CREATOR_MODULE,
-                                                                      SURFACE_STIMULUS_CREATOR_CLASS,
-                                                                      StimuliSurface())[0]
-            min_time = float(kwargs.get('min_tmp_x', 0))
-            max_time = float(kwargs.get('max_tmp_x', 100))
-            kwargs = surface_stimulus_creator.prepare_ui_inputs(kwargs)
-            stimulus = surface_stimulus_creator.launch(**kwargs)
-            surface_gid = base.get_from_session(PARAM_SURFACE)
-            surface = ABCAdapter.load_entity_by_gid(surface_gid)
-            stimulus.surface = surface
-            stimulus.configure_space()
-            time = numpy.arange(min_time, max_time, 1)
-            time = time[numpy.newaxis, :]
-            stimulus.configure_time(time)
-            data = []
-            max_value = numpy.max(stimulus())
-            min_value = numpy.min(stimulus())
-            for i in range(min(CHUNK_SIZE, stimulus.temporal_pattern.shape[1])):
-                step_data = stimulus(i).tolist()
-                data.append(step_data)
-            stimulus.surface = surface.gid
-            base.add2session(KEY_STIMULUS, stimulus)
-            result = {'status': 'ok', 'max': max_value, 'min': min_value,
-                      'data': data, "time_min": min_time, "time_max": max_time, "chunk_size": CHUNK_SIZE}
+            pattern, min_time, max_time = self._get_stimulus_pattern()
+            result = {'status': 'ok', 'max': float(pattern.max()), 'min': float(pattern.min()),
+                      'data': float32_data_url(pattern[:CHUNK_SIZE]), 'vertices': pattern.shape[1],
+                      "time_min": min_time, "time_max": max_time, "chunk_size": CHUNK_SIZE}
             return result
         except (NameError, ValueError, SyntaxError):
             return {'status': 'error',
@@ -295,6 +289,37 @@ class SurfaceStimulusController(SpatioTemporalController):
             return {'allSeries': 'error', 'errorMsg': ex.message}
 
 
+    def _get_stimulus_pattern(self):
+        """
+        Evaluate the stimulus currently configured in session, on the selected surface.
+        :returns: tuple (pattern, min_time, max_time), with pattern as given by `stimulus_pattern`;
+                  from cache, unless the stimulus configuration changed.
+        """
+        context = base.get_from_session(KEY_SURFACE_CONTEXT)
+        surface_gid = base.get_from_session(PARAM_SURFACE)
+        key = (cherrypy.session.id, surface_gid, json.dumps(context.equation_kwargs, sort_keys=True, default=str))
+        cached = _STIMULUS_PATTERNS.get(key)
+        if cached is not None:
+            return cached
+
+        kwargs = copy.deepcopy(context.equation_kwargs)
+        surface_stimulus_creator = self.get_creator_and_interface(SURFACE_STIMULUS_CREATOR_MODULE,
+                                                                  SURFACE_STIMULUS_CREATOR_CLASS,
+                                                                  StimuliSurface())[0]
+        min_time = float(kwargs.get('min_tmp_x', 0))
+        max_time = float(kwargs.get('max_tmp_x', 100))
+        kwargs = surface_stimulus_creator.prepare_ui_inputs(kwargs)
+        stimulus = surface_stimulus_creator.launch(**kwargs)
+        stimulus.surface = ABCAdapter.load_entity_by_gid(surface_gid)
+        stimulus.configure_space()
+        time = numpy.arange(min_time, max_time, 1)
+        stimulus.configure_time(time[numpy.newaxis, :])
+        result = (stimulus_pattern(stimulus.spatial_pattern, stimulus.temporal_pattern), min_time, max_time)
+
+        _STIMULUS_PATTERNS.put(key, result)
+        return result
+
+
     def fill_default_attributes(self, template_specification):
         """
         Add some entries that are used in both steps then fill the default required attributes.
@@ -311,22 +336,16 @@ class SurfaceStimulusController(SpatioTemporalController):
                                                                               subsection='surfacestim')
 
     @cherrypy.expose
-    @ajax_call()
+    @ajax_call(False)
     @logged()
     def get_stimulus_chunk(self, chunk_idx):
         """
-        Get the next chunk of the stimulus data.
+        Get the next chunk of the stimulus data, as little-endian float32 values (time x vertices).
         """
-        stimulus = base.get_from_session(KEY_STIMULUS)
-        surface_gid = base.get_from_session(PARAM_SURFACE)
         chunk_idx = int(chunk_idx)
-        if stimulus.surface.gid != surface_gid:
-            raise Exception("TODO: Surface changed while visualizing stimulus. See how to handle this.")
-        data = []
-        for idx in range(chunk_idx * CHUNK_SIZE,
-                         min((chunk_idx + 1) * CHUNK_SIZE, stimulus.temporal_pattern.shape[1]), 1):
-            data.append(stimulus(idx).tolist())
-        return data
+        pattern = self._get_stimulus_pattern()[0]
+        cherrypy.response.headers['Content-Type'] = 'application/octet-stream'
+        return pattern[chunk_idx * CHUNK_SIZE:(chunk_idx + 1) * CHUNK_SIZE].astype('<f4').tostring()
 
 
     @cherrypy.expose
@@ -344,8 +363,8 @@ class SurfaceStimulusController(SpatioTemporalController):
                                                                       StimuliSurface())[0]
             form_data = surface_stimulus_creator.prepare_ui_inputs(form_data, validation_required=False)
             equation = surface_stimulus_creator.get_temporal_equation(form_data)
-            series_data, display_ui_message = equation.get_series_data(min_range=min_x, max_range=max_x)
-            json_data = self.get_series_json(series_data, "Temporal")
+            x_values, y_values, display_ui_message = self.chart_service.get_series(equation, min_x, max_x)
+            json_data = self.get_series_json(x_values, y_values, "Temporal")
             all_series = self.build_final_json([json_data])
             if display_ui_message:
                 ui_message = self.get_ui_message(["temporal"])
@@ -376,8 +395,8 @@ class SurfaceStimulusController(SpatioTemporalController):
                                                                       StimuliSurface())[0]
             form_data = surface_stimulus_creator.prepare_ui_inputs(form_data, validation_required=False)
             equation = surface_stimulus_creator.get_spatial_equation(form_data)
-            series_data, display_ui_message = equation.get_series_data(min_range=min_x, max_range=max_x)
-            json_data = self.get_series_json(series_data, "Spatial")
+            x_values, y_values, display_ui_message = self.chart_service.get_series(equation, min_x, max_x)
+            json_data = self.get_series_json(x_values, y_values, "Spatial")
             all_series = self.build_final_json([json_data])
             ui_message = ''
             if display_ui_message:
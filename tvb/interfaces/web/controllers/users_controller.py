@@ -194,7 +194,6 @@ class UserController(basecontroller.BaseController):
             self.logger.debug("User " + user.username + " is just logging out!")
         basecontroller.remove_from_session(basecontroller.KEY_PROJECT)
         basecontroller.remove_from_session(basecontroller.KEY_BURST_CONFIG)
-        basecontroller.remove_from_session(basecontroller.KEY_CACHED_SIMULATOR_TREE)
         basecontroller.set_info_message("Thank you for using The Virtual Brain!")
         raise cherrypy.HTTPRedirect("/user")
 
@@ -356,10 +355,10 @@ class UserController(basecontroller.BaseController):
     def upgrade_file_storage(self):
         """
         Upgrade the file storage to the latest version if needed.
-        Otherwise just return. This is called on user login.
+        Otherwise just return. This is called on user login, and then periodically while the upgrade runs.
         """
         status, message = self.user_service.upgrade_file_storage()
-        return dict(message=message, status=status)
+        return dict(message=message, status=status, running=self.user_service.is_file_storage_upgrading())
 
 
     @cherrypy.expose
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Send stored data to the browser, with HTTP caching.
+
+The content under a DataType GID never changes: responses built from it are given a strong ETag and a long
+cache lifetime. Stored files (figures, exports) can be replaced under the same path, so their responses are
+identified by path, size and modification time, and always revalidated by the browser with If-None-Match:
+when unchanged, a 304 is sent instead of the same data again.
+"""
+
+import os
+import json
+import hashlib
+import mimetypes
+import cherrypy
+from cherrypy.lib.static import serve_file
+from tvb.basic.config.settings import TVBSettings as cfg
+
+## Responses depend on the logged user's rights, thus they are only kept in the browser cache (private).
+CACHE_MAX_AGE = 30 * 24 * 3600
+## Lifetime for content which can change under the same identifier (e.g. files): revalidate on each use.
+REVALIDATE = 0
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+
+def build_etag(*parts):
+    """
+    :returns: strong ETag for the content identified by parts (e.g. a DataType GID and the attribute read).
+    """
+    return '"%s"' % hashlib.md5(json.dumps(parts, sort_keys=True, default=str)).hexdigest()
+
+
+
+def file_etag(file_path):
+    """
+    :returns: ETag of a stored file, changed when the file is replaced (e.g. a figure name re-used after a remove).
+    """
+    stat = os.stat(file_path)
+    return build_etag(os.path.abspath(file_path), stat.st_size, stat.st_mtime)
+
+
+
+def validate_etag(etag, max_age=CACHE_MAX_AGE):
+    """
+    Set the caching headers of the current response and, when the browser already has this content
+    (If-None-Match), end the request with 304 Not Modified.
+    To be called before any expensive computation of the response.
+    :param max_age: seconds the browser may use the content without asking again; REVALIDATE for mutable content
+    """
+    headers = cherrypy.response.headers
+    headers['ETag'] = etag
+    if max_age > REVALIDATE:
+        headers['Cache-Control'] = 'private, max-age=%d' % max_age
+    else:
+        headers['Cache-Control'] = 'private, max-age=0, must-revalidate'
+    if_none_match = cherrypy.request.headers.get('If-None-Match')
+    if if_none_match:
+        known_tags = [tag.strip() for tag in if_none_match.split(',')]
+        ## Weak validators are enough for If-None-Match (e.g. when a proxy compressed the response).
+        if '*' in known_tags or etag in known_tags or 'W/' + etag in known_tags:
+            raise cherrypy.HTTPRedirect([], 304)
+
+
+
+def discard_etag():
+    """
+    Undo validate_etag, for a response which is not the expected content (e.g. an error).
+    """
+    headers = cherrypy.response.headers
+    headers.pop('ETag', None)
+    headers['Cache-Control'] = 'no-cache'
+
+
+
+def serve_data_file(file_path, content_type=None, disposition=None, name=None, etag=None, use_sendfile=True):
+    """
+    Send a stored file:
+        - 304, when the browser already has it;
+        - only the requested bytes, for Range requests (by CherryPy serve_file);
+        - whole by the front web server, with sendfile, when WEB_SENDFILE_HEADER is configured;
+        - else whole by CherryPy serve_file.
+    The browser revalidates the file on each use, as it can be replaced under the same path.
+    :param etag: when not given, computed from the file path, size and modification time
+    :param use_sendfile: False for files removed at the end of the request (sent after that, by the front server)
+    """
+    file_path = os.path.abspath(file_path)
+    if etag is None:
+        etag = file_etag(file_path)
+    validate_etag(etag, REVALIDATE)
+
+    sendfile_header = cfg.WEB_SENDFILE_HEADER
+    if use_sendfile and sendfile_header and 'Range' not in cherrypy.request.headers:
+        headers = cherrypy.response.headers
+        headers['Content-Type'] = content_type or mimetypes.guess_type(file_path)[0] or DEFAULT_CONTENT_TYPE
+        if disposition is not None:
+            headers['Content-Disposition'] = '%s; filename="%s"' % (disposition, name or os.path.basename(file_path))
+        headers[sendfile_header] = file_path
+        return ""
+    return serve_file(file_path, content_type, disposition, name)
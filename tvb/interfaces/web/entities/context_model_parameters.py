@@ -32,6 +32,7 @@
 .. moduleauthor:: Ionel Ortelecan <ionel.ortelecan@codemart.ro>
 """
 
+import json
 import numpy
 import tvb.basic.traits.parameters_factory as parameters_factory
 import tvb.simulator.models as models_module
@@ -39,7 +40,7 @@ from copy import deepcopy
 from tvb.basic.traits.core import Type
 from tvb.core.adapters.abcadapter import KEY_EQUATION, KEY_FOCAL_POINTS, KEY_SURFACE_GID, ABCAdapter
 from tvb.datatypes.equations import SpatialApplicableEquation, Gaussian
-from tvb.adapters.visualizers.phase_plane_interactive import PhasePlaneInteractive
+from tvb.adapters.visualizers.phase_plane import PhasePlane
 from tvb.interfaces.web.entities.context_spatial import BaseSpatialContext
 
 
@@ -51,7 +52,7 @@ class ContextModelParameters(BaseSpatialContext):
     """
     This class behaves like a controller. The model for this controller will
     be the fields defined into the init method and the view is represented
-    by a PhasePlaneInteractive instance.
+    by a PhasePlane instance, drawn in the browser.
 
     This class may also be used into the desktop application.
     """
@@ -64,8 +65,16 @@ class ContextModelParameters(BaseSpatialContext):
 
         model = self._get_model_for_region(0)
         if compute_phase_plane_params:
-            self._phase_plane = PhasePlaneInteractive(deepcopy(model), deepcopy(self.default_integrator))
-            self.phase_plane_params = self._phase_plane.draw_phase_plane()
+            self._phase_plane = PhasePlane(deepcopy(model), deepcopy(self.default_integrator))
+            self.phase_plane_params = dict(phasePlaneSettings=json.dumps(self._phase_plane.get_settings()))
+
+
+    @property
+    def phase_plane(self):
+        """
+        Phase-plane computations for the model of the currently selected connectivity node.
+        """
+        return self._phase_plane
 
 
     @property
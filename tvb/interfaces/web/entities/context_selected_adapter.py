@@ -36,6 +36,7 @@ It will store in current user's session information about
 """
 
 import tvb.interfaces.web.controllers.base_controller as base
+from tvb.core.services.flow_service import FlowService
 
 
 class SelectedAdapterContext(object):
@@ -45,6 +46,7 @@ class SelectedAdapterContext(object):
     
     KEY_CURRENT_ADAPTER_INFO = "currentAdapterInfo"
     _KEY_INPUT_TREE = "inputList"
+    _KEY_TREE_PROJECT = "inputListProject"
     _KEY_CURRENT_STEP = "currentStepCategoryId"
     _KEY_CURRENT_SUBSTEP = "currentAlgoGroupId"
     _KEY_SELECTED_DATA = 'defaultData'
@@ -69,11 +71,23 @@ class SelectedAdapterContext(object):
             adapter_info[self._KEY_SELECTED_DATA] = default_data
         if input_tree is not None:
             adapter_info[self._KEY_INPUT_TREE] = input_tree
+            adapter_info.pop(self._KEY_TREE_PROJECT, None)
         if algo_group is not None:
             adapter_info[self._KEY_CURRENT_STEP] = algo_group.fk_category 
             adapter_info[self._KEY_CURRENT_SUBSTEP] = algo_group.id 
                 
         base.add2session(self.KEY_CURRENT_ADAPTER_INFO, adapter_info)
+
+
+    def add_project_adapter_to_session(self, algo_group, project_id, default_data=None):
+        """
+        Same as add_adapter_to_session, for an adapter whose input tree is shared by all the users of a project
+        (FlowService.get_project_input_tree): only the project is kept in session, not the tree.
+        """
+        self.add_adapter_to_session(algo_group, None, default_data)
+        adapter_info = base.get_from_session(self.KEY_CURRENT_ADAPTER_INFO)
+        adapter_info.pop(self._KEY_INPUT_TREE, None)
+        adapter_info[self._KEY_TREE_PROJECT] = project_id
      
      
     def add_portlet_to_session(self, portlet_interface):
@@ -90,10 +104,17 @@ class SelectedAdapterContext(object):
     def get_current_input_tree(self):
         """
         Get from session previously selected InputTree.
+        For a tree shared per project, the (not filled) shared tree is returned.
         """
         full_description = base.get_from_session(self.KEY_CURRENT_ADAPTER_INFO)
-        if full_description is not None and self._KEY_INPUT_TREE in full_description:
+        if full_description is None:
+            return None
+        if self._KEY_INPUT_TREE in full_description:
             return full_description[self._KEY_INPUT_TREE]
+        if self._KEY_TREE_PROJECT in full_description and self._KEY_CURRENT_SUBSTEP in full_description:
+            flow_service = FlowService()
+            algo_group = flow_service.get_algo_group_by_identifier(full_description[self._KEY_CURRENT_SUBSTEP])
+            return flow_service.get_project_input_tree(full_description[self._KEY_TREE_PROJECT], algo_group)
         return None
     
     def get_session_tree_for_key(self, tree_session_key):
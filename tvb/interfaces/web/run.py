@@ -37,6 +37,7 @@ Launches the web server and configure the controllers for UI.
 import os
 import sys
 import cherrypy
+import threading
 import webbrowser
 from copy import copy
 from cherrypy import Tool
@@ -62,8 +63,9 @@ from tvb.core.decorators import user_environment_execution
 from tvb.core.services.settings_service import SettingsService
 from tvb.core.services.initializer import initialize, reset
 from tvb.core.services.exceptions import InvalidSettingsException
+from tvb.core.entities.file.files_update_manager import FilesUpdateManager
 from tvb.interfaces.web.request_handler import RequestHandler
-from tvb.interfaces.web.controllers.base_controller import BaseController
+from tvb.interfaces.web.controllers.base_controller import BaseController, precompile_templates
 from tvb.interfaces.web.controllers.users_controller import UserController
 from tvb.interfaces.web.controllers.help.help_controller import HelpController
 from tvb.interfaces.web.controllers.project.project_controller import ProjectController
@@ -86,6 +88,7 @@ from tvb.interfaces.web.controllers.api.simulator_controller import SimulatorCon
 LOGGER = get_logger('tvb.interface.web.run')
 CONFIG_EXISTS = not SettingsService.is_first_run()
 PARAM_RESET_DB = "reset"
+PARAM_PRECOMPILE_TEMPLATES = "precompile_templates"
 
 ### Ensure Python is using UTF-8 encoding.
 ### While running distribution/console, default encoding is ASCII
@@ -150,12 +153,19 @@ def start_tvb(arguments):
         reset()
         arguments.remove(PARAM_RESET_DB)
 
+    precompile = PARAM_PRECOMPILE_TEMPLATES in arguments
+    if precompile:
+        arguments.remove(PARAM_PRECOMPILE_TEMPLATES)
+
     if not os.path.exists(TVBSettings.TVB_STORAGE):
         try:
             os.makedirs(TVBSettings.TVB_STORAGE)
         except Exception:
             sys.exit("You do not have enough rights to use TVB storage folder:" + str(TVBSettings.TVB_STORAGE))
 
+    ##### Fork the processes for a pending file storage upgrade while this is still the only thread
+    FilesUpdateManager.prepare_upgrade_pool()
+
     try:
         initialize(arguments)
     except InvalidSettingsException, excep:
@@ -168,6 +178,12 @@ def start_tvb(arguments):
 
     init_cherrypy(arguments)
 
+    if precompile:
+        ##### Fill the templates cache in background, not to delay the first page
+        precompile_thread = threading.Thread(target=precompile_templates)
+        precompile_thread.daemon = True
+        precompile_thread.start()
+
     run_browser()
 
     ## Launch CherryPy loop forever.
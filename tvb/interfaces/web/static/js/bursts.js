@@ -122,9 +122,9 @@ function loadBurstHistory() {
 }
 
 /*
- * Periodically look for updates in burst history status and update their classes accordingly.
+ * Collect the ids of the bursts still marked as running in the history column.
  */
-function updateBurstHistoryStatus() {
+function _getRunningBurstIds() {
 	
 	var burst_ids = [];
 	$("#burst-history li").each(function (listItem) {
@@ -135,6 +135,16 @@ function updateBurstHistoryStatus() {
 			}
 		}
 	});
+	return burst_ids;
+}
+
+/*
+ * Read from DB the status of the running bursts in history, and update their classes accordingly.
+ * Used periodically only as fallback, when the server can not push status changes.
+ */
+function updateBurstHistoryStatus() {
+	
+	var burst_ids = _getRunningBurstIds();
 	if (burst_ids.length > 0) {
 		$.ajax({  	
 			type: "POST", 
@@ -164,8 +174,74 @@ function updateBurstHistoryStatus() {
 	}
 }
 
+// Becomes false when the server does not answer to status-change requests; we then poll the DB status.
+var STATUS_PUSH_SUPPORTED = true;
+// After this many status-change requests, the DB status is read once, for changes not seen by the server
+// process (e.g. operations finished on a cluster node).
+var STATUS_RECONCILE_CYCLES = 10;
+var statusListenerActive = false;
+var lastStatusSequence = -1;
+
+/*
+ * Wait on the server for status changes of the running bursts in history.
+ * Stops when no burst is running anymore, and it gets restarted by the next history reload.
+ */
+function waitForStatusUpdates(cycle) {
+	
+	if (document.getElementById('burst-history') == null || _getRunningBurstIds().length == 0) {
+		statusListenerActive = false;
+		return;
+	}
+	if (cycle >= STATUS_RECONCILE_CYCLES) {
+		statusListenerActive = false;
+		updateBurstHistoryStatus();
+		return;
+	}
+	var requestStart = new Date().getTime();
+	$.ajax({
+		type: "POST",
+		data: {'last_sequence' : lastStatusSequence},
+		url: '/burst/get_status_updates',
+        success: function(r) {
+        		var result = $.parseJSON(r);
+        		var firstRequest = (lastStatusSequence < 0);
+        		lastStatusSequence = result.sequence;
+        		if (!result.complete) {
+        			statusListenerActive = false;
+        			updateBurstHistoryStatus();
+        			return;
+        		}
+        		var finalStatusReceived = false;
+        		var changedStatusOnCurrentBurst = false;
+        		for (var i = 0; i < result.events.length; i++) {
+        			var event = result.events[i];
+        			if (event.type == 'burst' && event.status != 'running') {
+        				finalStatusReceived = true;
+        				if (event.id == sessionStoredBurst.id) {
+        					changedStatusOnCurrentBurst = true;
+        				}
+        			}
+        		}
+        		if (finalStatusReceived) {
+        			statusListenerActive = false;
+        			scheduleNewUpdate(true, changedStatusOnCurrentBurst);
+        			return;
+        		}
+        		// An immediate empty answer means too many clients are already waiting on the server.
+        		var delay = (firstRequest || new Date().getTime() - requestStart > 1000) ? 0 : 5000;
+        		setTimeout(function () { waitForStatusUpdates(cycle + 1); }, delay);
+        	},
+        error: function(r) {
+        		STATUS_PUSH_SUPPORTED = false;
+        		statusListenerActive = false;
+        		scheduleNewUpdate(false);
+        }
+	});
+}
+
 /**
- * Schedule burst-history section update, in the next 5 seconds.
+ * Schedule burst-history section update: wait for pushed status changes, or fall back to reading
+ * the status in the next 5 seconds.
  * If "withFullUpdate" is true, then a full history section replacement happens before the periodical update.
  */
 function scheduleNewUpdate(withFullUpdate, refreshCurrent) {
@@ -176,6 +252,11 @@ function scheduleNewUpdate(withFullUpdate, refreshCurrent) {
     		if (refreshCurrent) {
     			loadBurst(sessionStoredBurst.id);
     		}
+    	} else if (STATUS_PUSH_SUPPORTED) {
+    		if (!statusListenerActive) {
+    			statusListenerActive = true;
+    			waitForStatusUpdates(0);
+    		}
     	} else {
     		setTimeout("updateBurstHistoryStatus()", 5000);
     	}
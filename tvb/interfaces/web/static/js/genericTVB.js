@@ -820,18 +820,30 @@ function showHelpOverlay(section, subsection) {
 
 
 /**
- * Function that opens a loading overlay until the file storage update is done.
+ * Period (ms) between checks of a file storage upgrade running in background.
+ */
+var FILE_STORAGE_UPGRADE_POLL = 30 * 1000;
+
+/**
+ * Starts the file storage update (if needed). The update runs in background on the server,
+ * so we only poll for its outcome and display it when done.
  */
 function upgradeFileStorage() {
-	doAjaxCall({	
-					overlay_timeout: 60 * 1000 * 60 * 4, //Timeout of 4 hours
-					overlay_data: {'message_data': "Due to upgrade from pytables to h5py we need to update all your stored data. Please be patient and don't close TVB during the process."},
+	doAjaxCall({
 	                type:'GET',
 	                url:'/user/upgrade_file_storage',
 	                success:function (data) {
 	                	var result = $.parseJSON(data);
 	                	var message = result['message'];
 	                	var status = result['status'];
+	                	if (result['running']) {
+	                		if (message.length > 0 && !upgradeFileStorage.notified) {
+	                			displayMessage(message, "infoMessage");
+	                			upgradeFileStorage.notified = true;
+	                		}
+	                		setTimeout(upgradeFileStorage, FILE_STORAGE_UPGRADE_POLL);
+	                		return;
+	                	}
 	                	if (message.length > 0) {
 	                		if (status == true) {
 	                			displayMessage(message, "infoMessage");
@@ -839,10 +851,8 @@ function upgradeFileStorage() {
 	                			displayMessage(message, "errorMessage");
 	                		}
  	                	}
-            			closeBlockerOverlay();
 	               },
 	               error:function (r) {
-            			closeBlockerOverlay();
             			displayMessage("An unexpected error occured during update.", 'errorMessage');
 	        		}
 	            });
@@ -964,4 +974,35 @@ function checkArg(arg, def) {
 	return ( typeof arg == 'undefined' ? def : arg);
 }
 
-// -------------End AJAX Calls----------------------------------
\ No newline at end of file
+// -------------End AJAX Calls----------------------------------
+/**
+ * Decode a base64 data URL into an ArrayBuffer.
+ */
+function decodeDataURLBuffer(dataURL) {
+	var binary = atob(dataURL.substring(dataURL.indexOf(',') + 1));
+	var bytes = new Uint8Array(binary.length);
+	for (var i = 0; i < binary.length; i++) {
+		bytes[i] = binary.charCodeAt(i);
+	}
+	return bytes.buffer;
+}
+
+/**
+ * Decode a base64 data URL of little-endian float32 values (see float32_data_url in tvb/core/utils.py).
+ * A plain Array is returned, as d3 and tv.ndar expect one.
+ */
+function decodeFloat32DataURL(dataURL) {
+	return Array.prototype.slice.call(new Float32Array(decodeDataURLBuffer(dataURL)));
+}
+
+/**
+ * Decode a base64 data URL of float32 (x, y) pairs, into the [[x, y], ...] points expected by FLOT.
+ */
+function decodeFloat32PointsDataURL(dataURL) {
+	var values = new Float32Array(decodeDataURLBuffer(dataURL));
+	var points = [];
+	for (var i = 0; i + 1 < values.length; i += 2) {
+		points.push([values[i], values[i + 1]]);
+	}
+	return points;
+}
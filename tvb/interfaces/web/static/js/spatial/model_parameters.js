@@ -68,7 +68,9 @@ function _drawSlider(name, minValue, maxValue, stepValue, defaultValue) {
 	                async:false,
 	                type:'GET',
 	                url:'/spatial/modelparameters/regions/update_model_parameter_for_nodes/' + name + '/' + newValue + '/' + $.toJSON(GVAR_interestAreaNodeIndexes),
-	                success:function (data) { }
+	                success:function (data) {
+	                    _refreshPhasePlane();
+	                }
 	            });
 			}
         }
@@ -76,6 +78,16 @@ function _drawSlider(name, minValue, maxValue, stepValue, defaultValue) {
 }
 
 
+/**
+ * The phase-plane (phase_plane.js) is only included for region models.
+ */
+function _refreshPhasePlane() {
+    if (typeof PP_refresh == 'function') {
+        PP_refresh();
+    }
+}
+
+
 /**
  * @param parentDivId the id of the div in which are drawn the model parameters sliders
  */
@@ -89,6 +101,7 @@ function MP_resetParamSliders(parentDivId) {
                 var parentDiv = $("#" + parentDivId);
                 parentDiv.empty();
                 parentDiv.append(data);
+                _refreshPhasePlane();
             }
         });
     }
@@ -104,6 +117,7 @@ function _loadModelForConnectivityNode(connectivityNodeIndex, paramSlidersDivId)
                 var paramSlidersDiv = $("#" + paramSlidersDivId);
                 paramSlidersDiv.empty();
                 paramSlidersDiv.append(data);
+                _refreshPhasePlane();
             }
         });
     }
@@ -0,0 +1,439 @@
+/**
+ * TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+ * Web-UI helpful to run brain-simulations. To use it, you also need do download
+ * TheVirtualBrain-Scientific Package (for simulators). See content of the
+ * documentation-folder for more details. See also http://www.thevirtualbrain.org
+ *
+ * (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+ *
+ * This program is free software; you can redistribute it and/or modify it under 
+ * the terms of the GNU General Public License version 2 as published by the Free
+ * Software Foundation. This program is distributed in the hope that it will be
+ * useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+ * License for more details. You should have received a copy of the GNU General 
+ * Public License along with this program; if not, you can download it here
+ * http://www.gnu.org/licenses/old-licenses/gpl-2.0
+ *
+ **/
+
+/*
+ * Phase-plane for the model of the selected connectivity node. The server only computes the vector field
+ * (sent as binary float32 values), the nullcline segments and the trajectories; everything is drawn here.
+ * Function names are prefixed with PP_ so they do not collide with base_spatial.js or model_parameters.js.
+ */
+
+var PP_URL_PREFIX = '/spatial/modelparameters/regions/';
+var PP_MARGIN = 40;
+var PP_NULLCLINE_COLORS = {'x': '#cc0000', 'y': '#00aa00'};
+var PP_TRAJECTORY_COLOR = '#0000cc';
+
+var _PP_settings = null;
+/** Starting points for trajectories, kept so that they get recomputed when the plane changes. */
+var _PP_startingPoints = [];
+var _PP_field = null;
+var _PP_nullclines = null;
+var _PP_trajectories = [];
+
+
+/**
+ * Fill in the controls and draw the phase-plane for the given settings, as computed by PhasePlane.get_settings.
+ */
+function PP_init(settings) {
+    _PP_settings = settings;
+    _PP_startingPoints = [];
+    _PP_trajectories = [];
+
+    var svSelects = [$("#pp_svx"), $("#pp_svy")];
+    for (var i = 0; i < svSelects.length; i++) {
+        svSelects[i].empty();
+        for (var j = 0; j < settings.state_variables.length; j++) {
+            svSelects[i].append(new Option(settings.state_variables[j], settings.state_variables[j]));
+        }
+    }
+    var modeSelect = $("#pp_mode");
+    modeSelect.empty();
+    for (var mode = 0; mode < settings.number_of_modes; mode++) {
+        modeSelect.append(new Option(mode, mode));
+    }
+
+    _PP_drawStateSliders();
+    _PP_updateControls();
+    $("#pp_canvas").unbind('click').click(_PP_onCanvasClick);
+    PP_refresh();
+}
+
+
+/**
+ * Recompute and redraw everything, e.g. after a model parameter was changed.
+ */
+function PP_refresh() {
+    if (_PP_settings == null) {
+        return;
+    }
+    var mode = _PP_getMode();
+    var request = new XMLHttpRequest();
+    request.open('GET', PP_URL_PREFIX + 'get_phase_plane_field?mode=' + mode, true);
+    request.responseType = 'arraybuffer';
+    request.onload = function () {
+        if (request.status == 200) {
+            _PP_field = _PP_parseField(new Float32Array(request.response));
+            _PP_draw();
+        }
+    };
+    request.send();
+
+    doAjaxCall({
+        type: 'GET',
+        url: PP_URL_PREFIX + 'get_phase_plane_nullclines?mode=' + mode,
+        success: function (data) {
+            _PP_nullclines = $.parseJSON(data);
+            _PP_draw();
+        }
+    });
+    _PP_computeTrajectories(_PP_startingPoints);
+}
+
+
+function PP_changeAxes() {
+    _PP_submitSettings({svx: $("#pp_svx").val(), svy: $("#pp_svy").val()}, true);
+}
+
+
+function PP_changeMode() {
+    PP_refresh();
+}
+
+
+function PP_changeRanges() {
+    var xRange = [parseFloat($("#pp_x_min").val()), parseFloat($("#pp_x_max").val())];
+    var yRange = [parseFloat($("#pp_y_min").val()), parseFloat($("#pp_y_max").val())];
+    if (isNaN(xRange[0]) || isNaN(xRange[1]) || isNaN(yRange[0]) || isNaN(yRange[1]) ||
+        xRange[0] >= xRange[1] || yRange[0] >= yRange[1]) {
+        displayMessage("Invalid phase-plane ranges!", "errorMessage");
+        return;
+    }
+    _PP_submitSettings({x_range: $.toJSON(xRange), y_range: $.toJSON(yRange)}, false);
+}
+
+
+function PP_resetAxes() {
+    _PP_submitSettings({reset_axes: 'true'}, false);
+}
+
+
+function PP_resetStateVariables() {
+    var stateValues = {};
+    for (var sv in _PP_settings.default_ranges) {
+        var range = _PP_settings.default_ranges[sv];
+        stateValues[sv] = (range[0] + range[1]) / 2.0;
+    }
+    _PP_submitSettings({state_values: $.toJSON(stateValues)}, true);
+}
+
+
+function PP_clearTrajectories() {
+    _PP_startingPoints = [];
+    _PP_trajectories = [];
+    _PP_draw();
+    _PP_drawSignals();
+}
+
+
+function _PP_getMode() {
+    var mode = parseInt($("#pp_mode").val());
+    return isNaN(mode) ? 0 : mode;
+}
+
+
+function _PP_submitSettings(parameters, redrawSliders) {
+    doAjaxCall({
+        type: 'POST',
+        url: PP_URL_PREFIX + 'update_phase_plane',
+        data: parameters,
+        success: function (data) {
+            _PP_settings = $.parseJSON(data);
+            if (redrawSliders) {
+                _PP_drawStateSliders();
+            }
+            _PP_updateControls();
+            PP_refresh();
+        }
+    });
+}
+
+
+function _PP_updateControls() {
+    $("#pp_svx").val(_PP_settings.svx);
+    $("#pp_svy").val(_PP_settings.svy);
+    $("#pp_x_min").val(_PP_settings.x_range[0]);
+    $("#pp_x_max").val(_PP_settings.x_range[1]);
+    $("#pp_y_min").val(_PP_settings.y_range[0]);
+    $("#pp_y_max").val(_PP_settings.y_range[1]);
+}
+
+
+/**
+ * One slider for each state variable that is not on the axes, and one for the noise when the
+ * integrator is stochastic. Values are sent on slider change only, not while dragging.
+ */
+function _PP_drawStateSliders() {
+    var table = $("#pp_state_variables");
+    table.find("tr.pp_slider_row").remove();
+    for (var sv in _PP_settings.state_values) {
+        if (sv == _PP_settings.svx || sv == _PP_settings.svy) {
+            continue;
+        }
+        var limits = _PP_settings.default_ranges[sv];
+        _PP_addSlider(table, sv, limits[0], limits[1], _PP_settings.state_values[sv], function (name, value) {
+            var stateValues = {};
+            stateValues[name] = value;
+            _PP_submitSettings({state_values: $.toJSON(stateValues)}, false);
+        });
+    }
+    if (_PP_settings.noise != undefined) {
+        _PP_addSlider(table, 'noise', 0, Math.max(1.0, 2 * _PP_settings.noise), _PP_settings.noise,
+                      function (name, value) {
+                          _PP_submitSettings({noise: value}, false);
+                      });
+    }
+}
+
+
+function _PP_addSlider(table, name, minValue, maxValue, value, onChange) {
+    var sliderId = 'pp_slider_' + name;
+    var row = $('<tr class="pp_slider_row"><td>' + name + '</td><td><div id="' + sliderId + '"></div></td>' +
+                '<td><span id="' + sliderId + '_value">' + value + '</span></td></tr>');
+    table.append(row);
+    $("#" + sliderId).slider({
+        value: value,
+        min: minValue,
+        max: maxValue,
+        step: (maxValue - minValue) / 100.0,
+        change: function (event, ui) {
+            $("#" + sliderId + "_value").text(ui.value);
+            onChange(name, ui.value);
+        }
+    });
+}
+
+
+/**
+ * The binary field holds, in order: the grid positions on x, the grid positions on y,
+ * then the derivatives along x and along y, with y on rows and x on columns.
+ */
+function _PP_parseField(values) {
+    var n = _PP_settings.grid_points;
+    return {x: values.subarray(0, n),
+            y: values.subarray(n, 2 * n),
+            u: values.subarray(2 * n, 2 * n + n * n),
+            v: values.subarray(2 * n + n * n, 2 * n + 2 * n * n)};
+}
+
+
+function _PP_toCanvas(canvas, x, y) {
+    var xRange = _PP_settings.x_range, yRange = _PP_settings.y_range;
+    var width = canvas.width - 2 * PP_MARGIN, height = canvas.height - 2 * PP_MARGIN;
+    return [PP_MARGIN + (x - xRange[0]) / (xRange[1] - xRange[0]) * width,
+            canvas.height - PP_MARGIN - (y - yRange[0]) / (yRange[1] - yRange[0]) * height];
+}
+
+
+function _PP_fromCanvas(canvas, px, py) {
+    var xRange = _PP_settings.x_range, yRange = _PP_settings.y_range;
+    var width = canvas.width - 2 * PP_MARGIN, height = canvas.height - 2 * PP_MARGIN;
+    return [xRange[0] + (px - PP_MARGIN) / width * (xRange[1] - xRange[0]),
+            yRange[0] + (canvas.height - PP_MARGIN - py) / height * (yRange[1] - yRange[0])];
+}
+
+
+function _PP_draw() {
+    var canvas = document.getElementById("pp_canvas");
+    if (canvas == null || _PP_settings == null) {
+        return;
+    }
+    var ctx = canvas.getContext('2d');
+    ctx.clearRect(0, 0, canvas.width, canvas.height);
+    _PP_drawAxes(canvas, ctx);
+    ctx.save();
+    ctx.beginPath();
+    ctx.rect(PP_MARGIN, PP_MARGIN, canvas.width - 2 * PP_MARGIN, canvas.height - 2 * PP_MARGIN);
+    ctx.clip();
+    if (_PP_field != null) {
+        _PP_drawQuiver(canvas, ctx);
+    }
+    if (_PP_nullclines != null) {
+        for (var axis in PP_NULLCLINE_COLORS) {
+            _PP_drawSegments(canvas, ctx, _PP_nullclines[axis], PP_NULLCLINE_COLORS[axis]);
+        }
+    }
+    _PP_drawTrajectories(canvas, ctx);
+    ctx.restore();
+}
+
+
+function _PP_drawAxes(canvas, ctx) {
+    ctx.strokeStyle = '#000000';
+    ctx.lineWidth = 1;
+    ctx.strokeRect(PP_MARGIN, PP_MARGIN, canvas.width - 2 * PP_MARGIN, canvas.height - 2 * PP_MARGIN);
+    ctx.fillStyle = '#000000';
+    ctx.font = '11px sans-serif';
+    ctx.textAlign = 'center';
+    var xRange = _PP_settings.x_range, yRange = _PP_settings.y_range;
+    ctx.fillText(xRange[0].toPrecision(3), PP_MARGIN, canvas.height - PP_MARGIN + 14);
+    ctx.fillText(xRange[1].toPrecision(3), canvas.width - PP_MARGIN, canvas.height - PP_MARGIN + 14);
+    ctx.fillText(_PP_settings.svx, canvas.width / 2, canvas.height - 8);
+    ctx.textAlign = 'right';
+    ctx.fillText(yRange[0].toPrecision(3), PP_MARGIN - 4, canvas.height - PP_MARGIN);
+    ctx.fillText(yRange[1].toPrecision(3), PP_MARGIN - 4, PP_MARGIN + 10);
+    ctx.save();
+    ctx.translate(12, canvas.height / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.textAlign = 'center';
+    ctx.fillText(_PP_settings.svy, 0, 0);
+    ctx.restore();
+}
+
+
+/**
+ * Arrows are drawn normalised to the grid cell size, and coloured by the magnitude of the derivative.
+ */
+function _PP_drawQuiver(canvas, ctx) {
+    var n = _PP_settings.grid_points;
+    var cell = Math.min(canvas.width - 2 * PP_MARGIN, canvas.height - 2 * PP_MARGIN) / n;
+    var maxMagnitude = 0;
+    var i, magnitude;
+    for (i = 0; i < n * n; i++) {
+        magnitude = Math.sqrt(_PP_field.u[i] * _PP_field.u[i] + _PP_field.v[i] * _PP_field.v[i]);
+        if (isFinite(magnitude) && magnitude > maxMagnitude) {
+            maxMagnitude = magnitude;
+        }
+    }
+    ctx.lineWidth = 1;
+    for (var row = 0; row < n; row++) {
+        for (var col = 0; col < n; col++) {
+            i = row * n + col;
+            var start = _PP_toCanvas(canvas, _PP_field.x[col], _PP_field.y[row]);
+            var scaleX = _PP_toCanvas(canvas, _PP_field.x[col] + _PP_field.u[i], 0)[0] - start[0];
+            var scaleY = _PP_toCanvas(canvas, 0, _PP_field.y[row] + _PP_field.v[i])[1] -
+                         _PP_toCanvas(canvas, 0, _PP_field.y[row])[1];
+            var length = Math.sqrt(scaleX * scaleX + scaleY * scaleY);
+            if (!isFinite(length) || length == 0) {
+                continue;
+            }
+            magnitude = Math.sqrt(_PP_field.u[i] * _PP_field.u[i] + _PP_field.v[i] * _PP_field.v[i]);
+            var intensity = maxMagnitude > 0 ? Math.round(200 * (1 - magnitude / maxMagnitude)) : 200;
+            ctx.strokeStyle = 'rgb(' + intensity + ',' + intensity + ',' + intensity + ')';
+            var dx = 0.8 * cell * scaleX / length, dy = 0.8 * cell * scaleY / length;
+            var end = [start[0] + dx, start[1] + dy];
+            ctx.beginPath();
+            ctx.moveTo(start[0], start[1]);
+            ctx.lineTo(end[0], end[1]);
+            ctx.lineTo(end[0] - 0.3 * dx + 0.2 * dy, end[1] - 0.3 * dy - 0.2 * dx);
+            ctx.moveTo(end[0], end[1]);
+            ctx.lineTo(end[0] - 0.3 * dx - 0.2 * dy, end[1] - 0.3 * dy + 0.2 * dx);
+            ctx.stroke();
+        }
+    }
+}
+
+
+function _PP_drawSegments(canvas, ctx, segments, color) {
+    ctx.strokeStyle = color;
+    ctx.lineWidth = 2;
+    ctx.beginPath();
+    for (var i = 0; i < segments.length; i++) {
+        var start = _PP_toCanvas(canvas, segments[i][0], segments[i][1]);
+        var end = _PP_toCanvas(canvas, segments[i][2], segments[i][3]);
+        ctx.moveTo(start[0], start[1]);
+        ctx.lineTo(end[0], end[1]);
+    }
+    ctx.stroke();
+}
+
+
+function _PP_svIndex(name) {
+    return $.inArray(name, _PP_settings.state_variables);
+}
+
+
+function _PP_drawTrajectories(canvas, ctx) {
+    var xIdx = _PP_svIndex(_PP_settings.svx), yIdx = _PP_svIndex(_PP_settings.svy);
+    ctx.strokeStyle = PP_TRAJECTORY_COLOR;
+    ctx.fillStyle = PP_TRAJECTORY_COLOR;
+    ctx.lineWidth = 1.5;
+    for (var t = 0; t < _PP_trajectories.length; t++) {
+        var trajectory = _PP_trajectories[t];
+        ctx.beginPath();
+        var penDown = false;
+        for (var step = 0; step < trajectory.length; step++) {
+            var x = trajectory[step][xIdx], y = trajectory[step][yIdx];
+            if (x == null || y == null) {
+                penDown = false;
+                continue;
+            }
+            var point = _PP_toCanvas(canvas, x, y);
+            if (penDown) {
+                ctx.lineTo(point[0], point[1]);
+            } else {
+                ctx.moveTo(point[0], point[1]);
+                penDown = true;
+            }
+        }
+        ctx.stroke();
+        if (trajectory.length > 0 && trajectory[0][xIdx] != null) {
+            var origin = _PP_toCanvas(canvas, trajectory[0][xIdx], trajectory[0][yIdx]);
+            ctx.fillRect(origin[0] - 2, origin[1] - 2, 4, 4);
+        }
+    }
+}
+
+
+/**
+ * Time-series of all state variables, for the trajectories currently shown.
+ */
+function _PP_drawSignals() {
+    var series = [];
+    var dt = _PP_settings.dt;
+    for (var t = 0; t < _PP_trajectories.length; t++) {
+        for (var sv = 0; sv < _PP_settings.state_variables.length; sv++) {
+            var data = [];
+            for (var step = 0; step < _PP_trajectories[t].length; step++) {
+                data.push([step * dt, _PP_trajectories[t][step][sv]]);
+            }
+            series.push({data: data, label: t == 0 ? _PP_settings.state_variables[sv] : null, color: sv});
+        }
+    }
+    $.plot($("#pp_signals"), series, {legend: {position: 'ne'}, xaxis: {axisLabel: 'Time (ms)'}});
+}
+
+
+function _PP_computeTrajectories(startingPoints) {
+    if (startingPoints.length == 0) {
+        _PP_trajectories = [];
+        _PP_drawSignals();
+        return;
+    }
+    doAjaxCall({
+        type: 'POST',
+        url: PP_URL_PREFIX + 'get_phase_plane_trajectories',
+        data: {starting_points: $.toJSON(startingPoints), mode: _PP_getMode()},
+        success: function (data) {
+            _PP_trajectories = $.parseJSON(data);
+            _PP_draw();
+            _PP_drawSignals();
+        }
+    });
+}
+
+
+function _PP_onCanvasClick(event) {
+    var canvas = this;
+    var offset = $(canvas).offset();
+    var px = event.pageX - offset.left, py = event.pageY - offset.top;
+    if (px < PP_MARGIN || px > canvas.width - PP_MARGIN || py < PP_MARGIN || py > canvas.height - PP_MARGIN) {
+        return;
+    }
+    _PP_startingPoints.push(_PP_fromCanvas(canvas, px, py));
+    _PP_computeTrajectories(_PP_startingPoints);
+}
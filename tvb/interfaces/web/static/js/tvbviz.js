@@ -57,6 +57,14 @@ tv.util = {
             .enter().append("li").classed("instructions", true).text(function (d) {
                 return d
             });
+    }
+
+    // label of the nodes averaged in entry idx of an axis reduced from full_size to reduced_size entries
+    // (inverse of matrix_viewer.downsample_matrix), e.g. "12" or "12-15"
+    , block_label: function (idx, reduced_size, full_size) {
+        var lo = Math.floor(idx * full_size / reduced_size)
+            , hi = Math.floor((idx + 1) * full_size / reduced_size) - 1;
+        return hi > lo ? lo + "-" + hi : "" + lo;
     }, ord_nums: [ "zeroeth", "first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth", "eleventh", "twelfth", "thirteenth", "fourteenth", "fifteenth", "sixteenth", "seventeenth", "eighteenth", "nineteenth" ]
 
     /* f is a templater/formatter cf. https://gist.github.com/984375 */, fmt: function (f // fhe format specifier
@@ -469,9 +477,10 @@ tv.plot = {
             // Implement mat_over method set on mat() function
 			mp_pl.mat_over = function() {
 											var callback = function (d, i) {
-														var matShape = f.coh().shape[1];
-														var yVal = Math.floor(i / matShape);
-														var xVal = i % matShape;
+														var matShape = f.coh().shape;
+														var fullShape = f.full_shape() || matShape;
+														var yVal = tv.util.block_label(Math.floor(i / matShape[2]), matShape[1], fullShape[1]);
+														var xVal = tv.util.block_label(i % matShape[2], matShape[2], fullShape[2]);
 									                    f.infoelem().text("Value is " + d + " for Node " + xVal + " x Node " + yVal);
 									               };
 									        return callback;
@@ -511,7 +520,7 @@ tv.plot = {
 								    .text("Hover over nodes for info."));
         }
 
-        f.config_fields = ["f", "coh", "w", "h", "pad", "usage", "infoelem"];
+        f.config_fields = ["f", "coh", "full_shape", "w", "h", "pad", "usage", "infoelem"];
         f.config_fields.forEach(function (name) {
             f[name] = tv.util.gen_access(f, name);
         });
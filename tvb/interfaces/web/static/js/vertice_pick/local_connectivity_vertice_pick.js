@@ -48,15 +48,33 @@ function drawScene() {
 /**
  * Displays a gradient on the surface.
  *
- * @param data_from_server a json object which contains the data needed
- * for drawing a gradient on the surface.
+ * @param data_from_server a json object with the non-zero values of the local connectivity row for the
+ * picked vertex (`indices` and `values`), the number of vertices, the vertex ranges of every display buffer
+ * (`chunks`) and the min / max of the row.
  */
 function LCONN_PICK_updateBrainDrawing(data_from_server) {
     data_from_server = $.parseJSON(data_from_server);
 
-    var data = $.parseJSON(data_from_server['data']);
     var minValue = data_from_server['min_value'];
     var maxValue = data_from_server['max_value'];
+    var chunks = data_from_server['chunks'];
+
+    if (BASE_PICK_brainDisplayBuffers.length != chunks.length) {
+        displayMessage("Could not draw the gradient view. Invalid data received from the server.", "errorMessage");
+        return;
+    }
+
+    // Densify the row once; every display buffer then uses a view on its own range of vertices.
+    var rowValues = new Float32Array(data_from_server['vertex_count']);
+    var indices = data_from_server['indices'];
+    var values = data_from_server['values'];
+    for (var i = 0; i < indices.length; i++) {
+        rowValues[indices[i]] = values[i];
+    }
+    var data = [];
+    for (var j = 0; j < chunks.length; j++) {
+        data.push(rowValues.subarray(chunks[j][0], chunks[j][1]));
+    }
 
     BASE_PICK_initLegendInfo(maxValue, minValue);     // setup the legend
     ColSch_initColorSchemeParams(minValue, maxValue, function() {
@@ -64,12 +82,7 @@ function LCONN_PICK_updateBrainDrawing(data_from_server) {
                                                         _updateBrainColors(data, minValue, maxValue);
                                                         drawScene() });
 
-    if (BASE_PICK_brainDisplayBuffers.length != data.length) {
-        displayMessage("Could not draw the gradient view. Invalid data received from the server.", "errorMessage");
-        return;
-    }
-
-    _updateBrainColors(data_from_server);
+    _updateBrainColors(data, minValue, maxValue);
     drawScene();
     displayMessage("Displaying Local Connectivity profile for selected focal point ..." )
 }
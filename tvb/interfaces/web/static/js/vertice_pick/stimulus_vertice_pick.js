@@ -42,6 +42,7 @@ var currentStimulusData = null;
 var nextStimulusData = null;
 var asyncLoadStarted = false;
 var endReached = false;
+var stimulusVertices = 0;
 
 
 /**
@@ -50,7 +51,8 @@ var endReached = false;
 function STIM_PICK_setVisualizedData(data) {
 
 	BASE_PICK_isMovieMode = true;
-	currentStimulusData = data['data'];
+	stimulusVertices = data['vertices'];
+	currentStimulusData = STIM_PICK_splitTimeSteps(decodeDataURLBuffer(data['data']));
 	minTime = data['time_min'];
 	maxTime = data['time_max'];
 	DATA_CHUNK_SIZE = data['chunk_size'];
@@ -131,17 +133,19 @@ function STIM_PICK_loadNextStimulusChunk() {
 	if ((currentChunkIdx + 1) * DATA_CHUNK_SIZE < (maxTime - minTime)) {
 		// We haven't reached the final chunk so just load it normally.
 		asyncLoadStarted = true;
-		$.ajax({
-			        type:'GET',
-			        url:'/spatial/stimulus/surface/get_stimulus_chunk/' + (currentChunkIdx + 1),
-			        success:function (data) {
-			            nextStimulusData = $.parseJSON(data);
-			            asyncLoadStarted = false;
-			        },
-                    error: function() {
-                        displayMessage("Something went wrong in getting the next stimulus chunk!", "warningMessage")
-                    }
-			    });
+		// Chunks come as binary float32 values (time x vertices), which jQuery can not read.
+		var request = new XMLHttpRequest();
+		request.open('GET', '/spatial/stimulus/surface/get_stimulus_chunk/' + (currentChunkIdx + 1), true);
+		request.responseType = 'arraybuffer';
+		request.onload = function () {
+			if (request.status == 200) {
+				nextStimulusData = STIM_PICK_splitTimeSteps(request.response);
+				asyncLoadStarted = false;
+			} else {
+				displayMessage("Something went wrong in getting the next stimulus chunk!", "warningMessage");
+			}
+		};
+		request.send();
 	} else {
 		// No more chunks to load. Set end of data flat and block the async load by setting
 		// asyncLoadStarted to true so no more calls to loadNextStimulusChunk are done for this data.
@@ -150,6 +154,18 @@ function STIM_PICK_loadNextStimulusChunk() {
 	}
 }
 
+/**
+ * Split a buffer of float32 stimulus values (time x vertices) into one Float32Array per time step.
+ */
+function STIM_PICK_splitTimeSteps(buffer) {
+	var values = new Float32Array(buffer);
+	var steps = [];
+	for (var start = 0; stimulusVertices > 0 && start < values.length; start += stimulusVertices) {
+		steps.push(values.subarray(start, start + stimulusVertices));
+	}
+	return steps;
+}
+
 /**
  * Function called every TICK_STEP milliseconds. This is only done in movie mode.
  */
@@ -191,7 +207,7 @@ function tick() {
 				var upperBorder = BASE_PICK_brainDisplayBuffers[i][0].numItems / 3;
 			    var thisBufferColors = new Float32Array(upperBorder * 4);
 			    var offset_start = i * 40000;
-                getGradientColorArray(thisStepData.slice(offset_start, offset_start + upperBorder),
+                getGradientColorArray(thisStepData.subarray(offset_start, offset_start + upperBorder),
                                       minValue, maxValue, thisBufferColors);
 		    	BASE_PICK_brainDisplayBuffers[i][3] = gl.createBuffer();
 		    	gl.bindBuffer(gl.ARRAY_BUFFER, BASE_PICK_brainDisplayBuffers[i][3]);
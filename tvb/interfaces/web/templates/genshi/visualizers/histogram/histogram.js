@@ -85,7 +85,7 @@ function computeColors(colorsArray) {
 }
 
 function changeColors() {
-    var originalColors = $('#originalColors').val().replace('[','').replace(']','').split(',');
+    var originalColors = decodeFloat32DataURL($('#originalColors').val());
     var newColors = computeColors(originalColors);
     var data = plot.getData();
     for (var i = 0; i < data.length; i++) {
@@ -1,7 +1,13 @@
 // TODO: add legend, labels on axes, color scheme support
 var ctx = null                                                      // the context for drawing on current canvas
 var currentQuadrant, quadrants = []
-var minimumValue, maximumValue, data                                // minimum and maximum for current data slice
+var minimumValue, maximumValue                                      // minimum and maximum for the whole time series
+var volumeShape                                                     // [X, Y, Z] of one time point
+var planes = [null, null, null]                                     // planes[axis]: the slice through the selected
+                                                                    // voxel, orthogonal to axis; see volume_service.py
+var planesUrl, currentTimePoint = 0, pendingRequest = null
+var PLANES_REQUEST_INTERVAL = 50                                    // ms between two planes requests, while dragging
+var loadTimer = null, planesStale = false                           // see scheduleLoadPlanes
 var voxelSize, volumeOrigin                                         // volumeOrigin is not used for now, as in 2D it
                                                                     // is irrelevant; if needed, use it _setQuadrant
 var selectedEntity = [0, 0, 0]                                      // the selected voxel; [i, j, k]
@@ -18,14 +24,15 @@ var Quadrant = function (params) {                                  // this keep
 
 /**
  * Make all the necessary initialisations and draws the default view, with the center voxel selected
- * @param dataUrls  Urls containing data slices from server
- * @param minValue  The minimum value for all the slices
- * @param maxValue  The maximum value for all the slices
+ * @param urlPlanes Url returning (binary float32) the orthogonal planes through a voxel, for a time point
+ * @param shape     The shape of one time point, as JSON [X, Y, Z]
+ * @param minValue  The minimum value for all the time series
+ * @param maxValue  The maximum value for all the time series
  * @param volOrigin The origin of the rendering; irrelevant in 2D, for now
  * @param sizeOfVoxel   How the voxel is sized on each axis; [xScale, yScale, zScale]
  * @param voxelUnit The unit used for this rendering ("mm", "cm" etc)
  */
-function startVisualiser(dataUrls, minValue, maxValue, volOrigin, sizeOfVoxel, voxelUnit) {
+function startVisualiser(urlPlanes, shape, minValue, maxValue, volOrigin, sizeOfVoxel, voxelUnit) {
     var canvas = document.getElementById("volumetric-ts-canvas")
     if (!canvas.getContext) {
         displayMessage('You need a browser with canvas capabilities, to see this demo fully!', "errorMessage")
@@ -41,28 +48,81 @@ function startVisualiser(dataUrls, minValue, maxValue, volOrigin, sizeOfVoxel, v
 
     ctx = canvas.getContext("2d")
 
-    dataUrls = $.parseJSON(dataUrls)
-    data = HLPR_readJSONfromFile(dataUrls[0])
-    data = data[0]                                                  // just the first slice for now
-
-    _rotateData()                                                   // rotate Z axis
-    minimumValue =  9999                                            // compute the minimum on this slice
-    maximumValue = -9999
-    for (var i = 0; i < data.length; ++i)
-        for (var j = 0; j < data[0].length; ++j)
-            for (var k = 0; k < data[0][0].length; ++k)
-                if (data[i][j][k] > maximumValue)
-                    maximumValue = data[i][j][k]
-                else if (data[i][j][k] < minimumValue)
-                    minimumValue = data[i][j][k]
+    planesUrl = urlPlanes
+    volumeShape = $.parseJSON(shape)
+    minimumValue = minValue
+    maximumValue = maxValue
 
     _setupQuadrants()
 
-    selectedEntity[0] = Math.floor(data.length / 2)                 // set the center entity as the selected one
-    selectedEntity[1] = Math.floor(data[0].length / 2)
-    selectedEntity[2] = Math.floor(data[0][0].length / 2)
+    selectedEntity[0] = Math.floor(volumeShape[0] / 2)              // set the center entity as the selected one
+    selectedEntity[1] = Math.floor(volumeShape[1] / 2)
+    selectedEntity[2] = Math.floor(volumeShape[2] / 2)
 
-    drawScene()
+    loadPlanes()
+}
+
+/**
+ * Moves to another time point, keeping the selected voxel
+ */
+function changeTimePoint(timePoint) {
+    currentTimePoint = parseInt(timePoint)
+    loadPlanes()
+}
+
+/**
+ * Reads from server the planes through <code>selectedEntity</code> at <code>currentTimePoint</code>, and redraws.
+ * A request still in progress is cancelled, so that dragging or scrubbing only draws the latest selection.
+ */
+function loadPlanes() {
+    if (pendingRequest !== null)
+        pendingRequest.abort()
+    var request = new XMLHttpRequest()
+    request.open("GET", planesUrl + "/" + currentTimePoint + "/" + selectedEntity[0] + "/" + selectedEntity[1] +
+                        "/" + _rawK(selectedEntity[2]), true)
+    request.responseType = "arraybuffer"
+    request.onload = function () {
+        if (request !== pendingRequest)
+            return
+        if (request.status != 200) {
+            displayMessage("Could not read the volume for time point " + currentTimePoint, "errorMessage")
+            return
+        }
+        var values = new Float32Array(request.response)
+        var sizeI = volumeShape[1] * volumeShape[2], sizeJ = volumeShape[0] * volumeShape[2]
+        planes[0] = values.subarray(0, sizeI)
+        planes[1] = values.subarray(sizeI, sizeI + sizeJ)
+        planes[2] = values.subarray(sizeI + sizeJ)
+        drawScene()
+    }
+    request.onloadend = function () {
+        if (request !== pendingRequest)
+            return
+        pendingRequest = null
+        if (planesStale) {
+            planesStale = false
+            loadPlanes()
+        }
+    }
+    pendingRequest = request
+    request.send()
+}
+
+/**
+ * Reads the planes for the latest selection, while the mouse is dragged: at most one request every
+ * <code>PLANES_REQUEST_INTERVAL</code> ms, and none while another one is in progress (the selection
+ * made meanwhile is read when that one ends).
+ */
+function scheduleLoadPlanes() {
+    if (loadTimer !== null)
+        return
+    loadTimer = setTimeout(function () {
+        loadTimer = null
+        if (pendingRequest !== null)
+            planesStale = true
+        else
+            loadPlanes()
+    }, PLANES_REQUEST_INTERVAL)
 }
 
 // ==================================== DRAWING FUNCTIONS START =============================================
@@ -75,19 +135,20 @@ function drawScene() {
     _setCtxOnQuadrant(0)
     ctx.fillStyle = getGradientColorString(minimumValue, minimumValue, maximumValue)
     ctx.fillRect(0, 0, ctx.canvas.width, ctx.canvas.height)
-    for (var j = 0; j < data[0].length; ++j)
-        for (var i = 0; i < data.length; ++i)
-            drawVoxel(i, j, data[i][j][selectedEntity[2]])
+    var sizeI = volumeShape[0], sizeJ = volumeShape[1], sizeK = volumeShape[2]
+    for (var j = 0; j < sizeJ; ++j)
+        for (var i = 0; i < sizeI; ++i)
+            drawVoxel(i, j, planes[2][i * sizeJ + j])
 
     _setCtxOnQuadrant(1)
-    for (var k = 0; k < data[0][0].length; ++k)
-        for (var j = 0; j < data[0].length; ++j)
-            drawVoxel(k, j, data[selectedEntity[0]][j][k])
+    for (var k = 0; k < sizeK; ++k)
+        for (var j = 0; j < sizeJ; ++j)
+            drawVoxel(k, j, planes[0][j * sizeK + _rawK(k)])
 
     _setCtxOnQuadrant(2)
-    for (var k = 0; k < data[0][0].length; ++k)
-        for (var i = 0; i < data.length; ++i)
-            drawVoxel(k, i, data[i][selectedEntity[1]][k])
+    for (var k = 0; k < sizeK; ++k)
+        for (var i = 0; i < sizeI; ++i)
+            drawVoxel(k, i, planes[1][i * sizeK + _rawK(k)])
     drawNavigator()
 }
 
@@ -149,12 +210,11 @@ function _setCtxOnQuadrant(quadIdx) {
 }
 
 /**
- * Rotates the K axis on the data to get a nice, upright view of the brain
+ * The K axis is drawn reversed, to get a nice, upright view of the brain
+ * @returns the index in data, for the drawn index k
  */
-function _rotateData() {
-    for (var i = 0; i < data.length; ++i)
-        for (var j = 0; j < data[0].length; ++j)
-            data[i][j].reverse()
+function _rawK(k) {
+    return volumeShape[2] - 1 - k
 }
 
 /**
@@ -164,11 +224,7 @@ function _rotateData() {
  * @private
  */
 function _getDataSize(axis) {
-    switch (axis) {
-        case 0:     return data.length
-        case 1:     return data[0].length
-        case 2:     return data[0][0].length
-    }
+    return volumeShape[axis]
 }
 
 /**
@@ -230,9 +286,11 @@ function customMouseMove(e) {
     var selectedEntityOnX = Math.floor((e.offsetX % quadrantWidth) / selectedQuad.entityWidth)
     var selectedEntityOnY = Math.floor((e.offsetY - selectedQuad.offsetY) / selectedQuad.entityHeight)
 
+    if (selectedEntity[selectedQuad.axes.x] == selectedEntityOnX && selectedEntity[selectedQuad.axes.y] == selectedEntityOnY)
+        return
     selectedEntity[selectedQuad.axes.x] = selectedEntityOnX
     selectedEntity[selectedQuad.axes.y] = selectedEntityOnY
-    drawScene()
+    scheduleLoadPlanes()
 }
 
 // ==================================== PICKING RELATED CODE  END  ==========================================
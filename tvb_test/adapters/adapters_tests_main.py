@@ -33,7 +33,8 @@
 """
 
 import unittest
-from tvb_test.adapters.analyzers import timeseries_metrics_adapter_test
+from tvb_test.adapters.analyzers import timeseries_metrics_adapter_test, parallel_helper_test
+from tvb_test.adapters.creators import local_connectivity_engine_test
 from tvb_test.adapters.exporters import exporters_test
 from tvb_test.adapters.simulator import simulator_adapter_test
 from tvb_test.adapters.uploaders import uploaders_tests_main
@@ -46,6 +47,8 @@ def suite():
     """
     test_suite = unittest.TestSuite()
     test_suite.addTest(timeseries_metrics_adapter_test.suite())
+    test_suite.addTest(parallel_helper_test.suite())
+    test_suite.addTest(local_connectivity_engine_test.suite())
     test_suite.addTest(exporters_test.suite())
     test_suite.addTest(simulator_adapter_test.suite())
     test_suite.addTest(uploaders_tests_main.suite())
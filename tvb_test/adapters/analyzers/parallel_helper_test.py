@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the block executor shared by node-wise analyzers.
+"""
+
+import time
+import numpy
+import random
+import threading
+import unittest
+from tvb.adapters.analyzers.parallel_helper import BlockExecutor
+
+
+
+class BlockExecutorTest(unittest.TestCase):
+    """
+    Test ordering, bounding and error propagation of `BlockExecutor`.
+    """
+
+
+    def setUp(self):
+        self.data = numpy.arange(1000.0).reshape((100, 10))
+        self.slices = [(slice(idx * 10, (idx + 1) * 10), slice(None)) for idx in range(10)]
+
+
+    @staticmethod
+    def _slow_sum(block):
+        """Compute function taking a random amount of time, so that blocks finish out of order."""
+        time.sleep(random.random() / 100)
+        return block.sum(axis=0)
+
+
+    def test_results_in_submission_order(self):
+        """
+        Results are returned in the order of the slices, whatever the order in which workers finish.
+        """
+        executor = BlockExecutor(max_workers=4, memory_budget=10 ** 9)
+        results = list(executor.map_blocks(self._slow_sum, self.data.__getitem__, self.slices, block_memory=800))
+        expected = [self.data[block_slice].sum(axis=0) for block_slice in self.slices]
+        self.assertEqual(len(results), len(expected))
+        for result, expected_result in zip(results, expected):
+            self.assertTrue(numpy.all(result == expected_result))
+
+
+    def test_memory_budget_bounds_blocks_in_flight(self):
+        """
+        A budget for a single block forces serial evaluation, read and compute being interleaved.
+        """
+        executor = BlockExecutor(max_workers=4, memory_budget=1000)
+        self.assertEqual(executor.max_blocks_in_flight(800), 1)
+        self.assertEqual(executor.max_blocks_in_flight(10), 8)
+
+        events = []
+        read_function = lambda block_slice: events.append('read') or self.data[block_slice]
+        for _ in executor.map_blocks(self._slow_sum, read_function, self.slices, block_memory=800):
+            events.append('result')
+        self.assertEqual(events, ['read', 'result'] * len(self.slices))
+
+
+    def test_reads_happen_in_calling_thread(self):
+        """
+        Reading is done from the thread consuming the results, computing on worker threads.
+        """
+        caller = threading.current_thread()
+        reading_threads, computing_threads = set(), set()
+
+        def read_function(block_slice):
+            reading_threads.add(threading.current_thread())
+            return self.data[block_slice]
+
+        def compute_function(block):
+            computing_threads.add(threading.current_thread())
+            return self._slow_sum(block)
+
+        executor = BlockExecutor(max_workers=3, memory_budget=10 ** 9)
+        list(executor.map_blocks(compute_function, read_function, self.slices, block_memory=800))
+        self.assertEqual(reading_threads, set([caller]))
+        self.assertFalse(caller in computing_threads)
+
+
+    def test_errors_are_raised_in_caller(self):
+        """
+        An exception raised by a worker is raised again when its result is consumed.
+        """
+        def compute_function(block):
+            if block[0, 0] >= 500:
+                raise ValueError("Invalid block")
+            return block.sum()
+
+        executor = BlockExecutor(max_workers=2, memory_budget=10 ** 9)
+        results = []
+        try:
+            for result in executor.map_blocks(compute_function, self.data.__getitem__, self.slices):
+                results.append(result)
+            self.fail("Exception from worker thread should have been raised")
+        except ValueError:
+            self.assertEqual(len(results), 5)
+
+
+    def test_numpy_error_settings_propagated(self):
+        """
+        Floating point errors raise in workers when the caller configured NumPy to raise.
+        """
+        old_settings = numpy.seterr(divide='raise')
+        try:
+            executor = BlockExecutor(max_workers=2, memory_budget=10 ** 9)
+            blocks = executor.map_blocks(lambda block: block / 0.0, self.data.__getitem__, self.slices)
+            self.assertRaises(FloatingPointError, list, blocks)
+        finally:
+            numpy.seterr(**old_settings)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(BlockExecutorTest))
+    return test_suite
+
+
+
+if __name__ == "__main__":
+    #So you can run tests from this package individually.
+    unittest.main()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the parallel computation of LocalConnectivity distances.
+"""
+
+import numpy
+import gdist
+import unittest
+from tvb.adapters.creators.local_connectivity_engine import LocalConnectivityEngine, spatial_blocks
+
+
+
+class LocalConnectivityEngineTest(unittest.TestCase):
+    """
+    The distances computed in blocks, on reduced meshes, are the ones gdist computes on the whole surface.
+    """
+
+
+    def setUp(self):
+        side = 30
+        grid_x, grid_y = numpy.meshgrid(numpy.arange(side), numpy.arange(side))
+        heights = numpy.random.RandomState(42).rand(side * side) * 0.5
+        self.vertices = numpy.column_stack([grid_x.ravel(), grid_y.ravel(), heights]).astype(numpy.float64)
+        triangles = []
+        for row in range(side - 1):
+            for col in range(side - 1):
+                corner = row * side + col
+                triangles.append([corner, corner + 1, corner + side])
+                triangles.append([corner + 1, corner + side + 1, corner + side])
+        self.triangles = numpy.array(triangles, dtype=numpy.int32)
+        self.expected = gdist.local_gdist_matrix(self.vertices, self.triangles, max_distance=3.0)
+
+
+    def test_spatial_blocks(self):
+        """
+        Every vertex is in exactly one block, and blocks respect the maximum size.
+        """
+        blocks = spatial_blocks(self.vertices, 100)
+        self.assertTrue(all(len(block) <= 100 for block in blocks))
+        self.assertTrue(numpy.array_equal(numpy.sort(numpy.concatenate(blocks)), numpy.arange(len(self.vertices))))
+
+
+    def test_serial_matches_gdist(self):
+        """
+        Blocks evaluated in the calling process; progress is reported up to the number of vertices.
+        """
+        progress = []
+        engine = LocalConnectivityEngine(self.vertices, self.triangles, 3.0, max_workers=1, block_size=100)
+        result = engine.compute_gdist_matrix(lambda done, total: progress.append((done, total)))
+        self.assertEqual(result.nnz, self.expected.nnz)
+        self.assertTrue(numpy.allclose(result.toarray(), self.expected.toarray()))
+        self.assertEqual(progress[-1], (len(self.vertices), len(self.vertices)))
+
+
+    def test_parallel_matches_gdist(self):
+        """
+        Blocks evaluated on a pool of processes.
+        """
+        engine = LocalConnectivityEngine(self.vertices, self.triangles, 3.0, max_workers=3, block_size=100)
+        result = engine.compute_gdist_matrix()
+        self.assertTrue(numpy.allclose(result.toarray(), self.expected.toarray()))
+
+
+
+    def test_progress_counts_isolated_vertices(self):
+        """
+        Vertices which are in no triangle get no distances, but are still counted as done.
+        """
+        vertices = numpy.vstack([self.vertices, [[100.0, 100.0, 0.0], [101.0, 100.0, 0.0]]])
+        progress = []
+        engine = LocalConnectivityEngine(vertices, self.triangles, 3.0, max_workers=1, block_size=100)
+        result = engine.compute_gdist_matrix(lambda done, total: progress.append((done, total)))
+        self.assertTrue(numpy.allclose(result.toarray()[:len(self.vertices), :len(self.vertices)],
+                                       self.expected.toarray()))
+        self.assertEqual(0, result[len(self.vertices):].nnz)
+        self.assertEqual(progress[-1], (len(vertices), len(vertices)))
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(LocalConnectivityEngineTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
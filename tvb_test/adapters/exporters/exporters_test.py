@@ -33,9 +33,12 @@
 """
 import unittest
 import os.path
+import json
 import shutil
 import zipfile
 from contextlib import closing
+from StringIO import StringIO
+from tvb.core.entities.model.model_burst import BURST_INFO_FILE, DT_BURST_MAP
 from tvb.core.entities.storage import dao
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.adapters.exporters.export_manager import ExportManager
@@ -138,6 +141,24 @@ class ExportersTest(TransactionalTestCase):
                              "Should have 2 x nr datatypes files, one for operations one for datatypes")
 
         
+    def test_tvb_export_stream_for_datatype_group(self):
+        """
+        A data type group is streamed, with one folder for each operation in the group.
+        """
+        datatype_group = self.datatypeFactory.create_datatype_group()
+        file_name, content = self.export_manager.export_data_stream(datatype_group, self.TVB_EXPORTER, self.project)
+        self.assertTrue(file_name.endswith(".zip"))
+
+        with closing(zipfile.ZipFile(StringIO(''.join(content)))) as zip_file:
+            folders = set(name.split('/')[0] for name in zip_file.namelist())
+        operation_ids = dao.get_operation_ids_for_datatype_group(datatype_group.id)
+        self.assertEqual(dao.count_datatypes_in_group(datatype_group.id), len(operation_ids))
+        self.assertEqual(set("Operation_%s" % operation_id for operation_id in operation_ids), folders)
+
+        datatype = self.datatypeFactory.create_datatype_with_storage()
+        self.assertTrue(self.export_manager.export_data_stream(datatype, self.TVB_EXPORTER, self.project) is None)
+
+
     def test_export_with_invalid_data(self):
         """
         Test scenarios when data provided to export method is invalid
@@ -177,6 +198,25 @@ class ExportersTest(TransactionalTestCase):
         self.assertTrue(zipfile.is_zipfile(export_file), "Generated file is not a valid ZIP file")
 
 
+
+    def test_build_project_archive(self):
+        """
+        The bursts information is only added to the streamed archive, not to the project folder.
+        """
+        project = self.datatypeFactory.get_project()
+        self.datatypeFactory.create_datatype_with_storage()
+        file_name, archive = self.export_manager.build_project_archive(project)
+        self.assertTrue(file_name.endswith(project.name + ".zip"))
+
+        project_folder = FilesHelper().get_project_folder(project)
+        with closing(zipfile.ZipFile(StringIO(''.join(archive)))) as zip_file:
+            self.assertTrue(zip_file.testzip() is None)
+            self.assertTrue(BURST_INFO_FILE in zip_file.namelist())
+            burst_info = json.loads(zip_file.read(BURST_INFO_FILE))
+        self.assertTrue(burst_info[DT_BURST_MAP])
+        self.assertFalse(os.path.exists(os.path.join(project_folder, BURST_INFO_FILE)))
+
+
             
 def suite():
     """ 
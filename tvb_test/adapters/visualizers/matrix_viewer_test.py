@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the payloads shared by the matrix visualizers.
+"""
+
+import json
+import base64
+import numpy
+import unittest
+from tvb.core.utils import DATA_URL_PREFIX
+from tvb.adapters.visualizers.matrix_viewer import downsample_matrix, matrix_parameters, get_cached_parameters
+
+
+
+class MatrixViewerTest(unittest.TestCase):
+    """
+    Block-mean reduction, float32 encoding and caching of matrix payloads.
+    """
+
+
+    @staticmethod
+    def _decode(data_url):
+        return numpy.fromstring(base64.b64decode(data_url.split(',', 1)[1]), dtype='<f4')
+
+
+    def test_small_matrix_unchanged(self):
+        matrix = numpy.arange(12.0).reshape((3, 4))
+        params = matrix_parameters(matrix, max_size=4)
+        self.assertTrue(params["matrix_data"].startswith(DATA_URL_PREFIX))
+        self.assertEqual([3, 4], json.loads(params["matrix_shape"]))
+        self.assertEqual([4, 1], json.loads(params["matrix_strides"]))
+        self.assertEqual([3, 4], json.loads(params["matrix_full_shape"]))
+        self.assertTrue(numpy.allclose(matrix.flat, self._decode(params["matrix_data"])))
+
+
+    def test_block_mean(self):
+        matrix = numpy.arange(36.0).reshape((6, 6))
+        reduced = downsample_matrix(matrix, max_size=3)
+        expected = matrix.reshape((3, 2, 3, 2)).mean(axis=(1, 3))
+        self.assertTrue(numpy.allclose(expected, reduced))
+
+        ## Uneven blocks still cover all the entries
+        reduced = downsample_matrix(numpy.ones((7, 5)), max_size=3)
+        self.assertEqual((3, 3), reduced.shape)
+        self.assertTrue(numpy.allclose(1.0, reduced))
+
+        ## Entry k averages the rows [k * 7 // 3, (k + 1) * 7 // 3), as mapped back by tv.util.block_label
+        reduced = downsample_matrix(numpy.arange(7.0)[:, numpy.newaxis], max_size=3)
+        self.assertTrue(numpy.allclose([0.5, 2.5, 5.0], reduced[:, 0]))
+
+
+    def test_other_axes_kept(self):
+        coherence = numpy.random.random((10, 8, 8))
+        params = matrix_parameters(coherence, max_size=4, axes=(1, 2), prefix="")
+        self.assertEqual([10, 4, 4], json.loads(params["shape"]))
+        self.assertEqual([16, 4, 1], json.loads(params["strides"]))
+        self.assertEqual([10, 8, 8], json.loads(params["full_shape"]))
+        self.assertEqual(10 * 4 * 4, len(self._decode(params["data"])))
+
+
+    def test_cached_parameters(self):
+        calls = []
+
+        def prepare():
+            calls.append(1)
+            return {"matrix_data": "x"}
+
+        first = get_cached_parameters("test-gid", "matrix", prepare)
+        first["mainContent"] = "changed by the displayer"
+        second = get_cached_parameters("test-gid", "matrix", prepare)
+        self.assertEqual(1, len(calls))
+        self.assertEqual({"matrix_data": "x"}, second)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(MatrixViewerTest))
+    return test_suite
+
+
+
+if __name__ == "__main__":
+    #So you can run tests from this package individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the vector field, nullcline and trajectory computations of the phase-plane.
+"""
+
+import numpy
+import unittest
+import tvb.simulator.models as models_module
+import tvb.simulator.integrators as integrators_module
+from tvb.adapters.visualizers import phase_plane_interactive
+from tvb.adapters.visualizers.phase_plane import PhasePlane, marching_squares
+from tvb.adapters.visualizers.phase_plane_interactive import PhasePlaneInteractive
+
+
+
+class PhasePlaneTest(unittest.TestCase):
+    """
+    Computations are checked without drawing the matplotlib figure.
+    """
+
+    def setUp(self):
+        self.phase_plane = PhasePlaneInteractive(models_module.ReducedSetFitzHughNagumo(),
+                                                 integrators_module.HeunDeterministic(dt=0.1))
+        self.phase_plane.svx = self.phase_plane.model.state_variables[0]
+        self.phase_plane.svy = self.phase_plane.model.state_variables[1]
+        self.phase_plane.mode = 0
+        self.phase_plane._set_state_vector()
+        self.phase_plane._set_mesh_grid()
+
+
+    def test_vector_field_batched(self):
+        """
+        The whole grid evaluated at once gives the same field as evaluating each grid point.
+        """
+        u_batched, v_batched = self.phase_plane._calc_vector_field()
+        u_pointwise, v_pointwise = self.phase_plane._calc_vector_field_pointwise()
+        self.assertTrue(numpy.allclose(u_batched, u_pointwise))
+        self.assertTrue(numpy.allclose(v_batched, v_pointwise))
+
+
+    def test_vector_field_cache(self):
+        """
+        Returning to a previous view reuses the vector field, while changing a parameter recomputes it.
+        """
+        self.phase_plane._calc_phase_plane()
+        first_u = self.phase_plane.U
+        initial_state = self.phase_plane.default_sv.copy()
+        self.phase_plane.default_sv[2] = self.phase_plane.default_sv[2] + 0.5
+        self.phase_plane._calc_phase_plane()
+        self.assertFalse(self.phase_plane.U is first_u)
+        self.phase_plane.default_sv[:] = initial_state
+        self.phase_plane._calc_phase_plane()
+        self.assertTrue(self.phase_plane.U is first_u)
+        param_name = self.phase_plane.model.ui_configurable_parameters[0]
+        setattr(self.phase_plane.model, param_name, getattr(self.phase_plane.model, param_name) * 2)
+        self.phase_plane._calc_phase_plane()
+        self.assertFalse(self.phase_plane.U is first_u)
+
+
+    def test_trajectories_together(self):
+        """
+        Trajectories integrated together match those integrated one by one.
+        """
+        points = [(0.1, 0.2), (-0.5, 0.4), (1.0, -1.0)]
+        trajectories = self.phase_plane._calc_trajectories(points)
+        self.assertEqual((phase_plane_interactive.TRAJ_STEPS + 1, self.phase_plane.model.nvar, 3,
+                          self.phase_plane.model.number_of_modes), trajectories.shape)
+        for idx, point in enumerate(points):
+            single = self.phase_plane._calc_trajectories([point])
+            self.assertTrue(numpy.allclose(trajectories[:, :, idx:idx + 1], single))
+
+
+
+class PhasePlaneServiceTest(unittest.TestCase):
+    """
+    The headless phase-plane, as used by the web interface.
+    """
+
+    def setUp(self):
+        self.phase_plane = PhasePlane(models_module.ReducedSetFitzHughNagumo(),
+                                      integrators_module.HeunDeterministic(dt=0.1))
+
+
+    def test_marching_squares_line(self):
+        """
+        A field linear in x crosses zero along a vertical line.
+        """
+        x_values = numpy.linspace(-1, 1, 11)
+        y_values = numpy.linspace(-2, 2, 21)
+        field = numpy.tile(x_values - 0.25, (len(y_values), 1))
+        segments = marching_squares(x_values, y_values, field)
+        self.assertEqual((len(y_values) - 1, 4), segments.shape)
+        self.assertTrue(numpy.allclose(segments[:, [0, 2]], 0.25))
+
+
+    def test_marching_squares_circle(self):
+        """
+        Segments for the zero level of x^2 + y^2 - r^2 have their ends on the circle.
+        """
+        x_values = y_values = numpy.linspace(-1, 1, 41)
+        x_grid, y_grid = numpy.meshgrid(x_values, y_values)
+        segments = marching_squares(x_values, y_values, x_grid ** 2 + y_grid ** 2 - 0.5 ** 2)
+        self.assertTrue(len(segments) > 0)
+        for x_idx, y_idx in ((0, 1), (2, 3)):
+            radius = numpy.sqrt(segments[:, x_idx] ** 2 + segments[:, y_idx] ** 2)
+            self.assertTrue(numpy.allclose(radius, 0.5, atol=0.01))
+
+
+    def test_marching_squares_no_crossing(self):
+        x_values = y_values = numpy.linspace(0, 1, 5)
+        segments = marching_squares(x_values, y_values, numpy.ones((5, 5)))
+        self.assertEqual((0, 4), segments.shape)
+
+
+    def test_update_settings(self):
+        """
+        Changing the axes and ranges is reflected in the settings and in the vector field grid.
+        """
+        state_variables = self.phase_plane.model.state_variables
+        settings = self.phase_plane.update_settings(svx=state_variables[2], x_range=[-1.0, 1.0])
+        self.assertEqual(state_variables[2], settings['svx'])
+        self.assertEqual([-1.0, 1.0], settings['x_range'])
+        x_values, _, u_field, _ = self.phase_plane.get_vector_field()
+        self.assertAlmostEqual(-1.0, x_values[0])
+        self.assertAlmostEqual(1.0, x_values[-1])
+        self.assertEqual((settings['grid_points'], settings['grid_points']), u_field.shape)
+        self.assertRaises(ValueError, self.phase_plane.update_settings, x_range=[1.0, -1.0])
+        self.assertRaises(ValueError, self.phase_plane.update_settings, svy="not_a_state_variable")
+        settings = self.phase_plane.reset_axes()
+        self.assertEqual(settings['default_ranges'][settings['svx']], settings['x_range'])
+
+
+    def test_nullclines(self):
+        nullclines = self.phase_plane.get_nullclines()
+        self.assertEqual(set(['x', 'y']), set(nullclines.keys()))
+        for segments in nullclines.values():
+            for segment in segments:
+                self.assertEqual(4, len(segment))
+
+
+    def test_trajectories(self):
+        trajectories = self.phase_plane.get_trajectories([(0.1, 0.2), (-0.5, 0.4)])
+        self.assertEqual(2, len(trajectories))
+        self.assertEqual((phase_plane_interactive.TRAJ_STEPS + 1, self.phase_plane.model.nvar),
+                         trajectories[0].shape)
+        self.assertAlmostEqual(0.1, trajectories[0][0, 0])
+        self.assertAlmostEqual(0.2, trajectories[0][0, 1])
+
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(PhasePlaneTest))
+    test_suite.addTest(unittest.makeSuite(PhasePlaneServiceTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
+
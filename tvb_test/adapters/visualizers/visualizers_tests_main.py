@@ -40,6 +40,8 @@ from tvb_test.adapters.visualizers import crosscoherenceviewer_test
 from tvb_test.adapters.visualizers import crosscorelationviewer_test
 from tvb_test.adapters.visualizers import eegmonitor_test
 from tvb_test.adapters.visualizers import ica_test
+from tvb_test.adapters.visualizers import matrix_viewer_test
+from tvb_test.adapters.visualizers import phase_plane_test
 from tvb_test.adapters.visualizers import pse_test
 from tvb_test.adapters.visualizers import time_series_test
 
@@ -56,6 +58,8 @@ def suite():
     test_suite.addTest(crosscorelationviewer_test.suite())
     test_suite.addTest(eegmonitor_test.suite())
     test_suite.addTest(ica_test.suite())
+    test_suite.addTest(matrix_viewer_test.suite())
+    test_suite.addTest(phase_plane_test.suite())
     test_suite.addTest(pse_test.suite())
     test_suite.addTest(time_series_test.suite())
 #    test_suite.addTest(histogram_test.suite())
@@ -34,7 +34,7 @@
 import unittest
 from tvb.core.entities import model
 from tvb.core.entities.storage import dao
-from tvb.core.adapters.abcadapter import ABCSynchronous
+from tvb.core.adapters.abcadapter import ABCAdapter, ABCSynchronous
 from tvb_test.core.base_testcase import TransactionalTestCase
 from tvb_test.core.test_factory import TestFactory
 
@@ -206,6 +206,39 @@ class AdapterABCTest(TransactionalTestCase):
         self.assertEqual(42, kwargs["monitors_parameters"]["BOLD"]["mon_att1"])
         self.assertEqual(43, kwargs["monitors_parameters"]["EEG"]["mon_att1"])
         self.assertTrue(isinstance(kwargs["monitors_parameters"]["BOLD"]["mon_att4"], str))  
+
+
+
+    def test_fill_defaults_keeps_tree(self):
+        """
+        Test that ABCAdapter.fill_defaults returns the new values in copies, leaving the given tree unchanged.
+        """
+        input_tree = self.test_adapter.get_input_tree()
+        filled_tree = ABCAdapter.fill_defaults(input_tree, {'monitors': 'EEG', 'mon_att1': '3', 'length': '5'})
+        self.assertEqual('5', filled_tree[2]['default'])
+        self.assertEqual('3', filled_tree[1]['options'][0]['attributes'][0]['default'])
+        self.assertEqual('0', input_tree[2]['default'])
+        self.assertEqual('0', input_tree[1]['options'][0]['attributes'][0]['default'])
+        self.assertTrue(filled_tree[1]['options'][2] is input_tree[1]['options'][2])
+
+
+    def test_build_adapter_class_registry(self):
+        """
+        Adapter classes are resolved once per AlgorithmGroup id, and resolved again when the id
+        starts describing a different group.
+        """
+        group = model.AlgorithmGroup(ComplexInterfaceAdapter.__module__, ComplexInterfaceAdapter.__name__, 1)
+        self.assertTrue(isinstance(ABCAdapter.build_adapter(group), ComplexInterfaceAdapter))
+        group.id = -42
+        ABCAdapter.register_adapter_class(group, ABCSynchronous)
+        self.assertEqual(ABCSynchronous, ABCAdapter.determine_adapter_class(group))
+        other_group = model.AlgorithmGroup(AdapterABCTest.__module__, AdapterABCTest.__name__, 1)
+        other_group.id = -42
+        self.assertEqual(AdapterABCTest, ABCAdapter.determine_adapter_class(other_group))
+        self.assertEqual(ComplexInterfaceAdapter, ABCAdapter.determine_adapter_class(group))
+        adapter = ABCAdapter.build_adapter(group)
+        self.assertTrue(isinstance(adapter, ComplexInterfaceAdapter))
+        self.assertTrue(adapter.algorithm_group is group)
        
        
 def suite():
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for block-wise reading of H5 stored arrays.
+"""
+
+import os
+import shutil
+import numpy
+import unittest
+from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.core.entities.file.hdf5_storage_manager import HDF5StorageManager
+from tvb.core.entities.file.chunk_reader import ChunkedArrayReader
+
+
+
+class H5BackedArray(object):
+    """
+    Minimal stand-in for a MappedType, exposing the storage methods used by the reader.
+    """
+
+    def __init__(self, storage_manager):
+        self.storage_manager = storage_manager
+
+    def get_data(self, data_name, data_slice=None):
+        return self.storage_manager.get_data(data_name, data_slice)
+
+    def get_data_shape(self, data_name):
+        return self.storage_manager.get_data_shape(data_name)
+
+    def get_data_chunk_shape(self, data_name):
+        return self.storage_manager.get_data_chunks(data_name, ignore_errors=True)
+
+
+
+class ChunkedArrayReaderTest(unittest.TestCase):
+    """
+    Test block splitting and prefetching in `ChunkedArrayReader`.
+    """
+
+
+    def setUp(self):
+        """
+        Store a 4D array on disk, appended along the nodes dimension.
+        """
+        self.storage_folder = os.path.join(cfg.TVB_TEMP_FOLDER, "test_chunk_reader")
+        if os.path.exists(self.storage_folder):
+            shutil.rmtree(self.storage_folder)
+        os.makedirs(self.storage_folder)
+        self.storage = HDF5StorageManager(self.storage_folder, "test_data.h5")
+        self.test_array = numpy.random.random((20, 2, 30, 1))
+        self.storage.append_data('data', self.test_array, grow_dimension=2)
+        self.datatype = H5BackedArray(self.storage)
+
+
+    def tearDown(self):
+        """
+        Remove the H5 file.
+        """
+        self.storage.close_file()
+        if os.path.exists(self.storage_folder):
+            shutil.rmtree(self.storage_folder)
+
+
+    def test_blocks_cover_array(self):
+        """
+        Concatenating all blocks, with or without prefetch, gives back the stored array.
+        """
+        for prefetch in (True, False):
+            reader = ChunkedArrayReader(self.datatype, split_axis=2, block_length=7, prefetch=prefetch)
+            blocks = list(reader)
+            self.assertEqual(len(blocks), len(reader.block_slices()))
+            numpy.testing.assert_array_equal(self.test_array, numpy.concatenate(blocks, axis=2))
+
+
+    def test_block_length_limited_by_budget(self):
+        """
+        The memory budget limits the number of nodes in one block.
+        """
+        node_size = 20 * 2 * 1 * 8
+        reader = ChunkedArrayReader(self.datatype, split_axis=2, memory_budget=node_size * 5, prefetch=False)
+        self.assertTrue(1 <= reader.block_length <= 5)
+        self.assertTrue(reader.block_memory <= node_size * 5)
+
+
+    def test_block_aligned_to_chunks(self):
+        """
+        Blocks larger than one chunk contain a whole number of chunks.
+        """
+        reader = ChunkedArrayReader(self.datatype, split_axis=2, memory_budget=10 ** 9)
+        chunk_length = reader.chunk_shape[2]
+        if reader.block_length > chunk_length:
+            self.assertEqual(0, reader.block_length % chunk_length)
+        self.assertEqual(reader.shape, self.test_array.shape)
+
+
+    def test_custom_slices(self):
+        """
+        Explicit slices are read in the given order.
+        """
+        reader = ChunkedArrayReader(self.datatype, split_axis=1, block_length=1)
+        custom_slices = [(slice(20), slice(1, 2), slice(30), slice(0, 1)),
+                         (slice(20), slice(0, 1), slice(30), slice(0, 1))]
+        blocks = list(reader.iter_blocks(custom_slices))
+        numpy.testing.assert_array_equal(self.test_array[custom_slices[0]], blocks[0])
+        numpy.testing.assert_array_equal(self.test_array[custom_slices[1]], blocks[1])
+
+
+    def test_read_errors_raised_in_consumer(self):
+        """
+        An error while prefetching is raised again in the iterating thread.
+        """
+        reader = ChunkedArrayReader(self.datatype, split_axis=2, block_length=10)
+        invalid_slices = reader.block_slices() + [(slice(20), slice(2), "invalid", slice(1))]
+        self.assertRaises(Exception, list, reader.iter_blocks(invalid_slices))
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(ChunkedArrayReaderTest))
+    return test_suite
+
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
@@ -34,6 +34,9 @@ import unittest
 from tvb_test.core.entities.file import files_helper_test
 from tvb_test.core.entities.file import xml_metadata_handlers_test
 from tvb_test.core.entities.file import hdf5_storage_test
+from tvb_test.core.entities.file import chunk_reader_test
+from tvb_test.core.entities.file import zip_stream_test
+from tvb_test.core.entities.file import files_update_manager_test
 
 
 def suite():
@@ -44,6 +47,9 @@ def suite():
     test_suite.addTest(files_helper_test.suite())
     test_suite.addTest(xml_metadata_handlers_test.suite())
     test_suite.addTest(hdf5_storage_test.suite())
+    test_suite.addTest(chunk_reader_test.suite())
+    test_suite.addTest(zip_stream_test.suite())
+    test_suite.addTest(files_update_manager_test.suite())
     return test_suite
 
 
@@ -33,7 +33,9 @@
 """
 
 import os
+import zipfile
 import unittest
+from StringIO import StringIO
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.basic.traits.types_mapped import MappedType
 from tvb.core.entities.file.xml_metadata_handlers import XMLReader
@@ -249,6 +251,25 @@ class FilesHelperTest(TransactionalTestCase):
         self.assertFalse(os.path.isdir(folder_name), "Folder should not exist before call.")
         self.assertRaises(FileStructureException, self.files_helper.remove_folder, folder_name, False)
 
+        
+    def test_extract_zip_folder(self):
+        """
+        Only entries under the requested folder are written, and files already present are not written again.
+        """
+        zip_buffer = StringIO()
+        zip_arch = zipfile.ZipFile(zip_buffer, 'w')
+        zip_arch.writestr("project/1/Operation.xml", "<operation/>")
+        zip_arch.writestr("project/1/data.h5", "some data")
+        zip_arch.writestr("other/ignored.txt", "ignored")
+        zip_arch.close()
+
+        target_folder = self.files_helper.get_project_folder(self.test_project)
+        zip_arch = zipfile.ZipFile(zip_buffer)
+        self.assertEqual(2, self.files_helper.extract_zip_folder(zip_arch, "project", target_folder))
+        self.assertTrue(os.path.isfile(os.path.join(target_folder, "1", "data.h5")))
+        self.assertFalse(os.path.exists(os.path.join(target_folder, "other")))
+        self.assertEqual(0, self.files_helper.extract_zip_folder(zip_arch, "project", target_folder))
+
 
 def suite():
     """
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the tvb.core.entities.file.files_update_manager module.
+"""
+
+import os
+import shutil
+import unittest
+from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.core.entities.file import files_update_manager
+from tvb.core.entities.file.files_update_manager import FilesUpdateManager
+from tvb_test.core.base_testcase import BaseTestCase
+from tvb_test.core.test_factory import TestFactory
+
+
+
+class FilesUpdateManagerTest(unittest.TestCase):
+    """
+    Checks for the bookkeeping which lets the storage upgrade skip files already handled.
+    """
+
+
+    def setUp(self):
+        self.folder = os.path.join(cfg.TVB_TEMP_FOLDER, "test_files_update")
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+        self.update_manager = FilesUpdateManager()
+
+
+    def tearDown(self):
+        if os.path.exists(self.folder):
+            shutil.rmtree(self.folder)
+
+
+    def test_read_upgrade_progress(self):
+        """
+        Completed lines are read back, while a line interrupted while written is ignored.
+        """
+        progress_path = os.path.join(self.folder, files_update_manager.UPGRADE_PROGRESS_FILE % cfg.DATA_VERSION)
+        with open(progress_path, 'w') as progress_file:
+            progress_file.write("gid1 %s\ngid2 %s\ngid3" % (files_update_manager.UPGRADE_STATUS_FINE,
+                                                           files_update_manager.UPGRADE_STATUS_FAULT))
+        progress = self.update_manager._read_upgrade_progress(progress_path)
+        self.assertEqual({'gid1': files_update_manager.UPGRADE_STATUS_FINE,
+                          'gid2': files_update_manager.UPGRADE_STATUS_FAULT}, progress)
+        self.assertEqual({}, self.update_manager._read_upgrade_progress(progress_path + ".missing"))
+
+
+    def test_up_to_date_files_skip_check(self):
+        """
+        Files already known to be up to date are not opened again.
+        """
+        file_path = os.path.join(self.folder, "Missing.h5")
+        self.assertFalse(self.update_manager.is_file_up_to_date(file_path))
+        files_update_manager.UP_TO_DATE_FILES.add(file_path)
+        try:
+            self.assertTrue(self.update_manager.is_file_up_to_date(file_path))
+        finally:
+            files_update_manager.UP_TO_DATE_FILES.discard(file_path)
+
+
+    def test_storage_upgrade_not_running(self):
+        """
+        Without a started upgrade there is no result to report.
+        """
+        self.assertFalse(FilesUpdateManager.is_storage_upgrade_running())
+        self.assertTrue(FilesUpdateManager.pop_storage_upgrade_result() is None)
+
+
+
+class UpgradeInterrupted(Exception):
+    """
+    Stands for the TVB process being stopped in the middle of a storage upgrade.
+    """
+
+
+
+class StorageUpgradeTest(BaseTestCase):
+    """
+    Upgrade of all the stored DataTypes, interrupted and then continued.
+    """
+
+
+    def setUp(self):
+        self.clean_database()
+        self.datatypes = TestFactory.create_group()[0]
+        cfg.add_entries_to_config_file({cfg.KEY_LAST_CHECKED_FILE_VERSION: cfg.DATA_VERSION - 1})
+        cfg.read_config_file()
+        self.progress_path = os.path.join(cfg.TVB_STORAGE, files_update_manager.UPGRADE_PROGRESS_FILE
+                                          % cfg.DATA_VERSION)
+        self.original_upgrade = files_update_manager._upgrade_file_version
+        self.upgraded_files = []
+
+
+    def tearDown(self):
+        files_update_manager._upgrade_file_version = self.original_upgrade
+        if os.path.exists(self.progress_path):
+            os.remove(self.progress_path)
+        if os.path.exists(cfg.TVB_CONFIG_FILE):
+            os.remove(cfg.TVB_CONFIG_FILE)
+        self.clean_database()
+
+
+    def _upgrade_file_version(self, file_path):
+        """
+        Upgrade one file, as the storage upgrade would, and keep track of it.
+        """
+        result = self.original_upgrade(file_path)
+        self.upgraded_files.append(file_path)
+        return result
+
+
+    def _interrupted_upgrade_file_version(self, file_path):
+        """
+        Upgrade the first file, and stop at the second one.
+        """
+        if self.upgraded_files:
+            raise UpgradeInterrupted()
+        return self._upgrade_file_version(file_path)
+
+
+    def test_interrupted_upgrade_continues(self):
+        """
+        Interrupt the upgrade after one file: what was done is on disk, and the second run
+        upgrades only the rest, then marks the storage as up to date.
+        """
+        all_gids = set(datatype.gid for datatype in self.get_all_datatypes())
+        self.assertEqual(3, len(all_gids), "The group and its 2 DataTypes should be stored.")
+        update_manager = FilesUpdateManager()
+        update_manager.DATA_TYPES_PAGE_SIZE = 2
+
+        files_update_manager._upgrade_file_version = self._interrupted_upgrade_file_version
+        self.assertRaises(UpgradeInterrupted, update_manager.upgrade_all_files_from_storage)
+        self.assertEqual(1, len(self.upgraded_files))
+        handled = update_manager._read_upgrade_progress(self.progress_path)
+        self.assertTrue(0 < len(handled) < len(all_gids), "Progress should be kept for the files done.")
+        self.assertEqual(cfg.DATA_VERSION - 1, cfg.DATA_CHECKED_TO_VERSION)
+
+        files_update_manager._upgrade_file_version = self._upgrade_file_version
+        status, message = update_manager.upgrade_all_files_from_storage()
+        self.assertTrue(status, message)
+        self.assertEqual(len(self.datatypes), len(self.upgraded_files))
+        self.assertEqual(len(self.datatypes), len(set(self.upgraded_files)), "A file was upgraded twice.")
+        self.assertTrue(str(len(all_gids)) in message, message)
+        self.assertFalse(os.path.exists(self.progress_path))
+        cfg.read_config_file()
+        self.assertEqual(cfg.DATA_VERSION, cfg.DATA_CHECKED_TO_VERSION)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(FilesUpdateManagerTest))
+    test_suite.addTest(unittest.makeSuite(StorageUpgradeTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
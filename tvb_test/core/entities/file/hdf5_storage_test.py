@@ -292,6 +292,18 @@ class HDF5StorageTest(unittest.TestCase):
             self.assertArrayEqual(self.test_2D_array[sl], read_data)
 
 
+    def test_read_data_chunks(self):
+        """
+        Test that the chunk layout is available for appended data, and missing data sets are reported.
+        """
+        self.storage.append_data(DATASET_NAME_1, self.test_2D_array, grow_dimension=0)
+        chunks = self.storage.get_data_chunks(DATASET_NAME_1)
+        self.assertEqual(len(self.test_2D_array.shape), len(chunks))
+        self.assertEqual(self.test_2D_array.shape[1], chunks[1])
+        self.assertTrue(self.storage.get_data_chunks(DATASET_NAME_2, ignore_errors=True) is None)
+        self.assertRaises(MissingDataSetException, self.storage.get_data_chunks, DATASET_NAME_2)
+
+
     def test_add_metadata(self):
         """
         This method checks metadata add for root or a dataset
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for ZIP archives produced as a stream.
+"""
+
+import os
+import shutil
+import zipfile
+import unittest
+from StringIO import StringIO
+from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.core.entities.file import zip_stream
+from tvb.core.entities.file.zip_stream import ZipStream
+
+
+
+class ZipStreamTest(unittest.TestCase):
+    """
+    Archives produced by `ZipStream` are read back with the standard zipfile module.
+    """
+
+
+    def setUp(self):
+        self.folder = os.path.join(cfg.TVB_TEMP_FOLDER, "test_zip_stream")
+        if os.path.exists(self.folder):
+            shutil.rmtree(self.folder)
+        os.makedirs(os.path.join(self.folder, "Operation", "1"))
+        self.files = {os.path.join("Operation", "1", "Operation.xml"): "<tvb_data>" * 500,
+                      os.path.join("Operation", "1", "TimeSeries.h5"): os.urandom(20000),
+                      "project.xml": "<project/>"}
+        for relative_path, content in self.files.iteritems():
+            with open(os.path.join(self.folder, relative_path), 'wb') as file_obj:
+                file_obj.write(content)
+
+
+    def tearDown(self):
+        if os.path.exists(self.folder):
+            shutil.rmtree(self.folder)
+
+
+    def _check_archive(self, archive_data, prefix=''):
+        archive = zipfile.ZipFile(StringIO(archive_data))
+        self.assertTrue(archive.testzip() is None)
+        for relative_path, content in self.files.iteritems():
+            arc_name = prefix + relative_path.replace(os.sep, '/')
+            self.assertEqual(content, archive.read(arc_name))
+            expected_type = zipfile.ZIP_STORED if arc_name.endswith('.h5') else zipfile.ZIP_DEFLATED
+            self.assertEqual(expected_type, archive.getinfo(arc_name).compress_type)
+        return archive
+
+
+    def test_folder_and_string(self):
+        for max_workers in (1, 3):
+            archive = ZipStream(max_workers=max_workers)
+            archive.add_folder(self.folder, "prefix/")
+            archive.add_string(u'{"bursts": {}}', "bursts.json")
+            result = self._check_archive(''.join(archive), "prefix/")
+            self.assertEqual('{"bursts": {}}', result.read("bursts.json"))
+            self.assertEqual(len(self.files) + 1, len(result.namelist()))
+
+
+    def test_large_files_streamed(self):
+        """
+        Files above the in-memory limit are deflated while read, with sizes written after their data.
+        """
+        original_limit = zip_stream.IN_MEMORY_LIMIT
+        zip_stream.IN_MEMORY_LIMIT = 100
+        try:
+            archive = ZipStream()
+            archive.add_folder(self.folder)
+            self._check_archive(''.join(archive))
+        finally:
+            zip_stream.IN_MEMORY_LIMIT = original_limit
+
+
+    def test_zip64_records(self):
+        """
+        With the ZIP64 limit lowered, all entries and the archive end use ZIP64 records.
+        """
+        original_limit = zipfile.ZIP64_LIMIT
+        zipfile.ZIP64_LIMIT = 0
+        try:
+            archive = ZipStream()
+            archive.add_folder(self.folder)
+            archive_data = ''.join(archive)
+        finally:
+            zipfile.ZIP64_LIMIT = original_limit
+        self.assertTrue(zipfile.stringEndArchive64 in archive_data)
+        self._check_archive(archive_data)
+
+
+    def test_write_to_file(self):
+        archive = ZipStream()
+        archive.add_file(os.path.join(self.folder, "project.xml"))
+        result_path = archive.write_to(os.path.join(self.folder, "result.zip"))
+        self.assertTrue(zipfile.is_zipfile(result_path))
+        self.assertEqual(["project.xml"], zipfile.ZipFile(result_path).namelist())
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(ZipStreamTest))
+    return test_suite
+
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
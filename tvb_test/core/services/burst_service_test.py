@@ -38,7 +38,8 @@ import unittest
 import tvb_test
 import numpy
 import json
-from time import sleep
+from datetime import timedelta
+from time import sleep, time
 from tvb.config import SIMULATOR_MODULE, SIMULATOR_CLASS
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.datatypes.connectivity import Connectivity
@@ -51,6 +52,7 @@ from tvb.core.entities.storage import dao
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.core.entities.transient.burst_configuration_entities import WorkflowStepConfiguration as wf_cfg
 from tvb.core.entities.transient.structure_entities import DataTypeMetaData
+from tvb.core.services import burst_service
 from tvb.core.services.burst_service import BurstService, KEY_SAVED_VALUE, KEY_PARAMETER_CHECKED
 from tvb.core.services.flow_service import FlowService
 from tvb.core.services.workflow_service import WorkflowService
@@ -470,6 +472,86 @@ class BurstServiceTest(BaseTestCase):
                          "Different static params after burst load for visualizer.")
 
 
+    def test_update_history_status(self):
+        """
+        Statuses are read for all the requested bursts at once; missing bursts are skipped.
+        """
+        running = dao.store_entity(model.BurstConfiguration(self.test_project.id))
+        failed = model.BurstConfiguration(self.test_project.id)
+        failed.workflows_number = 3
+        failed.prepare_before_save()
+        failed.mark_status(error=True)
+        failed = dao.store_entity(failed)
+        ## A range with a single value launches one workflow, but is still a group.
+        single_range = model.BurstConfiguration(self.test_project.id, simulator_configuration={
+            model.RANGE_PARAMETER_1: {KEY_SAVED_VALUE: 'simulation_length'}})
+        single_range.workflows_number = 1
+        single_range.prepare_before_save()
+        single_range = dao.store_entity(single_range)
+
+        result = self.burst_service.update_history_status([str(running.id), str(failed.id), "-1",
+                                                           single_range.id])
+        self.assertEqual([[running.id, model.BurstConfiguration.BURST_RUNNING, False, ''],
+                          [failed.id, model.BurstConfiguration.BURST_ERROR, True,
+                           "Check Operations page for error Message"],
+                          [single_range.id, model.BurstConfiguration.BURST_RUNNING, True, '']], result)
+
+        result = self.burst_service.update_history_status([running.id, failed.id],
+                                                          failed.finish_time - timedelta(seconds=1))
+        self.assertEqual([failed.id], [entry[0] for entry in result])
+        self.assertEqual([], self.burst_service.update_history_status([running.id, failed.id],
+                                                                      failed.finish_time))
+
+
+    def test_get_portlet_preview(self):
+        """
+        Previews are rendered in background, served from cache afterwards, and no longer served
+        once the portlet is re-configured.
+        """
+        loaded_burst, _ = self._prepare_and_launch_sync_burst()
+        visualizer = loaded_burst.tabs[0].portlets[0].visualizer
+        static_param = visualizer.static_param
+        self.burst_service.invalidate_portlet_previews()
+        self.assertTrue(self.burst_service.get_portlet_preview(visualizer, 300, 200) is None)
+        preview = None
+        for _ in range(50):
+            preview = self.burst_service.get_portlet_preview(visualizer, 300, 200)
+            if preview is not None:
+                break
+            sleep(0.1)
+        self.assertTrue(preview is not None, "Preview was not rendered in background.")
+        self.assertTrue('launch_success' in preview)
+        self.assertEqual(static_param, visualizer.static_param)
+        self.assertEqual(0, len(burst_service._PENDING_PREVIEWS))
+        preview['extra_key'] = True
+        self.assertFalse('extra_key' in self.burst_service.get_portlet_preview(visualizer, 300, 200))
+
+        visualizer.static_param = {"test2": 3}
+        self.assertTrue(self.burst_service.get_portlet_preview(visualizer, 300, 200) is None)
+        self.burst_service.invalidate_portlet_previews([visualizer.id])
+
+
+    def test_failed_portlet_preview(self):
+        """
+        A failed preview is served only until it expires, and a pending preview is not scheduled again.
+        """
+        loaded_burst, _ = self._prepare_and_launch_sync_burst()
+        visualizer = loaded_burst.tabs[0].portlets[0].visualizer
+        key = burst_service._preview_key(visualizer, 300, 200)
+        signature = burst_service._preview_signature(visualizer)
+        failure = {'launch_success': False, 'error_msg': "Test failure"}
+        burst_service._PREVIEWS.put(key, (signature, failure, time() + 10))
+        self.assertEqual(failure, self.burst_service.get_portlet_preview(visualizer, 300, 200))
+
+        burst_service._PREVIEWS.put(key, (signature, failure, time() - 1))
+        burst_service._PENDING_PREVIEWS.add(key)
+        waiting = burst_service.PREVIEW_DISPATCHER.get_waiting_count()
+        self.assertTrue(self.burst_service.get_portlet_preview(visualizer, 300, 200) is None)
+        self.assertEqual(waiting, burst_service.PREVIEW_DISPATCHER.get_waiting_count())
+        burst_service._PENDING_PREVIEWS.discard(key)
+        self.burst_service.invalidate_portlet_previews([visualizer.id])
+
+
     def test_launch_burst(self):
         """
         Test the launch burst method from burst service.
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the cluster schedulers, and for ClusterSchedulerClient running on the local fake scheduler.
+"""
+
+import unittest
+from tvb.basic.config.settings import TVBSettings as config
+from tvb.core.entities import model
+from tvb.core.entities.storage import dao
+from tvb.core.services.backend_client import ClusterSchedulerClient
+from tvb.core.services.cluster_schedulers import OARScheduler, LocalScheduler
+from tvb_test.core.test_factory import TestFactory
+from tvb_test.core.base_testcase import BaseTestCase
+
+
+
+class DummyAdapter(object):
+    """
+    Only the time estimate is needed from an adapter, when submitting to the cluster.
+    """
+
+    def get_execution_time_approximation(self, **kwargs):
+        return 10
+
+
+
+class ClusterSchedulersTest(unittest.TestCase):
+    """
+    Test the schedulers, independent of the DB.
+    """
+
+    def setUp(self):
+        self.launched = []
+        self.default_command = config.CLUSTER_ARRAY_SCHEDULE_COMMAND
+
+
+    def tearDown(self):
+        config.CLUSTER_ARRAY_SCHEDULE_COMMAND = self.default_command
+
+
+    def test_local_array_tasks(self):
+        """
+        Each task of a local array job runs exactly its own operation.
+        """
+        scheduler = LocalScheduler(lambda op_id, user: self.launched.append((op_id, user)))
+        job_ids = scheduler.submit([(1, 'user'), (2, 'user'), (3, 'user')], "02:00:00")
+        scheduler.wait(5)
+        self.assertEqual(["1[0]", "1[1]", "1[2]"], job_ids)
+        self.assertEqual([(1, 'user'), (2, 'user'), (3, 'user')], sorted(self.launched))
+        self.assertEqual(["2[0]"], scheduler.submit([(4, 'user')], "02:00:00"))
+        self.assertTrue(scheduler.stop(["2[0]"]))
+        self.assertTrue("2[0]" in scheduler.stopped_jobs)
+
+
+    def test_oar_array_submission(self):
+        """
+        One array submission returns a job identifier for each operation.
+        """
+        config.CLUSTER_ARRAY_SCHEDULE_COMMAND = "echo %s > /dev/null; awk '{print \"OAR_JOB_ID=\" $1 \"00\"}' %s"
+        job_ids = OARScheduler().submit([(5, 'user'), (6, 'user')], "02:00:00")
+        self.assertEqual(["500", "600"], job_ids)
+
+
+
+class ClusterSchedulerClientTest(BaseTestCase):
+    """
+    Test the cluster back-end client, with jobs executed by the local fake scheduler.
+    """
+
+    def setUp(self):
+        self.test_user = TestFactory.create_user()
+        self.test_project = TestFactory.create_project(self.test_user)
+        self.launched = []
+        self.scheduler = LocalScheduler(lambda op_id, user: self.launched.append(op_id))
+        self.scheduler.MAX_ARRAY_SIZE = 2
+        self.client = ClusterSchedulerClient(self.scheduler)
+
+
+    def tearDown(self):
+        self.clean_database()
+
+
+    def test_submit_and_stop_operations(self):
+        """
+        Operations get submitted in arrays of limited size, and get stopped with one scheduler call.
+        """
+        operations = [TestFactory.create_operation(test_user=self.test_user, test_project=self.test_project,
+                                                   operation_status=model.STATUS_STARTED) for _ in range(3)]
+        self.client._run_cluster_job(operations, self.test_user.username, DummyAdapter())
+        self.scheduler.wait(5)
+        self.assertEqual(2, len(self.scheduler.submissions))
+        self.assertEqual(sorted(op.id for op in operations), sorted(self.launched))
+
+        job_ids = [dao.get_operation_process_for_operation(op.id).job_id for op in operations]
+        self.assertEqual(["1[0]", "1[1]", "2[0]"], job_ids)
+
+        self.assertTrue(self.client.stop_operations([op.id for op in operations]))
+        self.assertEqual(set(job_ids), self.scheduler.stopped_jobs)
+        for operation in operations:
+            self.assertEqual(model.STATUS_CANCELED, dao.get_operation_by_id(operation.id).status)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(ClusterSchedulersTest))
+    test_suite.addTest(unittest.makeSuite(ClusterSchedulerClientTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
+
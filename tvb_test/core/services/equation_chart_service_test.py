@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the evaluation of equations in charts.
+"""
+
+import numpy
+import unittest
+from tvb.core.services import equation_chart_service
+from tvb.core.services.equation_chart_service import EquationChartService, reduce_series
+
+
+
+class _LinearEquation(object):
+    """
+    Minimal equation: y = a / x, counting its evaluations.
+    """
+
+    def __init__(self, a):
+        self.parameters = {'a': a}
+        self.evaluations = 0
+
+
+    def evaluate(self, var):
+        self.evaluations += 1
+        return self.parameters['a'] / var
+
+
+
+class EquationChartServiceTest(unittest.TestCase):
+    """
+    Test series reduction and caching, independent of the DB.
+    """
+
+    def setUp(self):
+        equation_chart_service._SERIES.clear()
+        self.service = EquationChartService()
+
+
+    def test_reduce_series(self):
+        """
+        Short series are kept; long ones are reduced, keeping the extreme values in order.
+        """
+        x_values = numpy.arange(10)
+        self.assertEqual(10, len(reduce_series(x_values, x_values * 2, 20)[0]))
+        x_values = numpy.arange(10000, dtype=numpy.float32)
+        y_values = numpy.sin(x_values / 100)
+        y_values[5003] = 7
+        reduced_x, reduced_y = reduce_series(x_values, y_values, 100)
+        self.assertTrue(len(reduced_x) <= 100)
+        self.assertTrue(numpy.all(numpy.diff(reduced_x) > 0))
+        self.assertEqual(7, reduced_y.max())
+        self.assertAlmostEqual(y_values.min(), reduced_y.min())
+        self.assertEqual(x_values[0], reduced_x[0])
+
+
+    def test_get_series(self):
+        """
+        Invalid values are replaced by 0, and repeated charts are not evaluated again.
+        """
+        equation = _LinearEquation(2.0)
+        x_values, y_values, changed = self.service.get_series(equation, 0, 10, step=1)
+        self.assertEqual(numpy.float32, y_values.dtype)
+        self.assertEqual(11, len(x_values))
+        self.assertTrue(changed)
+        self.assertEqual(0, y_values[0])
+        self.assertEqual(1, y_values[2])
+        self.service.get_series(equation, 0, 10, step=1)
+        self.assertEqual(1, equation.evaluations)
+        equation.parameters['a'] = 4.0
+        _, y_values, _ = self.service.get_series(equation, 0, 10, step=1)
+        self.assertEqual(2, equation.evaluations)
+        self.assertEqual(2, y_values[2])
+        x_values, _, _ = self.service.get_series(equation, 1, 100000, max_points=50)
+        self.assertTrue(len(x_values) <= 50)
+
+
+    def test_get_series_range(self):
+        """
+        An empty range gives a single point; a reversed range or a step which is not positive is refused.
+        """
+        equation = _LinearEquation(2.0)
+        x_values, y_values, _ = self.service.get_series(equation, 4, 4)
+        self.assertEqual([4], x_values.tolist())
+        self.assertEqual([0.5], y_values.tolist())
+        self.assertRaises(ValueError, self.service.get_series, equation, 10, 0)
+        self.assertRaises(ValueError, self.service.get_series, equation, 0, 10, 0)
+        self.assertRaises(ValueError, self.service.get_series, equation, 0, 10, -1)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(EquationChartServiceTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
@@ -34,6 +34,7 @@
 import unittest
 import os
 import time
+import threading
 import tvb.core.services.event_handlers as event_handlers
 from tvb.core.entities.storage import dao
 from tvb.core.services.project_service import ProjectService
@@ -81,12 +82,89 @@ class EventHandlerTest(BaseTestCase):
         self.project_service._remove_project_node_files(test_project.id, gid)
         
 
+class DummyExecutor(object):
+    """
+    Executor recording when it was run, with a configurable coalesce key.
+    """
+
+    def __init__(self, key, executed, delay=0):
+        self.key = key
+        self.executed = executed
+        self.delay = delay
+        self.done = threading.Event()
+
+    def get_coalesce_key(self):
+        return self.key
+
+    def run(self):
+        self.executed.append(self.key)
+        self.done.set()
+
+
+
+class EventDispatcherTest(unittest.TestCase):
+    """
+    Tests for the delay queue of the event dispatcher.
+    """
+
+    def setUp(self):
+        self.dispatcher = event_handlers.EventDispatcher(2)
+        self.executed = []
+
+
+    def test_delayed_events_order(self):
+        """
+        Events are executed in the order of their due time, not of their submission.
+        """
+        late = DummyExecutor("late", self.executed)
+        early = DummyExecutor("early", self.executed)
+        self.dispatcher.submit(late, 0.4)
+        self.dispatcher.submit(early, 0.1)
+        early.done.wait(2)
+        self.assertEqual(["early"], self.executed)
+        late.done.wait(2)
+        self.assertEqual(["early", "late"], self.executed)
+        self.assertEqual(0, self.dispatcher.get_waiting_count())
+
+
+    def test_waiting_events_coalesced(self):
+        """
+        An event identical to one waiting in the queue is dropped; after execution it can be fired again.
+        """
+        first = DummyExecutor("same", self.executed)
+        self.assertTrue(self.dispatcher.submit(first, 0.2))
+        self.assertFalse(self.dispatcher.submit(DummyExecutor("same", self.executed), 0.2))
+        self.assertTrue(self.dispatcher.submit(DummyExecutor("other", self.executed), 0.2))
+        first.done.wait(2)
+        time.sleep(0.1)
+        self.assertEqual(["other", "same"], sorted(self.executed))
+        again = DummyExecutor("same", self.executed)
+        self.assertTrue(self.dispatcher.submit(again))
+        again.done.wait(2)
+        self.assertEqual(3, len(self.executed))
+
+
+    def test_pool_size_bounded(self):
+        """
+        A burst of events does not start more threads than the pool size.
+        """
+        executors = [DummyExecutor(idx, self.executed) for idx in range(50)]
+        for executor in executors:
+            self.dispatcher.submit(executor)
+        for executor in executors:
+            executor.done.wait(2)
+        self.assertEqual(50, len(self.executed))
+        self.assertEqual(2, len(self.dispatcher._threads))
+
+
+
 def suite():
     """
     Gather all the tests in a test suite.
     """
     test_suite = unittest.TestSuite()
     test_suite.addTest(unittest.makeSuite(EventHandlerTest))
+    test_suite.addTest(unittest.makeSuite(EventDispatcherTest))
     return test_suite
 
 
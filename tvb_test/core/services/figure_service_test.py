@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the thumbnails of stored figures.
+"""
+
+import os
+import base64
+import shutil
+import unittest
+import Image
+# See TVB-985
+if not hasattr(Image, 'open'):
+    from Image import Image
+from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.core import utils
+from tvb.core.services.exceptions import FigureException
+from tvb.core.services.figure_service import THUMBNAIL_SIZE, ThumbnailWriter, FigureWriter, FigureService
+from tvb.core.services.figure_service import get_thumbnail_file, write_thumbnail, get_figure_thumbnail_url
+
+
+
+class _FigureStub(object):
+    """
+    The ResultFigure fields needed for computing thumbnail URLs.
+    """
+
+    def __init__(self, file_path, file_format):
+        self.file_path = file_path
+        self.file_format = file_format
+
+
+
+class _EntityStub(object):
+    """
+    The Project / User fields kept by a FigureWriter.
+    """
+
+    def __init__(self, entity_id, name=None):
+        self.id = entity_id
+        self.name = name
+
+
+
+class FigureServiceTest(unittest.TestCase):
+    """
+    Test thumbnails writing and their display in lists, independent of the DB.
+    """
+
+    def setUp(self):
+        self.figures_folder = os.path.join(cfg.TVB_TEMP_FOLDER, "figures_test")
+        if not os.path.exists(self.figures_folder):
+            os.makedirs(self.figures_folder)
+        self.figure_path = os.path.join(self.figures_folder, "snapshot.png")
+        Image.new("RGBA", (1200, 600)).save(self.figure_path)
+
+
+    def tearDown(self):
+        if os.path.exists(self.figures_folder):
+            shutil.rmtree(self.figures_folder)
+
+
+    def test_write_thumbnail(self):
+        """
+        Thumbnails fit in THUMBNAIL_SIZE and keep the figure proportions.
+        """
+        self.assertEqual(os.path.join(self.figures_folder, "snapshot-thumbnail.png"),
+                         get_thumbnail_file(self.figure_path))
+        write_thumbnail(Image.open(self.figure_path), self.figure_path)
+        thumbnail = Image.open(get_thumbnail_file(self.figure_path))
+        self.assertEqual(THUMBNAIL_SIZE[0], thumbnail.size[0])
+        self.assertEqual(THUMBNAIL_SIZE[0] / 2, thumbnail.size[1])
+
+
+    def test_get_figure_thumbnail_url(self):
+        """
+        Lists show the thumbnail of PNG figures, once written, and SVG figures directly.
+        """
+        figure = _FigureStub("snapshot.png", "png")
+        self.assertEqual(utils.path2url_part(self.figure_path), get_figure_thumbnail_url(self.figures_folder, figure))
+        ThumbnailWriter(self.figure_path).run()
+        self.assertEqual(utils.path2url_part(get_thumbnail_file(self.figure_path)),
+                         get_figure_thumbnail_url(self.figures_folder, figure))
+        figure = _FigureStub("snapshot.svg", "svg")
+        self.assertEqual(utils.path2url_part(os.path.join(self.figures_folder, "snapshot.svg")),
+                         get_figure_thumbnail_url(self.figures_folder, figure))
+
+
+
+    def test_decode_figure(self):
+        """
+        Figures are decoded in the request, so invalid data is reported to the user at once.
+        """
+        with open(self.figure_path, 'rb') as figure_file:
+            png_data = base64.b64encode(figure_file.read())
+        self.assertEqual((1200, 600), FigureService.decode_figure("png", png_data).size)
+        svg = FigureService.decode_figure("svg", '<svg width="10px" height="20px"><g/></svg>')
+        self.assertEqual("20px", svg.getAttribute("height"))
+        self.assertRaises(FigureException, FigureService.decode_figure, "png", "not an image")
+        self.assertRaises(FigureException, FigureService.decode_figure, "svg", "<svg>")
+        self.assertRaises(FigureException, FigureService.decode_figure, "bmp", png_data)
+
+
+    def test_failed_figures_reported(self):
+        """
+        Failures of the background writer are kept for the user, until read once.
+        """
+        def _failing_write(*_):
+            raise IOError("Disk full")
+        original_write = FigureService.write_result_figure
+        FigureService.write_result_figure = _failing_write
+        try:
+            FigureWriter(_EntityStub(1, "project"), _EntityStub(42), "png", 7, None).run()
+        finally:
+            FigureService.write_result_figure = original_write
+        failures = FigureService.pop_failed_figures(42)
+        self.assertEqual(1, len(failures))
+        self.assertTrue("Disk full" in failures[0], failures[0])
+        self.assertEqual([], FigureService.pop_failed_figures(42))
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(FigureServiceTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
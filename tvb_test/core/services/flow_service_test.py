@@ -46,6 +46,7 @@ from tvb.core.adapters.abcadapter import ABCAdapter
 from tvb.core.adapters.abcadapter import ABCSynchronous
 from tvb.core.services.exceptions import OperationException
 from tvb.core.services.flow_service import FlowService
+from tvb.core.services.status_bus import STATUS_BUS
 from tvb_test.datatypes.datatype1 import Datatype1
 from tvb_test.datatypes.datatype2 import Datatype2
 from tvb_test.core.base_testcase import TransactionalTestCase
@@ -217,6 +218,48 @@ class FlowServiceTest(TransactionalTestCase):
         self.assertTrue(result.endswith("has finished."), "Operation fail")
 
 
+    def test_get_operation_numbers(self):
+        """
+        Operation numbers are counted per status, and cached until a status change gets published.
+        """
+        FlowService.invalidate_operation_numbers(self.test_project.id)
+        for status in [model.STATUS_FINISHED, model.STATUS_FINISHED, model.STATUS_STARTED, model.STATUS_ERROR]:
+            operation = model.Operation(self.test_user.id, self.test_project.id, self.algo_inst.id, 'test params',
+                                        status=status)
+            operation = dao.store_entity(operation)
+        self.assertEqual((2, 1, 1, 0), FlowService.get_operation_numbers(self.test_project.id))
+        self.assertEqual((2, 1, 1, 0), dao.get_operation_numbers(self.test_project.id))
+
+        operation.status = model.STATUS_CANCELED
+        operation = dao.store_entity(operation)
+        ## Not published yet, so the cached numbers are still returned.
+        self.assertEqual((2, 1, 1, 0), FlowService.get_operation_numbers(self.test_project.id))
+        STATUS_BUS.publish_operation(operation)
+        self.assertEqual((2, 1, 0, 1), FlowService.get_operation_numbers(self.test_project.id))
+
+
+    def test_get_project_input_tree(self):
+        """
+        Input trees are shared per project, until a status event gets published for that project.
+        """
+        group = dao.find_group(TEST_ADAPTER_VALID_MODULE, TEST_ADAPTER_VALID_CLASS)
+        FlowService.invalidate_input_trees(self.test_project.id)
+        input_tree = self.flow_service.get_project_input_tree(self.test_project.id, group)
+        self.assertEqual('test', input_tree[0][ABCAdapter.KEY_NAME])
+        self.assertTrue(input_tree is self.flow_service.get_project_input_tree(self.test_project.id, group))
+
+        filled_tree = ABCAdapter.fill_defaults(input_tree, {'test': '5'})
+        self.assertEqual('5', filled_tree[0][ABCAdapter.KEY_DEFAULT])
+        self.assertEqual('0', input_tree[0][ABCAdapter.KEY_DEFAULT])
+
+        operation = TestFactory.create_operation(test_user=self.test_user, test_project=self.test_project)
+        STATUS_BUS.publish_operation(operation)
+        new_tree = self.flow_service.get_project_input_tree(self.test_project.id, group)
+        self.assertFalse(input_tree is new_tree)
+        FlowService.invalidate_input_trees(self.test_project.id)
+        self.assertFalse(new_tree is self.flow_service.get_project_input_tree(self.test_project.id, group))
+
+
     def test_get_filtered_by_column(self):
         """
         Test the filter function when retrieving dataTypes with a filter
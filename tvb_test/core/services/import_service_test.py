@@ -39,7 +39,7 @@ import numpy
 from tvb.basic.config.settings import TVBSettings as cfg
 from tvb.core.entities.storage import dao
 from tvb.core.entities.file.files_helper import FilesHelper
-from tvb.core.services.import_service import ImportService
+from tvb.core.services.import_service import ImportService, ImportJournal
 from tvb.core.services.flow_service import FlowService
 from tvb.core.services.project_service import ProjectService
 from tvb.core.services.operation_service import OperationService
@@ -176,6 +176,63 @@ class ImportServiceTest(TransactionalTestCase):
             pass
 
 
+    def test_import_resumed_after_failure(self):
+        """
+        When the import of a project stops halfway with a retryable error, the data imported so far is kept
+        together with the import journal, and uploading the same archive again completes the import.
+        """
+        self._create_value_wrapper()
+        self.zip_path = ExportManager().export_project(self.test_project)
+        self.project_service.remove_project(self.test_project.id)
+
+        def _interrupted_import(*_):
+            raise IOError("Import interrupted")
+        self.import_service.import_workflows = _interrupted_import
+        self.assertRaises(ProjectImportException, self.import_service.import_project_structure,
+                          self.zip_path, self.test_user.id)
+
+        projects = self.project_service.retrieve_projects_for_user(self.test_user.id)[0]
+        self.assertEqual(len(projects), 1, "The partially imported project should be kept.")
+        project_folder = FilesHelper().get_project_folder(projects[0])
+        self.assertTrue(ImportJournal.exists(project_folder), "Import journal should be kept after a failure.")
+        self.assertEqual(len(dao.get_filtered_operations(projects[0].id, None)), 2)
+
+        ImportService().import_project_structure(self.zip_path, self.test_user.id)
+        projects = self.project_service.retrieve_projects_for_user(self.test_user.id)[0]
+        self.assertEqual(len(projects), 1, "There should be only one project.")
+        self.test_project = projects[0]
+        self.assertFalse(ImportJournal.exists(project_folder), "Import journal should be removed when done.")
+        self.assertEqual(len(dao.get_filtered_operations(self.test_project.id, None)), 2,
+                         "Operations should not be imported twice.")
+        new_val = self.flow_service.get_available_datatypes(self.test_project.id,
+                                                            "tvb.datatypes.mapped_values.ValueWrapper")
+        self.assertEqual(len(new_val), 1)
+
+
+    def test_import_removed_after_failure(self):
+        """
+        When the import of a project fails with an error which would happen again on the next upload,
+        the partially imported project is removed.
+        """
+        self._create_value_wrapper()
+        self.zip_path = ExportManager().export_project(self.test_project)
+        self.project_service.remove_project(self.test_project.id)
+
+        def _failing_import(*_):
+            raise ProjectImportException("Invalid workflows")
+        self.import_service.import_workflows = _failing_import
+        self.assertRaises(ProjectImportException, self.import_service.import_project_structure,
+                          self.zip_path, self.test_user.id)
+        projects = self.project_service.retrieve_projects_for_user(self.test_user.id)[0]
+        self.assertEqual(len(projects), 0, "The partially imported project should be removed.")
+
+        ImportService().import_project_structure(self.zip_path, self.test_user.id)
+        projects = self.project_service.retrieve_projects_for_user(self.test_user.id)[0]
+        self.assertEqual(len(projects), 1)
+        self.test_project = projects[0]
+        self.assertFalse(ImportJournal.exists(FilesHelper().get_project_folder(self.test_project)))
+
+
     def _create_timeseries(self):
         """Launch adapter to persist a TimeSeries entity"""
         activity_data = numpy.array([[1, 2, 3], [4, 5, 6], [7, 8, 9], [10, 11, 12]])
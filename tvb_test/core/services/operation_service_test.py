@@ -41,6 +41,7 @@ from tvb.core.entities import model
 from tvb.core.entities.storage import dao
 from tvb.core.entities.file.files_helper import FilesHelper
 from tvb.core.entities.transient.structure_entities import DataTypeMetaData
+from tvb.core.services import backend_client
 from tvb.core.services.operation_service import OperationService
 from tvb.core.services.project_service import initialize_storage, ProjectService
 from tvb.core.services.flow_service import FlowService
@@ -379,6 +380,30 @@ class OperationServiceTest(BaseTestCase):
         self.assertEqual(operation.status, model.STATUS_FINISHED, "Operation shouldn't have been canceled!")
 
 
+    def test_send_to_cluster_partial_failure(self):
+        """
+        When the back-end fails to start an operation, the ones already started are left alone,
+        while the failing one and the ones after it are marked as failed.
+        """
+        operations = [TestFactory.create_operation(test_user=self.test_user, test_project=self.test_project,
+                                                   operation_status=model.STATUS_STARTED) for _ in range(4)]
+        started = []
+
+        def failing_execute(operation_id, user_name_label, adapter_instance):
+            if len(started) == 2:
+                raise Exception("No more threads")
+            started.append(operation_id)
+
+        original_execute = backend_client.StandAloneClient.execute
+        backend_client.StandAloneClient.execute = staticmethod(failing_execute)
+        try:
+            self.assertRaises(Exception, self.operation_service._send_to_cluster, operations, None)
+        finally:
+            backend_client.StandAloneClient.execute = original_execute
+        statuses = [dao.get_operation_by_id(operation.id).status for operation in operations]
+        self.assertEqual([model.STATUS_STARTED] * 2 + [model.STATUS_ERROR] * 2, statuses)
+
+
     def test_array_from_string(self):
         """
         Simple test for parse array on 1d, 2d and 3d array.
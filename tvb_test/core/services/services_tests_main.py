@@ -37,6 +37,10 @@ from tvb_test.core.services import project_structure_test
 from tvb_test.core.services import burst_service_test
 from tvb_test.core.services import user_service_test
 from tvb_test.core.services import event_handler_test
+from tvb_test.core.services import status_bus_test
+from tvb_test.core.services import equation_chart_service_test
+from tvb_test.core.services import figure_service_test
+from tvb_test.core.services import cluster_schedulers_test
 from tvb_test.core.services import flow_service_test
 from tvb_test.core.services import settings_service_test
 from tvb_test.core.services import import_service_test
@@ -44,6 +48,7 @@ from tvb_test.core.services import workflow_service_test
 from tvb_test.core.services import operation_service_test
 from tvb_test.core.services import remove_test
 from tvb_test.core.services import dti_pipeline_service_test
+from tvb_test.core.services import volume_service_test
 
 
 def suite():
@@ -54,6 +59,10 @@ def suite():
     test_suite.addTest(project_service_test.suite())
     test_suite.addTest(project_structure_test.suite())
     test_suite.addTest(event_handler_test.suite())
+    test_suite.addTest(status_bus_test.suite())
+    test_suite.addTest(equation_chart_service_test.suite())
+    test_suite.addTest(figure_service_test.suite())
+    test_suite.addTest(cluster_schedulers_test.suite())
     test_suite.addTest(user_service_test.suite())
     test_suite.addTest(flow_service_test.suite())
     test_suite.addTest(settings_service_test.suite())
@@ -63,6 +72,7 @@ def suite():
     test_suite.addTest(operation_service_test.suite())
     test_suite.addTest(remove_test.suite())
     test_suite.addTest(dti_pipeline_service_test.suite())
+    test_suite.addTest(volume_service_test.suite())
     return test_suite
 
 
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the in-process status bus.
+"""
+
+import time
+import threading
+import unittest
+from tvb.core.entities import model
+from tvb.core.services.status_bus import StatusBus, EVENT_OPERATION, EVENT_BURST
+
+
+class StatusBusTest(unittest.TestCase):
+    """
+    Test publishing and reading of status events, independent of the DB.
+    """
+
+    def setUp(self):
+        self.bus = StatusBus(history_size=5, max_waiting_clients=1)
+
+
+    def test_events_filtered_by_project(self):
+        """
+        Only events newer than the given sequence, and of the requested project, are returned.
+        """
+        first = self.bus.publish(1, EVENT_OPERATION, 10, model.STATUS_STARTED)
+        self.bus.publish(2, EVENT_OPERATION, 11, model.STATUS_STARTED)
+        self.bus.publish(1, EVENT_OPERATION, 10, model.STATUS_FINISHED)
+        sequence, events, is_complete = self.bus.get_events(1, first)
+        self.assertEqual(3, sequence)
+        self.assertTrue(is_complete)
+        self.assertEqual(1, len(events))
+        self.assertEqual(model.STATUS_FINISHED, events[0]['status'])
+        self.assertEqual((3, [], True), self.bus.get_events(1, sequence))
+
+
+    def test_lost_events_detected(self):
+        """
+        Clients behind the kept history, or ahead of it (server restart), are told to reload.
+        """
+        for idx in range(7):
+            self.bus.publish(1, EVENT_OPERATION, idx, model.STATUS_FINISHED)
+        _, events, is_complete = self.bus.get_events(1, 1)
+        self.assertFalse(is_complete)
+        _, events, is_complete = self.bus.get_events(1, 2)
+        self.assertTrue(is_complete)
+        self.assertEqual(5, len(events))
+        _, events, is_complete = self.bus.get_events(1, 100)
+        self.assertFalse(is_complete)
+
+
+    def test_wait_for_events(self):
+        """
+        A waiting client is woken up by a publish; over the waiting limit, requests return at once.
+        """
+        result = []
+        waiting = threading.Thread(target=lambda: result.append(self.bus.get_events(1, 0, timeout=5)))
+        waiting.start()
+        time.sleep(0.2)
+        start = time.time()
+        self.assertEqual((0, [], True), self.bus.get_events(1, 0, timeout=5))
+        self.assertTrue(time.time() - start < 1)
+        self.bus.publish(1, EVENT_BURST, 3, 'finished')
+        waiting.join(2)
+        self.assertEqual(1, len(result))
+        self.assertEqual(3, result[0][1][0]['id'])
+        start = time.time()
+        self.assertEqual((1, [], True), self.bus.get_events(1, 1, timeout=0.3))
+        self.assertTrue(time.time() - start >= 0.3)
+
+
+    def test_listeners(self):
+        """
+        Listeners get a copy of every event published; a failing listener does not stop the others.
+        """
+        received = []
+
+        def failing_listener(_):
+            raise Exception("Listener failure")
+
+        self.bus.add_listener(failing_listener)
+        self.bus.add_listener(received.append)
+        self.bus.add_listener(received.append)
+        sequence = self.bus.publish(1, EVENT_BURST, 3, 'finished')
+        self.assertEqual(1, len(received))
+        self.assertEqual(sequence, received[0]['sequence'])
+        received[0]['status'] = 'changed'
+        self.assertEqual('finished', self.bus.get_events(1, 0)[1][0]['status'])
+        self.bus.remove_listener(received.append)
+        self.bus.publish(1, EVENT_BURST, 3, 'finished')
+        self.assertEqual(1, len(received))
+
+
+    def test_burst_progress(self):
+        """
+        Operation events in a burst carry the counts of finished operations, until the burst ends.
+        """
+        burst = model.BurstConfiguration(1)
+        burst.id = 7
+        operation = model.Operation(1, 1, 1, '{}', status=model.STATUS_FINISHED)
+        operation.id = 1
+        self.bus.publish_operation(operation, burst.id)
+        operation.status = model.STATUS_ERROR
+        self.bus.publish_operation(operation, burst.id)
+        self.bus.publish_burst(burst)
+        _, events, _ = self.bus.get_events(1, 0)
+        self.assertEqual({model.STATUS_FINISHED: 1, model.STATUS_ERROR: 1}, events[1]['burst_progress'])
+        self.assertEqual(events[1]['burst_progress'], events[2]['burst_progress'])
+        burst.mark_status(success=True)
+        self.bus.publish_burst(burst)
+        self.bus.publish_operation(operation, burst.id)
+        _, events, _ = self.bus.get_events(1, 3)
+        self.assertEqual(burst.BURST_FINISHED, events[0]['status'])
+        self.assertEqual({model.STATUS_ERROR: 1}, events[1]['burst_progress'])
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(StatusBusTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
+
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the planes and the time point cache of the volume service.
+"""
+
+import numpy
+import unittest
+from tvb.core.services import volume_service
+from tvb.core.services.volume_service import VolumeService, orthogonal_planes
+
+
+
+class _CountingVolumeService(VolumeService):
+    """
+    Reads a generated volume instead of a stored TimeSeriesVolume, and counts the reads.
+    """
+
+    def __init__(self):
+        VolumeService.__init__(self)
+        self.reads = []
+
+
+    @staticmethod
+    def _read_time_length(time_series_gid):
+        return 100
+
+
+    def _read_time_point(self, time_series_gid, time_idx):
+        self.reads.append(time_idx)
+        return numpy.arange(24, dtype=numpy.float32).reshape((2, 3, 4)) + time_idx
+
+
+
+class VolumeServiceTest(unittest.TestCase):
+    """
+    Slicing and caching are checked independent of the DB and H5 files.
+    """
+
+
+    def test_orthogonal_planes(self):
+        volume = numpy.arange(24).reshape((2, 3, 4))
+        planes = orthogonal_planes(volume, (1, 2, 3))
+        self.assertEqual(3, len(planes))
+        self.assertTrue(numpy.all(volume[1, :, :] == planes[0]))
+        self.assertTrue(numpy.all(volume[:, 2, :] == planes[1]))
+        self.assertTrue(numpy.all(volume[:, :, 3] == planes[2]))
+
+        only_z = orthogonal_planes(volume, (0, 0, 1), axis=2)
+        self.assertEqual(1, len(only_z))
+        self.assertTrue(numpy.all(volume[:, :, 1] == only_z[0]))
+
+
+    def test_voxel_clipped(self):
+        volume = numpy.arange(24).reshape((2, 3, 4))
+        planes = orthogonal_planes(volume, (5, -1, 10))
+        self.assertTrue(numpy.all(volume[1, :, :] == planes[0]))
+        self.assertTrue(numpy.all(volume[:, 0, :] == planes[1]))
+        self.assertTrue(numpy.all(volume[:, :, 3] == planes[2]))
+
+
+    def test_time_points_cached(self):
+        service = _CountingVolumeService()
+        gid = "volume-service-test"
+        service.get_planes(gid, 0, (0, 0, 0))
+        service.get_planes(gid, 0, (1, 2, 3))
+        self.assertEqual([0], service.reads)
+
+        for time_idx in xrange(1, volume_service.TIME_POINTS_CACHE_SIZE + 1):
+            service.get_time_point(gid, time_idx)
+        ## The first time point was the least recently used, thus evicted.
+        planes = service.get_planes(gid, 0, (0, 0, 0), axis=0)
+        self.assertEqual(volume_service.TIME_POINTS_CACHE_SIZE + 2, len(service.reads))
+        self.assertEqual((3, 4), planes[0].shape)
+
+
+    def test_time_index_clipped(self):
+        service = _CountingVolumeService()
+        gid = "volume-service-test-clipped"
+        service.get_time_point(gid, 99)
+        service.get_time_point(gid, 150)
+        service.get_time_point(gid, -1)
+        service.get_time_point(gid, 0)
+        ## Out of range indices are served by the cache entries of the first and the last time point.
+        self.assertEqual([99, 0], service.reads)
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(VolumeServiceTest))
+    return test_suite
+
+
+
+if __name__ == "__main__":
+    #So you can run tests from this package individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
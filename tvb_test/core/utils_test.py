@@ -37,7 +37,7 @@ import numpy
 import unittest
 import datetime
 from tvb.core.utils import path2url_part, get_unique_file_name, string2date, date2string, string2bool
-from tvb.core.utils import string2array
+from tvb.core.utils import string2array, LRUCache
 from tvb_test.core.base_testcase import TransactionalTestCase
 
 class UtilsTest(TransactionalTestCase):
@@ -158,6 +158,24 @@ class UtilsTest(TransactionalTestCase):
             self.assertEqual(result_array[0], 1)
             self.assertEqual(result_array[1], 2)
             self.assertEqual(result_array[2], 3)
+
+
+    def test_lru_cache(self):
+        """
+        The least recently used entry is dropped when the cache is full; reading an entry refreshes it.
+        """
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(1, cache.get('a'))
+        cache.put('c', 3)
+        self.assertEqual(['a', 'c'], cache.keys())
+        self.assertFalse('b' in cache)
+        self.assertEqual('missing', cache.get('b', 'missing'))
+        self.assertEqual(3, cache.pop('c'))
+        self.assertEqual(None, cache.pop('c'))
+        cache.clear()
+        self.assertEqual(0, len(cache))
         
         
 def suite():
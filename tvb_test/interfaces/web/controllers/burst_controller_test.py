@@ -42,6 +42,7 @@ from time import sleep
 from tvb.config import SIMULATOR_MODULE, SIMULATOR_CLASS
 import tvb.interfaces.web.controllers.base_controller as b_c
 from tvb.interfaces.web.controllers.burst.burst_controller import BurstController
+from tvb.interfaces.web.entities.context_selected_adapter import SelectedAdapterContext
 from tvb.datatypes.connectivity import Connectivity
 from tvb.core.entities import model
 from tvb.core.entities.file.files_helper import FilesHelper
@@ -104,6 +105,17 @@ class BurstContollerTest(BaseControllersTest):
         self.assertTrue(result_dict['draw_hidden_ranges'])
 
 
+
+    def test_simulator_tree_not_in_session(self):
+        """
+        The simulator tree is not copied into session: filters read the tree shared by the project.
+        """
+        self.burst_c.index()
+        adapter_info = cherrypy.session[SelectedAdapterContext.KEY_CURRENT_ADAPTER_INFO]
+        self.assertFalse(any(isinstance(value, list) for value in adapter_info.values()))
+        self.assertTrue(self.burst_c.context.get_current_input_tree() is self.burst_c.cached_simulator_input_tree)
+
+
     def test_load_burst_history(self):
         """
         Create two burst, load the burst and check that we get back
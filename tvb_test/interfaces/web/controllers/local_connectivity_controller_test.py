@@ -32,11 +32,15 @@
 .. moduleauthor:: Bogdan Neacsa <bogdan.neacsa@codemart.ro>
 """
 
+import json
+import numpy
 import unittest
 import cherrypy
+from scipy import sparse
 from tvb.core.entities.transient.context_local_connectivity import ContextLocalConnectivity
 from tvb.interfaces.web.controllers.spatial.local_connectivity_controller import LocalConnectivityController
 from tvb.interfaces.web.controllers.spatial.local_connectivity_controller import KEY_LCONN_CONTEXT
+from tvb.interfaces.web.controllers.spatial import local_connectivity_controller
 from tvb_test.core.base_testcase import TransactionalTestCase
 from tvb_test.interfaces.web.controllers.base_controller_test import BaseControllersTest
 
@@ -99,6 +103,33 @@ class LocalConnectivityControllerTest(TransactionalTestCase, BaseControllersTest
         self.assertEqual(result_dict['next_step_url'], '/spatial/localconnectivity/step_1')
         
         
+    def test_compute_data_for_gradient_view(self):
+        """
+        The picked row is returned as its non-zero entries, with the split of the surface in display buffers.
+        """
+        class _FakeSurface(object):
+            SPLIT_MAX_SIZE = 4
+            SPLIT_BUFFER_SIZE = 2
+            triangles = numpy.array([[0, 1, 2], [3, 4, 5], [6, 7, 8]])
+
+        class _FakeLocalConnectivity(object):
+            surface = _FakeSurface()
+            matrix = sparse.csc_matrix(numpy.diag(numpy.arange(1.0, 10.0)))
+
+        gradient_source = local_connectivity_controller._GradientSource(_FakeLocalConnectivity())
+        self.assertEqual(gradient_source.chunks, [[0, 6], [4, 9]])
+        local_connectivity_controller._GRADIENT_SOURCES.put('fake-gid', gradient_source)
+        try:
+            result = json.loads(self.local_p_c.compute_data_for_gradient_view('fake-gid', '1'))
+        finally:
+            local_connectivity_controller._GRADIENT_SOURCES.pop('fake-gid')
+        self.assertEqual(result['indices'], [3])
+        self.assertEqual(result['values'], [4.0])
+        self.assertEqual(result['vertex_count'], 9)
+        self.assertEqual(result['min_value'], 0.0)
+        self.assertEqual(result['max_value'], 4.0)
+        
+        
             
 def suite():
     """
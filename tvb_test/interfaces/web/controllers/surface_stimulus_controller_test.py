@@ -32,9 +32,11 @@
 .. moduleauthor:: Bogdan Neacsa <bogdan.neacsa@codemart.ro>
 """
 
+import numpy
 import unittest
 import tvb.interfaces.web.controllers.base_controller as b_c
 from tvb.interfaces.web.controllers.spatial.surface_stimulus_controller import SurfaceStimulusController
+from tvb.interfaces.web.controllers.spatial.surface_stimulus_controller import stimulus_pattern
 from tvb.interfaces.web.controllers.spatial.surface_stimulus_controller import KEY_SURFACE_CONTEXT
 from tvb.core.entities.transient.context_stimulus import SURFACE_PARAMETER
 from tvb_test.datatypes.datatypes_factory import DatatypesFactory
@@ -81,6 +83,21 @@ class SurfaceStimulusControllerTest(TransactionalTestCase, BaseControllersTest):
         self.assertEqual(result_dict['loadExistentEntityUrl'], '/spatial/stimulus/surface/load_surface_stimulus')
 
 
+
+    def test_stimulus_pattern(self):
+        """
+        The pattern is the outer product of its spatial (vertices x 1) and temporal (1 x time) components,
+        with time steps on the first axis.
+        """
+        spatial = numpy.array([[1.0], [2.0], [0.0]])
+        temporal = numpy.array([[0.5, 1.0, 3.0, 0.0]])
+        pattern = stimulus_pattern(spatial, temporal)
+        self.assertEqual((4, 3), pattern.shape)
+        self.assertEqual(numpy.float32, pattern.dtype)
+        numpy.testing.assert_array_equal((spatial * temporal).T, pattern)
+        numpy.testing.assert_array_equal([3.0, 6.0, 0.0], pattern[2])
+
+
 def suite():
     """
     Gather all the tests in a test suite.
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+#
+# TheVirtualBrain-Framework Package. This package holds all Data Management, and 
+# Web-UI helpful to run brain-simulations. To use it, you also need do download
+# TheVirtualBrain-Scientific Package (for simulators). See content of the
+# documentation-folder for more details. See also http://www.thevirtualbrain.org
+#
+# (c) 2012-2013, Baycrest Centre for Geriatric Care ("Baycrest")
+#
+# This program is free software; you can redistribute it and/or modify it under 
+# the terms of the GNU General Public License version 2 as published by the Free
+# Software Foundation. This program is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of 
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details. You should have received a copy of the GNU General 
+# Public License along with this program; if not, you can download it here
+# http://www.gnu.org/licenses/old-licenses/gpl-2.0
+#
+#
+#   CITATION:
+# When using The Virtual Brain for scientific publications, please cite it as follows:
+#
+#   Paula Sanz Leon, Stuart A. Knock, M. Marmaduke Woodman, Lia Domide,
+#   Jochen Mersmann, Anthony R. McIntosh, Viktor Jirsa (2013)
+#       The Virtual Brain: a simulator of primate brain network dynamics.
+#   Frontiers in Neuroinformatics (7:10. doi: 10.3389/fninf.2013.00010)
+#
+#
+"""
+Tests for the HTTP caching of stored data.
+"""
+
+import os
+import shutil
+import unittest
+import cherrypy
+from cherrypy.lib import httputil
+from tvb.basic.config.settings import TVBSettings as cfg
+from tvb.interfaces.web.data_serving import build_etag, file_etag, validate_etag, discard_etag, serve_data_file
+from tvb.interfaces.web.data_serving import CACHE_MAX_AGE, REVALIDATE
+
+
+
+class DataServingTest(unittest.TestCase):
+    """
+    Test ETag validation on the current CherryPy request, without a running server.
+    """
+
+    def setUp(self):
+        self.data_folder = os.path.join(cfg.TVB_TEMP_FOLDER, "data_serving_test")
+        if not os.path.exists(self.data_folder):
+            os.makedirs(self.data_folder)
+        cherrypy.request.headers = httputil.HeaderMap()
+        cherrypy.response.headers = httputil.HeaderMap()
+
+
+    def tearDown(self):
+        cherrypy.request.headers = httputil.HeaderMap()
+        if os.path.exists(self.data_folder):
+            shutil.rmtree(self.data_folder)
+
+
+    def _assert_not_modified(self, method, *args, **kwargs):
+        """ The call should end the request with 304. """
+        try:
+            method(*args, **kwargs)
+            self.fail("Should end with 304.")
+        except cherrypy.HTTPRedirect, redirect:
+            self.assertEqual(304, redirect.status)
+
+
+    def test_validate_etag(self):
+        """
+        Matching If-None-Match headers (also in lists, or weak) end with 304; others only get caching headers.
+        """
+        etag = build_etag("gid", "vertices", "True")
+        self.assertEqual(etag, build_etag("gid", "vertices", "True"))
+        self.assertNotEqual(etag, build_etag("gid", "triangles", "True"))
+        validate_etag(etag)
+        self.assertEqual(etag, cherrypy.response.headers['ETag'])
+        self.assertEqual('private, max-age=%d' % CACHE_MAX_AGE, cherrypy.response.headers['Cache-Control'])
+        validate_etag(etag, REVALIDATE)
+        self.assertEqual('private, max-age=0, must-revalidate', cherrypy.response.headers['Cache-Control'])
+        cherrypy.request.headers['If-None-Match'] = build_etag("other")
+        validate_etag(etag)
+        for if_none_match in [etag, '"x", ' + etag, 'W/' + etag, '*']:
+            cherrypy.request.headers['If-None-Match'] = if_none_match
+            self._assert_not_modified(validate_etag, etag)
+        discard_etag()
+        self.assertFalse('ETag' in cherrypy.response.headers)
+        self.assertEqual('no-cache', cherrypy.response.headers['Cache-Control'])
+
+
+    def test_serve_data_file(self):
+        """
+        A stored file already in the browser is not sent again, until it is replaced.
+        As it can be replaced under the same path, the browser should always revalidate it.
+        """
+        file_path = os.path.join(self.data_folder, "figure.png")
+        with open(file_path, 'wb') as file_writer:
+            file_writer.write("content")
+        cherrypy.request.headers['If-None-Match'] = file_etag(file_path)
+        self._assert_not_modified(serve_data_file, file_path)
+        self.assertEqual('private, max-age=0, must-revalidate', cherrypy.response.headers['Cache-Control'])
+        with open(file_path, 'wb') as file_writer:
+            file_writer.write("changed content")
+        self.assertNotEqual(cherrypy.request.headers['If-None-Match'], file_etag(file_path))
+
+
+
+def suite():
+    """
+    Gather all the tests in a test suite.
+    """
+    test_suite = unittest.TestSuite()
+    test_suite.addTest(unittest.makeSuite(DataServingTest))
+    return test_suite
+
+
+if __name__ == "__main__":
+    #So you can run tests individually.
+    TEST_RUNNER = unittest.TextTestRunner()
+    TEST_SUITE = suite()
+    TEST_RUNNER.run(TEST_SUITE)
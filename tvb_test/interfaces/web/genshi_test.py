@@ -486,6 +486,37 @@ class GenshiTestNDimensionArray(GenshiTest):
 
 
 
+class GenshiTestTemplateCache(GenshiTest):
+    """
+    Rendering through the template loader shared by all requests.
+    """
+
+
+    def test_template_compiled_once(self):
+        """
+        The same compiled template is reused, and the renders are counted per template.
+        """
+        path_to_form = os.path.join(os.path.dirname(root_html.__file__), 'genericAdapterFormFields.html')
+        self.assertTrue(base.TEMPLATE_LOADER.load(path_to_form) is base.TEMPLATE_LOADER.load(path_to_form))
+
+        input_tree = ABCAdapter.prepare_param_names(TraitAdapter().get_input_tree())
+        self.template_specification['inputList'] = input_tree
+        self.template_specification[base.KEY_SHOW_ONLINE_HELP] = False
+        previous_count = base.get_render_metrics().get(path_to_form, {}).get('count', 0)
+        first_html = base.render_template(path_to_form, self.template_specification)
+        second_html = base.render_template(path_to_form, self.template_specification)
+        self.assertEqual(first_html, second_html)
+        self.assertEqual(previous_count + 2, base.get_render_metrics()[path_to_form]['count'])
+
+
+    def test_precompile_templates(self):
+        """
+        Templates are found and compiled from the given root folder.
+        """
+        self.assertTrue(base.precompile_templates(os.path.dirname(root_html.__file__)) > 0)
+
+
+
 def suite():
     """
     Gather all the tests in a test suite.
@@ -495,6 +526,7 @@ def suite():
     test_suite.addTest(unittest.makeSuite(GenshiTestSimple))
     test_suite.addTest(unittest.makeSuite(GenshiTestGroup))
     test_suite.addTest(unittest.makeSuite(GenthiTraitTest))
+    test_suite.addTest(unittest.makeSuite(GenshiTestTemplateCache))
     return test_suite
 
 